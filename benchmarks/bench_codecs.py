@@ -0,0 +1,102 @@
+"""
+benchmarks/bench_codecs.py
+
+Encode/decode throughput of the capsule codecs:
+
+- codec_v03:      raw dense volume capsule (header + volume + CRC)
+- civd_v04_codec: single-file capsule through the v0.4 file table
+- civd_v05_codec: adaptive geometry + capsule metadata
+- ci3_codec:      legacy v0.1 / v0.2 corpora (fixed 16^3 geometry, so they
+                  run once per suite instead of once per case)
+
+The payload of every case is the raw (z, y, x, C) volume bytes; v0.3/v0.4
+store each voxel as channels * itemsize byte channels.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from corpus_informaticus.ci3_codec import decode_ci3, decode_ci3_v02, encode_bytes_to_ci3, encode_bytes_to_ci3_v02
+from corpus_informaticus.civd_v04_codec import decode_civd_v04, encode_folder_to_civd_v04
+from corpus_informaticus.civd_v05_codec import decode_civd_v05, encode_payloads_to_civd_v05
+from corpus_informaticus.codec_v03 import decode_civd_v03, encode_bytes_to_civd_v03
+
+from harness import Case, make_volume, throughput_records, time_best
+
+CI3_PAYLOAD = 4096
+CI3_LOOPS = 20
+
+
+def _bench_case(case: Case, repeat: int) -> List[Dict[str, Any]]:
+    params = case.params()
+    payload = make_volume(case).tobytes()
+    n = len(payload)
+    byte_channels = case.channels * np.dtype(case.dtype).itemsize
+    out: List[Dict[str, Any]] = []
+
+    blob = encode_bytes_to_civd_v03(payload, dims=case.dims, channels=byte_channels)
+    out += throughput_records(
+        "codec/civd_v03/encode", params, n,
+        *time_best(lambda: encode_bytes_to_civd_v03(payload, dims=case.dims, channels=byte_channels), repeat),
+    )
+    out += throughput_records("codec/civd_v03/decode", params, n, *time_best(lambda: decode_civd_v03(blob), repeat))
+    del blob
+
+    with tempfile.TemporaryDirectory() as td:
+        with open(os.path.join(td, "volume.bin"), "wb") as f:
+            f.write(payload)
+        # one spare z-slice of capacity holds the v0.4 file table
+        dims = (case.size, case.size, case.size + 1)
+        blob, _ = encode_folder_to_civd_v04(td, dims=dims, channels=byte_channels)
+        out += throughput_records(
+            "codec/civd_v04/encode", params, n,
+            *time_best(lambda: encode_folder_to_civd_v04(td, dims=dims, channels=byte_channels), repeat),
+        )
+    out += throughput_records("codec/civd_v04/decode", params, n, *time_best(lambda: decode_civd_v04(blob), repeat))
+    del blob
+
+    payloads = {"volume.bin": payload}
+    meta = {"dims": list(case.dims), "dtype": case.dtype, "channels": case.channels}
+    blob, _ = encode_payloads_to_civd_v05(payloads, capsule_meta=meta, channels=byte_channels)
+    out += throughput_records(
+        "codec/civd_v05/encode", params, n,
+        *time_best(lambda: encode_payloads_to_civd_v05(payloads, capsule_meta=meta, channels=byte_channels), repeat),
+    )
+    out += throughput_records("codec/civd_v05/decode", params, n, *time_best(lambda: decode_civd_v05(blob), repeat))
+    return out
+
+
+def _bench_ci3(repeat: int) -> List[Dict[str, Any]]:
+    payload = np.random.default_rng(0).integers(0, 256, CI3_PAYLOAD, dtype=np.uint8).tobytes()
+    n = CI3_PAYLOAD * CI3_LOOPS
+    out: List[Dict[str, Any]] = []
+    for version, encode, decode, channels in (
+        ("v01", encode_bytes_to_ci3, decode_ci3, 1),
+        ("v02", encode_bytes_to_ci3_v02, decode_ci3_v02, 4),
+    ):
+        params = {"size": 16, "dtype": "uint8", "channels": channels}
+        blob = encode(payload)
+
+        def _encode_loop(encode=encode):
+            for _ in range(CI3_LOOPS):
+                encode(payload)
+
+        def _decode_loop(decode=decode, blob=blob):
+            for _ in range(CI3_LOOPS):
+                decode(blob)
+
+        out += throughput_records(f"codec/ci3_{version}/encode", params, n, *time_best(_encode_loop, repeat))
+        out += throughput_records(f"codec/ci3_{version}/decode", params, n, *time_best(_decode_loop, repeat))
+    return out
+
+
+def run(cases: Sequence[Case], repeat: int = 5, **_: Any) -> List[Dict[str, Any]]:
+    results = _bench_ci3(repeat)
+    for case in cases:
+        results += _bench_case(case, repeat)
+    return results
@@ -0,0 +1,82 @@
+"""
+benchmarks/bench_io.py
+
+File I/O throughput (volume MB/s) through the page cache of a scratch
+directory:
+
+- tile packs:  write_tile_pack_v08 (raw and zlib+shuffle) and a full-volume
+               read back with read_roi_from_tile_pack_v08
+- snapshots:   write_snapshot_v08 / read_snapshot_v08, dense and bricked
+
+Pass --workdir to put the scratch files on the storage under test; the
+default is the system temporary directory.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+from corpus_informaticus.roi_v06 import RoiV06, VolumeSpecV06
+from corpus_informaticus.snapshot_v08 import read_snapshot_v08, write_snapshot_v08
+from corpus_informaticus.tile_pack_v08 import read_roi_from_tile_pack_v08, tile_volume_buffer_v08, write_tile_pack_v08
+
+from harness import Case, make_volume, throughput_records, time_best
+
+TILE_EDGE = 64
+BRICK_EDGE = 32
+
+PACK_VARIANTS = (
+    ("raw", {}),
+    ("zlib_shuffle", {"compressor": "zlib", "filters": ("shuffle",)}),
+)
+
+
+def _bench_case(case: Case, repeat: int, workdir: Optional[str]) -> List[Dict[str, Any]]:
+    vol = make_volume(case)
+    spec = VolumeSpecV06(dims=case.dims, channels=case.channels, dtype=case.dtype)
+    edge = min(TILE_EDGE, case.size)
+    brick = min(BRICK_EDGE, case.size)
+    full = RoiV06(x=0, y=0, z=0, w=case.size, h=case.size, d=case.size)
+    out: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(dir=workdir) as td:
+        tiling, tiles = tile_volume_buffer_v08(vol, spec, (edge, edge, edge))
+        for variant, kwargs in PACK_VARIANTS:
+            pack = os.path.join(td, f"pack_{variant}")
+            params = dict(case.params(), tile=edge, variant=variant)
+
+            def _write(pack: str = pack, kwargs: Dict[str, Any] = kwargs) -> None:
+                shutil.rmtree(pack, ignore_errors=True)
+                write_tile_pack_v08(pack, tiling, tiles, spec, **kwargs)
+
+            out += throughput_records("io/tile_pack_v08/write", params, case.nbytes, *time_best(_write, repeat))
+            out += throughput_records(
+                "io/tile_pack_v08/read", params, case.nbytes,
+                *time_best(lambda pack=pack: read_roi_from_tile_pack_v08(pack, full), repeat),
+            )
+            shutil.rmtree(pack)
+        del tiles
+
+        for variant, brick_size in (("dense", None), ("bricked", (brick, brick, brick))):
+            path = os.path.join(td, f"{variant}.civd")
+            params = dict(case.params(), variant=variant)
+            out += throughput_records(
+                "io/snapshot_v08/write", params, case.nbytes,
+                *time_best(lambda path=path, brick_size=brick_size: write_snapshot_v08(path, vol, spec, brick_size=brick_size), repeat),
+            )
+            out += throughput_records(
+                "io/snapshot_v08/read", params, case.nbytes,
+                *time_best(lambda path=path: read_snapshot_v08(path), repeat),
+            )
+            os.remove(path)
+    return out
+
+
+def run(cases: Sequence[Case], repeat: int = 5, workdir: Optional[str] = None, **_: Any) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for case in cases:
+        results += _bench_case(case, repeat, workdir)
+    return results
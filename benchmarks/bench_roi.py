@@ -0,0 +1,79 @@
+"""
+benchmarks/bench_roi.py
+
+ROI read latency percentiles (p50/p95/p99, milliseconds) for random
+cubic ROIs of edge min(ROI_EDGE, size) from:
+
+- an in-memory dense buffer (read_region_from_bytes)
+- a dense v0.8 snapshot file (read_roi_from_snapshot_v08)
+- a bricked v0.8 snapshot file
+- a v0.8 tile pack folder (read_roi_from_tile_pack_v08)
+
+Each sample reads one ROI at a fresh random origin; the file-backed
+variants open the file per call, as a one-off query would.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import RoiV06, VolumeSpecV06, read_region_from_bytes
+from corpus_informaticus.snapshot_v08 import read_roi_from_snapshot_v08, write_snapshot_v08
+from corpus_informaticus.tile_pack_v08 import read_roi_from_tile_pack_v08, tile_volume_buffer_v08, write_tile_pack_v08
+
+from harness import Case, latencies, latency_records, make_volume
+
+ROI_EDGE = 32
+TILE_EDGE = 64
+
+
+def _bench_case(case: Case, samples: int) -> List[Dict[str, Any]]:
+    vol = make_volume(case)
+    spec = VolumeSpecV06(dims=case.dims, channels=case.channels, dtype=case.dtype)
+    edge = min(ROI_EDGE, case.size)
+    tile = min(TILE_EDGE, case.size)
+    origins = np.random.default_rng(1).integers(0, case.size - edge + 1, size=(samples, 3))
+    params = dict(case.params(), roi=edge)
+    out: List[Dict[str, Any]] = []
+
+    def _memory(i: int) -> None:
+        x, y, z = (int(v) for v in origins[i])
+        read_region_from_bytes(vol, spec, x=x, y=y, z=z, w=edge, h=edge, d=edge)
+
+    out += latency_records("roi/memory", params, latencies(_memory, samples))
+
+    with tempfile.TemporaryDirectory() as td:
+        dense = os.path.join(td, "dense.civd")
+        bricked = os.path.join(td, "bricked.civd")
+        pack = os.path.join(td, "pack")
+        write_snapshot_v08(dense, vol, spec)
+        write_snapshot_v08(bricked, vol, spec, brick_size=(tile, tile, tile))
+        tiling, tiles = tile_volume_buffer_v08(vol, spec, (tile, tile, tile))
+        write_tile_pack_v08(pack, tiling, tiles, spec)
+        del tiles
+
+        for name, path in (("roi/snapshot_v08", dense), ("roi/snapshot_v08_bricked", bricked)):
+
+            def _snapshot(i: int, path: str = path) -> None:
+                x, y, z = (int(v) for v in origins[i])
+                read_roi_from_snapshot_v08(path, x, y, z, edge, edge, edge)
+
+            out += latency_records(name, params, latencies(_snapshot, samples))
+
+        def _pack(i: int) -> None:
+            x, y, z = (int(v) for v in origins[i])
+            read_roi_from_tile_pack_v08(pack, RoiV06(x=x, y=y, z=z, w=edge, h=edge, d=edge))
+
+        out += latency_records("roi/tile_pack_v08", dict(params, tile=tile), latencies(_pack, samples))
+    return out
+
+
+def run(cases: Sequence[Case], samples: int = 200, **_: Any) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for case in cases:
+        results += _bench_case(case, samples)
+    return results
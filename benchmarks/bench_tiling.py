@@ -0,0 +1,61 @@
+"""
+benchmarks/bench_tiling.py
+
+Tiling throughput (volume MB/s) for cutting a dense volume into tiles:
+
+- tile_volume_buffer_v08: v0.8 payload tiles (edge tiles zero-padded)
+- tile_volume_buffer:     v0.7 byte-buffer tiler
+- tile_volume:            v0.7 manifest-driven array tiler (tiler_v07)
+
+Tiles are min(TILE_EDGE, size) voxels per axis.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Sequence
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06
+from corpus_informaticus.tile_manifest_v07 import TileGridSpecV07, TileManifestV07
+from corpus_informaticus.tile_pack_v07 import tile_volume_buffer
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08
+from corpus_informaticus.tiler_v07 import tile_volume
+
+from harness import Case, make_volume, throughput_records, time_best
+
+TILE_EDGE = 64
+
+
+def _bench_case(case: Case, repeat: int) -> List[Dict[str, Any]]:
+    vol = make_volume(case)
+    spec = VolumeSpecV06(dims=case.dims, channels=case.channels, dtype=case.dtype)
+    edge = min(TILE_EDGE, case.size)
+    tile = (edge, edge, edge)
+    manifest = TileManifestV07(
+        version="0.7",
+        grid=TileGridSpecV07(dims=case.dims, tile=tile),
+        channels=case.channels,
+        dtype=case.dtype,
+    )
+    params = dict(case.params(), tile=edge)
+
+    out: List[Dict[str, Any]] = []
+    out += throughput_records(
+        "tiling/tile_volume_buffer_v08", params, case.nbytes,
+        *time_best(lambda: tile_volume_buffer_v08(vol, spec, tile), repeat),
+    )
+    out += throughput_records(
+        "tiling/tile_volume_buffer_v07", params, case.nbytes,
+        *time_best(lambda: tile_volume_buffer(vol, spec, tile), repeat),
+    )
+    out += throughput_records(
+        "tiling/tile_volume_v07", params, case.nbytes,
+        *time_best(lambda: tile_volume(vol, manifest), repeat),
+    )
+    return out
+
+
+def run(cases: Sequence[Case], repeat: int = 5, **_: Any) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for case in cases:
+        results += _bench_case(case, repeat)
+    return results
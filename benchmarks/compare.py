@@ -0,0 +1,38 @@
+"""
+benchmarks/compare.py
+
+Compare two stored benchmark result files without re-running anything:
+
+    python benchmarks/compare.py base.json new.json --threshold 0.10
+
+Prints one line per shared entry and exits with status 1 if any entry
+regressed by more than the threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from harness import compare, format_comparison, load_results
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Compare CIVD benchmark results against a baseline")
+    ap.add_argument("baseline")
+    ap.add_argument("current")
+    ap.add_argument("--threshold", type=float, default=0.10)
+    ap.add_argument("--only-regressions", action="store_true")
+    args = ap.parse_args(argv)
+
+    rows = compare(load_results(args.baseline)["results"], load_results(args.current)["results"], args.threshold)
+    regressions = [r for r in rows if r["regression"]]
+    shown = regressions if args.only_regressions else rows
+    if shown:
+        print(format_comparison(shown))
+    print(f"{len(rows)} compared, {len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
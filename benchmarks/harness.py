@@ -0,0 +1,245 @@
+"""
+benchmarks/harness.py
+
+Shared pieces of the CIVD benchmark suite:
+
+- Case:        one (size, dtype, channels) point of the parameter matrix
+- time_best(): repeat a callable and keep the fastest / median wall time
+- latencies(): per-call timings summarised as percentiles
+- record():    one JSON result entry (name + params + metric + value)
+- compare():   results vs. a stored baseline, flagging regressions
+
+Every result is keyed by name and parameters, so two JSON runs of the
+suite can be compared entry by entry no matter which subsets they ran.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+RESULTS_FORMAT = "civd.bench.v1"
+
+
+@dataclass(frozen=True)
+class Case:
+    """
+    One benchmark parameter point: a cubic volume of 'size' voxels per
+    axis with 'channels' channels of 'dtype'.
+    """
+
+    size: int
+    dtype: str
+    channels: int
+
+    @property
+    def dims(self) -> Tuple[int, int, int]:
+        return (self.size, self.size, self.size)
+
+    @property
+    def nbytes(self) -> int:
+        return self.size ** 3 * self.channels * np.dtype(self.dtype).itemsize
+
+    def params(self) -> Dict[str, Any]:
+        return {"size": self.size, "dtype": self.dtype, "channels": self.channels}
+
+
+def make_volume(case: Case, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic (z, y, x, C) volume for a case. Values are random so
+    that compressed variants do not benefit from trivial inputs.
+    """
+    rng = np.random.default_rng(seed)
+    shape = (case.size, case.size, case.size, case.channels)
+    dt = np.dtype(case.dtype)
+    if dt.kind == "f":
+        return rng.random(shape, dtype=np.float32).astype(dt, copy=False)
+    info = np.iinfo(dt)
+    return rng.integers(info.min, info.max, size=shape, dtype=dt, endpoint=True)
+
+
+def time_best(fn: Callable[[], Any], repeat: int) -> Tuple[float, float]:
+    """
+    Run 'fn' once to warm up, then 'repeat' times. Returns (best, median)
+    wall time in seconds.
+    """
+    fn()
+    times = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), float(np.median(times))
+
+
+def latencies(fn: Callable[[int], Any], samples: int) -> Dict[str, float]:
+    """
+    Call fn(i) for i in range(samples) (after one warm-up call) and return
+    p50/p95/p99 latency in milliseconds.
+    """
+    fn(0)
+    times = np.empty(samples)
+    for i in range(samples):
+        t0 = time.perf_counter()
+        fn(i)
+        times[i] = time.perf_counter() - t0
+    times *= 1000.0
+    p50, p95, p99 = np.percentile(times, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+def record(
+    name: str,
+    params: Dict[str, Any],
+    metric: str,
+    value: float,
+    higher_is_better: bool,
+    **extra: Any,
+) -> Dict[str, Any]:
+    entry = {
+        "name": name,
+        "params": dict(params),
+        "metric": metric,
+        "value": float(value),
+        "higher_is_better": higher_is_better,
+    }
+    entry.update(extra)
+    return entry
+
+
+def throughput_records(name: str, params: Dict[str, Any], nbytes: int, best: float, median: float) -> List[Dict[str, Any]]:
+    """
+    MB/s result for an operation that processed 'nbytes' (1 MB = 1e6 bytes).
+    """
+    mbps = nbytes / 1e6 / best if best > 0 else float("inf")
+    return [record(name, params, "MB/s", mbps, True, nbytes=nbytes, best_s=best, median_s=median)]
+
+
+def latency_records(name: str, params: Dict[str, Any], stats: Dict[str, float]) -> List[Dict[str, Any]]:
+    return [record(name, params, metric, value, False) for metric, value in stats.items()]
+
+
+def result_key(entry: Dict[str, Any]) -> str:
+    params = ",".join(f"{k}={entry['params'][k]}" for k in sorted(entry["params"]))
+    return f"{entry['name']}[{params}]:{entry['metric']}"
+
+
+# ---------------------------------------------------------------------------
+# Result files
+# ---------------------------------------------------------------------------
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _package_version() -> Optional[str]:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # pragma: no cover
+        return None
+    try:
+        return version("corpus-informaticus")
+    except PackageNotFoundError:
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "package": _package_version(),
+        "git_commit": _git_commit(),
+    }
+
+
+def write_results(path: str, results: List[Dict[str, Any]], config: Dict[str, Any]) -> None:
+    doc = {"format": RESULTS_FORMAT, "environment": environment(), "config": config, "results": results}
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    if doc.get("format") != RESULTS_FORMAT:
+        raise ValueError(f"{path} is not a CIVD benchmark result file (format {doc.get('format')!r})")
+    return doc
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+
+def compare(
+    baseline: Sequence[Dict[str, Any]],
+    current: Sequence[Dict[str, Any]],
+    threshold: float = 0.10,
+) -> List[Dict[str, Any]]:
+    """
+    Match results by key and return one row per shared entry:
+
+        {"key", "baseline", "current", "change", "regression"}
+
+    'change' is the relative change in the "better" direction (negative =
+    worse). An entry regresses when it got worse by more than 'threshold'
+    (0.10 = 10 %). Entries missing from either side are ignored.
+    """
+    base = {result_key(e): e for e in baseline}
+    rows = []
+    for entry in current:
+        key = result_key(entry)
+        old = base.get(key)
+        if old is None or old["value"] <= 0:
+            continue
+        if entry["higher_is_better"]:
+            change = entry["value"] / old["value"] - 1.0
+        elif entry["value"] > 0:
+            change = old["value"] / entry["value"] - 1.0
+        else:
+            change = float("inf")
+        rows.append(
+            {
+                "key": key,
+                "baseline": old["value"],
+                "current": entry["value"],
+                "change": change,
+                "regression": change < -threshold,
+            }
+        )
+    return rows
+
+
+def format_comparison(rows: Sequence[Dict[str, Any]]) -> str:
+    lines = []
+    width = max((len(r["key"]) for r in rows), default=10)
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else ""
+        lines.append(f"{r['key']:<{width}}  {r['baseline']:>12.3f} -> {r['current']:>12.3f}  {r['change']:+7.1%}  {flag}")
+    return "\n".join(lines)
@@ -0,0 +1,115 @@
+"""
+benchmarks/run_benchmarks.py
+
+Run the CIVD benchmark suite and write the results as JSON.
+
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --sizes 64 128 256 --output base.json
+    python benchmarks/run_benchmarks.py --baseline base.json --threshold 0.15
+
+Suites (--suites): codecs, roi, tiling, io. The parameter matrix is
+sizes x dtypes x channels; cases whose volume exceeds --max-mb are
+skipped and listed under "skipped" in the output. With --baseline the
+run is compared against a stored result file and the exit status is 1
+if any shared entry regressed by more than --threshold.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+import time
+from typing import Dict, List
+
+import bench_codecs
+import bench_io
+import bench_roi
+import bench_tiling
+from harness import Case, compare, format_comparison, load_results, write_results
+
+SUITES = {
+    "codecs": bench_codecs,
+    "roi": bench_roi,
+    "tiling": bench_tiling,
+    "io": bench_io,
+}
+
+DEFAULT_SIZES = [64, 128]
+DEFAULT_DTYPES = ["uint8", "float32"]
+DEFAULT_CHANNELS = [1, 4]
+
+
+def build_cases(sizes: List[int], dtypes: List[str], channels: List[int], max_mb: float):
+    cases, skipped = [], []
+    for size, dtype, c in itertools.product(sizes, dtypes, channels):
+        case = Case(size=size, dtype=dtype, channels=c)
+        (cases if case.nbytes <= max_mb * 1e6 else skipped).append(case)
+    return cases, skipped
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="CIVD benchmark suite")
+    ap.add_argument("--suites", default=",".join(SUITES), help="comma-separated subset of: " + ", ".join(SUITES))
+    ap.add_argument("--sizes", type=int, nargs="+", default=None, help="volume edge lengths (64..1024)")
+    ap.add_argument("--dtypes", nargs="+", default=None)
+    ap.add_argument("--channels", type=int, nargs="+", default=None)
+    ap.add_argument("--repeat", type=int, default=None, help="timed repetitions per throughput case (best is kept)")
+    ap.add_argument("--samples", type=int, default=None, help="ROI reads per latency case")
+    ap.add_argument("--max-mb", type=float, default=1024.0, help="skip cases whose volume exceeds this many MB")
+    ap.add_argument("--workdir", default=None, help="scratch directory for file I/O benchmarks")
+    ap.add_argument("--quick", action="store_true", help="smallest matrix, few repetitions (smoke run)")
+    ap.add_argument("--output", "-o", default="bench_results.json")
+    ap.add_argument("--baseline", default=None, help="result file to compare against")
+    ap.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged as regression")
+    args = ap.parse_args(argv)
+
+    if args.quick:
+        sizes, dtypes, channels, repeat, samples = [64], ["uint8"], [1], 2, 30
+    else:
+        sizes, dtypes, channels, repeat, samples = DEFAULT_SIZES, DEFAULT_DTYPES, DEFAULT_CHANNELS, 5, 200
+    sizes = args.sizes or sizes
+    dtypes = args.dtypes or dtypes
+    channels = args.channels or channels
+    repeat = args.repeat or repeat
+    samples = args.samples or samples
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        ap.error(f"unknown suite(s): {', '.join(unknown)}")
+
+    cases, skipped = build_cases(sizes, dtypes, channels, args.max_mb)
+    for case in skipped:
+        print(f"skip {case.params()} ({case.nbytes / 1e6:.0f} MB > --max-mb)", file=sys.stderr)
+
+    results: List[Dict] = []
+    for name in suites:
+        t0 = time.perf_counter()
+        part = SUITES[name].run(cases, repeat=repeat, samples=samples, workdir=args.workdir)
+        print(f"{name}: {len(part)} results in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+        results += part
+
+    config = {
+        "suites": suites,
+        "sizes": sizes,
+        "dtypes": dtypes,
+        "channels": channels,
+        "repeat": repeat,
+        "samples": samples,
+        "skipped": [c.params() for c in skipped],
+    }
+    write_results(args.output, results, config)
+    print(f"wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        rows = compare(load_results(args.baseline)["results"], results, args.threshold)
+        print(format_comparison(rows))
+        regressions = [r for r in rows if r["regression"]]
+        print(f"{len(rows)} compared, {len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
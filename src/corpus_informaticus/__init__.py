@@ -43,6 +43,9 @@ __all__ = [
     "clamp_roi",
     "roi_to_slices",
     "read_region_from_bytes_roi",
+    "write_region_to_bytes",
+    "convert_volume_layout",
+    "read_regions",
 
     # v0.7 tiling
     "TileIndexV07",
@@ -59,6 +62,7 @@ __all__ = [
     "read_snapshot_v07",
     "full_volume_from_snapshot_v07",
     "read_roi_from_snapshot_v07",
+    "write_region_to_snapshot_v07",
 
     # v0.8 tile headers + tiling
     "TileHeaderV08",
@@ -67,11 +71,133 @@ __all__ = [
     "tile_volume_buffer_v08",
     "write_tile_pack_v08",
     "read_tile_file_payload_auto",
+    "load_tile_pack_manifest_v08",
+    "read_roi_from_tile_pack_v08",
+    "write_region_to_tile_pack_v08",
 
     # v0.8 snapshot
     "write_snapshot_v08",
     "read_snapshot_v08",
     "read_roi_from_snapshot_v08",
+    "read_regions_from_snapshot_v08",
+    "write_region_to_snapshot_v08",
+    "SnapshotWriterV08",
+    "read_snapshot_header_v08",
+
+    # v0.8 temporal delta packs
+    "DeltaStepInfoV08",
+    "write_delta_step_v08",
+    "load_temporal_pack_v08",
+    "read_roi_from_delta_pack_v08",
+
+    # v0.8 content-addressed tile store
+    "TileStoreV08",
+    "release_tile_pack_v08",
+
+    # v0.8 Morton (Z-order) signature
+    "morton_encode_3d",
+    "morton_decode_3d",
+    "encode_morton_volume",
+    "decode_morton_volume",
+    "morton_ranges_for_roi",
+    "read_region_morton",
+
+    # v0.8 binary tile index
+    "TileIndexV08",
+    "TILE_INDEX_FILENAME",
+
+    # v0.8 motion-predictive tile prefetch
+    "TileCacheV08",
+    "TilePrefetcherV08",
+    "PrefetchStatsV08",
+    "open_tile_pack_prefetcher_v08",
+
+    # v0.8 non-box spatial queries
+    "SphereV08",
+    "OrientedBoxV08",
+    "FrustumV08",
+    "query_tiles_for_shape_v08",
+    "read_shape_from_tile_pack_v08",
+
+    # v0.8 quantized channel codec
+    "QuantSpecV08",
+    "fit_quant_spec_v08",
+    "write_quantized_snapshot_v08",
+    "read_roi_dequantized_from_snapshot_v08",
+    "write_quantized_tile_pack_v08",
+    "read_roi_dequantized_from_tile_pack_v08",
+
+    # v0.8 tile pre-filters + compression
+    "encoding_flags_v08",
+    "encode_tile_payload_v08",
+    "decode_tile_payload_v08",
+
+    # v0.8 per-tile palette + bit-packing
+    "PaletteTileV08",
+    "encode_palette_tile_v08",
+    "decode_palette_tile_v08",
+
+    # v0.8 sparse voxel container
+    "SparseVolumeV08",
+    "morton_key_ranges_for_roi",
+    "write_sparse_snapshot_v08",
+    "read_sparse_snapshot_v08",
+    "read_roi_from_sparse_snapshot_v08",
+
+    # v0.8 hierarchical sparse tile index (octree)
+    "TileOctreeV08",
+    "RayHitV08",
+    "build_tile_octree_v08",
+    "open_tile_octree_v08",
+
+    # v0.8 multi-worker patch loader
+    "PatchLoaderV08",
+    "PatchBatchV08",
+    "PatchReaderV08",
+    "open_patch_reader_v08",
+    "UniformPatchSamplerV08",
+    "ClassBalancedPatchSamplerV08",
+    "RoiListPatchSamplerV08",
+
+    # v0.8 shared-memory volume publishing
+    "VolumePublisherV08",
+    "VolumeConsumerV08",
+    "SharedVolumeV08",
+
+    # v0.8 local ROI server / client
+    "RoiServerV08",
+    "RoiClientV08",
+    "RoiServerError",
+    "AsyncTileCacheV08",
+    "serve_roi_v08",
+    "open_roi_client_v08",
+
+    # v0.8 byte-range storage backends (local / HTTP)
+    "ByteRangeStoreV08",
+    "LocalFileStoreV08",
+    "HttpRangeStoreV08",
+    "open_range_store_v08",
+    "coalesce_ranges",
+    "StoreTileLoaderV08",
+    "open_tile_loader_store_v08",
+    "read_roi_from_snapshot_store_v08",
+    "read_roi_from_tile_pack_store_v08",
+
+    # v0.8 hot-path instrumentation (spans, byte counters, sinks)
+    "InstrumentSinkV08",
+    "StatsSinkV08",
+    "JsonLinesSinkV08",
+    "CallbackSinkV08",
+    "InstrumentSpanV08",
+    "enable_instrumentation_v08",
+    "disable_instrumentation_v08",
+    "instrumentation_v08",
+    "instrumentation_enabled",
+    "instrument_span",
+    "instrumented",
+    "add_bytes_read",
+    "add_bytes_copied",
+    "add_bytes_written",
 ]
 
 # ---------------------------------------------------------------------------
@@ -123,6 +249,9 @@ try:
         clamp_roi,
         roi_to_slices,
         read_region_from_bytes_roi,
+        write_region_to_bytes,
+        convert_volume_layout,
+        read_regions,
     )
 except Exception:  # pragma: no cover
     pass
@@ -155,6 +284,7 @@ try:
         read_snapshot_v07,
         full_volume_from_snapshot_v07,
         read_roi_from_snapshot_v07,
+        write_region_to_snapshot_v07,
     )
 except Exception:  # pragma: no cover
     pass
@@ -174,6 +304,9 @@ try:
         tile_volume_buffer_v08,
         write_tile_pack_v08,
         read_tile_file_payload_auto,
+        load_tile_pack_manifest_v08,
+        read_roi_from_tile_pack_v08,
+        write_region_to_tile_pack_v08,
     )
 except Exception:  # pragma: no cover
     pass
@@ -188,6 +321,269 @@ try:
         write_snapshot_v08,
         read_snapshot_v08,
         read_roi_from_snapshot_v08,
+        read_regions_from_snapshot_v08,
+        write_region_to_snapshot_v08,
+        SnapshotWriterV08,
+        read_snapshot_header_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – temporal delta tile packs
+# ---------------------------------------------------------------------------
+
+try:
+    from .tile_delta_v08 import (
+        DeltaStepInfoV08,
+        write_delta_step_v08,
+        load_temporal_pack_v08,
+        read_roi_from_delta_pack_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – content-addressed tile store
+# ---------------------------------------------------------------------------
+
+try:
+    from .tile_store_v08 import (
+        TileStoreV08,
+        release_tile_pack_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – Morton (Z-order) volume signature
+# ---------------------------------------------------------------------------
+
+try:
+    from .morton_v08 import (
+        morton_encode_3d,
+        morton_decode_3d,
+        encode_morton_volume,
+        decode_morton_volume,
+        morton_ranges_for_roi,
+        read_region_morton,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – binary tile-pack manifest (tile index)
+# ---------------------------------------------------------------------------
+
+try:
+    from .tile_index_v08 import (
+        TileIndexV08,
+        TILE_INDEX_FILENAME,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – motion-predictive tile prefetch
+# ---------------------------------------------------------------------------
+
+try:
+    from .tile_prefetch_v08 import (
+        TileCacheV08,
+        TilePrefetcherV08,
+        PrefetchStatsV08,
+        open_tile_pack_prefetcher_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – non-box spatial queries (sphere / oriented box / frustum)
+# ---------------------------------------------------------------------------
+
+try:
+    from .spatial_query_v08 import (
+        SphereV08,
+        OrientedBoxV08,
+        FrustumV08,
+        query_tiles_for_shape_v08,
+        read_shape_from_tile_pack_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – quantized channel codec
+# ---------------------------------------------------------------------------
+
+try:
+    from .quantize_v08 import (
+        QuantSpecV08,
+        fit_quant_spec_v08,
+        write_quantized_snapshot_v08,
+        read_roi_dequantized_from_snapshot_v08,
+        write_quantized_tile_pack_v08,
+        read_roi_dequantized_from_tile_pack_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – tile pre-filters (shuffle / bitshuffle / delta) + compression
+# ---------------------------------------------------------------------------
+
+try:
+    from .tile_filters_v08 import (
+        encoding_flags_v08,
+        encode_tile_payload_v08,
+        decode_tile_payload_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – per-tile palette + bit-packing
+# ---------------------------------------------------------------------------
+
+try:
+    from .palette_v08 import (
+        PaletteTileV08,
+        encode_palette_tile_v08,
+        decode_palette_tile_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – sparse voxel container (Morton-sorted)
+# ---------------------------------------------------------------------------
+
+try:
+    from .sparse_v08 import (
+        SparseVolumeV08,
+        morton_key_ranges_for_roi,
+        write_sparse_snapshot_v08,
+        read_sparse_snapshot_v08,
+        read_roi_from_sparse_snapshot_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – hierarchical sparse tile index (octree)
+# ---------------------------------------------------------------------------
+
+try:
+    from .tile_octree_v08 import (
+        TileOctreeV08,
+        RayHitV08,
+        build_tile_octree_v08,
+        open_tile_octree_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – multi-worker patch loader (shared-memory batches)
+# ---------------------------------------------------------------------------
+
+try:
+    from .patch_loader_v08 import (
+        PatchLoaderV08,
+        PatchBatchV08,
+        PatchReaderV08,
+        open_patch_reader_v08,
+        UniformPatchSamplerV08,
+        ClassBalancedPatchSamplerV08,
+        RoiListPatchSamplerV08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – shared-memory volume publishing (seqlock header)
+# ---------------------------------------------------------------------------
+
+try:
+    from .shm_volume_v08 import (
+        VolumePublisherV08,
+        VolumeConsumerV08,
+        SharedVolumeV08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – local ROI server / client (asyncio, Unix socket or TCP)
+# ---------------------------------------------------------------------------
+
+try:
+    from .roi_server_v08 import (
+        RoiServerV08,
+        RoiClientV08,
+        RoiServerError,
+        AsyncTileCacheV08,
+        serve_roi_v08,
+        open_roi_client_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – byte-range storage backends (local files, HTTP Range)
+# ---------------------------------------------------------------------------
+
+try:
+    from .range_store_v08 import (
+        ByteRangeStoreV08,
+        LocalFileStoreV08,
+        HttpRangeStoreV08,
+        open_range_store_v08,
+        coalesce_ranges,
+        StoreTileLoaderV08,
+        open_tile_loader_store_v08,
+        read_roi_from_snapshot_store_v08,
+        read_roi_from_tile_pack_store_v08,
+    )
+except Exception:  # pragma: no cover
+    pass
+
+
+# ---------------------------------------------------------------------------
+# CIVD v0.8 – hot-path instrumentation (spans, byte counters, sinks)
+# ---------------------------------------------------------------------------
+
+try:
+    from .instrument_v08 import (
+        InstrumentSinkV08,
+        StatsSinkV08,
+        JsonLinesSinkV08,
+        CallbackSinkV08,
+        InstrumentSpanV08,
+        enable_instrumentation_v08,
+        disable_instrumentation_v08,
+        instrumentation_v08,
+        instrumentation_enabled,
+        instrument_span,
+        instrumented,
+        add_bytes_read,
+        add_bytes_copied,
+        add_bytes_written,
     )
 except Exception:  # pragma: no cover
     pass
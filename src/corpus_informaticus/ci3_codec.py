@@ -16,7 +16,9 @@ from .ci3_types import (
 )
 
 from .ci3_types import MAGIC, VERSION_V02, DIMS_V02, CHANNELS_V02
+from .instrument_v08 import instrumented
 
+@instrumented("ci3_v01.encode")
 def encode_bytes_to_ci3(data: bytes) -> bytes:
     """
     Encode an arbitrary byte sequence into a CI3 v0.1 corpus (in-memory bytes).
@@ -69,6 +71,7 @@ def encode_bytes_to_ci3_file(data: bytes, path: str) -> None:
         f.write(blob)
 
 
+@instrumented("ci3_v01.decode")
 def decode_ci3(data: bytes) -> Tuple[bytes, CI3Header]:
     """
     Decode a CI3 v0.1 corpus (in-memory bytes) into original data and header.
@@ -139,6 +142,7 @@ def decode_ci3_file(path: str) -> Tuple[bytes, CI3Header]:
 # v0.2 – Multi-channel anatomy (payload + integrity + semantic + aux)
 # ---------------------------------------------------------------------------
 
+@instrumented("ci3_v02.encode")
 def encode_bytes_to_ci3_v02(data: bytes) -> bytes:
     """
     Encode an arbitrary byte sequence into a CI3 v0.2 corpus (in-memory bytes).
@@ -213,6 +217,7 @@ def encode_bytes_to_ci3_v02_file(data: bytes, path: str) -> None:
         f.write(blob)
 
 
+@instrumented("ci3_v02.decode")
 def decode_ci3_v02(data: bytes) -> Tuple[bytes, CI3Header]:
     """
     Decode a CI3 v0.2 corpus (in-memory bytes) into original data and header.
@@ -24,6 +24,7 @@ import os
 from typing import Dict, Tuple, List, Any
 
 from .codec_v03 import encode_bytes_to_civd_v03, decode_civd_v03
+from .instrument_v08 import add_bytes_copied, add_bytes_read, instrumentation_enabled, instrumented
 from .filetable_v04 import CivdFileEntryV04, CivdFileTableV04
 
 
@@ -54,6 +55,7 @@ def _build_table_and_blob_from_folder(root: str) -> Tuple[CivdFileTableV04, byte
                 buf = f.read()
 
             size = len(buf)
+            add_bytes_read(size)
 
             # For now, we just use mime=1 (generic binary) and flags=0.
             entry = CivdFileEntryV04(
@@ -71,6 +73,7 @@ def _build_table_and_blob_from_folder(root: str) -> Tuple[CivdFileTableV04, byte
 
     table = CivdFileTableV04(entries)
     data_blob = b"".join(data_chunks)
+    add_bytes_copied(len(data_blob))
     return table, data_blob
 
 
@@ -121,6 +124,7 @@ def _call_v03_encode(payload: bytes,
 # --------------------------------------------------------------------
 # Public API: encode a folder into a CIVD v0.4 volumetric capsule
 # --------------------------------------------------------------------
+@instrumented("civd_v04.encode_folder")
 def encode_folder_to_civd_v04(
     root: str,
     dims: Tuple[int, int, int] = (64, 64, 32),
@@ -139,6 +143,7 @@ def encode_folder_to_civd_v04(
     table_bytes = table.to_bytes()
 
     payload = table_bytes + data_blob
+    add_bytes_copied(len(payload))
 
     # Use CIVD v0.3 volumetric codec under the hood, with robust handling
     # of its return signature.
@@ -160,6 +165,7 @@ def encode_folder_to_civd_v04(
 # --------------------------------------------------------------------
 # Public API: decode a CIVD v0.4 capsule back into files
 # --------------------------------------------------------------------
+@instrumented("civd_v04.decode")
 def decode_civd_v04(blob: bytes) -> Tuple[CivdFileTableV04, Dict[str, bytes], Dict]:
     """
     Decode a CIVD v0.4 volumetric capsule into:
@@ -180,6 +186,8 @@ def decode_civd_v04(blob: bytes) -> Tuple[CivdFileTableV04, Dict[str, bytes], Di
         start = entry.offset
         end = start + entry.size
         files[entry.name] = data_region[start:end]
+    if instrumentation_enabled():
+        add_bytes_copied(len(data_region) + sum(len(f) for f in files.values()))
 
     meta = {
         "file_count": len(table.entries),
@@ -10,6 +10,7 @@ import math
 from typing import Dict, Tuple, Optional
 
 from .codec_v03 import encode_bytes_to_civd_v03, decode_civd_v03
+from .instrument_v08 import add_bytes_copied, instrumentation_enabled, instrumented
 from .filetable_v04 import (
     CivdFileTableV04,
     build_file_table_from_file_list,
@@ -31,6 +32,7 @@ def choose_geometry_v05(payload_size: int, channels: int = 4) -> Tuple[int, int,
 # 2. Encode arbitrary payload dict → CIVD v0.5 blob
 # ---------------------------------------------------------------------
 
+@instrumented("civd_v05.encode")
 def encode_payloads_to_civd_v05(
     payloads: Dict[str, bytes],
     capsule_meta: Optional[dict] = None,
@@ -75,6 +77,7 @@ def encode_payloads_to_civd_v05(
     # -------------------------------------------------
     data_region = b"".join(data for (_name, data) in ordered_files)
     payload_bytes = table_bytes + data_region
+    add_bytes_copied(len(data_region) + len(payload_bytes))
 
     # -------------------------------------------------
     # 2.4 Choose geometry (v0.5 adaptive cube)
@@ -177,6 +180,7 @@ def encode_folder_to_civd_v05(
 # 4. Decode CIVD v0.5 blob → (file_table, files, meta)
 # ---------------------------------------------------------------------
 
+@instrumented("civd_v05.decode")
 def decode_civd_v05(blob: bytes):
     """Decode full v0.5 capsule into file table + file map + metadata."""
     # v0.3 decoder returns: payload_bytes, info_dict
@@ -192,6 +196,8 @@ def decode_civd_v05(blob: bytes):
         offset = entry.offset
         size = entry.size
         files[entry.name] = data_region[offset:offset + size]
+    if instrumentation_enabled():
+        add_bytes_copied(len(data_region) + sum(len(f) for f in files.values()))
 
     # Extract capsule-level metadata (if present)
     capsule_meta = None
@@ -9,6 +9,8 @@ import zlib
 from dataclasses import asdict
 from typing import Dict, Tuple, Any
 
+from .instrument_v08 import add_bytes_copied, instrument_span, instrumented
+
 # --- Basic constants ---
 
 MAGIC = b"CI3\x00"      # 4-byte magic
@@ -129,6 +131,7 @@ class CI3Header:
 # ENCODER
 # -------------------------------------------------------------------
 
+@instrumented("civd_v03.encode")
 def encode_bytes_to_civd_v03(
     payload: bytes,
     dims: Tuple[int, int, int] = (32, 32, 32),
@@ -159,16 +162,21 @@ def encode_bytes_to_civd_v03(
     )
 
     volume = payload + b"\x00" * (capacity - len(payload))
+    add_bytes_copied(capacity)
 
-    crc = zlib.crc32(volume) & 0xFFFFFFFF
+    with instrument_span("crc32", nbytes=capacity):
+        crc = zlib.crc32(volume) & 0xFFFFFFFF
 
-    return header.pack() + volume + FOOTER_STRUCT.pack(crc)
+    blob = header.pack() + volume + FOOTER_STRUCT.pack(crc)
+    add_bytes_copied(len(blob))
+    return blob
 
 
 # -------------------------------------------------------------------
 # DECODER
 # -------------------------------------------------------------------
 
+@instrumented("civd_v03.decode")
 def decode_civd_v03(blob: bytes) -> Tuple[bytes, Dict[str, Any]]:
     header_size = HEADER_STRUCT.size
     footer_size = FOOTER_STRUCT.size
@@ -184,14 +192,17 @@ def decode_civd_v03(blob: bytes) -> Tuple[bytes, Dict[str, Any]]:
     )
 
     volume = blob[header_size:-footer_size]
+    add_bytes_copied(len(volume))
     if len(volume) != capacity:
         raise ValueError(f"Volume length {len(volume)} != capacity {capacity}")
 
     (crc_stored,) = FOOTER_STRUCT.unpack(blob[-footer_size:])
-    crc_calc = zlib.crc32(volume) & 0xFFFFFFFF
+    with instrument_span("crc32", nbytes=capacity):
+        crc_calc = zlib.crc32(volume) & 0xFFFFFFFF
     crc_ok = crc_calc == crc_stored
 
     payload = volume[: header.orig_length]
+    add_bytes_copied(len(payload))
 
     info: Dict[str, Any] = {
         "header": header,
@@ -0,0 +1,353 @@
+"""
+instrument_v08.py — CIVD v0.8 opt-in hot-path instrumentation.
+
+When an ROI read is slow the question is where the time went: storage,
+header parsing, CRC, decompression or in-memory copies. The codecs,
+snapshot readers, tile-pack functions and byte-range stores report that
+through this module:
+
+- spans:     named, timed sections (nested per thread)
+- counters:  bytes read from storage, bytes copied in memory and bytes
+             written, attributed to the innermost open span
+
+Instrumentation is off by default. While no sink is installed a span is a
+shared no-op object and a counter call is a single global check, so the
+hot paths pay (almost) nothing. Install one or more sinks to turn it on:
+
+    stats = StatsSinkV08()
+    with instrumentation_v08(stats, JsonLinesSinkV08("civd_trace.jsonl")):
+        read_roi_from_snapshot_v08(path, 0, 0, 0, 64, 64, 8)
+    stats.stats()["snapshot_v08.read_roi"]["bytes_read"]
+
+Every finished span is emitted to the sinks as one event dict:
+
+    {"name": "snapshot_v08.read_roi", "start": <unix time>, "duration_s": ...,
+     "bytes_read": ..., "bytes_copied": ..., "bytes_written": ...,
+     "depth": 0, "parent": None, "thread": <ident>, ...attrs}
+
+Byte counts are inclusive: a span's totals include those of the spans
+nested in it. "error" holds the exception type name if the span exited
+with one. Counter calls made outside any span (or in a thread with no
+open span) are ignored. An exception raised by a sink is reported as a
+RuntimeWarning and otherwise ignored.
+
+For memory-mapped reads 'bytes_read' counts the stored bytes the read
+addresses, an upper bound on what the OS pages in.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import functools
+import json
+import threading
+import time
+import warnings
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+_SINKS: Tuple["InstrumentSinkV08", ...] = ()
+_local = threading.local()
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------
+
+
+class InstrumentSinkV08:
+    """
+    Receiver of finished-span events. Subclasses implement emit(); it may
+    be called from several threads at once.
+    """
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class StatsSinkV08(InstrumentSinkV08):
+    """
+    In-memory aggregate per span name: count, errors, total/min/max
+    duration and byte totals.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        d = event["duration_s"]
+        with self._lock:
+            s = self._stats.get(event["name"])
+            if s is None:
+                s = self._stats[event["name"]] = {
+                    "count": 0,
+                    "errors": 0,
+                    "total_s": 0.0,
+                    "min_s": d,
+                    "max_s": d,
+                    "bytes_read": 0,
+                    "bytes_copied": 0,
+                    "bytes_written": 0,
+                }
+            s["count"] += 1
+            s["errors"] += "error" in event
+            s["total_s"] += d
+            s["min_s"] = min(s["min_s"], d)
+            s["max_s"] = max(s["max_s"], d)
+            s["bytes_read"] += event["bytes_read"]
+            s["bytes_copied"] += event["bytes_copied"]
+            s["bytes_written"] += event["bytes_written"]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Copy of the aggregates, keyed by span name.
+        """
+        with self._lock:
+            return {name: dict(s) for name, s in self._stats.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class JsonLinesSinkV08(InstrumentSinkV08):
+    """
+    Append one JSON object per event to a file path or an open text
+    stream. A path is opened in append mode and closed by close().
+    """
+
+    def __init__(self, target, flush: bool = False) -> None:
+        self._owned = isinstance(target, str)
+        self._f = open(target, "a", encoding="utf-8") if self._owned else target
+        self._flush = flush
+        self._lock = threading.Lock()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, separators=(",", ":"), default=str) + "\n"
+        with self._lock:
+            self._f.write(line)
+            if self._flush:
+                self._f.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._owned and not self._f.closed:
+                self._f.close()
+            elif not self._owned:
+                self._f.flush()
+
+
+class CallbackSinkV08(InstrumentSinkV08):
+    """
+    Forward every event to a user callable, e.g. a metrics client.
+    """
+
+    def __init__(self, fn: Callable[[Dict[str, Any]], None]) -> None:
+        self.fn = fn
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        self.fn(event)
+
+
+# ---------------------------------------------------------------------------
+# Enable / disable
+# ---------------------------------------------------------------------------
+
+
+def _as_sink(sink) -> InstrumentSinkV08:
+    if isinstance(sink, InstrumentSinkV08):
+        return sink
+    if callable(sink):
+        return CallbackSinkV08(sink)
+    raise TypeError(f"Not an instrumentation sink or callable: {sink!r}")
+
+
+def enable_instrumentation_v08(*sinks) -> None:
+    """
+    Install 'sinks' (InstrumentSinkV08 instances or plain callables),
+    replacing any installed before. With no sinks this disables
+    instrumentation.
+    """
+    global _SINKS
+    _SINKS = tuple(_as_sink(s) for s in sinks)
+
+
+def disable_instrumentation_v08() -> None:
+    """
+    Remove all sinks. Sinks are not closed.
+    """
+    global _SINKS
+    _SINKS = ()
+
+
+def instrumentation_enabled() -> bool:
+    return bool(_SINKS)
+
+
+@contextmanager
+def instrumentation_v08(*sinks) -> Iterator[Tuple[InstrumentSinkV08, ...]]:
+    """
+    Install 'sinks' for the duration of the block and restore the previous
+    ones afterwards.
+    """
+    global _SINKS
+    previous = _SINKS
+    enable_instrumentation_v08(*sinks)
+    try:
+        yield _SINKS
+    finally:
+        _SINKS = previous
+
+
+# ---------------------------------------------------------------------------
+# Spans and counters
+# ---------------------------------------------------------------------------
+
+
+def _stack() -> List["InstrumentSpanV08"]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+class InstrumentSpanV08:
+    """
+    One timed section; use via instrument_span().
+    """
+
+    __slots__ = ("name", "attrs", "bytes_read", "bytes_copied", "bytes_written", "_start", "_t0", "_sinks")
+
+    def __init__(self, name: str, attrs: Dict[str, Any], sinks: Tuple[InstrumentSinkV08, ...]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.bytes_read = 0
+        self.bytes_copied = 0
+        self.bytes_written = 0
+        self._sinks = sinks
+
+    def set(self, **attrs: Any) -> None:
+        """
+        Attach attributes known only once the operation is under way.
+        """
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "InstrumentSpanV08":
+        _stack().append(self)
+        self._start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self._t0
+        stack = _stack()
+        stack.pop()
+        parent = stack[-1] if stack else None
+        if parent is not None:
+            parent.bytes_read += self.bytes_read
+            parent.bytes_copied += self.bytes_copied
+            parent.bytes_written += self.bytes_written
+
+        event = dict(self.attrs)
+        event.update(
+            name=self.name,
+            start=self._start,
+            duration_s=duration,
+            bytes_read=self.bytes_read,
+            bytes_copied=self.bytes_copied,
+            bytes_written=self.bytes_written,
+            depth=len(stack),
+            parent=None if parent is None else parent.name,
+            thread=threading.get_ident(),
+        )
+        if exc_type is not None:
+            event["error"] = exc_type.__name__
+        for sink in self._sinks:
+            # A broken sink must not fail (or mask the error of) the
+            # instrumented call, nor starve the other sinks.
+            try:
+                sink.emit(event)
+            except Exception as err:
+                warnings.warn(f"Instrumentation sink {sink!r} failed: {err!r}", RuntimeWarning, stacklevel=2)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def instrument_span(name: str, **attrs: Any):
+    """
+    Context manager timing the enclosed block as span 'name'. Keyword
+    arguments become event attributes. A no-op while disabled.
+    """
+    if not _SINKS:
+        return _NULL_SPAN
+    return InstrumentSpanV08(name, attrs, _SINKS)
+
+
+def instrumented(name: str) -> Callable:
+    """
+    Decorator: run every call of the function inside instrument_span(name).
+    """
+
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _SINKS:
+                return fn(*args, **kwargs)
+            with InstrumentSpanV08(name, {}, _SINKS):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _current() -> Optional[InstrumentSpanV08]:
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def add_bytes_read(nbytes: int) -> None:
+    """
+    Count bytes read from storage (file, mapping or byte-range store).
+    """
+    if _SINKS:
+        span = _current()
+        if span is not None:
+            span.bytes_read += nbytes
+
+
+def add_bytes_copied(nbytes: int) -> None:
+    """
+    Count bytes copied in memory (slices of bytes, concatenation, array copies).
+    """
+    if _SINKS:
+        span = _current()
+        if span is not None:
+            span.bytes_copied += nbytes
+
+
+def add_bytes_written(nbytes: int) -> None:
+    """
+    Count bytes written to storage.
+    """
+    if _SINKS:
+        span = _current()
+        if span is not None:
+            span.bytes_written += nbytes
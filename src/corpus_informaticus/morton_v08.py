@@ -0,0 +1,420 @@
+"""
+morton_v08.py — CIVD v0.8 Morton (Z-order) volume signature.
+
+A volume with signature 'MORTON' stores its voxels sorted by their 3D
+Morton code instead of row-major (z, y, x). Channels stay interleaved per
+voxel, so the payload is a (voxels, C) array in Morton order.
+
+Layout is *compact*: dims do not need to be powers of two. Voxels outside
+the volume are simply skipped, so a MORTON payload has exactly the same
+size as the C_CONTIG payload (VolumeSpecV06.expected_nbytes() holds).
+
+Bit convention: x occupies bit 0, y bit 1, z bit 2 of each interleaved
+triple, so x varies fastest, matching the C-contiguous (z, y, x) layout.
+
+Because nearby voxels in 3D are nearby in Morton order, a cubic ROI maps
+to a handful of contiguous payload ranges instead of one x-run per (z, y)
+row, which keeps mmap'd ROI reads local.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+import functools
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, RoiV06, full_volume_from_bytes, _byte_view
+
+MORTON_MAX_BITS = 21  # per axis, so codes fit in uint64
+
+
+# ---------------------------------------------------------------------------
+# Bit interleaving
+# ---------------------------------------------------------------------------
+
+
+def _part1by2(v: "np.ndarray") -> "np.ndarray":
+    v = v.astype(np.uint64) & np.uint64(0x1FFFFF)
+    v = (v | (v << np.uint64(32))) & np.uint64(0x1F00000000FFFF)
+    v = (v | (v << np.uint64(16))) & np.uint64(0x1F0000FF0000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x100F00F00F00F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return v
+
+
+def _compact1by2(v: "np.ndarray") -> "np.ndarray":
+    v = v.astype(np.uint64) & np.uint64(0x1249249249249249)
+    v = (v ^ (v >> np.uint64(2))) & np.uint64(0x10C30C30C30C30C3)
+    v = (v ^ (v >> np.uint64(4))) & np.uint64(0x100F00F00F00F00F)
+    v = (v ^ (v >> np.uint64(8))) & np.uint64(0x1F0000FF0000FF)
+    v = (v ^ (v >> np.uint64(16))) & np.uint64(0x1F00000000FFFF)
+    v = (v ^ (v >> np.uint64(32))) & np.uint64(0x1FFFFF)
+    return v
+
+
+def morton_encode_3d(x, y, z) -> "np.ndarray":
+    """
+    Interleave integer coordinates into uint64 Morton codes (vectorized).
+    """
+    return _part1by2(np.asarray(x)) | (_part1by2(np.asarray(y)) << np.uint64(1)) | (
+        _part1by2(np.asarray(z)) << np.uint64(2)
+    )
+
+
+def morton_decode_3d(codes) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Inverse of morton_encode_3d(): return (x, y, z) as int64 arrays.
+    """
+    c = np.asarray(codes, dtype=np.uint64)
+    x = _compact1by2(c)
+    y = _compact1by2(c >> np.uint64(1))
+    z = _compact1by2(c >> np.uint64(2))
+    return x.astype(np.int64), y.astype(np.int64), z.astype(np.int64)
+
+
+def _check_dims(dims: Tuple[int, int, int]) -> None:
+    if max(dims) > (1 << MORTON_MAX_BITS):
+        raise ValueError(f"MORTON dims {dims} exceed {1 << MORTON_MAX_BITS} voxels per axis")
+
+
+# ---------------------------------------------------------------------------
+# Compact Morton positions
+# ---------------------------------------------------------------------------
+
+
+def morton_order(dims: Tuple[int, int, int]) -> "np.ndarray":
+    """
+    Permutation mapping Morton payload position -> C-order voxel index.
+
+    payload_morton = payload_c.reshape(-1, C)[morton_order(dims)]
+    """
+    _check_dims(dims)
+    x, y, z = dims
+    zz, yy, xx = np.meshgrid(
+        np.arange(z, dtype=np.uint64),
+        np.arange(y, dtype=np.uint64),
+        np.arange(x, dtype=np.uint64),
+        indexing="ij",
+    )
+    codes = morton_encode_3d(xx.ravel(), yy.ravel(), zz.ravel())
+    return np.argsort(codes, kind="stable")
+
+
+def morton_rank(dims: Tuple[int, int, int], x, y, z) -> "np.ndarray":
+    """
+    Return the position of voxels (x, y, z) inside a compact MORTON payload.
+
+    The position equals the number of in-bounds voxels whose Morton code is
+    smaller. It is computed per octree level: octree nodes that lie fully
+    inside the volume contribute 'child * half**3'; only nodes clipped by
+    the upper volume bounds need the exact per-sibling count.
+    """
+    _check_dims(dims)
+    X, Y, Z = dims
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    z = np.asarray(z, dtype=np.int64)
+
+    levels = max(int(max(dims) - 1).bit_length(), 1)
+    rank = np.zeros(np.broadcast(x, y, z).shape, dtype=np.int64)
+
+    for level in range(levels - 1, -1, -1):
+        half = 1 << level
+        ox = (x >> (level + 1)) << (level + 1)
+        oy = (y >> (level + 1)) << (level + 1)
+        oz = (z >> (level + 1)) << (level + 1)
+        child = ((x >> level) & 1) | (((y >> level) & 1) << 1) | (((z >> level) & 1) << 2)
+
+        full = (ox + 2 * half <= X) & (oy + 2 * half <= Y) & (oz + 2 * half <= Z)
+        rank += np.where(full, child * (half * half * half), 0)
+
+        clipped = ~full
+        if clipped.any():
+            cox, coy, coz, cc = ox[clipped], oy[clipped], oz[clipped], child[clipped]
+            acc = np.zeros(cc.shape, dtype=np.int64)
+            for sib in range(7):
+                ex = np.clip(X - (cox + (sib & 1) * half), 0, half)
+                ey = np.clip(Y - (coy + ((sib >> 1) & 1) * half), 0, half)
+                ez = np.clip(Z - (coz + ((sib >> 2) & 1) * half), 0, half)
+                acc += np.where(sib < cc, ex * ey * ez, 0)
+            rank[clipped] += acc
+
+    return rank
+
+
+_OCTANTS = np.array([[i & 1, (i >> 1) & 1, (i >> 2) & 1] for i in range(8)], dtype=np.int64)
+
+# Octree nodes at least this wide are copied as their one contiguous
+# payload run through a strided view of the ROI box; narrower nodes are
+# gathered with cached per-voxel offsets, at most _GATHER_BATCH voxels at
+# a time.
+_BLOCK_MIN_SIDE = 16
+_GATHER_BATCH = 1 << 18
+# A block view has one axis per node bit and axis (3 * bits + 1 dims);
+# wider nodes are copied as aligned children of this many bits.
+_BLOCK_MAX_BITS = 10
+
+def _roi_nodes(
+    dims: Tuple[int, int, int], x: int, y: int, z: int, w: int, h: int, d: int
+) -> Iterator[Tuple[int, "np.ndarray", "np.ndarray"]]:
+    """
+    Cover an in-bounds ROI box with the largest octree nodes lying fully
+    inside it. Yields (side, origins, ranks) per level: the (n, 3) (x, y, z)
+    node origins and their payload positions. A node inside the volume is
+    one contiguous run of side**3 voxels in the payload, so only one rank
+    per node is computed instead of one per voxel.
+    """
+    lo = np.array([x, y, z], dtype=np.int64)
+    hi = lo + np.array([w, h, d], dtype=np.int64)
+    level = max(int(max(dims) - 1).bit_length(), 1)
+    origins = np.zeros((1, 3), dtype=np.int64)
+    while len(origins):
+        side = 1 << level
+        inside = np.all((origins >= lo) & (origins + side <= hi), axis=1)
+        if inside.any():
+            o = origins[inside]
+            yield side, o, morton_rank(dims, o[:, 0], o[:, 1], o[:, 2])
+        if level == 0:
+            break
+        level -= 1
+        half = side >> 1
+        kids = (origins[~inside][:, None, :] + _OCTANTS * half).reshape(-1, 3)
+        origins = kids[np.all((kids < hi) & (kids + half > lo), axis=1)]
+
+
+@functools.lru_cache(maxsize=None)
+def _cube_offsets(side: int) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    (x, y, z, step) of the side**3 voxels of a small octree node, in payload order.
+    """
+    steps = np.arange(side**3, dtype=np.int64)
+    return (*morton_decode_3d(steps), steps)
+
+
+def _node_gathers(
+    side: int, origins: "np.ndarray", ranks: "np.ndarray", x: int, y: int, z: int
+) -> Iterator[Tuple["np.ndarray", Tuple["np.ndarray", "np.ndarray", "np.ndarray"]]]:
+    """
+    (payload positions, (z, y, x) ROI-local indices) of the voxels of small
+    nodes, as (n, side**3) arrays in batches of at most _GATHER_BATCH voxels.
+    """
+    cx, cy, cz, steps = _cube_offsets(side)
+    per_batch = max(_GATHER_BATCH // side**3, 1)
+    for i in range(0, len(ranks), per_batch):
+        o, r = origins[i : i + per_batch], ranks[i : i + per_batch]
+        local = ((o[:, 2] - z)[:, None] + cz, (o[:, 1] - y)[:, None] + cy, (o[:, 0] - x)[:, None] + cx)
+        yield r[:, None] + steps, local
+
+
+def _node_blocks(
+    side: int, origins: "np.ndarray", ranks: "np.ndarray", x: int, y: int, z: int
+) -> Iterator[Tuple[int, int, Tuple[slice, slice, slice]]]:
+    """
+    (payload start, side, (z, y, x) ROI-local slices) per large node; the
+    node's voxels are the payload run [start, start + side**3).
+    """
+    sub = min(side, 1 << _BLOCK_MAX_BITS)
+    kx, ky, kz = (v * sub for v in morton_decode_3d(np.arange((side // sub) ** 3)))
+    for (ox, oy, oz), r in zip(origins.tolist(), ranks.tolist()):
+        for j in range(len(kx)):
+            lx, ly, lz = ox - x + int(kx[j]), oy - y + int(ky[j]), oz - z + int(kz[j])
+            yield r + j * sub**3, sub, (slice(lz, lz + sub), slice(ly, ly + sub), slice(lx, lx + sub))
+
+
+def _morton_block_view(box: "np.ndarray") -> "np.ndarray":
+    """
+    View a (side, side, side, C) (z, y, x, C) box, side = 2**k, as
+    (2,) * 3k + (C,) with one axis per coordinate bit in Morton order (z,
+    y, x bit of the most significant level first). A node's (side**3, C)
+    payload run reshaped to the same shape lines up element for element.
+    """
+    k = box.shape[0].bit_length() - 1
+    sz, sy, sx, sc = box.strides
+    strides = [s * (1 << b) for b in range(k - 1, -1, -1) for s in (sz, sy, sx)]
+    return np.lib.stride_tricks.as_strided(box, shape=(2,) * (3 * k) + box.shape[3:], strides=(*strides, sc))
+
+
+def morton_ranges_for_roi(
+    dims: Tuple[int, int, int],
+    roi: RoiV06,
+    max_gap: int = 0,
+) -> List[Tuple[int, int]]:
+    """
+    Map an ROI box to contiguous [start, stop) voxel ranges of a MORTON payload.
+
+    Ranges separated by at most 'max_gap' voxels are merged, trading a few
+    extra voxels of over-read for fewer, larger reads. Multiply by
+    channels * itemsize to get byte ranges.
+    """
+    if roi.w <= 0 or roi.h <= 0 or roi.d <= 0:
+        return []
+    _check_dims(dims)
+    nodes = [(ranks, np.full(len(ranks), side**3)) for side, _, ranks in _roi_nodes(dims, roi.x, roi.y, roi.z, roi.w, roi.h, roi.d)]
+    starts = np.concatenate([r for r, _ in nodes])
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    stops = starts + np.concatenate([n for _, n in nodes])[order]
+    breaks = np.nonzero(starts[1:] - stops[:-1] > max_gap)[0]
+    return [
+        (int(a), int(b))
+        for a, b in zip(np.concatenate(([starts[0]], starts[breaks + 1])), np.concatenate((stops[breaks], [stops[-1]])))
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Volume conversion
+# ---------------------------------------------------------------------------
+
+
+def morton_to_array(buf: bytes, spec: VolumeSpecV06) -> "np.ndarray":
+    """
+    Decode a MORTON payload into a new (z, y, x, C) C-contiguous array.
+    """
+    buf = _byte_view(buf)
+    expected = spec.expected_nbytes()
+    if len(buf) != expected:
+        raise ValueError(
+            f"Buffer size {len(buf)} does not match expected {expected} "
+            f"for dims={spec.dims}, channels={spec.channels}, dtype={spec.dtype}"
+        )
+    x, y, z = spec.dims
+    flat = np.frombuffer(buf, dtype=np.dtype(spec.dtype)).reshape(-1, spec.channels)
+    out = np.empty_like(flat)
+    out[morton_order(spec.dims)] = flat
+    return out.reshape((z, y, x, spec.channels))
+
+
+def array_to_morton(vol: "np.ndarray") -> bytes:
+    """
+    Encode a (z, y, x, C) array into a MORTON payload.
+    """
+    if vol.ndim != 4:
+        raise ValueError(f"Expected 4D array (z, y, x, C), got shape {vol.shape}")
+    z, y, x, c = vol.shape
+    flat = np.ascontiguousarray(vol).reshape(-1, c)
+    return flat[morton_order((x, y, z))].tobytes()
+
+
+def encode_morton_volume(buf: bytes, spec: VolumeSpecV06) -> Tuple[bytes, VolumeSpecV06]:
+    """
+    Convert a C_CONTIG / F_CONTIG / PLANAR payload to MORTON.
+
+    Returns (morton_bytes, spec_with_signature_MORTON).
+    """
+    vol = full_volume_from_bytes(buf, spec)
+    return array_to_morton(vol), replace(spec, order="C", signature="MORTON")
+
+
+def decode_morton_volume(buf: bytes, spec: VolumeSpecV06) -> Tuple[bytes, VolumeSpecV06]:
+    """
+    Convert a MORTON payload back to C_CONTIG.
+
+    Returns (c_contig_bytes, spec_with_signature_C_CONTIG).
+    """
+    if spec.signature != "MORTON":
+        raise ValueError(f"Expected signature 'MORTON', got {spec.signature!r}")
+    return morton_to_array(buf, spec).tobytes(), replace(spec, order="C", signature="C_CONTIG")
+
+
+# ---------------------------------------------------------------------------
+# ROI reads
+# ---------------------------------------------------------------------------
+
+
+def read_region_morton(
+    buf: bytes,
+    spec: VolumeSpecV06,
+    x: int,
+    y: int,
+    z: int,
+    w: int,
+    h: int,
+    d: int,
+    channels: Optional[List[int]] = None,
+) -> "np.ndarray":
+    """
+    Extract a (d, h, w, C_sel) ROI from a MORTON payload.
+
+    The ROI is covered with octree nodes (the contiguous Morton runs of
+    morton_ranges_for_roi), and each node's run is copied into place, so
+    with an mmap-backed 'buf' only the pages covering those runs are
+    touched. Always returns a new array.
+    """
+    buf = _byte_view(buf)
+    expected = spec.expected_nbytes()
+    if len(buf) != expected:
+        raise ValueError(
+            f"Buffer size {len(buf)} does not match expected {expected} "
+            f"for dims={spec.dims}, channels={spec.channels}, dtype={spec.dtype}"
+        )
+
+    x_max, y_max, z_max = spec.dims
+    if not (0 <= x < x + w <= x_max):
+        raise ValueError(f"ROI x-range [{x}, {x + w}) is out of bounds [0, {x_max})")
+    if not (0 <= y < y + h <= y_max):
+        raise ValueError(f"ROI y-range [{y}, {y + h}) is out of bounds [0, {y_max})")
+    if not (0 <= z < z + d <= z_max):
+        raise ValueError(f"ROI z-range [{z}, {z + d}) is out of bounds [0, {z_max})")
+
+    if channels is not None:
+        for c in channels:
+            if c < 0 or c >= spec.channels:
+                raise ValueError(
+                    f"Requested channel index {c} is out of range [0, {spec.channels})"
+                )
+
+    flat = np.frombuffer(buf, dtype=np.dtype(spec.dtype)).reshape(-1, spec.channels)
+    chan = None if channels is None else np.asarray(channels, dtype=np.intp)
+    out = np.empty((d, h, w, spec.channels if chan is None else len(chan)), dtype=flat.dtype)
+    for side, o, ranks in _roi_nodes(spec.dims, x, y, z, w, h, d):
+        if side < _BLOCK_MIN_SIDE:
+            for pos, local in _node_gathers(side, o, ranks, x, y, z):
+                out[local] = flat[pos] if chan is None else flat[pos[..., None], chan]
+            continue
+        for start, sub, box in _node_blocks(side, o, ranks, x, y, z):
+            run = flat[start : start + sub**3]
+            shape = (2,) * (3 * (sub.bit_length() - 1)) + (spec.channels,)
+            if chan is None:
+                _morton_block_view(out[box])[...] = run.reshape(shape)
+            else:
+                for i, c in enumerate(chan):
+                    _morton_block_view(out[box + (slice(i, i + 1),)])[...] = run[:, c : c + 1].reshape(shape[:-1] + (1,))
+    return out
+
+
+def write_region_morton(
+    buf,
+    spec: VolumeSpecV06,
+    x: int,
+    y: int,
+    z: int,
+    data: "np.ndarray",
+    channels: Optional[List[int]] = None,
+) -> None:
+    """
+    Scatter a (d, h, w, C_sel) region into a writable MORTON payload, in place.
+
+    'data' must already match spec.dtype (see roi_v06.write_region_to_bytes).
+    """
+    d, h, w, c = data.shape
+    flat = np.frombuffer(_byte_view(buf), dtype=np.dtype(spec.dtype)).reshape(-1, spec.channels)
+    chan = None if channels is None else np.asarray(channels, dtype=np.intp)
+    for side, o, ranks in _roi_nodes(spec.dims, x, y, z, w, h, d):
+        if side < _BLOCK_MIN_SIDE:
+            for pos, local in _node_gathers(side, o, ranks, x, y, z):
+                if chan is None:
+                    flat[pos] = data[local]
+                else:
+                    flat[pos[..., None], chan] = data[local]
+            continue
+        for start, sub, box in _node_blocks(side, o, ranks, x, y, z):
+            run = flat[start : start + sub**3]
+            block = _morton_block_view(data[box])
+            if chan is None:
+                run.reshape(block.shape)[...] = block
+            else:
+                for i, ch in enumerate(chan):
+                    run[:, ch : ch + 1].reshape(block.shape[:-1] + (1,))[...] = block[..., i : i + 1]
@@ -0,0 +1,158 @@
+"""
+palette_v08.py — CIVD v0.8 per-tile palette + bit-packing encoding.
+
+Semantic and occupancy channels hold only a handful of distinct values
+per tile but are stored at a full byte (or more) per voxel. The palette
+encoding stores, per tile and per channel, the distinct values (sorted by
+bit pattern) and one bit-packed palette index per voxel:
+
+    per channel:
+      n_colors (u16), bits (u8), reserved (u8)
+      palette  (n_colors * itemsize bytes, volume dtype)
+      indices  (ceil(n_voxels * bits / 8) bytes)
+
+'bits' is the smallest of 0, 1, 2, 4, 8 that can address the palette
+(0 = constant channel, no index bytes). Channels with more than 256
+distinct values are stored raw, marked by n_colors == 0. Indices follow
+the tile's (z, y, x) raster order and are packed little-endian inside
+each byte, so voxel i sits at byte i // (8 // bits), bit (i % (8 // bits)) * bits.
+
+That fixed addressing lets PaletteTileV08.read_box() unpack just an ROI
+sub-box of a tile. The encoding is selected with the "palette" tile
+filter (see tile_filters_v08).
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, _volume_to_bytes, _volume_view_from_bytes
+
+_CHANNEL_HEADER = struct.Struct("<H B x")
+_BITS = (0, 1, 2, 4, 8)
+
+
+def _bits_for(n_colors: int) -> int:
+    for b in _BITS:
+        if n_colors <= (1 << b):
+            return b
+    raise ValueError(f"Palette of {n_colors} colors does not fit in 8 bits")
+
+
+def pack_indices(indices: "np.ndarray", bits: int) -> bytes:
+    """
+    Bit-pack uint8 palette indices at 1/2/4/8 bits per entry.
+    """
+    if bits == 0:
+        return b""
+    if bits == 8:
+        return indices.astype(np.uint8).tobytes()
+    per = 8 // bits
+    n = len(indices)
+    padded = np.zeros(-(-n // per) * per, dtype=np.uint8)
+    padded[:n] = indices
+    shifts = np.arange(per, dtype=np.uint8) * bits
+    return np.bitwise_or.reduce(padded.reshape(-1, per) << shifts, axis=1).astype(np.uint8).tobytes()
+
+
+def unpack_indices(packed: "np.ndarray", bits: int, positions: "np.ndarray") -> "np.ndarray":
+    """
+    Return the palette indices at the given voxel 'positions' (any integer
+    array) without unpacking the rest.
+    """
+    if bits == 0:
+        return np.zeros(positions.shape, dtype=np.uint8)
+    if bits == 8:
+        return packed[positions]
+    per = 8 // bits
+    shift = ((positions % per) * bits).astype(np.uint8)
+    return (packed[positions // per] >> shift) & np.uint8((1 << bits) - 1)
+
+
+def encode_palette_tile_v08(payload: bytes, spec: VolumeSpecV06) -> bytes:
+    """
+    Palette-encode a raw tile payload; 'spec.dims' is the tile's (x, y, z) shape.
+    """
+    vol = _volume_view_from_bytes(payload, spec)
+    parts: List[bytes] = []
+    for c in range(spec.channels):
+        values = np.ascontiguousarray(vol[..., c]).ravel()
+        # Unique over the raw bit patterns so float -0.0 and NaN payloads
+        # survive the round trip.
+        bits_view = values.view(f"u{values.dtype.itemsize}")
+        palette, inverse = np.unique(bits_view, return_inverse=True)
+        palette = palette.view(values.dtype)
+        if len(palette) > 256:
+            parts += [_CHANNEL_HEADER.pack(0, 0), values.tobytes()]
+            continue
+        bits = _bits_for(len(palette))
+        parts += [_CHANNEL_HEADER.pack(len(palette), bits), palette.tobytes(), pack_indices(inverse.ravel(), bits)]
+    return b"".join(parts)
+
+
+class PaletteTileV08:
+    """
+    Parsed palette-encoded tile that can unpack arbitrary sub-boxes.
+
+    'spec.dims' is the (x, y, z) shape of the tile payload.
+    """
+
+    def __init__(self, blob: Union[bytes, memoryview], spec: VolumeSpecV06) -> None:
+        self.spec = spec
+        self.shape = tuple(spec.dims)
+        dtype = np.dtype(spec.dtype)
+        n = spec.voxel_count()
+
+        self._channels: List[Tuple[int, "np.ndarray", "np.ndarray"]] = []
+        off = 0
+        for _ in range(spec.channels):
+            n_colors, bits = _CHANNEL_HEADER.unpack_from(blob, off)
+            off += _CHANNEL_HEADER.size
+            if n_colors == 0:
+                raw = np.frombuffer(blob, dtype=dtype, count=n, offset=off)
+                off += n * dtype.itemsize
+                self._channels.append((-1, raw, raw))
+                continue
+            palette = np.frombuffer(blob, dtype=dtype, count=n_colors, offset=off)
+            off += n_colors * dtype.itemsize
+            nbytes = -(-n * bits // 8)
+            packed = np.frombuffer(blob, dtype=np.uint8, count=nbytes, offset=off)
+            off += nbytes
+            self._channels.append((bits, palette, packed))
+        if off != len(blob):
+            raise ValueError(f"Palette tile has {len(blob) - off} trailing bytes")
+
+    def read_box(self, tile_slices: Tuple[slice, slice, slice], channels=slice(None)) -> "np.ndarray":
+        """
+        Unpack the (z, y, x) sub-box 'tile_slices' for the selected channels
+        and return it as (d, h, w, C_sel).
+        """
+        sx, sy, sz = self.shape
+        zs, ys, xs = (range(*s.indices(n)) for s, n in zip(tile_slices, (sz, sy, sx)))
+        lin = (
+            (np.asarray(zs)[:, None, None] * sy + np.asarray(ys)[None, :, None]) * sx
+            + np.asarray(xs)[None, None, :]
+        )
+        sel = range(self.spec.channels)[channels] if isinstance(channels, slice) else channels
+
+        out = np.empty(lin.shape + (len(sel),), dtype=np.dtype(self.spec.dtype))
+        for i, c in enumerate(sel):
+            bits, palette, packed = self._channels[c]
+            if bits < 0:
+                out[..., i] = palette[lin]
+            else:
+                out[..., i] = palette[unpack_indices(packed, bits, lin)]
+        return out
+
+    def to_array(self) -> "np.ndarray":
+        return self.read_box((slice(None), slice(None), slice(None)))
+
+
+def decode_palette_tile_v08(blob: bytes, spec: VolumeSpecV06) -> bytes:
+    """
+    Inverse of encode_palette_tile_v08(); returns the raw tile payload.
+    """
+    return _volume_to_bytes(PaletteTileV08(blob, spec).to_array(), spec)
@@ -0,0 +1,589 @@
+"""
+patch_loader_v08.py — CIVD v0.8 multi-worker patch loader for training.
+
+Training on large volumes spends most of its time cutting fixed-size
+patches out of a snapshot or tile pack. PatchLoaderV08 moves that work to
+worker processes:
+
+    sampler = ClassBalancedPatchSamplerV08("scan.civd", (32, 32, 32), semantic_channel=3)
+    with PatchLoaderV08("scan.civd", sampler, (32, 32, 32), batch_size=16, num_workers=4) as loader:
+        for batch in loader:
+            train_step(batch.patches)     # (B, d, h, w, C) view into shared memory
+
+The main process draws patch origins from a sampler and hands them out as
+small (batch_id, slot, origins) tasks. Each worker keeps its own mapping
+of the source (see open_patch_reader_v08) and writes the patches straight
+into one of a ring of multiprocessing.shared_memory slots, so voxel data
+is never pickled. Batches are yielded in submission order; a batch's
+patches stay valid until the next batch is requested (pass copy=True to
+keep them longer).
+
+Samplers produce (n, 3) arrays of (x, y, z) origins:
+
+    UniformPatchSamplerV08        uniform over all valid origins
+    ClassBalancedPatchSamplerV08  classes of a semantic channel drawn
+                                  uniformly (or by weight), then a voxel of
+                                  that class, then a patch containing it
+    RoiListPatchSamplerV08        a fixed list of origins / ROIs
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import mmap
+import multiprocessing
+from multiprocessing import shared_memory
+import os
+import queue
+import traceback
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, RoiV06, read_regions
+from .snapshot_v08 import _parse_snapshot_header_v08, _read_bricked_roi
+from .tile_pack_v08 import assemble_roi_from_tiles_v08, open_tile_loader_v08
+from .tile_prefetch_v08 import TileCacheV08
+
+
+def _check_patch_size(dims: Tuple[int, int, int], patch_size: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    size = tuple(int(v) for v in patch_size)
+    if len(size) != 3 or any(s <= 0 or s > n for s, n in zip(size, dims)):
+        raise ValueError(f"patch_size {tuple(patch_size)} must be positive and fit in dims {tuple(dims)}")
+    return size
+
+
+# ---------------------------------------------------------------------------
+# Readers
+# ---------------------------------------------------------------------------
+
+
+class PatchReaderV08:
+    """
+    Keeps a snapshot file or tile pack folder open for repeated batched
+    patch reads.
+
+    Dense snapshots are memory-mapped and gathered with read_regions();
+    bricked snapshots and tile packs are assembled patch by patch (tile
+    packs through a TileCacheV08 of 'cache_tiles' payloads).
+    """
+
+    def __init__(self, path: str, cache_tiles: int = 256) -> None:
+        self.path = path
+        self._file = None
+        self._mm = None
+        self._payload = None
+        self._close_tiles = None
+
+        if os.path.isdir(path):
+            self.tiling, self.spec, load_tile, self._close_tiles = open_tile_loader_v08(path)
+            self._cache = TileCacheV08(load_tile, capacity=cache_tiles)
+            self.kind = "tile_pack"
+            return
+
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._header, self.spec, self._header_len = _parse_snapshot_header_v08(self._mm)
+        except BaseException:
+            self.close()
+            raise
+        if self._header.layout == "BRICKED":
+            self.kind = "bricked_snapshot"
+        else:
+            self.kind = "snapshot"
+            self._payload = memoryview(self._mm)[self._header_len:]
+
+    def read_regions(
+        self,
+        origins,
+        size: Tuple[int, int, int],
+        channels: Optional[List[int]] = None,
+        dtype: Optional[str] = None,
+        out: Optional["np.ndarray"] = None,
+    ) -> "np.ndarray":
+        """
+        Read (N, d, h, w, C_sel) patches at (N, 3) (x, y, z) 'origins'.
+        """
+        if self._payload is not None:
+            return read_regions(self._payload, self.spec, origins, size, channels=channels, dtype=dtype, out=out)
+
+        origins = np.asarray(origins, dtype=np.int64).reshape(-1, 3)
+        w, h, d = (int(v) for v in size)
+        n_ch = self.spec.channels if channels is None else len(channels)
+        if out is None:
+            out = np.empty((len(origins), d, h, w, n_ch), dtype=np.dtype(dtype or self.spec.dtype))
+        for i, (x, y, z) in enumerate(origins.tolist()):
+            roi = RoiV06(x, y, z, w, h, d)
+            if self.kind == "tile_pack":
+                out[i] = assemble_roi_from_tiles_v08(
+                    self.tiling, self.spec, roi, self._cache.get, channels=channels, dtype=dtype
+                )
+            else:
+                out[i] = _read_bricked_roi(self._mm, self._header, self.spec, self._header_len, roi, channels, dtype)
+        return out
+
+    def read_roi(self, roi: RoiV06, channels: Optional[List[int]] = None) -> "np.ndarray":
+        return self.read_regions([[roi.x, roi.y, roi.z]], (roi.w, roi.h, roi.d), channels=channels)[0]
+
+    def close(self) -> None:
+        if self._payload is not None:
+            self._payload.release()
+            self._payload = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._close_tiles is not None:
+            self._close_tiles()
+            self._close_tiles = None
+
+    def __enter__(self) -> "PatchReaderV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_patch_reader_v08(path: str, **kwargs) -> PatchReaderV08:
+    """
+    Open a v0.8 snapshot file or tile pack folder for patch reads.
+    """
+    return PatchReaderV08(path, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Samplers
+# ---------------------------------------------------------------------------
+
+
+class UniformPatchSamplerV08:
+    """
+    Draw patch origins uniformly over every position where the patch fits.
+    """
+
+    def __init__(self, dims: Tuple[int, int, int], patch_size: Tuple[int, int, int], seed: Optional[int] = None) -> None:
+        self.dims = tuple(dims)
+        self.patch_size = _check_patch_size(self.dims, patch_size)
+        self._rng = np.random.default_rng(seed)
+
+    def sample(self, n: int) -> "np.ndarray":
+        high = np.asarray(self.dims) - np.asarray(self.patch_size) + 1
+        return self._rng.integers(0, high, size=(n, 3))
+
+
+class ClassBalancedPatchSamplerV08:
+    """
+    Draw patches so that every class of a semantic channel is equally
+    likely (or follows 'weights') to be present.
+
+    On construction the semantic channel is scanned slice by slice on a
+    grid of 'stride' voxels and the coordinates of each class are indexed.
+    sample() then picks a class, a random indexed voxel of that class, and
+    a random patch origin that keeps the voxel inside the patch.
+
+    source:
+        Snapshot / tile pack path or an open PatchReaderV08.
+    classes:
+        Class values to sample; defaults to every value found. Classes
+        missing from the volume raise ValueError.
+    """
+
+    def __init__(
+        self,
+        source: Union[str, PatchReaderV08],
+        patch_size: Tuple[int, int, int],
+        semantic_channel: int,
+        classes: Optional[Sequence[int]] = None,
+        weights: Optional[Sequence[float]] = None,
+        stride: int = 1,
+        seed: Optional[int] = None,
+    ) -> None:
+        reader = open_patch_reader_v08(source) if isinstance(source, str) else source
+        try:
+            spec = reader.spec
+            if not 0 <= semantic_channel < spec.channels:
+                raise ValueError(f"semantic_channel {semantic_channel} is out of range [0, {spec.channels})")
+            self.dims = tuple(spec.dims)
+            self.patch_size = _check_patch_size(self.dims, patch_size)
+            coords, labels = self._scan(reader, semantic_channel, max(int(stride), 1))
+        finally:
+            if isinstance(source, str):
+                reader.close()
+
+        found, counts = np.unique(labels, return_counts=True)
+        if classes is None:
+            self.classes = found
+        else:
+            self.classes = np.asarray(classes, dtype=labels.dtype)
+            missing = np.setdiff1d(self.classes, found)
+            if len(missing):
+                raise ValueError(f"Classes {missing.tolist()} do not occur in channel {semantic_channel}")
+        if not len(self.classes):
+            raise ValueError("No classes to sample from")
+
+        order = np.argsort(labels, kind="stable")
+        self._coords = coords[order]
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        pos = np.searchsorted(found, self.classes)
+        self._starts = starts[pos]
+        self._counts = counts[pos]
+
+        if weights is None:
+            self.weights = np.full(len(self.classes), 1.0 / len(self.classes))
+        else:
+            w = np.asarray(weights, dtype=np.float64)
+            if w.shape != (len(self.classes),) or np.any(w < 0) or w.sum() <= 0:
+                raise ValueError("weights must be non-negative, one per class, with a positive sum")
+            self.weights = w / w.sum()
+        self._rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def _scan(reader: PatchReaderV08, channel: int, stride: int) -> Tuple["np.ndarray", "np.ndarray"]:
+        X, Y, Z = reader.spec.dims
+        yy, xx = np.mgrid[0:Y:stride, 0:X:stride]
+        coords: List["np.ndarray"] = []
+        labels: List["np.ndarray"] = []
+        for z in range(0, Z, stride):
+            plane = reader.read_roi(RoiV06(0, 0, z, X, Y, 1), channels=[channel])[0, ::stride, ::stride, 0]
+            coords.append(np.stack([xx.ravel(), yy.ravel(), np.full(xx.size, z)], axis=1))
+            labels.append(plane.ravel())
+        return np.concatenate(coords), np.concatenate(labels)
+
+    def sample(self, n: int) -> "np.ndarray":
+        cls = self._rng.choice(len(self.classes), size=n, p=self.weights)
+        pick = self._starts[cls] + (self._rng.random(n) * self._counts[cls]).astype(np.int64)
+        voxels = self._coords[pick]
+        size = np.asarray(self.patch_size)
+        origins = voxels - self._rng.integers(0, size, size=(n, 3))
+        return np.clip(origins, 0, np.asarray(self.dims) - size)
+
+
+class RoiListPatchSamplerV08:
+    """
+    Serve a fixed list of patch origins, optionally shuffled, once (or
+    forever with repeat=True).
+
+    'rois' is an (N, 3) array of (x, y, z) origins or a list of RoiV06
+    whose size must equal 'patch_size'.
+    """
+
+    def __init__(
+        self,
+        rois,
+        patch_size: Tuple[int, int, int],
+        shuffle: bool = False,
+        repeat: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.patch_size = tuple(int(v) for v in patch_size)
+        if len(rois) and isinstance(rois[0], RoiV06):
+            for roi in rois:
+                if (roi.w, roi.h, roi.d) != self.patch_size:
+                    raise ValueError(f"ROI {roi} does not match patch_size {self.patch_size}")
+            rois = [(roi.x, roi.y, roi.z) for roi in rois]
+        self.origins = np.asarray(rois, dtype=np.int64).reshape(-1, 3)
+        self.shuffle = shuffle
+        self.repeat = repeat
+        self._rng = np.random.default_rng(seed)
+        self._order = self._new_order()
+        self._pos = 0
+
+    def _new_order(self) -> "np.ndarray":
+        if self.shuffle:
+            return self._rng.permutation(len(self.origins))
+        return np.arange(len(self.origins))
+
+    def __len__(self) -> int:
+        return len(self.origins)
+
+    def sample(self, n: int) -> "np.ndarray":
+        """
+        Return the next (up to) n origins; fewer (or none) once the list is
+        exhausted, unless repeat=True.
+        """
+        parts: List["np.ndarray"] = []
+        while n > 0:
+            if self._pos == len(self._order):
+                if not self.repeat or not len(self._order):
+                    break
+                self._order = self._new_order()
+                self._pos = 0
+            take = self._order[self._pos : self._pos + n]
+            self._pos += len(take)
+            n -= len(take)
+            parts.append(self.origins[take])
+        return np.concatenate(parts) if parts else np.empty((0, 3), dtype=np.int64)
+
+
+# ---------------------------------------------------------------------------
+# Loader
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class PatchBatchV08:
+    """
+    One batch: 'patches' is (B, d, h, w, C_sel) for the (B, 3) (x, y, z)
+    'origins'. Unless the loader copies, 'patches' lives in a shared-memory
+    slot that is reused once the next batch is requested.
+    """
+
+    index: int
+    origins: "np.ndarray"
+    patches: "np.ndarray"
+
+
+def _patch_worker(
+    path: str,
+    slot_names: List[str],
+    slot_shape: Tuple[int, ...],
+    dtype: str,
+    channels: Optional[List[int]],
+    cache_tiles: int,
+    tasks,
+    done,
+) -> None:
+    slots = [shared_memory.SharedMemory(name=name) for name in slot_names]
+    arrays = [np.ndarray(slot_shape, dtype=dtype, buffer=shm.buf) for shm in slots]
+    size = slot_shape[3:0:-1]
+    reader = None
+    try:
+        reader = open_patch_reader_v08(path, cache_tiles=cache_tiles)
+        while True:
+            item = tasks.get()
+            if item is None:
+                return
+            batch_id, slot, origins = item
+            try:
+                reader.read_regions(origins, size, channels=channels, dtype=dtype, out=arrays[slot][: len(origins)])
+                done.put((batch_id, None))
+            except Exception:
+                done.put((batch_id, traceback.format_exc()))
+    except Exception:
+        done.put((-1, traceback.format_exc()))
+    finally:
+        if reader is not None:
+            reader.close()
+        del arrays
+        for shm in slots:
+            shm.close()
+
+
+class PatchLoaderV08:
+    """
+    Iterate batches of patches read by worker processes into shared memory.
+
+    path:
+        v0.8 snapshot file or tile pack folder; every worker opens its own
+        mapping.
+    sampler:
+        Object with sample(n) -> (k, 3) origins, k <= n; k == 0 ends the
+        epoch (see the samplers above).
+    num_workers:
+        Worker processes; 0 reads in the calling process (no shared memory).
+    slots:
+        Shared-memory batch slots in the ring (default 2 * num_workers + 1):
+        bounds how many batches are prepared ahead of the consumer.
+    num_batches:
+        Stop after this many batches (required to end infinite samplers).
+    copy:
+        Return private copies instead of views into the slots.
+    mp_context:
+        multiprocessing start method ("fork", "spawn", ...) or None for the
+        platform default.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sampler,
+        patch_size: Tuple[int, int, int],
+        batch_size: int,
+        channels: Optional[List[int]] = None,
+        dtype: Optional[str] = None,
+        num_workers: int = 2,
+        slots: Optional[int] = None,
+        num_batches: Optional[int] = None,
+        copy: bool = False,
+        cache_tiles: int = 256,
+        mp_context: Optional[str] = None,
+    ) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.path = path
+        self.sampler = sampler
+        self.batch_size = batch_size
+        self.channels = None if channels is None else list(channels)
+        self.num_workers = num_workers
+        self.num_batches = num_batches
+        self.copy = copy
+
+        with open_patch_reader_v08(path) as reader:
+            self.spec: VolumeSpecV06 = reader.spec
+        self.patch_size = _check_patch_size(self.spec.dims, patch_size)
+        self.dtype = np.dtype(dtype or self.spec.dtype)
+        w, h, d = self.patch_size
+        n_ch = self.spec.channels if channels is None else len(channels)
+        self._slot_shape = (batch_size, d, h, w, n_ch)
+
+        n_slots = slots if slots is not None else 2 * max(num_workers, 0) + 1
+        if n_slots <= 0:
+            raise ValueError("slots must be positive")
+
+        self._shms: List[shared_memory.SharedMemory] = []
+        self._workers: List[multiprocessing.process.BaseProcess] = []
+        self._reader: Optional[PatchReaderV08] = None
+        nbytes = int(np.prod(self._slot_shape)) * self.dtype.itemsize
+        try:
+            if num_workers > 0:
+                ctx = multiprocessing.get_context(mp_context)
+                self._shms = [shared_memory.SharedMemory(create=True, size=max(nbytes, 1)) for _ in range(n_slots)]
+                self._arrays = [np.ndarray(self._slot_shape, dtype=self.dtype, buffer=s.buf) for s in self._shms]
+                self._tasks = ctx.Queue()
+                self._done = ctx.Queue()
+                args = ([s.name for s in self._shms], self._slot_shape, self.dtype.str, self.channels, cache_tiles)
+                for i in range(num_workers):
+                    p = ctx.Process(
+                        target=_patch_worker,
+                        args=(path,) + args + (self._tasks, self._done),
+                        name=f"civd-patch-worker-{i}",
+                        daemon=True,
+                    )
+                    p.start()
+                    self._workers.append(p)
+            else:
+                self._arrays = [np.empty(self._slot_shape, dtype=self.dtype) for _ in range(n_slots)]
+                self._reader = open_patch_reader_v08(path, cache_tiles=cache_tiles)
+        except BaseException:
+            self.close()
+            raise
+
+        self._free = list(range(n_slots))
+        self._pending: Dict[int, Tuple[int, "np.ndarray"]] = {}
+        self._finished: Dict[int, Optional[str]] = {}
+        self._held: Optional[int] = None
+        self._submitted = 0
+        self._next = 0
+        self._exhausted = False
+
+    # -- scheduling ---------------------------------------------------------
+
+    def _submit(self) -> None:
+        while self._free and not self._exhausted:
+            if self.num_batches is not None and self._submitted >= self.num_batches:
+                self._exhausted = True
+                return
+            origins = np.asarray(self.sampler.sample(self.batch_size), dtype=np.int64).reshape(-1, 3)
+            if not len(origins):
+                self._exhausted = True
+                return
+            if len(origins) > self.batch_size:
+                raise ValueError(f"Sampler returned {len(origins)} origins for a batch of {self.batch_size}")
+            bad = np.any((origins < 0) | (origins + np.asarray(self.patch_size) > np.asarray(self.spec.dims)), axis=1)
+            if bad.any():
+                o = tuple(int(v) for v in origins[np.argmax(bad)])
+                raise ValueError(f"Patch origin {o} with size {self.patch_size} is out of bounds for dims={self.spec.dims}")
+
+            slot = self._free.pop()
+            batch_id = self._submitted
+            self._submitted += 1
+            self._pending[batch_id] = (slot, origins)
+            if self._reader is not None:
+                self._reader.read_regions(
+                    origins, self.patch_size, channels=self.channels, dtype=self.dtype.str,
+                    out=self._arrays[slot][: len(origins)],
+                )
+                self._finished[batch_id] = None
+            else:
+                self._tasks.put((batch_id, slot, origins))
+
+    def _wait(self, batch_id: int) -> None:
+        while batch_id not in self._finished:
+            try:
+                done_id, error = self._done.get(timeout=1.0)
+            except queue.Empty:
+                dead = [p.name for p in self._workers if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Patch worker(s) {dead} exited unexpectedly")
+                continue
+            if done_id < 0:
+                raise RuntimeError(f"Patch worker failed to start:\n{error}")
+            self._finished[done_id] = error
+
+    # -- iteration ----------------------------------------------------------
+
+    def __iter__(self) -> "PatchLoaderV08":
+        return self
+
+    def __next__(self) -> PatchBatchV08:
+        if self._held is not None:
+            self._free.append(self._held)
+            self._held = None
+        self._submit()
+        if self._next not in self._pending:
+            raise StopIteration
+
+        batch_id = self._next
+        self._wait(batch_id)
+        slot, origins = self._pending.pop(batch_id)
+        error = self._finished.pop(batch_id)
+        self._next += 1
+        if error is not None:
+            self._free.append(slot)
+            raise RuntimeError(f"Patch worker failed on batch {batch_id}:\n{error}")
+
+        patches = self._arrays[slot][: len(origins)]
+        if self.copy:
+            patches = patches.copy()
+            self._free.append(slot)
+        else:
+            self._held = slot
+        self._submit()
+        return PatchBatchV08(index=batch_id, origins=origins, patches=patches)
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def close(self) -> None:
+        """
+        Stop the workers and release the shared-memory slots. Batches that
+        were not copied become invalid.
+        """
+        if self._workers:
+            for _ in self._workers:
+                self._tasks.put(None)
+            for p in self._workers:
+                p.join(timeout=5.0)
+                if p.is_alive():
+                    p.terminate()
+                    p.join()
+            self._workers = []
+            self._tasks.close()
+            self._done.close()
+        self._arrays = []
+        for shm in self._shms:
+            try:
+                shm.close()
+            except BufferError:
+                # a yielded batch still views the slot; the mapping goes
+                # away with it, the name is released below regardless
+                pass
+            shm.unlink()
+        self._shms = []
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def __enter__(self) -> "PatchLoaderV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __del__(self) -> None:  # pragma: no cover
+        try:
+            self.close()
+        except Exception:
+            pass
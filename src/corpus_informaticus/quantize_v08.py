@@ -0,0 +1,273 @@
+"""
+quantize_v08.py — CIVD v0.8 quantized channel codec.
+
+Float fields such as TSDF, confidence or intensity are often fine at 8 or
+16 bits. A QuantSpecV08 stores each channel as an integer code with a
+per-channel affine map
+
+    value ≈ code * scale + offset
+
+The stored payload is an ordinary v0.8 volume in the integer dtype (so
+all layouts, bricks and tile packs apply unchanged); the descriptor is
+recorded as meta["quantization"] in the snapshot header or tile-pack
+manifest. Dequantization is done on the ROI only: the integer ROI is read
+as usual and expanded to float in the same vectorized pass.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, RoiV06, _volume_to_bytes, _volume_view_from_bytes
+from .snapshot_v08 import (
+    SnapshotHeaderV08,
+    read_roi_from_snapshot_v08,
+    read_snapshot_header_v08,
+    write_snapshot_v08,
+)
+from .tile_pack_v08 import (
+    load_tile_pack_manifest_v08,
+    read_roi_from_tile_pack_v08,
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+)
+
+QUANT_META_KEY = "quantization"
+QUANT_DTYPES = ("uint8", "uint16", "int16")
+
+
+# ---------------------------------------------------------------------------
+# Descriptor
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class QuantSpecV08:
+    """
+    Per-channel quantization descriptor.
+
+    dtype:
+        Stored integer dtype ('uint8', 'uint16' or 'int16').
+    scale, offset:
+        One entry per channel; value = code * scale + offset.
+    source_dtype:
+        Float dtype the values are restored to by default.
+    """
+
+    dtype: str
+    scale: Tuple[float, ...]
+    offset: Tuple[float, ...]
+    source_dtype: str = "float32"
+
+    def __post_init__(self) -> None:
+        if self.dtype not in QUANT_DTYPES:
+            raise ValueError(f"Unsupported quantized dtype {self.dtype!r}; use one of {QUANT_DTYPES}")
+        if len(self.scale) != len(self.offset):
+            raise ValueError("scale and offset must have one entry per channel")
+        if any(s <= 0 for s in self.scale):
+            raise ValueError("scale entries must be positive")
+
+    @property
+    def channels(self) -> int:
+        return len(self.scale)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "dtype": self.dtype,
+            "scale": list(self.scale),
+            "offset": list(self.offset),
+            "source_dtype": self.source_dtype,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantSpecV08":
+        return cls(
+            dtype=str(data["dtype"]),
+            scale=tuple(float(v) for v in data["scale"]),
+            offset=tuple(float(v) for v in data["offset"]),
+            source_dtype=str(data.get("source_dtype", "float32")),
+        )
+
+
+def fit_quant_spec_v08(buf: bytes, spec: VolumeSpecV06, dtype: str = "uint8") -> QuantSpecV08:
+    """
+    Derive a QuantSpecV08 that maps each channel's [min, max] (NaNs ignored)
+    onto the full range of 'dtype'.
+    """
+    if dtype not in QUANT_DTYPES:
+        raise ValueError(f"Unsupported quantized dtype {dtype!r}; use one of {QUANT_DTYPES}")
+    info = np.iinfo(dtype)
+    flat = _volume_view_from_bytes(buf, spec).reshape(-1, spec.channels)
+
+    scale: List[float] = []
+    offset: List[float] = []
+    for c in range(spec.channels):
+        col = flat[:, c]
+        finite = col[np.isfinite(col)]
+        lo, hi = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 0.0)
+        s = (hi - lo) / (info.max - info.min) if hi > lo else 1.0
+        scale.append(s)
+        offset.append(lo - info.min * s)
+    return QuantSpecV08(dtype=dtype, scale=tuple(scale), offset=tuple(offset), source_dtype=spec.dtype)
+
+
+# ---------------------------------------------------------------------------
+# Vectorized codec
+# ---------------------------------------------------------------------------
+
+
+def quantize_array_v08(values: "np.ndarray", quant: QuantSpecV08) -> "np.ndarray":
+    """
+    Quantize a (..., C) float array. Values are rounded to the nearest code
+    and saturated to the dtype range; NaN maps to the code nearest 'offset'.
+    """
+    values = np.asarray(values)
+    if values.shape[-1] != quant.channels:
+        raise ValueError(f"Array has {values.shape[-1]} channels, quantization has {quant.channels}")
+    info = np.iinfo(quant.dtype)
+    codes = (values - np.asarray(quant.offset)) / np.asarray(quant.scale)
+    codes = np.nan_to_num(codes, nan=0.0, posinf=info.max, neginf=info.min)
+    np.rint(codes, out=codes)
+    np.clip(codes, info.min, info.max, out=codes)
+    return codes.astype(quant.dtype)
+
+
+def dequantize_array_v08(
+    codes: "np.ndarray",
+    quant: QuantSpecV08,
+    channels: Optional[Sequence[int]] = None,
+    dtype: Optional[str] = None,
+) -> "np.ndarray":
+    """
+    Expand a (..., C_sel) code array to float. 'channels' names the stored
+    channels present in 'codes' (default: all, in order).
+    """
+    sel = list(range(quant.channels)) if channels is None else list(channels)
+    if codes.shape[-1] != len(sel):
+        raise ValueError(f"Array has {codes.shape[-1]} channels, expected {len(sel)}")
+    out_dtype = np.dtype(quant.source_dtype if dtype is None else dtype)
+    scale = np.asarray(quant.scale, dtype=out_dtype)[sel]
+    offset = np.asarray(quant.offset, dtype=out_dtype)[sel]
+
+    out = np.empty(codes.shape, dtype=out_dtype)
+    np.multiply(codes, scale, out=out, casting="unsafe")
+    out += offset
+    return out
+
+
+def quantize_volume_v08(buf: bytes, spec: VolumeSpecV06, quant: QuantSpecV08) -> Tuple[bytes, VolumeSpecV06]:
+    """
+    Quantize a float volume payload. Returns (codes_bytes, stored_spec);
+    the stored spec keeps dims/order/signature and carries quant.dtype.
+    """
+    if spec.channels != quant.channels:
+        raise ValueError(f"Volume has {spec.channels} channels, quantization has {quant.channels}")
+    stored = replace(spec, dtype=quant.dtype)
+    codes = quantize_array_v08(_volume_view_from_bytes(buf, spec), quant)
+    return _volume_to_bytes(codes, stored), stored
+
+
+def dequantize_volume_v08(
+    buf: bytes, stored_spec: VolumeSpecV06, quant: QuantSpecV08
+) -> Tuple[bytes, VolumeSpecV06]:
+    """
+    Inverse of quantize_volume_v08(). Returns (float_bytes, float_spec).
+    """
+    spec = replace(stored_spec, dtype=quant.source_dtype)
+    vol = dequantize_array_v08(_volume_view_from_bytes(buf, stored_spec), quant)
+    return _volume_to_bytes(vol, spec), spec
+
+
+# ---------------------------------------------------------------------------
+# Snapshots
+# ---------------------------------------------------------------------------
+
+
+def write_quantized_snapshot_v08(
+    path: str,
+    volume_buf: bytes,
+    spec: VolumeSpecV06,
+    quant: QuantSpecV08,
+    meta: Optional[Dict[str, Any]] = None,
+    **kwargs: Any,
+) -> SnapshotHeaderV08:
+    """
+    Quantize a float volume and write it as a v0.8 snapshot; the descriptor
+    goes to meta["quantization"]. Extra kwargs go to write_snapshot_v08().
+    """
+    codes, stored = quantize_volume_v08(volume_buf, spec, quant)
+    meta = dict(meta or {})
+    meta[QUANT_META_KEY] = quant.to_dict()
+    return write_snapshot_v08(path, codes, stored, meta=meta, **kwargs)
+
+
+def read_quant_spec_from_snapshot_v08(path: str) -> Optional[QuantSpecV08]:
+    """
+    Return the snapshot's quantization descriptor, or None if it is not quantized.
+    """
+    q = read_snapshot_header_v08(path).meta.get(QUANT_META_KEY)
+    return QuantSpecV08.from_dict(q) if q else None
+
+
+def read_roi_dequantized_from_snapshot_v08(
+    path: str,
+    x: int, y: int, z: int,
+    w: int, h: int, d: int,
+    channels: Optional[List[int]] = None,
+    dtype: Optional[str] = None,
+) -> "np.ndarray":
+    """
+    Read an ROI from a quantized snapshot and return it as float; only the
+    ROI's codes are read and expanded.
+    """
+    quant = read_quant_spec_from_snapshot_v08(path)
+    if quant is None:
+        raise ValueError(f"Snapshot {path!r} has no {QUANT_META_KEY!r} descriptor")
+    codes = read_roi_from_snapshot_v08(path, x, y, z, w, h, d, channels=channels)
+    return dequantize_array_v08(codes, quant, channels=channels, dtype=dtype)
+
+
+# ---------------------------------------------------------------------------
+# Tile packs
+# ---------------------------------------------------------------------------
+
+
+def write_quantized_tile_pack_v08(
+    out_dir: str,
+    volume_buf: bytes,
+    spec: VolumeSpecV06,
+    quant: QuantSpecV08,
+    tile_size: Tuple[int, int, int],
+    **kwargs: Any,
+) -> str:
+    """
+    Quantize a float volume and write it as a v0.8 tile pack; the descriptor
+    goes to manifest["meta"]["quantization"]. Extra kwargs go to
+    write_tile_pack_v08().
+    """
+    codes, stored = quantize_volume_v08(volume_buf, spec, quant)
+    tiling, tiles = tile_volume_buffer_v08(codes, stored, tile_size)
+    meta = dict(kwargs.pop("meta", None) or {})
+    meta[QUANT_META_KEY] = quant.to_dict()
+    return write_tile_pack_v08(out_dir, tiling, tiles, stored, meta=meta, **kwargs)
+
+
+def read_roi_dequantized_from_tile_pack_v08(
+    out_dir: str,
+    roi: RoiV06,
+    channels: Optional[List[int]] = None,
+    dtype: Optional[str] = None,
+) -> "np.ndarray":
+    """
+    Read an ROI from a quantized tile pack and return it as float.
+    """
+    _, _, manifest = load_tile_pack_manifest_v08(out_dir)
+    q = manifest.get("meta", {}).get(QUANT_META_KEY)
+    if not q:
+        raise ValueError(f"Tile pack {out_dir!r} has no {QUANT_META_KEY!r} descriptor")
+    quant = QuantSpecV08.from_dict(q)
+    codes = read_roi_from_tile_pack_v08(out_dir, roi, channels=channels)
+    return dequantize_array_v08(codes, quant, channels=channels, dtype=dtype)
@@ -0,0 +1,598 @@
+"""
+roi_server_v08.py — CIVD v0.8 local ROI server and client (asyncio).
+
+Robot processes that each open the same tile pack keep separate, cold
+tile caches. RoiServerV08 opens v0.8 snapshots and tile packs once and
+answers ROI and point queries for any number of local clients over a Unix
+socket or localhost TCP, from one shared tile cache:
+
+    server = RoiServerV08({"map": "pack_dir", "scan": "scan.civd"})
+    await server.start("/tmp/civd.sock")            # or ("127.0.0.1", 0)
+
+    async with await open_roi_client_v08("/tmp/civd.sock", pool_size=4) as client:
+        block = await client.read_roi("map", RoiV06(0, 0, 0, 64, 64, 16), channels=[0])
+        values = await client.read_points("map", [[3, 4, 5], [10, 0, 2]])
+
+Concurrent requests that need the same tile share one load (the load runs
+on the default executor; later requests await the in-flight future), and
+loaded tiles stay in an LRU cache of 'cache_tiles' payloads. Dense
+snapshots are served from a memory mapping, so the page cache is their
+tile cache.
+
+Protocol
+--------
+Every message is a frame: u32 body length followed by the body
+(little-endian). Requests carry an id; responses echo it and may arrive
+out of order, so a client can pipeline many requests on one connection.
+
+Request body:
+
+    u64 request_id, u8 op, u8 reserved, u16 n_channels,
+    n_channels * u16 channel indices (0 = all channels),
+    u16 source name length, source name (UTF-8),
+    op payload:
+        OP_INFO    (1)  -
+        OP_ROI     (2)  6 * i32 x, y, z, w, h, d
+        OP_POINTS  (3)  u32 n, n * 3 * i32 (x, y, z)
+
+Response body:
+
+    u64 request_id, u8 status (0 = ok, 1 = error), then
+        error       UTF-8 message
+        OP_INFO     UTF-8 JSON (dims, channels, dtype, order, signature, kind)
+        OP_ROI      array: u8 ndim, ndim * u32 shape, u8 dtype code
+        OP_POINTS   (tile_header_v08 DTYPE_CODE), C-order values;
+                    (d, h, w, C_sel) for ROIs, (n, C_sel) for points
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import itertools
+import json
+import mmap
+import os
+import struct
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, RoiV06, read_region_from_bytes, read_regions
+from .snapshot_v08 import _parse_brick_table_v08, _parse_snapshot_header_v08
+from .tile_header_v08 import DTYPE_CODE, DTYPE_NAME
+from .tile_manifest_v07 import TileIndexV07
+from .tile_pack_v07 import query_tiles_for_roi
+from .tile_pack_v08 import (
+    TilingSpecV08,
+    _tile_array,
+    assemble_roi_from_tiles_v08,
+    open_tile_loader_v08,
+)
+
+OP_INFO = 1
+OP_ROI = 2
+OP_POINTS = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+_FRAME = struct.Struct("<I")
+_REQ_HEAD = struct.Struct("<Q B x H")
+_RESP_HEAD = struct.Struct("<Q B")
+_ROI = struct.Struct("<6i")
+
+Address = Union[str, Tuple[str, int]]
+
+
+# ---------------------------------------------------------------------------
+# Wire helpers
+# ---------------------------------------------------------------------------
+
+
+def _encode_request(request_id: int, op: int, source: str, channels: Optional[Sequence[int]], payload: bytes = b"") -> bytes:
+    channels = list(channels or [])
+    name = source.encode("utf-8")
+    body = b"".join(
+        [
+            _REQ_HEAD.pack(request_id, op, len(channels)),
+            struct.pack(f"<{len(channels)}H", *channels),
+            struct.pack("<H", len(name)),
+            name,
+            payload,
+        ]
+    )
+    return _FRAME.pack(len(body)) + body
+
+
+def _decode_request(body: bytes) -> Tuple[int, int, str, Optional[List[int]], memoryview]:
+    request_id, op, n_channels = _REQ_HEAD.unpack_from(body, 0)
+    off = _REQ_HEAD.size
+    channels = list(struct.unpack_from(f"<{n_channels}H", body, off)) or None
+    off += 2 * n_channels
+    (n,) = struct.unpack_from("<H", body, off)
+    off += 2
+    source = bytes(body[off : off + n]).decode("utf-8")
+    return request_id, op, source, channels, memoryview(body)[off + n :]
+
+
+def _array_parts(arr: "np.ndarray") -> List[bytes]:
+    arr = np.ascontiguousarray(arr)
+    code = DTYPE_CODE.get(arr.dtype.name)
+    if code is None:
+        raise ValueError(f"Unsupported dtype {arr.dtype.name!r}")
+    head = struct.pack(f"<B{arr.ndim}IB", arr.ndim, *arr.shape, code)
+    return [head, memoryview(arr).cast("B")]
+
+
+def _array_from_bytes(data: memoryview) -> "np.ndarray":
+    (ndim,) = struct.unpack_from("<B", data, 0)
+    *shape, code = struct.unpack_from(f"<{ndim}IB", data, 1)
+    off = 1 + 4 * ndim + 1
+    return np.frombuffer(data, dtype=np.dtype(DTYPE_NAME[code]), offset=off).reshape(shape)
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+    try:
+        head = await reader.readexactly(_FRAME.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise
+        return None
+    (n,) = _FRAME.unpack(head)
+    return await reader.readexactly(n)
+
+
+# ---------------------------------------------------------------------------
+# Tile cache with request coalescing
+# ---------------------------------------------------------------------------
+
+
+class AsyncTileCacheV08:
+    """
+    LRU cache of tile payloads for asyncio code.
+
+    Loads run on the event loop's default executor. A tile requested again
+    while its load is in flight is not loaded twice: the later request
+    awaits the same future ('coalesced' in stats()).
+    """
+
+    def __init__(self, load_tile: Callable[[TileIndexV07], Any], capacity: int = 1024) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._load = load_tile
+        self.capacity = capacity
+        self._tiles: "OrderedDict[TileIndexV07, Any]" = OrderedDict()
+        self._inflight: Dict[TileIndexV07, "asyncio.Future"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get(self, idx: TileIndexV07):
+        payload = self._tiles.get(idx)
+        if payload is not None:
+            self._tiles.move_to_end(idx)
+            self.hits += 1
+            return payload
+        fut = self._inflight.get(idx)
+        if fut is not None:
+            self.coalesced += 1
+            return await asyncio.shield(fut)
+
+        self.misses += 1
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(None, self._load, idx)
+        self._inflight[idx] = fut
+        try:
+            payload = await asyncio.shield(fut)
+        finally:
+            del self._inflight[idx]
+        self._tiles[idx] = payload
+        while len(self._tiles) > self.capacity:
+            self._tiles.popitem(last=False)
+        return payload
+
+    async def get_many(self, tiles: Iterable[TileIndexV07]) -> Dict[TileIndexV07, Any]:
+        tiles = list(tiles)
+        payloads = await asyncio.gather(*(self.get(idx) for idx in tiles))
+        return dict(zip(tiles, payloads))
+
+    def stats(self) -> Dict[str, int]:
+        return {"tiles": len(self._tiles), "hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+# ---------------------------------------------------------------------------
+# Served sources
+# ---------------------------------------------------------------------------
+
+
+def _check_roi(roi: RoiV06, dims: Tuple[int, int, int]) -> None:
+    for axis, start, size, dim in zip("xyz", (roi.x, roi.y, roi.z), (roi.w, roi.h, roi.d), dims):
+        if size <= 0 or not (0 <= start and start + size <= dim):
+            raise ValueError(f"ROI {axis}-range [{start}, {start + size}) is out of bounds [0, {dim})")
+
+
+def _check_points(pts: "np.ndarray", dims: Tuple[int, int, int]) -> None:
+    bad = np.nonzero(np.any((pts < 0) | (pts >= np.asarray(dims)), axis=1))[0]
+    if len(bad):
+        raise ValueError(f"Point {tuple(int(v) for v in pts[bad[0]])} is outside dims={tuple(dims)}")
+
+
+def _check_channels(channels: Optional[List[int]], spec: VolumeSpecV06) -> None:
+    for c in channels or []:
+        if c >= spec.channels:
+            raise ValueError(f"Requested channel index {c} is out of range [0, {spec.channels})")
+
+
+class _DenseSnapshotSource:
+    kind = "snapshot"
+
+    def __init__(self, f, mm: mmap.mmap, spec: VolumeSpecV06, header_len: int) -> None:
+        self._file, self._mm, self.spec = f, mm, spec
+        self._payload = memoryview(mm)[header_len:]
+
+    async def read_roi(self, roi: RoiV06, channels: Optional[List[int]]) -> "np.ndarray":
+        _check_roi(roi, self.spec.dims)
+        return read_region_from_bytes(
+            self._payload, self.spec, roi.x, roi.y, roi.z, roi.w, roi.h, roi.d, channels=channels, copy=True
+        )
+
+    async def read_points(self, pts: "np.ndarray", channels: Optional[List[int]]) -> "np.ndarray":
+        _check_points(pts, self.spec.dims)
+        return read_regions(self._payload, self.spec, pts, (1, 1, 1), channels=channels).reshape(len(pts), -1)
+
+    def close(self) -> None:
+        self._payload.release()
+        self._mm.close()
+        self._file.close()
+
+
+class _TiledSource:
+    """
+    Tile pack or bricked snapshot: every read goes through the shared
+    AsyncTileCacheV08.
+    """
+
+    def __init__(self, kind: str, tiling: TilingSpecV08, spec: VolumeSpecV06, load_tile, capacity: int,
+                 close: Callable[[], None]) -> None:
+        self.kind = kind
+        self.tiling = tiling
+        self.spec = spec
+        self.cache = AsyncTileCacheV08(load_tile, capacity=capacity)
+        self._close = close
+
+    async def read_roi(self, roi: RoiV06, channels: Optional[List[int]]) -> "np.ndarray":
+        _check_roi(roi, self.spec.dims)
+        payloads = await self.cache.get_many(query_tiles_for_roi(self.tiling, roi))
+        return assemble_roi_from_tiles_v08(self.tiling, self.spec, roi, payloads.__getitem__, channels=channels)
+
+    async def read_points(self, pts: "np.ndarray", channels: Optional[List[int]]) -> "np.ndarray":
+        _check_points(pts, self.spec.dims)
+        size = np.asarray(self.tiling.tile_size, dtype=np.int64)
+        t = pts // size
+        uniq, inverse = np.unique(t, axis=0, return_inverse=True)
+        tiles = [TileIndexV07(tx=int(a), ty=int(b), tz=int(c)) for a, b, c in uniq]
+        payloads = await self.cache.get_many(tiles)
+
+        ch = slice(None) if channels is None else list(channels)
+        n_ch = self.spec.channels if channels is None else len(channels)
+        out = np.empty((len(pts), n_ch), dtype=np.dtype(self.spec.dtype))
+        inverse = inverse.ravel()
+        for i, idx in enumerate(tiles):
+            rows = np.nonzero(inverse == i)[0]
+            local = pts[rows] - t[rows] * size
+            tile = _tile_array(self.tiling, idx, self.spec, payloads[idx])
+            out[rows] = tile[local[:, 2], local[:, 1], local[:, 0]][:, ch]
+        return out
+
+    def close(self) -> None:
+        self._close()
+
+
+def _open_source(path: str, cache_tiles: int):
+    if os.path.isdir(path):
+        tiling, spec, load_tile, close = open_tile_loader_v08(path)
+        return _TiledSource("tile_pack", tiling, spec, load_tile, cache_tiles, close)
+
+    f = open(path, "rb")
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header, spec, header_len = _parse_snapshot_header_v08(mm)
+    if header.layout != "BRICKED":
+        return _DenseSnapshotSource(f, mm, spec, header_len)
+
+    tiling, offsets = _parse_brick_table_v08(mm, header, header_len)
+    nx, ny, _ = tiling.tiles_per_axis
+
+    def _load(idx: TileIndexV07):
+        i = (idx.tz * ny + idx.ty) * nx + idx.tx
+        return bytes(mm[int(offsets[i]) : int(offsets[i + 1])])
+
+    def _close() -> None:
+        mm.close()
+        f.close()
+
+    return _TiledSource("bricked_snapshot", tiling, spec, _load, cache_tiles, _close)
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+
+class RoiServerV08:
+    """
+    asyncio server answering ROI / point queries for named sources.
+
+    sources:
+        Mapping of source name -> v0.8 snapshot file or tile pack folder.
+        Every source is opened once, when the server is constructed.
+    cache_tiles:
+        LRU capacity (in tiles) of each tiled source's cache.
+    """
+
+    def __init__(self, sources: Dict[str, str], cache_tiles: int = 1024) -> None:
+        self._sources: Dict[str, Any] = {}
+        try:
+            for name, path in sources.items():
+                self._sources[name] = _open_source(path, cache_tiles)
+        except BaseException:
+            self._close_sources()
+            raise
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.address: Optional[Address] = None
+        self.requests = 0
+
+    # -- lifecycle ----------------------------------------------------------
+
+    async def start(self, address: Address) -> Address:
+        """
+        Listen on a Unix socket path or a (host, port) TCP address and
+        return the bound address (port 0 picks a free port).
+        """
+        if self._server is not None:
+            raise RuntimeError("RoiServerV08 is already listening; stop() it first")
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+            self._server = await asyncio.start_unix_server(self._handle, path=address)
+            self.address = address
+        else:
+            host, port = address
+            self._server = await asyncio.start_server(self._handle, host=host, port=port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+        return self.address
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    def _close_sources(self) -> None:
+        for source in self._sources.values():
+            source.close()
+        self._sources = {}
+
+    async def stop(self) -> None:
+        """
+        Stop listening; the sources stay open, so start() can be called again.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    async def close(self) -> None:
+        await self.stop()
+        self._close_sources()
+
+    async def __aenter__(self) -> "RoiServerV08":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "caches": {name: s.cache.stats() for name, s in self._sources.items() if isinstance(s, _TiledSource)},
+        }
+
+    # -- requests -----------------------------------------------------------
+
+    async def _answer(self, op: int, source_name: str, channels: Optional[List[int]], payload: memoryview) -> List[bytes]:
+        source = self._sources.get(source_name)
+        if source is None:
+            raise KeyError(f"Unknown source {source_name!r}")
+        _check_channels(channels, source.spec)
+        if op == OP_INFO:
+            spec = source.spec
+            doc = {
+                "dims": list(spec.dims),
+                "channels": spec.channels,
+                "dtype": spec.dtype,
+                "order": spec.order,
+                "signature": spec.signature,
+                "kind": source.kind,
+            }
+            return [json.dumps(doc).encode("utf-8")]
+        if op == OP_ROI:
+            roi = RoiV06(*_ROI.unpack_from(payload, 0))
+            return _array_parts(await source.read_roi(roi, channels))
+        if op == OP_POINTS:
+            (n,) = struct.unpack_from("<I", payload, 0)
+            pts = np.frombuffer(payload, dtype="<i4", count=3 * n, offset=4).reshape(n, 3).astype(np.int64)
+            return _array_parts(await source.read_points(pts, channels))
+        raise ValueError(f"Unknown op {op}")
+
+    async def _respond(self, body: bytes, writer: asyncio.StreamWriter) -> None:
+        request_id = 0
+        try:
+            request_id, op, source_name, channels, payload = _decode_request(body)
+            status, parts = STATUS_OK, await self._answer(op, source_name, channels, payload)
+        except Exception as exc:
+            status, parts = STATUS_ERROR, [f"{type(exc).__name__}: {exc}".encode("utf-8")]
+        head = _RESP_HEAD.pack(request_id, status)
+        writer.writelines([_FRAME.pack(len(head) + sum(len(p) for p in parts)), head] + parts)
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks = set()
+        try:
+            while True:
+                body = await _read_frame(reader)
+                if body is None:
+                    break
+                self.requests += 1
+                task = asyncio.create_task(self._respond(body, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+
+async def serve_roi_v08(sources: Dict[str, str], address: Address, **kwargs) -> None:
+    """
+    Run an RoiServerV08 for 'sources' on 'address' until cancelled.
+    """
+    async with RoiServerV08(sources, **kwargs) as server:
+        await server.start(address)
+        await server.serve_forever()
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+class RoiServerError(RuntimeError):
+    """
+    Error reported by the server for one request.
+    """
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[int, "asyncio.Future"] = {}
+        self.task = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        error: BaseException = ConnectionError("ROI server closed the connection")
+        try:
+            while True:
+                body = await _read_frame(self.reader)
+                if body is None:
+                    break
+                request_id, status = _RESP_HEAD.unpack_from(body, 0)
+                fut = self.pending.pop(request_id, None)
+                if fut is None or fut.done():
+                    continue
+                data = memoryview(body)[_RESP_HEAD.size :]
+                if status == STATUS_OK:
+                    fut.set_result(data)
+                else:
+                    fut.set_exception(RoiServerError(bytes(data).decode("utf-8")))
+        except Exception as exc:
+            error = exc
+        finally:
+            for fut in self.pending.values():
+                if not fut.done():
+                    fut.set_exception(error)
+            self.pending.clear()
+
+    async def close(self) -> None:
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+
+class RoiClientV08:
+    """
+    Client for RoiServerV08 with a pool of 'pool_size' connections.
+
+    Every call sends one request on the connection with the fewest
+    outstanding requests and does not wait for earlier responses, so
+    concurrent calls (e.g. asyncio.gather) are pipelined. Use
+    open_roi_client_v08() or 'await client.connect()' before calling.
+    """
+
+    def __init__(self, address: Address, pool_size: int = 2) -> None:
+        if pool_size <= 0:
+            raise ValueError("pool_size must be positive")
+        self.address = address
+        self.pool_size = pool_size
+        self._pool: List[_Connection] = []
+        self._ids = itertools.count(1)
+
+    async def connect(self) -> "RoiClientV08":
+        for _ in range(self.pool_size - len(self._pool)):
+            if isinstance(self.address, str):
+                reader, writer = await asyncio.open_unix_connection(self.address)
+            else:
+                reader, writer = await asyncio.open_connection(*self.address)
+            self._pool.append(_Connection(reader, writer))
+        return self
+
+    async def close(self) -> None:
+        pool, self._pool = self._pool, []
+        for conn in pool:
+            await conn.close()
+
+    async def __aenter__(self) -> "RoiClientV08":
+        return await self.connect()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _request(self, op: int, source: str, channels: Optional[Sequence[int]], payload: bytes = b"") -> memoryview:
+        if not self._pool:
+            raise RuntimeError("RoiClientV08 is not connected")
+        conn = min(self._pool, key=lambda c: len(c.pending))
+        if conn.task.done():
+            raise ConnectionError("ROI server connection is closed")
+        request_id = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        conn.pending[request_id] = fut
+        conn.writer.write(_encode_request(request_id, op, source, channels, payload))
+        await conn.writer.drain()
+        return await fut
+
+    async def info(self, source: str) -> Dict[str, Any]:
+        return json.loads(bytes(await self._request(OP_INFO, source, None)))
+
+    async def read_roi(self, source: str, roi: RoiV06, channels: Optional[Sequence[int]] = None) -> "np.ndarray":
+        """
+        (d, h, w, C_sel) ROI of 'source'; the ROI must lie inside the volume.
+        The array is a read-only view of the response buffer.
+        """
+        data = await self._request(OP_ROI, source, channels, _ROI.pack(roi.x, roi.y, roi.z, roi.w, roi.h, roi.d))
+        return _array_from_bytes(data)
+
+    async def read_points(self, source: str, points, channels: Optional[Sequence[int]] = None) -> "np.ndarray":
+        """
+        (n, C_sel) values at (n, 3) (x, y, z) voxel points of 'source'.
+        """
+        pts = np.ascontiguousarray(np.asarray(points).reshape(-1, 3), dtype="<i4")
+        data = await self._request(OP_POINTS, source, channels, struct.pack("<I", len(pts)) + pts.tobytes())
+        return _array_from_bytes(data)
+
+
+async def open_roi_client_v08(address: Address, pool_size: int = 2) -> RoiClientV08:
+    """
+    Connect a RoiClientV08 pool to a running RoiServerV08.
+    """
+    return await RoiClientV08(address, pool_size=pool_size).connect()
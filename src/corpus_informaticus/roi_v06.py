@@ -14,7 +14,7 @@ This is the foundation for:
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import List, Optional, Tuple
 
 try:
@@ -40,15 +40,19 @@ class VolumeSpecV06:
     channels:
         Number of channels per voxel (e.g. 4 for RGBA or multi-sensor).
     dtype:
-        Name of the NumPy dtype (e.g. 'uint8', 'float32').
+        Name of the NumPy dtype. v0.8 headers can record 'uint8',
+        'uint16', 'float32', 'float16', 'int16', 'int32' and 'float64'.
     order:
         Memory order: 'C' (row-major) or 'F' (column-major).
     signature:
-        Logical layout / encoding. For v0.6 we support:
+        Logical layout / encoding. Supported:
           - 'C_CONTIG'  : standard dense C-contiguous tensor
           - 'F_CONTIG'  : dense F-contiguous tensor
-        Future:
-          - 'MORTON'    : Morton / Z-order (not yet implemented here).
+          - 'MORTON'    : voxels in compact Morton / Z-order, channels
+                          interleaved per voxel (see morton_v08).
+          - 'PLANAR'    : channel-planar (C, z, y, x): one contiguous
+                          (z, y, x) plane per channel, each in 'order'.
+                          Channel-subset reads touch only those planes.
     """
 
     dims: Tuple[int, int, int]
@@ -72,16 +76,34 @@ class VolumeSpecV06:
 # ---------------------------------------------------------------------------
 
 
+def _byte_view(buf) -> memoryview:
+    """
+    Flat unsigned-byte view over any C-contiguous buffer (bytes, bytearray,
+    memoryview, mmap, NumPy array) without copying; len() is its size in bytes.
+    """
+    mv = buf if isinstance(buf, memoryview) else memoryview(buf)
+    if mv.ndim == 1 and mv.format == "B":
+        return mv
+    if not mv.c_contiguous:
+        raise ValueError("Volume buffers must be C-contiguous; use np.ascontiguousarray() first")
+    return mv.cast("B")
+
+
 def _volume_view_from_bytes(buf: bytes, spec: VolumeSpecV06) -> "np.ndarray":
     """
     Interpret a raw bytes buffer as a 4D volume view:
 
         shape = (z, y, x, channels)
 
-    No copies are made; this returns a NumPy view over 'buf'.
+    No copies are made; this returns a NumPy view over 'buf' (for 'PLANAR'
+    a strided view whose channel axis steps between planes). The one
+    exception is the 'MORTON' signature, which is decoded into a new
+    C-contiguous array.
 
-    Raises ValueError if the buffer size does not match the spec.
+    'buf' may be any C-contiguous buffer (see _byte_view). Raises
+    ValueError if the buffer size does not match the spec.
     """
+    buf = _byte_view(buf)
     expected = spec.expected_nbytes()
     if len(buf) != expected:
         raise ValueError(
@@ -91,10 +113,15 @@ def _volume_view_from_bytes(buf: bytes, spec: VolumeSpecV06) -> "np.ndarray":
 
     dtype = np.dtype(spec.dtype)
 
-    if spec.signature not in ("C_CONTIG", "F_CONTIG"):
+    if spec.signature == "MORTON":
+        from .morton_v08 import morton_to_array
+
+        return morton_to_array(buf, spec)
+
+    if spec.signature not in ("C_CONTIG", "F_CONTIG", "PLANAR"):
         raise NotImplementedError(
             f"Volume signature '{spec.signature}' is not implemented yet. "
-            "Supported: 'C_CONTIG', 'F_CONTIG'."
+            "Supported: 'C_CONTIG', 'F_CONTIG', 'MORTON', 'PLANAR'."
         )
 
     # For v0.6 we standardize on internal view shape:
@@ -113,10 +140,44 @@ def _volume_view_from_bytes(buf: bytes, spec: VolumeSpecV06) -> "np.ndarray":
     if spec.order not in ("C", "F"):
         raise ValueError(f"Unsupported order: {spec.order!r}. Use 'C' or 'F'.")
 
+    if spec.signature == "PLANAR" and spec.order == "C":
+        # (C, z, y, x) planes, exposed as a (z, y, x, C) view.
+        return np.moveaxis(arr.reshape((spec.channels, z, y, x)), 0, -1)
+
+    # F-ordered (z, y, x, C) already keeps each channel as one contiguous
+    # F-ordered plane, which is exactly the 'PLANAR' + order 'F' layout.
     vol = arr.reshape((z, y, x, spec.channels), order=spec.order)
     return vol
 
 
+def _layout_strides(spec: VolumeSpecV06) -> Tuple[int, int, int, int]:
+    """
+    Element strides (z, y, x, C) of the view _volume_view_from_bytes()
+    returns, derived from the spec alone (no buffer needed). Not defined
+    for 'MORTON'.
+    """
+    x, y, z = spec.dims
+    if spec.signature == "PLANAR" and spec.order == "C":
+        return (y * x, x, 1, z * y * x)
+    if spec.order == "F":
+        return (1, z, z * y, z * y * x)
+    return (y * x * spec.channels, x * spec.channels, spec.channels, 1)
+
+
+def _volume_to_bytes(vol: "np.ndarray", spec: VolumeSpecV06) -> bytes:
+    """
+    Serialize a (z, y, x, C) array in the layout of 'spec' (inverse of
+    _volume_view_from_bytes; only signature, order and dtype are used).
+    """
+    if spec.signature == "MORTON":
+        from .morton_v08 import array_to_morton
+
+        return array_to_morton(vol)
+    if spec.signature == "PLANAR" and spec.order == "C":
+        return np.ascontiguousarray(np.moveaxis(vol, -1, 0)).tobytes()
+    return vol.tobytes(order=spec.order)
+
+
 def read_region_from_bytes(
     buf: bytes,
     spec: VolumeSpecV06,
@@ -128,6 +189,7 @@ def read_region_from_bytes(
     d: int,
     channels: Optional[List[int]] = None,
     copy: bool = True,
+    dtype: Optional[str] = None,
 ) -> "np.ndarray":
     """
     Extract a 3D region-of-interest (ROI) from a dense CIVD volume buffer.
@@ -135,7 +197,9 @@ def read_region_from_bytes(
     Parameters
     ----------
     buf:
-        Raw bytes containing the volume in the layout described by 'spec'.
+        The volume in the layout described by 'spec': bytes or any other
+        C-contiguous buffer (bytearray, memoryview, mmap, NumPy array),
+        used in place without a copy.
     spec:
         VolumeSpecV06 describing dims, channels, dtype, order, signature.
     x, y, z:
@@ -148,6 +212,12 @@ def read_region_from_bytes(
     copy:
         If True, returns a copy of the data. If False, returns a view
         over the underlying NumPy array. For safety, the default is True.
+        MORTON volumes, and PLANAR volumes with a channel subset, always
+        return a new array.
+    dtype:
+        Optional output dtype name. If it differs from spec.dtype the ROI
+        is converted (NumPy 'unsafe' casting, like ndarray.astype) in the
+        same pass that copies it out.
 
     Returns
     -------
@@ -155,6 +225,15 @@ def read_region_from_bytes(
         A 4D tensor of shape (d, h, w, C_sel) where C_sel is either
         'spec.channels' or len(channels) if subset selection is used.
     """
+    out_dtype = np.dtype(spec.dtype if dtype is None else dtype)
+    buf = _byte_view(buf)
+
+    if spec.signature == "MORTON":
+        from .morton_v08 import read_region_morton
+
+        roi = read_region_morton(buf, spec, x, y, z, w, h, d, channels=channels)
+        return roi if roi.dtype == out_dtype else roi.astype(out_dtype)
+
     vol = _volume_view_from_bytes(buf, spec)
 
     x0, y0, z0 = x, y, z
@@ -172,6 +251,18 @@ def read_region_from_bytes(
     # vol shape: (z, y, x, C)
     roi = vol[z0:z1, y0:y1, x0:x1, :]
 
+    if channels is not None and spec.signature == "PLANAR":
+        for c in channels:
+            if c < 0 or c >= spec.channels:
+                raise ValueError(
+                    f"Requested channel index {c} is out of range [0, {spec.channels})"
+                )
+        # Copy plane by plane so only the requested planes are touched.
+        out = np.empty((d, h, w, len(channels)), dtype=out_dtype)
+        for i, c in enumerate(channels):
+            out[..., i] = roi[..., c]
+        return out
+
     if channels is not None:
         # Basic validation of requested channel indices.
         for c in channels:
@@ -181,12 +272,223 @@ def read_region_from_bytes(
                 )
         roi = roi[..., channels]
 
-    if copy:
+    if roi.dtype != out_dtype:
+        roi = roi.astype(out_dtype)
+    elif copy:
         roi = roi.copy()
 
     return roi
 
 
+def _prepare_region_data(
+    data: "np.ndarray",
+    spec: VolumeSpecV06,
+    x: int,
+    y: int,
+    z: int,
+    channels: Optional[List[int]] = None,
+) -> "np.ndarray":
+    """
+    Validate a (d, h, w, C_sel) region array against 'spec' and its origin.
+
+    The array is cast to spec.dtype only if that cast is lossless ('safe').
+    """
+    data = np.asarray(data)
+    if data.ndim != 4:
+        raise ValueError(f"Region data must be 4D (d, h, w, C), got shape {data.shape}")
+
+    target = np.dtype(spec.dtype)
+    if data.dtype != target:
+        if not np.can_cast(data.dtype, target, casting="safe"):
+            raise ValueError(f"Cannot safely cast region data {data.dtype} to {target}")
+        data = data.astype(target)
+
+    d, h, w, c = data.shape
+    n_ch = spec.channels if channels is None else len(channels)
+    if c != n_ch:
+        raise ValueError(f"Region data has {c} channels, expected {n_ch}")
+    if channels is not None:
+        for ch in channels:
+            if ch < 0 or ch >= spec.channels:
+                raise ValueError(
+                    f"Requested channel index {ch} is out of range [0, {spec.channels})"
+                )
+
+    x_max, y_max, z_max = spec.dims
+    if not (0 <= x < x + w <= x_max):
+        raise ValueError(f"ROI x-range [{x}, {x + w}) is out of bounds [0, {x_max})")
+    if not (0 <= y < y + h <= y_max):
+        raise ValueError(f"ROI y-range [{y}, {y + h}) is out of bounds [0, {y_max})")
+    if not (0 <= z < z + d <= z_max):
+        raise ValueError(f"ROI z-range [{z}, {z + d}) is out of bounds [0, {z_max})")
+
+    return data
+
+
+def write_region_to_bytes(
+    buf,
+    spec: VolumeSpecV06,
+    x: int,
+    y: int,
+    z: int,
+    data: "np.ndarray",
+    channels: Optional[List[int]] = None,
+) -> None:
+    """
+    Write a (d, h, w, C_sel) region into a dense volume buffer, in place.
+
+    This is the write counterpart of read_region_from_bytes(). 'buf' must be
+    writable (bytearray, writable memoryview, mmap opened for writing).
+    Only the bytes covered by the region are modified.
+    """
+    data = _prepare_region_data(data, spec, x, y, z, channels)
+    buf = _byte_view(buf)
+    if buf.readonly:
+        raise TypeError("write_region_to_bytes() needs a writable buffer")
+
+    if spec.signature == "MORTON":
+        from .morton_v08 import write_region_morton
+
+        write_region_morton(buf, spec, x, y, z, data, channels=channels)
+        return
+
+    vol = _volume_view_from_bytes(buf, spec)
+    d, h, w, _ = data.shape
+    ch = slice(None) if channels is None else list(channels)
+    vol[z : z + d, y : y + h, x : x + w, ch] = data
+
+
+def convert_volume_layout(
+    buf: bytes,
+    spec: VolumeSpecV06,
+    signature: str,
+    order: str = "C",
+    dtype: Optional[str] = None,
+) -> Tuple[bytes, VolumeSpecV06]:
+    """
+    Re-lay a dense volume payload in another signature/order, e.g.
+    interleaved 'C_CONTIG' -> channel-planar 'PLANAR'. If 'dtype' is given
+    the values are converted too (e.g. float32 depth -> float16).
+
+    Returns (new_bytes, new_spec).
+    """
+    if signature not in ("C_CONTIG", "F_CONTIG", "MORTON", "PLANAR"):
+        raise NotImplementedError(f"Volume signature '{signature}' is not implemented yet.")
+    if order not in ("C", "F"):
+        raise ValueError(f"Unsupported order: {order!r}. Use 'C' or 'F'.")
+    new_spec = replace(spec, signature=signature, order=order, dtype=spec.dtype if dtype is None else str(np.dtype(dtype)))
+    vol = _volume_view_from_bytes(buf, spec)
+    if vol.dtype != np.dtype(new_spec.dtype):
+        vol = vol.astype(new_spec.dtype)
+    return _volume_to_bytes(vol, new_spec), new_spec
+
+
+# ---------------------------------------------------------------------------
+# Batched ROI reads
+# ---------------------------------------------------------------------------
+
+# Patches with at most this many voxels are gathered with one np.take over
+# precomputed element offsets; larger patches are copied one slice at a
+# time, where per-patch Python overhead no longer dominates.
+READ_REGIONS_GATHER_MAX_VOXELS = 64
+
+
+def read_regions(
+    buf,
+    spec: VolumeSpecV06,
+    origins,
+    size: Tuple[int, int, int],
+    channels: Optional[List[int]] = None,
+    dtype: Optional[str] = None,
+    out: Optional["np.ndarray"] = None,
+    strategy: str = "auto",
+) -> "np.ndarray":
+    """
+    Read N equally sized ROIs in one call and return them stacked as
+    (N, d, h, w, C_sel).
+
+    origins:
+        (N, 3) integer array of (x, y, z) ROI origins.
+    size:
+        (w, h, d) ROI size shared by all patches.
+    out:
+        Optional preallocated (N, d, h, w, C_sel) array to fill (and return).
+    strategy:
+        "gather" computes the element offset of every requested value from
+        the layout strides and copies all patches with one np.take; "loop"
+        copies patch by patch; "auto" (default) picks "gather" for patches
+        of at most READ_REGIONS_GATHER_MAX_VOXELS voxels.
+
+    Bounds are checked for all origins at once. 'buf' may be any
+    C-contiguous buffer; 'MORTON' volumes are always gathered by rank.
+    """
+    buf = _byte_view(buf)
+    origins = np.asarray(origins, dtype=np.int64).reshape(-1, 3)
+    w, h, d = (int(v) for v in size)
+    if min(w, h, d) <= 0:
+        raise ValueError(f"ROI size must be positive, got {tuple(size)}")
+    if strategy not in ("auto", "gather", "loop"):
+        raise ValueError(f"Unknown strategy {strategy!r}; use 'auto', 'gather' or 'loop'")
+
+    bad = np.nonzero(np.any((origins < 0) | (origins + np.array([w, h, d]) > np.asarray(spec.dims)), axis=1))[0]
+    if len(bad):
+        i = int(bad[0])
+        raise ValueError(
+            f"{len(bad)} ROI(s) out of bounds for dims={spec.dims}, first: origin "
+            f"{tuple(int(v) for v in origins[i])} size {(w, h, d)} (index {i})"
+        )
+    if channels is not None:
+        for c in channels:
+            if c < 0 or c >= spec.channels:
+                raise ValueError(
+                    f"Requested channel index {c} is out of range [0, {spec.channels})"
+                )
+
+    n_ch = spec.channels if channels is None else len(channels)
+    shape = (len(origins), d, h, w, n_ch)
+    out_dtype = np.dtype(spec.dtype if dtype is None else dtype)
+    if out is None:
+        out = np.empty(shape, dtype=out_dtype)
+    elif out.shape != shape:
+        raise ValueError(f"'out' has shape {out.shape}, expected {shape}")
+    if not len(origins):
+        return out
+
+    ch = slice(None) if channels is None else np.asarray(channels, dtype=np.intp)
+    dz, dy, dx = np.meshgrid(np.arange(d), np.arange(h), np.arange(w), indexing="ij")
+    ox, oy, oz = (origins[:, i, None, None, None] for i in range(3))
+
+    if spec.signature == "MORTON":
+        from .morton_v08 import morton_rank
+
+        flat = np.frombuffer(buf, dtype=np.dtype(spec.dtype)).reshape(-1, spec.channels)
+        pos = morton_rank(spec.dims, ox + dx, oy + dy, oz + dz)
+        out[...] = flat[pos][..., ch]
+        return out
+
+    vol = _volume_view_from_bytes(buf, spec)
+    if strategy == "loop" or (strategy == "auto" and w * h * d > READ_REGIONS_GATHER_MAX_VOXELS):
+        for i, (x, y, z) in enumerate(origins.tolist()):
+            out[i] = vol[z : z + d, y : y + h, x : x + w, ch]
+        return out
+
+    # Every non-Morton view starts at byte 0 of 'buf', so element offsets
+    # follow directly from the view strides.
+    flat = np.frombuffer(buf, dtype=np.dtype(spec.dtype))
+    sz, sy, sx, sc = (s // flat.itemsize for s in vol.strides)
+    chan = np.arange(spec.channels) if channels is None else np.asarray(channels, dtype=np.int64)
+    lin = (
+        (ox * sx + oy * sy + oz * sz)[..., None]
+        + (dx * sx + dy * sy + dz * sz)[..., None]
+        + chan * sc
+    )
+    if out.dtype == flat.dtype:
+        np.take(flat, lin, out=out)
+    else:
+        out[...] = flat[lin]
+    return out
+
+
 # ---------------------------------------------------------------------------
 # Convenience function for "full volume" read
 # ---------------------------------------------------------------------------
@@ -0,0 +1,346 @@
+"""
+shm_volume_v08.py — CIVD v0.8 shared-memory volume publishing.
+
+Several local processes (perception, planning, logging) that each call
+read_snapshot_v08() hold one private copy of the volume apiece. A
+VolumePublisherV08 instead places one decoded volume in a named
+multiprocessing.shared_memory segment; any number of VolumeConsumerV08
+instances attach to it by name and view the voxels without copying:
+
+    pub = VolumePublisherV08("civd_map", capacity=spec.expected_nbytes())
+    pub.publish(vol, spec, meta={"frame": 12})
+
+    # another process
+    con = VolumeConsumerV08("civd_map")
+    version = con.wait_for_version(0)
+    with con.acquire() as shared:
+        plan(shared.volume)            # (z, y, x, C) view into the segment
+        if not shared.valid:
+            ...                        # republished while we were reading
+
+Segment layout (little-endian; the payload starts on a page boundary):
+
+    0    magic      8s   b"CIVDSHMV"
+    8    version    u16  header format (1)
+    10   reserved   u16
+    12   spec_len   u32  length of the spec JSON
+    16   seq        u64  seqlock counter: odd while a publish is in progress
+    24   capacity   u64  payload capacity in bytes
+    32   nbytes     u64  payload size of the current volume
+    64   spec JSON       dims, channels, dtype, order, signature, meta
+    4096 payload         raw volume bytes (see VolumeSpecV06)
+
+Publishing bumps 'seq' to odd, rewrites spec and payload in place and
+bumps it back to even, so the published version is seq // 2. Consumers
+read 'seq' before and after they use the data; an unchanged even value
+means the data they saw was consistent. Waiting for a new version polls
+the 8-byte counter, which costs nothing measurable at millisecond
+intervals.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import json
+import mmap
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, _byte_view, _volume_view_from_bytes
+
+MAGIC_SHM_V08 = b"CIVDSHMV"
+SHM_HEADER_SIZE = 4096
+
+_SHM_HEAD = struct.Struct("<8s H H I Q Q Q")
+_SEQ_OFFSET = 16
+_SPEC_OFFSET = 64
+_SPEC_MAX = SHM_HEADER_SIZE - _SPEC_OFFSET
+
+
+def _seq_word(buf) -> "np.ndarray":
+    """
+    The 'seq' counter as a one-element uint64 array. Element reads and
+    writes are single aligned 8-byte loads/stores, so another process never
+    sees a half-updated counter (struct.pack_into/unpack_from move it one
+    byte at a time). Drop the array before closing the segment.
+    """
+    return np.ndarray((1,), dtype="<u8", buffer=buf, offset=_SEQ_OFFSET)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing segment without letting this process's resource
+    tracker unlink it at exit (it belongs to the publisher).
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        pass
+    # Older versions always register the segment. Unregistering afterwards
+    # is not an option: a forked consumer shares the publisher's tracker
+    # and would drop the publisher's own entry, so skip registration.
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def _spec_from_json(doc: Dict[str, Any]) -> VolumeSpecV06:
+    return VolumeSpecV06(
+        dims=tuple(doc["dims"]),
+        channels=doc["channels"],
+        dtype=doc["dtype"],
+        order=doc["order"],
+        signature=doc["signature"],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Publisher
+# ---------------------------------------------------------------------------
+
+
+class VolumePublisherV08:
+    """
+    Owner of a shared-memory volume segment.
+
+    name:
+        Segment name consumers attach to; None picks a unique name (see
+        .name).
+    capacity:
+        Largest payload in bytes that can be published into the segment.
+
+    The segment is unlinked by close() (or when the publishing process
+    exits); consumers that are still attached keep their mapping.
+    """
+
+    def __init__(self, name: Optional[str], capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._shm = shared_memory.SharedMemory(name=name, create=True, size=SHM_HEADER_SIZE + capacity)
+        self.capacity = capacity
+        self._seq = 0
+        _SHM_HEAD.pack_into(self._shm.buf, 0, MAGIC_SHM_V08, 1, 0, 0, 0, capacity, 0)
+        self._seq_word = _seq_word(self._shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def version(self) -> int:
+        return self._seq // 2
+
+    def _set_seq(self, seq: int) -> None:
+        self._seq = seq
+        self._seq_word[0] = seq
+
+    def publish(self, buf, spec: VolumeSpecV06, meta: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Copy a raw volume payload ('buf' is any C-contiguous buffer laid out
+        per 'spec') into the segment and return the new version number.
+        """
+        data = _byte_view(buf)
+        if len(data) != spec.expected_nbytes():
+            raise ValueError(f"Buffer has {len(data)} bytes, expected {spec.expected_nbytes()} for {spec}")
+        if len(data) > self.capacity:
+            raise ValueError(f"Volume of {len(data)} bytes exceeds segment capacity {self.capacity}")
+        spec_json = json.dumps(
+            {
+                "dims": list(spec.dims),
+                "channels": spec.channels,
+                "dtype": spec.dtype,
+                "order": spec.order,
+                "signature": spec.signature,
+                "meta": meta or {},
+            },
+            separators=(",", ":"),
+            ensure_ascii=False,
+        ).encode("utf-8")
+        if len(spec_json) > _SPEC_MAX:
+            raise ValueError(f"Spec + meta JSON is {len(spec_json)} bytes; at most {_SPEC_MAX} fit in the header")
+
+        mv = self._shm.buf
+        self._set_seq(self._seq + 1)
+        struct.pack_into("<I", mv, 12, len(spec_json))
+        struct.pack_into("<Q", mv, 32, len(data))
+        mv[_SPEC_OFFSET : _SPEC_OFFSET + len(spec_json)] = spec_json
+        mv[SHM_HEADER_SIZE : SHM_HEADER_SIZE + len(data)] = data
+        self._set_seq(self._seq + 1)
+        return self.version
+
+    def publish_snapshot(self, path: str) -> int:
+        """
+        Publish a v0.8 snapshot file. Dense payloads are copied from a
+        memory mapping of the file straight into the segment; bricked
+        snapshots are decoded first. The snapshot meta is published too.
+        """
+        from .snapshot_v08 import _parse_snapshot_header_v08, read_snapshot_v08
+
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header, spec, header_len = _parse_snapshot_header_v08(mm)
+            if header.layout != "BRICKED":
+                with memoryview(mm) as mv, mv[header_len:] as payload:
+                    return self.publish(payload, spec, meta=header.meta)
+        header, spec, payload = read_snapshot_v08(path)
+        return self.publish(payload, spec, meta=header.meta)
+
+    def close(self, unlink: bool = True) -> None:
+        if self._shm is None:
+            return
+        self._seq_word = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> "VolumePublisherV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Consumer
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class SharedVolumeV08:
+    """
+    A published volume as seen by a consumer.
+
+    'volume' is a (z, y, x, C) view into the segment ('MORTON' volumes are
+    decoded into a private array). It is only guaranteed consistent while
+    'valid' is True, i.e. no newer version has started publishing since it
+    was acquired.
+    """
+
+    version: int
+    spec: VolumeSpecV06
+    meta: Dict[str, Any]
+    volume: "np.ndarray"
+    _consumer: "VolumeConsumerV08"
+    _seq: int
+
+    @property
+    def valid(self) -> bool:
+        return self._consumer._read_seq() == self._seq
+
+    def release(self) -> None:
+        self.volume = None
+
+    def __enter__(self) -> "SharedVolumeV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class VolumeConsumerV08:
+    """
+    Read-only attachment to a VolumePublisherV08 segment by name.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._shm = _attach(name)
+        magic, fmt, _, _, _, capacity, _ = _SHM_HEAD.unpack_from(self._shm.buf, 0)
+        if magic != MAGIC_SHM_V08 or fmt != 1:
+            self._shm.close()
+            raise ValueError(f"Shared-memory segment {name!r} is not a CIVD v0.8 volume")
+        self.name = name
+        self.capacity = capacity
+        self._seq_word = _seq_word(self._shm.buf)
+
+    def _read_seq(self) -> int:
+        return int(self._seq_word[0])
+
+    @property
+    def version(self) -> int:
+        """
+        Number of completed publishes (0 = nothing published yet).
+        """
+        return self._read_seq() // 2
+
+    def acquire(self, timeout: Optional[float] = None, poll_interval: float = 0.0005) -> SharedVolumeV08:
+        """
+        Return a zero-copy view of the current volume. Waits while a publish
+        is in progress; raises LookupError if nothing was published yet and
+        TimeoutError after 'timeout' seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        mv = self._shm.buf
+        while True:
+            seq = self._read_seq()
+            if seq == 0:
+                raise LookupError(f"Nothing has been published to {self.name!r} yet")
+            if not seq & 1:
+                # A publish may start while we read the header: the spec
+                # bytes can then be torn. Only trust them if seq is unchanged.
+                try:
+                    spec_len, = struct.unpack_from("<I", mv, 12)
+                    nbytes, = struct.unpack_from("<Q", mv, 32)
+                    doc = json.loads(bytes(mv[_SPEC_OFFSET : _SPEC_OFFSET + spec_len]))
+                except (ValueError, UnicodeDecodeError):
+                    if self._read_seq() == seq:
+                        raise
+                    doc = None
+                if doc is not None and self._read_seq() == seq:
+                    spec = _spec_from_json(doc)
+                    vol = _volume_view_from_bytes(mv[SHM_HEADER_SIZE : SHM_HEADER_SIZE + nbytes], spec)
+                    return SharedVolumeV08(seq // 2, spec, doc["meta"], vol, self, seq)
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Publish to {self.name!r} did not complete within {timeout}s")
+            time.sleep(poll_interval)
+
+    def read(self, timeout: Optional[float] = None) -> Tuple[int, VolumeSpecV06, Dict[str, Any], "np.ndarray"]:
+        """
+        Copy the current volume out of the segment, retrying until the copy
+        is consistent. Returns (version, spec, meta, volume).
+        """
+        while True:
+            with self.acquire(timeout=timeout) as shared:
+                vol = np.array(shared.volume)
+                if shared.valid:
+                    return shared.version, shared.spec, shared.meta, vol
+
+    def wait_for_version(
+        self,
+        after: int,
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.001,
+    ) -> Optional[int]:
+        """
+        Block until a version newer than 'after' has been published and
+        return it; None on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            version = self.version
+            if version > after:
+                return version
+            if deadline is not None and time.monotonic() > deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def close(self) -> None:
+        """
+        Detach. Views handed out by acquire() must be released first.
+        """
+        if self._shm is not None:
+            self._seq_word = None
+            self._shm.close()
+            self._shm = None
+
+    def __enter__(self) -> "VolumeConsumerV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -26,14 +26,17 @@ from pathlib import Path
 from typing import Any, Dict, Optional, Tuple, Union
 
 import json
+import mmap
 import struct
 
 import numpy as np
 
 from .roi_v06 import (
     VolumeSpecV06,
+    _byte_view,
     full_volume_from_bytes,
     read_region_from_bytes,
+    write_region_to_bytes,
 )
 from .roi_v06 import RoiV06  # type: ignore  # defined in same module
 from .roi_v06 import clamp_roi  # type: ignore
@@ -123,12 +126,14 @@ def _header_from_dict(d: Dict[str, Any]) -> SnapshotHeaderV07:
 
 
 def _normalize_path_or_bytes(
-    path_or_bytes: Union[str, Path, bytes, bytearray]
-) -> bytes:
-    if isinstance(path_or_bytes, (bytes, bytearray)):
-        return bytes(path_or_bytes)
-    p = Path(path_or_bytes)
-    return p.read_bytes()
+    path_or_bytes: Union[str, Path, bytes, bytearray, memoryview]
+) -> memoryview:
+    """
+    Byte view of a snapshot blob; in-memory buffers are used in place.
+    """
+    if isinstance(path_or_bytes, (str, Path)):
+        return memoryview(Path(path_or_bytes).read_bytes())
+    return _byte_view(path_or_bytes)
 
 
 # ---------------------------------------------------------------------------
@@ -141,14 +146,16 @@ def write_snapshot_v07(
     spec: VolumeSpecV06,
     meta: Optional[Dict[str, Any]] = None,
     path: Optional[Union[str, Path]] = None,
-) -> Tuple[bytes, SnapshotHeaderV07]:
+    return_blob: bool = True,
+) -> Tuple[Optional[bytes], SnapshotHeaderV07]:
     """
     Write a v0.7 snapshot to disk (optionally) and return the blob + header.
 
     Parameters
     ----------
     volume_bytes:
-        Raw dense volume buffer in (z, y, x, C) C-contiguous layout.
+        Raw dense volume buffer in (z, y, x, C) C-contiguous layout: bytes
+        or any C-contiguous buffer (bytearray, memoryview, mmap, NumPy array).
     spec:
         VolumeSpecV06 describing dims, channels, dtype, signature.
     meta:
@@ -156,14 +163,21 @@ def write_snapshot_v07(
     path:
         Optional filesystem path to write the snapshot to. If None, the
         blob is constructed in memory and only returned.
+    return_blob:
+        If False (only valid with 'path'), the volume is streamed to the
+        file straight from 'volume_bytes' and no in-memory blob is built;
+        None is returned in its place.
 
     Returns
     -------
-    blob : bytes
+    blob : bytes or None
         The complete on-disk representation of the snapshot.
     header : SnapshotHeaderV07
         Parsed header model for convenience.
     """
+    if not return_blob and path is None:
+        raise ValueError("return_blob=False requires a path")
+    volume_bytes = _byte_view(volume_bytes)
     expected = spec.expected_nbytes()
     if len(volume_bytes) != expected:
         raise ValueError(
@@ -178,20 +192,15 @@ def write_snapshot_v07(
     )
     header_len = len(header_json)
 
-    blob = bytearray()
-    blob += MAGIC
-    blob += _HEADER_LEN_STRUCT.pack(header_len)
-    blob += header_json
-    blob += volume_bytes
-
-    out_blob = bytes(blob)
+    parts = [MAGIC, _HEADER_LEN_STRUCT.pack(header_len), header_json, volume_bytes]
     hdr = _header_from_dict(header_dict)
 
     if path is not None:
-        p = Path(path)
-        p.write_bytes(out_blob)
+        with open(path, "wb") as f:
+            for part in parts:
+                f.write(part)
 
-    return out_blob, hdr
+    return (b"".join(parts) if return_blob else None), hdr
 
 
 def read_snapshot_v07(
@@ -209,14 +218,15 @@ def read_snapshot_v07(
     -------
     header : SnapshotHeaderV07
     spec   : VolumeSpecV06
-    volume_bytes : bytes
+    volume_bytes : memoryview
+        Zero-copy view of the volume inside the blob (or the file contents).
     """
     data = _normalize_path_or_bytes(path_or_bytes)
 
     if len(data) < MAGIC_LEN + _HEADER_LEN_STRUCT.size:
         raise ValueError("Snapshot data too short to contain header.")
 
-    if data[:MAGIC_LEN] != MAGIC:
+    if bytes(data[:MAGIC_LEN]) != MAGIC:
         raise ValueError("Snapshot magic header mismatch; not a v0.7 snapshot.")
 
     offset = MAGIC_LEN
@@ -226,7 +236,7 @@ def read_snapshot_v07(
     if len(data) < offset + header_len:
         raise ValueError("Snapshot data truncated before header JSON.")
 
-    header_json = data[offset : offset + header_len]
+    header_json = bytes(data[offset : offset + header_len])
     offset += header_len
 
     header_dict = json.loads(header_json.decode("utf-8"))
@@ -310,3 +320,61 @@ def read_roi_from_snapshot_v07(
         channels=channels,
         copy=copy,
     )
+
+
+def _payload_offset_v07(data) -> Tuple[SnapshotHeaderV07, VolumeSpecV06, int]:
+    if len(data) < MAGIC_LEN + _HEADER_LEN_STRUCT.size or bytes(data[:MAGIC_LEN]) != MAGIC:
+        raise ValueError("Snapshot magic header mismatch; not a v0.7 snapshot.")
+    (header_len,) = _HEADER_LEN_STRUCT.unpack_from(data, MAGIC_LEN)
+    offset = MAGIC_LEN + _HEADER_LEN_STRUCT.size
+    hdr = _header_from_dict(json.loads(bytes(data[offset : offset + header_len]).decode("utf-8")))
+    if hdr.layout != "SNAPSHOT_V07":
+        raise ValueError(f"Unexpected snapshot layout: {hdr.layout!r}")
+    spec = _spec_from_header(hdr)
+    offset += header_len
+    if len(data) - offset != spec.expected_nbytes():
+        raise ValueError("Snapshot volume length does not match header spec.")
+    return hdr, spec, offset
+
+
+def write_region_to_snapshot_v07(
+    path_or_buffer: Union[str, Path, bytearray],
+    x: int,
+    y: int,
+    z: int,
+    data: np.ndarray,
+    channels: Optional[list[int]] = None,
+) -> SnapshotHeaderV07:
+    """
+    Patch a region of a v0.7 snapshot in place.
+
+    Parameters
+    ----------
+    path_or_buffer:
+        Path of a snapshot file (patched through a writable mmap, so only
+        the pages covering the region are touched) or a bytearray holding
+        a snapshot blob (patched directly).
+    x, y, z:
+        Origin of the region in voxel coordinates.
+    data:
+        Region tensor of shape (d, h, w, C_sel).
+    channels:
+        Optional subset of channel indices that 'data' provides.
+
+    Returns
+    -------
+    SnapshotHeaderV07
+        The (unchanged) snapshot header.
+    """
+    if isinstance(path_or_buffer, bytearray):
+        hdr, spec, offset = _payload_offset_v07(path_or_buffer)
+        with memoryview(path_or_buffer) as mv, mv[offset:] as payload:
+            write_region_to_bytes(payload, spec, x, y, z, data, channels=channels)
+        return hdr
+
+    with open(path_or_buffer, "r+b") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as mm:
+        hdr, spec, offset = _payload_offset_v07(mm)
+        with memoryview(mm) as mv, mv[offset:] as payload:
+            write_region_to_bytes(payload, spec, x, y, z, data, channels=channels)
+        mm.flush()
+    return hdr
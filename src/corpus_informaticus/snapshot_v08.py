@@ -5,18 +5,54 @@ Design:
 - Self-identifying header (magic + version)
 - Variable header length with length-prefixed strings (schema_version, meta_json)
 - Payload is dense volume buffer compatible with VolumeSpecV06 ROI access.
+
+Bricked layout (optional, layout_code=1 in the core header):
+
+    [ header                ]  as above
+    [ brick block           ]  brick_size (3u32) + reserved(u32) + n_bricks (u64)
+    [ brick offset table    ]  (n_bricks + 1) u64 absolute file offsets;
+                               brick i spans [off[i], off[i+1])
+    [ bricks                ]  fixed-size bricks in (bz, by, bx) raster order,
+                               each a v0.8 tile payload (edge bricks padded)
+
+An ROI read on a bricked snapshot touches one contiguous range per
+intersecting brick instead of one x-run per (z, y) row.
+
+SnapshotWriterV08 writes either layout from a sequence of z-slabs, so
+producers never need the whole volume in memory.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import json
+import mmap
+import os
 import struct
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
-from .roi_v06 import VolumeSpecV06, read_region_from_bytes
+from .roi_v06 import (
+    VolumeSpecV06,
+    RoiV06,
+    read_region_from_bytes,
+    read_regions,
+    write_region_to_bytes,
+    _byte_view,
+    _prepare_region_data,
+    _volume_to_bytes,
+    _volume_view_from_bytes,
+)
+from .instrument_v08 import add_bytes_copied, add_bytes_read, add_bytes_written, instrumented
+from .tile_header_v08 import DTYPE_CODE, DTYPE_NAME
+from .tile_manifest_v07 import TileIndexV07
+from .tile_pack_v08 import (
+    TilingSpecV08,
+    assemble_roi_from_tiles_v08,
+    compute_tiling_spec_v08,
+    iter_tile_overlaps_v08,
+)
 
 MAGIC_SNAP_V08 = b"CIVDSNAP"  # 8 bytes
 
@@ -24,18 +60,24 @@ MAGIC_SNAP_V08 = b"CIVDSNAP"  # 8 bytes
 _SNAP_PREFIX = struct.Struct("<8s H H")
 
 # Fixed core fields after prefix:
-# dims (3u32), channels (u32), dtype_code(u16), sig_code(u16), order_code(u8), reserved(7 bytes)
-_SNAP_CORE = struct.Struct("<3I I H H B 7x")
+# dims (3u32), channels (u32), dtype_code(u16), sig_code(u16), order_code(u8),
+# layout_code(u8), reserved(2 bytes), generation(u32)
+_SNAP_CORE = struct.Struct("<3I I H H B B 2x I")
+_GENERATION_OFFSET = _SNAP_PREFIX.size + _SNAP_CORE.size - 4
 
-DTYPE_CODE = {"uint8": 1, "uint16": 2, "float32": 3}
-DTYPE_NAME = {v: k for k, v in DTYPE_CODE.items()}
+# Bricked layout block directly after the header:
+# brick_size (3u32), reserved(u32), n_bricks(u64)
+_SNAP_BRICKS = struct.Struct("<3I 4x Q")
 
-SIG_CODE = {"C_CONTIG": 1, "F_CONTIG": 2}
+SIG_CODE = {"C_CONTIG": 1, "F_CONTIG": 2, "MORTON": 3, "PLANAR": 4}
 SIG_NAME = {v: k for k, v in SIG_CODE.items()}
 
 ORDER_CODE = {"C": 1, "F": 2}
 ORDER_NAME = {v: k for k, v in ORDER_CODE.items()}
 
+LAYOUT_CODE = {"DENSE": 0, "BRICKED": 1}
+LAYOUT_NAME = {v: k for k, v in LAYOUT_CODE.items()}
+
 
 def _pack_lp_string(s: str) -> bytes:
     b = s.encode("utf-8")
@@ -61,17 +103,18 @@ class SnapshotHeaderV08:
     signature: str
     order: str
     meta: Dict[str, Any]
+    layout: str = "DENSE"                            # "DENSE" or "BRICKED"
+    brick_size: Optional[Tuple[int, int, int]] = None  # (bx,by,bz) when bricked
+    generation: int = 0                              # bumped by every in-place write
 
 
-def write_snapshot_v08(
-    path: str,
-    volume_buf: bytes,
+def _snapshot_header_bytes_v08(
     spec: VolumeSpecV06,
-    meta: Optional[Dict[str, Any]] = None,
-    schema_id: str = "CIVD_SNAPSHOT",
-    schema_version: str = "0.8",
-) -> SnapshotHeaderV08:
-    meta = meta or {}
+    meta: Dict[str, Any],
+    schema_id: str,
+    schema_version: str,
+    bricked: bool,
+) -> bytes:
     dtype_code = DTYPE_CODE.get(spec.dtype)
     sig_code = SIG_CODE.get(spec.signature)
     order_code = ORDER_CODE.get(spec.order)
@@ -81,6 +124,8 @@ def write_snapshot_v08(
         raise ValueError(f"Unsupported signature: {spec.signature!r}")
     if order_code is None:
         raise ValueError(f"Unsupported order: {spec.order!r}")
+    if bricked and spec.signature == "MORTON":
+        raise ValueError("Bricked layout is not supported for 'MORTON' volumes")
 
     # Encode meta JSON
     meta_json = json.dumps(meta, separators=(",", ":"), ensure_ascii=False)
@@ -91,6 +136,8 @@ def write_snapshot_v08(
         dtype_code,
         sig_code,
         order_code,
+        LAYOUT_CODE["BRICKED" if bricked else "DENSE"],
+        0,
     )
 
     tail = (
@@ -101,15 +148,47 @@ def write_snapshot_v08(
 
     header_len = _SNAP_PREFIX.size + len(core) + len(tail)
     prefix = _SNAP_PREFIX.pack(MAGIC_SNAP_V08, 8, header_len)
-    header_bytes = prefix + core + tail
+    return prefix + core + tail
+
 
+@instrumented("snapshot_v08.write")
+def write_snapshot_v08(
+    path: str,
+    volume_buf: bytes,
+    spec: VolumeSpecV06,
+    meta: Optional[Dict[str, Any]] = None,
+    schema_id: str = "CIVD_SNAPSHOT",
+    schema_version: str = "0.8",
+    brick_size: Optional[Tuple[int, int, int]] = None,
+) -> SnapshotHeaderV08:
+    """
+    Write a v0.8 snapshot.
+
+    'volume_buf' may be bytes or any C-contiguous buffer (bytearray,
+    memoryview, mmap, NumPy array); it is written without a copy.
+
+    If brick_size=(bx, by, bz) is given, the payload is stored as
+    fixed-size bricks with an offset table (layout "BRICKED") instead of a
+    single dense buffer. read_snapshot_v08() still returns the dense payload.
+    """
+    volume_buf = _byte_view(volume_buf)
     expected = spec.expected_nbytes()
     if len(volume_buf) != expected:
         raise ValueError(f"volume_buf size {len(volume_buf)} != expected {expected}")
 
+    if brick_size is not None:
+        # Bricks are cut one brick layer at a time, never for the whole volume.
+        vol = _volume_view_from_bytes(volume_buf, spec)
+        with SnapshotWriterV08(path, spec, meta, schema_id, schema_version, brick_size) as writer:
+            for z0 in range(0, spec.dims[2], brick_size[2]):
+                writer.write_slab(vol[z0 : z0 + brick_size[2]])
+        return writer.header
+
+    header_bytes = _snapshot_header_bytes_v08(spec, meta or {}, schema_id, schema_version, False)
     with open(path, "wb") as f:
         f.write(header_bytes)
         f.write(volume_buf)
+    add_bytes_written(len(header_bytes) + len(volume_buf))
 
     return SnapshotHeaderV08(
         version="0.8",
@@ -120,13 +199,216 @@ def write_snapshot_v08(
         dtype=spec.dtype,
         signature=spec.signature,
         order=spec.order,
-        meta=meta,
+        meta=meta or {},
     )
 
 
-def read_snapshot_v08(path: str) -> Tuple[SnapshotHeaderV08, VolumeSpecV06, bytes]:
-    with open(path, "rb") as f:
-        blob = f.read()
+class SnapshotWriterV08:
+    """
+    Write a v0.8 snapshot slab by slab, without holding the whole volume.
+
+        with SnapshotWriterV08(path, spec, brick_size=(32, 32, 8)) as w:
+            for slab in simulator():          # (d, y, x, C) z-slabs
+                w.write_slab(slab)
+
+    The header is written up front; 'write_slab()' takes consecutive
+    z-slabs of any depth as a (d, y, x, C) array or any buffer-protocol
+    object holding d full (y, x, C) planes in C order. On close the slab
+    depths must add up to dims[2]; the file is written to a temporary name
+    and only moved to 'path' then, so an incomplete snapshot never appears.
+
+    Supported layouts: dense 'C_CONTIG' and 'PLANAR' with order 'C'
+    (every slab is one contiguous write, or one per channel plane), and
+    bricked layout for every signature except 'MORTON' (one brick layer
+    of slabs is buffered).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        spec: VolumeSpecV06,
+        meta: Optional[Dict[str, Any]] = None,
+        schema_id: str = "CIVD_SNAPSHOT",
+        schema_version: str = "0.8",
+        brick_size: Optional[Tuple[int, int, int]] = None,
+    ) -> None:
+        if brick_size is None and not (spec.order == "C" and spec.signature in ("C_CONTIG", "PLANAR")):
+            raise ValueError(
+                f"Dense streaming needs order 'C' and signature 'C_CONTIG' or 'PLANAR', "
+                f"got {spec.signature!r}/{spec.order!r}; pass brick_size to stream other layouts"
+            )
+        header_bytes = _snapshot_header_bytes_v08(spec, meta or {}, schema_id, schema_version, brick_size is not None)
+
+        self.path = path
+        self.spec = spec
+        self.header = SnapshotHeaderV08(
+            version="0.8",
+            schema_id=schema_id,
+            schema_version=schema_version,
+            dims=spec.dims,
+            channels=spec.channels,
+            dtype=spec.dtype,
+            signature=spec.signature,
+            order=spec.order,
+            meta=meta or {},
+            layout="BRICKED" if brick_size is not None else "DENSE",
+            brick_size=tuple(brick_size) if brick_size is not None else None,  # type: ignore[arg-type]
+        )
+        self.z_written = 0
+
+        self._tmp = f"{path}.{os.getpid()}.tmp"
+        self._f = open(self._tmp, "wb")
+        self._f.write(header_bytes)
+        self._payload_off = len(header_bytes)
+
+        self._tiling: Optional[TilingSpecV08] = None
+        self._layer: Optional["np.ndarray"] = None
+        if brick_size is not None:
+            self._tiling = compute_tiling_spec_v08(spec.dims, tuple(brick_size))
+            order = _brick_raster(self._tiling)
+            brick_nbytes = replace(spec, dims=self._tiling.tile_size).expected_nbytes()
+            offsets = np.empty(len(order) + 1, dtype="<u8")
+            offsets[0] = len(header_bytes) + _SNAP_BRICKS.size + offsets.nbytes
+            offsets[1:] = offsets[0] + brick_nbytes * np.arange(1, len(order) + 1, dtype=np.uint64)
+            self._f.write(_SNAP_BRICKS.pack(*self._tiling.tile_size, len(order)))
+            self._f.write(offsets.tobytes())
+
+            x, y, _ = spec.dims
+            bz = self._tiling.tile_size[2]
+            self._layer = np.zeros((bz, y, x, spec.channels), dtype=np.dtype(spec.dtype))
+
+    def _as_slab(self, slab) -> "np.ndarray":
+        x, y, z = self.spec.dims
+        plane = (y, x, self.spec.channels)
+        if isinstance(slab, np.ndarray) and slab.ndim == 4:
+            if slab.dtype != np.dtype(self.spec.dtype):
+                raise ValueError(f"Slab dtype {slab.dtype} does not match spec dtype {self.spec.dtype!r}")
+            arr = slab
+        else:
+            flat = np.frombuffer(slab, dtype=np.dtype(self.spec.dtype))
+            if flat.size % int(np.prod(plane)):
+                raise ValueError(f"Slab of {flat.size} values is not a whole number of (y, x, C) planes")
+            arr = flat.reshape((-1,) + plane)
+        if arr.shape[1:] != plane:
+            raise ValueError(f"Slab shape {arr.shape} does not match (d, {y}, {x}, {self.spec.channels})")
+        if self.z_written + arr.shape[0] > z:
+            raise ValueError(f"Slab overruns the volume: z {self.z_written}+{arr.shape[0]} > {z}")
+        return arr
+
+    @instrumented("snapshot_v08.write_slab")
+    def write_slab(self, slab) -> None:
+        """
+        Append the next (d, y, x, C) z-slab.
+        """
+        if self._f is None:
+            raise ValueError("SnapshotWriterV08 is closed")
+        arr = self._as_slab(slab)
+        d = arr.shape[0]
+        if self._tiling is None:
+            self._write_dense(arr)
+        else:
+            bz = self._tiling.tile_size[2]
+            done = 0
+            while done < d:
+                lz = (self.z_written + done) % bz
+                n = min(d - done, bz - lz)
+                self._layer[lz : lz + n] = arr[done : done + n]
+                done += n
+                if lz + n == bz:
+                    self._flush_layer(bz)
+            add_bytes_copied(arr.nbytes)
+        self.z_written += d
+
+    def _write_dense(self, arr: "np.ndarray") -> None:
+        arr = np.ascontiguousarray(arr)
+        if self.spec.signature == "C_CONTIG":
+            self._f.write(memoryview(arr).cast("B"))
+            add_bytes_written(arr.nbytes)
+            return
+        # PLANAR: the slab lands in each channel plane at the same z offset.
+        x, y, z = self.spec.dims
+        plane_nbytes = x * y * z * arr.itemsize
+        pos = self._payload_off + self.z_written * x * y * arr.itemsize
+        for c in range(self.spec.channels):
+            self._f.seek(pos + c * plane_nbytes)
+            self._f.write(np.ascontiguousarray(arr[..., c]))
+        add_bytes_copied(arr.nbytes)
+        add_bytes_written(arr.nbytes)
+
+    def _flush_layer(self, depth: int) -> None:
+        sx, sy, _ = self._tiling.tile_size
+        nx, ny, _ = self._tiling.tiles_per_axis
+        x, y, _ = self.spec.dims
+        brick_spec = replace(self.spec, dims=self._tiling.tile_size)
+        pad = np.zeros(tuple(reversed(self._tiling.tile_size)) + (self.spec.channels,), dtype=self._layer.dtype)
+        for ty in range(ny):
+            for tx in range(nx):
+                sub = self._layer[:, ty * sy : (ty + 1) * sy, tx * sx : (tx + 1) * sx]
+                if sub.shape != pad.shape or depth < sub.shape[0]:
+                    pad[...] = 0
+                    pad[:depth, : sub.shape[1], : sub.shape[2]] = sub[:depth]
+                    sub = pad
+                brick = _volume_to_bytes(sub, brick_spec)
+                self._f.write(brick)
+                add_bytes_copied(len(brick))
+                add_bytes_written(len(brick))
+
+    def close(self) -> SnapshotHeaderV08:
+        """
+        Finish the snapshot and move it into place; raises ValueError if
+        fewer than dims[2] planes were written.
+        """
+        if self._f is None:
+            return self.header
+        try:
+            if self.z_written != self.spec.dims[2]:
+                raise ValueError(f"Snapshot incomplete: {self.z_written} of {self.spec.dims[2]} z-planes written")
+            if self._tiling is not None and self.z_written % self._tiling.tile_size[2]:
+                self._flush_layer(self.z_written % self._tiling.tile_size[2])
+            self._f.close()
+            self._f = None
+            os.replace(self._tmp, self.path)
+        except BaseException:
+            self.abort()
+            raise
+        return self.header
+
+    def abort(self) -> None:
+        """
+        Discard the partially written snapshot.
+        """
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        if os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self) -> "SnapshotWriterV08":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+def _brick_raster(tiling: TilingSpecV08) -> List[TileIndexV07]:
+    nx, ny, nz = tiling.tiles_per_axis
+    return [TileIndexV07(tx=tx, ty=ty, tz=tz) for tz in range(nz) for ty in range(ny) for tx in range(nx)]
+
+
+@instrumented("snapshot_v08.parse_header")
+def _parse_snapshot_header_v08(blob, file_size: Optional[int] = None) -> Tuple[SnapshotHeaderV08, VolumeSpecV06, int]:
+    """
+    Parse the header from a bytes-like object (bytes, mmap, memoryview).
+
+    Returns (header, spec, header_len); the payload starts at header_len.
+    'blob' may be just a prefix of the file (covering the header and, for
+    bricked snapshots, the brick sizes) if 'file_size' is given.
+    """
+    if len(blob) < _SNAP_PREFIX.size + _SNAP_CORE.size:
+        raise ValueError("Not a CIVD v0.8 snapshot")
 
     magic, ver, header_len = _SNAP_PREFIX.unpack_from(blob, 0)
     if magic != MAGIC_SNAP_V08 or ver != 8:
@@ -134,18 +416,20 @@ def read_snapshot_v08(path: str) -> Tuple[SnapshotHeaderV08, VolumeSpecV06, byte
 
     off = _SNAP_PREFIX.size
 
-    x, y, z, channels, dtype_code, sig_code, order_code = _SNAP_CORE.unpack_from(blob, off)
+    x, y, z, channels, dtype_code, sig_code, order_code, layout_code, generation = _SNAP_CORE.unpack_from(blob, off)
     off += _SNAP_CORE.size
 
     dtype = DTYPE_NAME.get(dtype_code)
     signature = SIG_NAME.get(sig_code)
     order = ORDER_NAME.get(order_code)
-    if dtype is None or signature is None or order is None:
-        raise ValueError("Unknown dtype/signature/order in header")
+    layout = LAYOUT_NAME.get(layout_code)
+    if dtype is None or signature is None or order is None or layout is None:
+        raise ValueError("Unknown dtype/signature/order/layout in header")
 
-    schema_id, off = _unpack_lp_string(blob, off)
-    schema_version, off = _unpack_lp_string(blob, off)
-    meta_json, off = _unpack_lp_string(blob, off)
+    head = bytes(blob[:header_len])
+    schema_id, off = _unpack_lp_string(head, off)
+    schema_version, off = _unpack_lp_string(head, off)
+    meta_json, off = _unpack_lp_string(head, off)
 
     if off != header_len:
         raise ValueError("Header length mismatch")
@@ -154,8 +438,11 @@ def read_snapshot_v08(path: str) -> Tuple[SnapshotHeaderV08, VolumeSpecV06, byte
 
     spec = VolumeSpecV06(dims=(x, y, z), channels=channels, dtype=dtype, order=order, signature=signature)
 
-    payload = blob[header_len:]
-    if len(payload) != spec.expected_nbytes():
+    brick_size = None
+    if layout == "BRICKED":
+        bx, by, bz, _ = _SNAP_BRICKS.unpack_from(blob, header_len)
+        brick_size = (bx, by, bz)
+    elif (len(blob) if file_size is None else file_size) - header_len != spec.expected_nbytes():
         raise ValueError("Snapshot payload size mismatch vs spec")
 
     header = SnapshotHeaderV08(
@@ -168,16 +455,208 @@ def read_snapshot_v08(path: str) -> Tuple[SnapshotHeaderV08, VolumeSpecV06, byte
         signature=signature,
         order=order,
         meta=meta,
+        layout=layout,
+        brick_size=brick_size,
+        generation=generation,
     )
 
+    return header, spec, header_len
+
+
+def _parse_brick_table_v08(
+    blob,
+    header: SnapshotHeaderV08,
+    header_len: int,
+    file_size: Optional[int] = None,
+) -> Tuple[TilingSpecV08, "np.ndarray"]:
+    """
+    Return (tiling, offsets) for a bricked snapshot; offsets has n_bricks + 1 entries.
+
+    'blob' must cover at least the brick table; pass 'file_size' when it is
+    only a prefix of the file.
+    """
+    bx, by, bz, n_bricks = _SNAP_BRICKS.unpack_from(blob, header_len)
+    tiling = compute_tiling_spec_v08(header.dims, (bx, by, bz))
+    nx, ny, nz = tiling.tiles_per_axis
+    if n_bricks != nx * ny * nz:
+        raise ValueError("Brick count mismatch vs dims/brick_size")
+
+    table_off = header_len + _SNAP_BRICKS.size
+    offsets = np.frombuffer(bytes(blob[table_off : table_off + 8 * (n_bricks + 1)]), dtype="<u8")
+    if len(offsets) != n_bricks + 1 or int(offsets[-1]) != (len(blob) if file_size is None else file_size):
+        raise ValueError("Snapshot brick table does not match file size")
+    return tiling, offsets
+
+
+def _check_roi_request(spec: VolumeSpecV06, roi: RoiV06, channels: Optional[List[int]]) -> None:
+    # Checked before any view of the mapping exists: a view held by an
+    # exception traceback would make the mmap close raise BufferError.
+    for axis, start, size, dim in zip("xyz", (roi.x, roi.y, roi.z), (roi.w, roi.h, roi.d), spec.dims):
+        if not (0 <= start < start + size <= dim):
+            raise ValueError(f"ROI {axis}-range [{start}, {start + size}) is out of bounds [0, {dim})")
+    for c in channels or []:
+        if c < 0 or c >= spec.channels:
+            raise ValueError(f"Requested channel index {c} is out of range [0, {spec.channels})")
+
+
+def _read_bricked_roi(blob, header: SnapshotHeaderV08, spec: VolumeSpecV06, header_len: int,
+                      roi: RoiV06, channels: Optional[List[int]],
+                      dtype: Optional[str] = None) -> "np.ndarray":
+    _check_roi_request(spec, roi, channels)
+
+    tiling, offsets = _parse_brick_table_v08(blob, header, header_len)
+    nx, ny, _ = tiling.tiles_per_axis
+
+    def _load(idx: TileIndexV07):
+        # A zero-copy slice: for 'PLANAR' bricks only the pages of the
+        # requested channel planes are then read from the mapping.
+        i = (idx.tz * ny + idx.ty) * nx + idx.tx
+        add_bytes_read(int(offsets[i + 1] - offsets[i]))
+        return memoryview(blob)[int(offsets[i]) : int(offsets[i + 1])]
+
+    return assemble_roi_from_tiles_v08(tiling, spec, roi, _load, channels=channels, dtype=dtype)
+
+
+def read_snapshot_header_v08(path: str) -> SnapshotHeaderV08:
+    """
+    Parse only the header of a snapshot (the payload is memory-mapped, not read).
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header, _, _ = _parse_snapshot_header_v08(mm)
+    return header
+
+
+@instrumented("snapshot_v08.read")
+def read_snapshot_v08(path: str) -> Tuple[SnapshotHeaderV08, VolumeSpecV06, bytes]:
+    with open(path, "rb") as f:
+        blob = f.read()
+    add_bytes_read(len(blob))
+
+    header, spec, header_len = _parse_snapshot_header_v08(blob)
+    if header.layout == "BRICKED":
+        x, y, z = spec.dims
+        vol = _read_bricked_roi(blob, header, spec, header_len, RoiV06(0, 0, 0, x, y, z), None)
+        payload = _volume_to_bytes(vol, spec)
+    else:
+        payload = blob[header_len:]
+    add_bytes_copied(len(payload))
     return header, spec, payload
 
 
+@instrumented("snapshot_v08.read_roi")
 def read_roi_from_snapshot_v08(
     path: str,
     x: int, y: int, z: int,
     w: int, h: int, d: int,
     channels: Optional[list[int]] = None,
+    dtype: Optional[str] = None,
+) -> "np.ndarray":
+    """
+    Read an ROI without loading the whole snapshot.
+
+    The file is memory-mapped and the ROI is gathered straight from the
+    mapping, so only the pages holding ROI voxels are read from disk. For
+    'MORTON' snapshots those pages form a few contiguous ranges; for
+    bricked snapshots each intersecting brick is one contiguous read. For
+    'PLANAR' snapshots a channel subset only touches the requested planes.
+
+    The stored dtype is mapped zero-copy; pass 'dtype' to receive the ROI
+    converted to another dtype during the copy out of the mapping.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header, spec, header_len = _parse_snapshot_header_v08(mm)
+        roi = RoiV06(x, y, z, w, h, d)
+        if header.layout == "BRICKED":
+            return _read_bricked_roi(mm, header, spec, header_len, roi, channels, dtype)
+        _check_roi_request(spec, roi, channels)
+        payload = memoryview(mm)[header_len:]
+        try:
+            out = read_region_from_bytes(payload, spec, x=x, y=y, z=z, w=w, h=h, d=d, channels=channels, copy=True, dtype=dtype)
+        finally:
+            payload.release()
+        add_bytes_read(out.size * np.dtype(spec.dtype).itemsize)
+        add_bytes_copied(out.nbytes)
+        return out
+
+
+@instrumented("snapshot_v08.read_regions")
+def read_regions_from_snapshot_v08(
+    path: str,
+    origins,
+    size: Tuple[int, int, int],
+    channels: Optional[list[int]] = None,
+    dtype: Optional[str] = None,
 ) -> "np.ndarray":
-    header, spec, payload = read_snapshot_v08(path)
-    return read_region_from_bytes(payload, spec, x=x, y=y, z=z, w=w, h=h, d=d, channels=channels, copy=True)
+    """
+    Read N equally sized ROIs (see roi_v06.read_regions) from a snapshot in
+    one call; returns (N, d, h, w, C_sel).
+
+    Dense snapshots are gathered straight from the memory mapping. Bricked
+    snapshots are assembled ROI by ROI into the same preallocated output.
+    """
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header, spec, header_len = _parse_snapshot_header_v08(mm)
+        if header.layout != "BRICKED":
+            payload = memoryview(mm)[header_len:]
+            try:
+                out = read_regions(payload, spec, origins, size, channels=channels, dtype=dtype)
+            finally:
+                payload.release()
+            add_bytes_read(out.size * np.dtype(spec.dtype).itemsize)
+            add_bytes_copied(out.nbytes)
+            return out
+
+        origins = np.asarray(origins, dtype=np.int64).reshape(-1, 3)
+        w, h, d = (int(v) for v in size)
+        n_ch = spec.channels if channels is None else len(channels)
+        out = np.empty((len(origins), d, h, w, n_ch), dtype=np.dtype(dtype or spec.dtype))
+        for i, (x, y, z) in enumerate(origins.tolist()):
+            out[i] = _read_bricked_roi(mm, header, spec, header_len, RoiV06(x, y, z, w, h, d), channels, dtype)
+        return out
+
+
+@instrumented("snapshot_v08.write_region")
+def write_region_to_snapshot_v08(
+    path: str,
+    x: int, y: int, z: int,
+    data: "np.ndarray",
+    channels: Optional[list[int]] = None,
+) -> SnapshotHeaderV08:
+    """
+    Patch a (d, h, w, C_sel) region of a snapshot in place.
+
+    The file is memory-mapped for writing and only the pages covering the
+    region are modified; for bricked snapshots the region is scattered into
+    the intersecting bricks. After the payload is flushed, the header's
+    generation counter is incremented (a single 4-byte write) so readers
+    can detect that the snapshot changed.
+
+    Returns the updated header.
+    """
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE) as mm:
+        header, spec, header_len = _parse_snapshot_header_v08(mm)
+
+        if header.layout == "BRICKED":
+            data = _prepare_region_data(data, spec, x, y, z, channels)
+            d, h, w, _ = data.shape
+            tiling, offsets = _parse_brick_table_v08(mm, header, header_len)
+            nx, ny, _ = tiling.tiles_per_axis
+            brick_spec = replace(spec, dims=tiling.tile_size)
+            ch = slice(None) if channels is None else list(channels)
+            with memoryview(mm) as mv:
+                for idx, tsl, rsl in iter_tile_overlaps_v08(tiling, RoiV06(x, y, z, w, h, d)):
+                    i = (idx.tz * ny + idx.ty) * nx + idx.tx
+                    with mv[int(offsets[i]) : int(offsets[i + 1])] as brick_mv:
+                        brick = _volume_view_from_bytes(brick_mv, brick_spec)
+                        brick[tsl + (ch,)] = data[rsl]
+                        del brick
+        else:
+            with memoryview(mm) as mv, mv[header_len:] as payload:
+                write_region_to_bytes(payload, spec, x, y, z, data, channels=channels)
+
+        mm.flush()
+        generation = (header.generation + 1) & 0xFFFFFFFF
+        struct.pack_into("<I", mm, _GENERATION_OFFSET, generation)
+        mm.flush()
+
+    return replace(header, generation=generation)
@@ -0,0 +1,411 @@
+"""
+sparse_v08.py — CIVD v0.8 sparse voxel container.
+
+Occupancy-style volumes are often only a few percent occupied, but every
+dense representation pays for the empty space. A SparseVolumeV08 keeps
+only the occupied voxels: their Morton keys (uint64, sorted, see
+morton_v08) and a (N, C) value array in the same order. Everything else
+reads as 'background'.
+
+Because the keys are sorted, an ROI is answered by splitting the box into
+aligned octree cells (each one contiguous key range) and binary-searching
+those ranges; only the voxels in the ROI are touched.
+
+On-disk layout ("CIVDSPRS"):
+
+    [ prefix ]   magic(8) + ver(u16) + header_len(u16)
+    [ core   ]   dims(3u32), channels(u32), dtype_code(u16), reserved(u16),
+                 n_voxels(u64), background(f64)
+    [ meta   ]   length-prefixed JSON
+    [ pad    ]   zeros up to an 8-byte boundary
+    [ keys   ]   n_voxels little-endian u64 Morton keys, ascending
+    [ values ]   n_voxels * channels values (little-endian dtype)
+
+File size and ROI I/O scale with the number of occupied voxels.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .morton_v08 import MORTON_MAX_BITS, morton_decode_3d, morton_encode_3d
+from .roi_v06 import VolumeSpecV06, RoiV06, clamp_roi, _volume_to_bytes, _volume_view_from_bytes
+from .tile_header_v08 import DTYPE_CODE, DTYPE_NAME
+
+MAGIC_SPARSE_V08 = b"CIVDSPRS"  # 8 bytes
+
+_SPARSE_PREFIX = struct.Struct("<8s H H")
+_SPARSE_CORE = struct.Struct("<3I I H 2x Q d")
+
+
+def _check_dims(dims: Tuple[int, int, int]) -> None:
+    if max(dims) > (1 << MORTON_MAX_BITS):
+        raise ValueError(f"Sparse dims {dims} exceed {1 << MORTON_MAX_BITS} voxels per axis")
+
+
+# ---------------------------------------------------------------------------
+# Morton key ranges
+# ---------------------------------------------------------------------------
+
+
+def morton_key_ranges_for_roi(roi: RoiV06, max_ranges: int = 512) -> "np.ndarray":
+    """
+    Cover an ROI box with Morton key ranges, returned as an (n, 2) uint64
+    array of sorted, non-overlapping [start, stop) intervals.
+
+    The box is split level by level into aligned octree cells; a cell fully
+    inside the ROI is one exact key range. Once the cell count would exceed
+    'max_ranges', the remaining boundary cells are emitted whole, so the
+    ranges may also cover some keys just outside the ROI.
+    """
+    if roi.w <= 0 or roi.h <= 0 or roi.d <= 0:
+        return np.empty((0, 2), dtype=np.uint64)
+    lo = np.array([roi.x, roi.y, roi.z], dtype=np.int64)
+    hi = lo + np.array([roi.w, roi.h, roi.d], dtype=np.int64)
+
+    level = max(int(int(hi.max()) - 1).bit_length(), 0)
+    cells = np.zeros((1, 3), dtype=np.int64)
+    starts: List["np.ndarray"] = []
+    sizes: List["np.ndarray"] = []
+    children = np.array([[i & 1, (i >> 1) & 1, (i >> 2) & 1] for i in range(8)], dtype=np.int64)
+
+    while len(cells):
+        size = 1 << level
+        keep = np.all((cells < hi) & (cells + size > lo), axis=1)
+        cells = cells[keep]
+        inside = np.all((cells >= lo) & (cells + size <= hi), axis=1)
+        n_emitted = sum(len(s) for s in starts) + int(inside.sum())
+        partial = cells[~inside]
+
+        done = cells[inside]
+        if len(partial) and (level == 0 or n_emitted + 8 * len(partial) > max_ranges):
+            done, partial = cells, partial[:0]
+        starts.append(morton_encode_3d(done[:, 0], done[:, 1], done[:, 2]))
+        sizes.append(np.full(len(done), size ** 3, dtype=np.uint64))
+
+        level -= 1
+        cells = (partial[:, None, :] + children[None, :, :] * (1 << max(level, 0))).reshape(-1, 3)
+
+    start = np.concatenate(starts)
+    stop = start + np.concatenate(sizes)
+    order = np.argsort(start)
+    start, stop = start[order], stop[order]
+
+    # Merge touching ranges.
+    brk = np.nonzero(start[1:] != stop[:-1])[0]
+    first = np.concatenate(([0], brk + 1))
+    last = np.concatenate((brk, [len(start) - 1]))
+    return np.stack([start[first], stop[last]], axis=1)
+
+
+# ---------------------------------------------------------------------------
+# In-memory container
+# ---------------------------------------------------------------------------
+
+
+class SparseVolumeV08:
+    """
+    Occupied voxels of a (x, y, z) volume, sorted by Morton key.
+
+    keys:
+        (N,) uint64 Morton keys, strictly ascending.
+    values:
+        (N, C) array of channel values in key order.
+    background:
+        Value of every voxel that is not stored.
+    """
+
+    def __init__(
+        self,
+        dims: Tuple[int, int, int],
+        keys: "np.ndarray",
+        values: "np.ndarray",
+        background: float = 0,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        _check_dims(dims)
+        keys = np.asarray(keys, dtype=np.uint64)
+        values = np.asarray(values)
+        if values.ndim != 2 or len(values) != len(keys):
+            raise ValueError(f"values must be (N, C) with N={len(keys)}, got {values.shape}")
+        if len(keys) > 1 and not np.all(keys[1:] > keys[:-1]):
+            raise ValueError("keys must be strictly ascending")
+        self.dims = tuple(int(v) for v in dims)
+        self.keys = keys
+        self.values = values
+        self.background = background
+        self.meta = dict(meta or {})
+
+    @property
+    def channels(self) -> int:
+        return int(self.values.shape[1])
+
+    @property
+    def dtype(self) -> str:
+        return self.values.dtype.name
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def occupancy(self) -> float:
+        x, y, z = self.dims
+        return len(self.keys) / float(x * y * z)
+
+    def coords(self) -> "np.ndarray":
+        """
+        (N, 3) int64 voxel coordinates (x, y, z) in key order.
+        """
+        return np.stack(morton_decode_3d(self.keys), axis=1)
+
+    # -- construction ------------------------------------------------------
+
+    @classmethod
+    def from_coords(
+        cls,
+        dims: Tuple[int, int, int],
+        coords: "np.ndarray",
+        values: "np.ndarray",
+        background: float = 0,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> "SparseVolumeV08":
+        """
+        Build from (N, 3) (x, y, z) coordinates and (N, C) values in any
+        order. Duplicate coordinates keep the last value.
+        """
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+        values = np.asarray(values)
+        if values.ndim == 1:
+            values = values[:, None]
+        if np.any(coords < 0) or np.any(coords >= np.asarray(dims)):
+            raise ValueError(f"coords out of bounds for dims={tuple(dims)}")
+        keys = morton_encode_3d(coords[:, 0], coords[:, 1], coords[:, 2])
+        # Reverse so np.unique's first occurrence is the last one given.
+        keys, first = np.unique(keys[::-1], return_index=True)
+        return cls(dims, keys, values[::-1][first], background=background, meta=meta)
+
+    @classmethod
+    def from_dense(
+        cls,
+        buf: bytes,
+        spec: VolumeSpecV06,
+        background: float = 0,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> "SparseVolumeV08":
+        """
+        Keep the voxels of a dense volume buffer where any channel differs
+        from 'background'. Works for every VolumeSpecV06 signature.
+        """
+        vol = _volume_view_from_bytes(buf, spec)
+        zz, yy, xx = np.nonzero(np.any(vol != background, axis=-1))
+        keys = morton_encode_3d(xx, yy, zz)
+        order = np.argsort(keys)
+        return cls(spec.dims, keys[order], vol[zz[order], yy[order], xx[order]], background=background, meta=meta)
+
+    # -- conversion --------------------------------------------------------
+
+    def volume_spec(self, signature: str = "C_CONTIG", order: str = "C") -> VolumeSpecV06:
+        return VolumeSpecV06(dims=self.dims, channels=self.channels, dtype=self.dtype, order=order, signature=signature)
+
+    def to_dense(self, signature: str = "C_CONTIG", order: str = "C") -> Tuple[bytes, VolumeSpecV06]:
+        """
+        Expand to a dense volume buffer; returns (payload, spec).
+        """
+        spec = self.volume_spec(signature=signature, order=order)
+        x, y, z = self.dims
+        vol = np.full((z, y, x, self.channels), self.background, dtype=self.values.dtype)
+        cx, cy, cz = morton_decode_3d(self.keys)
+        vol[cz, cy, cx] = self.values
+        return _volume_to_bytes(vol, spec), spec
+
+    # -- queries -----------------------------------------------------------
+
+    def lookup(self, points: "np.ndarray", channels: Optional[List[int]] = None) -> "np.ndarray":
+        """
+        Values at (M, 3) (x, y, z) points; unoccupied points get 'background'.
+        """
+        _check_channels(channels, self.channels)
+        return _lookup(self.keys, self.values, self.background, points, channels)
+
+    def query_roi(self, roi: RoiV06, channels: Optional[List[int]] = None) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Occupied voxels inside an ROI: (coords (K, 3) x/y/z, values (K, C_sel)),
+        in key order. The ROI is clamped to the volume bounds.
+        """
+        _check_channels(channels, self.channels)
+        return _query_roi(self.keys, self.values, self.dims, roi, channels)
+
+    def read_roi(
+        self,
+        roi: RoiV06,
+        channels: Optional[List[int]] = None,
+        dtype: Optional[str] = None,
+    ) -> "np.ndarray":
+        """
+        Dense (d, h, w, C_sel) ROI array filled with 'background' where unoccupied.
+        """
+        _check_channels(channels, self.channels)
+        return _read_roi(self.keys, self.values, self.background, self.dims, roi, channels, dtype)
+
+
+def _check_channels(channels: Optional[List[int]], n_channels: int) -> None:
+    for c in channels or []:
+        if c < 0 or c >= n_channels:
+            raise ValueError(f"Requested channel index {c} is out of range [0, {n_channels})")
+
+
+def _select(values: "np.ndarray", channels: Optional[List[int]]) -> "np.ndarray":
+    return values if channels is None else values[:, list(channels)]
+
+
+def _lookup(keys, values, background, points, channels) -> "np.ndarray":
+    pts = np.asarray(points, dtype=np.int64).reshape(-1, 3)
+    k = morton_encode_3d(pts[:, 0], pts[:, 1], pts[:, 2])
+    pos = np.searchsorted(keys, k)
+    pos_c = np.minimum(pos, max(len(keys) - 1, 0))
+    hit = (pos < len(keys)) & (keys[pos_c] == k) if len(keys) else np.zeros(len(k), dtype=bool)
+    n_ch = values.shape[1] if channels is None else len(channels)
+    out = np.full((len(k), n_ch), background, dtype=values.dtype)
+    out[hit] = _select(values[pos_c[hit]], channels)
+    return out
+
+
+def _roi_indices(keys, dims, roi: RoiV06) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Return (indices into keys, (K, 3) coords) of stored voxels inside 'roi'.
+    """
+    roi = clamp_roi(roi, dims)
+    ranges = morton_key_ranges_for_roi(roi)
+    if not len(ranges) or not len(keys):
+        return np.empty(0, dtype=np.int64), np.empty((0, 3), dtype=np.int64)
+    a = np.searchsorted(keys, ranges[:, 0])
+    b = np.searchsorted(keys, ranges[:, 1])
+    counts = b - a
+    total = int(counts.sum())
+    # Concatenate the aranges [a_i, b_i) without a Python loop.
+    idx = np.repeat(a - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(total)
+    coords = np.stack(morton_decode_3d(keys[idx]), axis=1)
+    lo = np.array([roi.x, roi.y, roi.z])
+    hi = lo + np.array([roi.w, roi.h, roi.d])
+    inside = np.all((coords >= lo) & (coords < hi), axis=1)
+    return idx[inside], coords[inside]
+
+
+def _query_roi(keys, values, dims, roi, channels) -> Tuple["np.ndarray", "np.ndarray"]:
+    idx, coords = _roi_indices(keys, dims, roi)
+    return coords, _select(values[idx], channels)
+
+
+def _read_roi(keys, values, background, dims, roi, channels, dtype) -> "np.ndarray":
+    roi = clamp_roi(roi, dims)
+    idx, coords = _roi_indices(keys, dims, roi)
+    n_ch = values.shape[1] if channels is None else len(channels)
+    out = np.full((roi.d, roi.h, roi.w, n_ch), background, dtype=np.dtype(dtype or values.dtype))
+    out[coords[:, 2] - roi.z, coords[:, 1] - roi.y, coords[:, 0] - roi.x] = _select(values[idx], channels)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+
+
+def write_sparse_snapshot_v08(path: str, sparse: SparseVolumeV08) -> int:
+    """
+    Write a sparse volume to 'path'; returns the file size in bytes.
+    """
+    dtype_code = DTYPE_CODE.get(sparse.dtype)
+    if dtype_code is None:
+        raise ValueError(f"Unsupported dtype: {sparse.dtype!r}")
+    meta = json.dumps(sparse.meta, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    core = _SPARSE_CORE.pack(*sparse.dims, sparse.channels, dtype_code, len(sparse), float(sparse.background))
+    header_len = _SPARSE_PREFIX.size + len(core) + 4 + len(meta)
+    pad = b"\0" * (-header_len % 8)
+
+    with open(path, "wb") as f:
+        f.write(_SPARSE_PREFIX.pack(MAGIC_SPARSE_V08, 8, header_len))
+        f.write(core)
+        f.write(struct.pack("<I", len(meta)) + meta + pad)
+        f.write(np.ascontiguousarray(sparse.keys, dtype="<u8"))
+        f.write(np.ascontiguousarray(sparse.values, dtype=sparse.values.dtype.newbyteorder("<")))
+        return f.tell()
+
+
+def _parse_sparse_v08(blob) -> Tuple[SparseVolumeV08, int]:
+    """
+    Map a sparse snapshot held in a bytes-like object; keys and values are
+    zero-copy views into 'blob'. Returns (sparse, data_offset).
+    """
+    if len(blob) < _SPARSE_PREFIX.size + _SPARSE_CORE.size + 4:
+        raise ValueError("Not a CIVD v0.8 sparse snapshot")
+    magic, ver, header_len = _SPARSE_PREFIX.unpack_from(blob, 0)
+    if magic != MAGIC_SPARSE_V08 or ver != 8:
+        raise ValueError("Not a CIVD v0.8 sparse snapshot")
+
+    x, y, z, channels, dtype_code, n, background = _SPARSE_CORE.unpack_from(blob, _SPARSE_PREFIX.size)
+    dtype = DTYPE_NAME.get(dtype_code)
+    if dtype is None:
+        raise ValueError("Unknown dtype in sparse snapshot header")
+    off = _SPARSE_PREFIX.size + _SPARSE_CORE.size
+    (meta_len,) = struct.unpack_from("<I", blob, off)
+    if off + 4 + meta_len != header_len:
+        raise ValueError("Header length mismatch")
+    meta_json = bytes(blob[off + 4 : header_len]).decode("utf-8")
+
+    data_off = header_len + (-header_len % 8)
+    itemsize = np.dtype(dtype).itemsize
+    if len(blob) != data_off + n * (8 + channels * itemsize):
+        raise ValueError("Sparse snapshot size mismatch vs header")
+    keys = np.frombuffer(blob, dtype="<u8", count=n, offset=data_off)
+    values = np.frombuffer(blob, dtype=np.dtype(dtype).newbyteorder("<"), count=n * channels, offset=data_off + 8 * n)
+    sparse = SparseVolumeV08.__new__(SparseVolumeV08)
+    sparse.dims = (x, y, z)
+    sparse.keys = keys
+    sparse.values = values.reshape(n, channels)
+    sparse.background = background
+    sparse.meta = json.loads(meta_json) if meta_json else {}
+    return sparse, data_off
+
+
+def read_sparse_snapshot_v08(path: str) -> SparseVolumeV08:
+    """
+    Load a sparse snapshot into memory.
+    """
+    with open(path, "rb") as f:
+        blob = f.read()
+    sparse, _ = _parse_sparse_v08(blob)
+    return sparse
+
+
+def read_roi_from_sparse_snapshot_v08(
+    path: str,
+    roi: RoiV06,
+    channels: Optional[List[int]] = None,
+    dtype: Optional[str] = None,
+    dense: bool = True,
+):
+    """
+    Read an ROI without loading the whole file.
+
+    The file is memory-mapped; the key ranges of the ROI are binary-searched
+    in the mapped key array and only the matching values are gathered. With
+    dense=True returns a (d, h, w, C_sel) array, otherwise (coords, values).
+    """
+    if dtype is not None:
+        dtype = np.dtype(dtype)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        sparse, _ = _parse_sparse_v08(mm)
+        try:
+            # Checked here, not in the helpers: an exception raised where a
+            # view of the mapping is a local would keep it alive past the
+            # mmap close (BufferError).
+            _check_channels(channels, sparse.channels)
+            if dense:
+                return _read_roi(sparse.keys, sparse.values, sparse.background, sparse.dims, roi, channels, dtype)
+            return _query_roi(sparse.keys, sparse.values, sparse.dims, roi, channels)
+        finally:
+            del sparse
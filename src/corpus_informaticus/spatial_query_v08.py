@@ -0,0 +1,324 @@
+"""
+spatial_query_v08.py — CIVD v0.8 non-box spatial queries.
+
+query_tiles_for_roi() only understands axis-aligned RoiV06 boxes, so a
+sensor cone or camera frustum has to be fetched through its bounding box.
+This module selects tiles for spheres, oriented boxes and view frusta
+directly, testing every tile AABB against the shape in one vectorized
+NumPy pass over the tile grid, and extracts just the voxels inside the
+shape:
+
+    shape = FrustumV08.from_camera(position=(0, 32, 32), forward=(1, 0, 0),
+                                   up=(0, 0, 1), fov_y_deg=60, aspect=1.0,
+                                   near=1, far=60)
+    tiles = query_tiles_for_shape_v08(tiling, shape)
+    coords, values = read_shape_from_tile_pack_v08("pack_dir", shape)
+
+Coordinates are continuous voxel space (x, y, z): voxel (i, j, k) covers
+[i, i+1) x [j, j+1) x [k, k+1) and counts as inside a shape when its centre
+(i+0.5, j+0.5, k+0.5) is. Tile tests are conservative: a selected tile may
+contain no voxel centre inside the shape, but no needed tile is missed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, RoiV06
+from .tile_manifest_v07 import TileIndexV07
+from .tile_pack_v08 import (
+    TilingSpecV08,
+    _tile_array,
+    open_tile_loader_v08,
+    tile_extent_v08,
+)
+
+Vec3 = Tuple[float, float, float]
+
+
+# ---------------------------------------------------------------------------
+# Shapes
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class SphereV08:
+    """
+    Ball of 'radius' voxels around 'center' (x, y, z).
+    """
+
+    center: Vec3
+    radius: float
+
+    def aabb(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        c = np.asarray(self.center, dtype=np.float64)
+        return c - self.radius, c + self.radius
+
+    def contains(self, points: "np.ndarray") -> "np.ndarray":
+        d = np.asarray(points, dtype=np.float64) - np.asarray(self.center, dtype=np.float64)
+        return np.einsum("ij,ij->i", d, d) <= self.radius * self.radius
+
+    def intersects_boxes(self, lo: "np.ndarray", hi: "np.ndarray") -> "np.ndarray":
+        c = np.asarray(self.center, dtype=np.float64)
+        d = np.clip(c, lo, hi) - c
+        return np.einsum("ij,ij->i", d, d) <= self.radius * self.radius
+
+
+@dataclass(frozen=True)
+class OrientedBoxV08:
+    """
+    Box with half sizes 'half_extents' along its own axes, centred on 'center'.
+
+    'rotation' is a 3x3 matrix (row-major tuples) whose *columns* are the
+    box axes expressed in volume (x, y, z) coordinates.
+    """
+
+    center: Vec3
+    half_extents: Vec3
+    rotation: Tuple[Vec3, Vec3, Vec3] = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+
+    def _r(self) -> "np.ndarray":
+        return np.asarray(self.rotation, dtype=np.float64)
+
+    def aabb(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        c = np.asarray(self.center, dtype=np.float64)
+        r = np.abs(self._r()) @ np.asarray(self.half_extents, dtype=np.float64)
+        return c - r, c + r
+
+    def contains(self, points: "np.ndarray") -> "np.ndarray":
+        local = (np.asarray(points, dtype=np.float64) - np.asarray(self.center, dtype=np.float64)) @ self._r()
+        return np.all(np.abs(local) <= np.asarray(self.half_extents, dtype=np.float64), axis=1)
+
+    def intersects_boxes(self, lo: "np.ndarray", hi: "np.ndarray") -> "np.ndarray":
+        # Separating-axis test on the 3 volume axes and the 3 box axes.
+        # The 9 edge-cross axes are skipped, which keeps the test
+        # conservative (never rejects an intersecting tile).
+        r = self._r()
+        h = np.asarray(self.half_extents, dtype=np.float64)
+        c = np.asarray(self.center, dtype=np.float64)
+        a_c = (lo + hi) * 0.5
+        a_h = (hi - lo) * 0.5
+        t = c - a_c
+
+        obb_r = np.abs(r) @ h
+        ok = np.all(np.abs(t) <= a_h + obb_r, axis=1)
+
+        aabb_r = a_h @ np.abs(r)
+        ok &= np.all(np.abs(t @ r) <= h + aabb_r, axis=1)
+        return ok
+
+
+@dataclass(frozen=True)
+class FrustumV08:
+    """
+    Convex volume bounded by planes (a, b, c, d): a point p is inside when
+    a*x + b*y + c*z + d >= 0 for every plane (normals point inwards).
+
+    'corners' (the 8 frustum vertices) are optional and only used to
+    bound the shape; FrustumV08.from_camera() fills them in.
+    """
+
+    planes: Tuple[Tuple[float, float, float, float], ...]
+    corners: Optional[Tuple[Vec3, ...]] = None
+
+    @classmethod
+    def from_camera(
+        cls,
+        position: Vec3,
+        forward: Vec3,
+        up: Vec3,
+        fov_y_deg: float,
+        aspect: float,
+        near: float,
+        far: float,
+    ) -> "FrustumV08":
+        """
+        Build a perspective view frustum in voxel coordinates.
+        """
+        if not (0 < near < far):
+            raise ValueError("Frustum requires 0 < near < far")
+        p = np.asarray(position, dtype=np.float64)
+        f = np.asarray(forward, dtype=np.float64)
+        f = f / np.linalg.norm(f)
+        right = np.cross(f, np.asarray(up, dtype=np.float64))
+        if np.linalg.norm(right) == 0:
+            raise ValueError("'up' must not be parallel to 'forward'")
+        right /= np.linalg.norm(right)
+        u = np.cross(right, f)
+
+        ty = math.tan(math.radians(fov_y_deg) / 2)
+        tx = ty * aspect
+
+        normals = [
+            f,                 # near
+            -f,                # far
+            tx * f + right,    # left
+            tx * f - right,    # right
+            ty * f + u,        # bottom
+            ty * f - u,        # top
+        ]
+        offsets = [-(f @ p) - near, (f @ p) + far]
+        offsets += [-(n @ p) for n in normals[2:]]
+        planes = tuple(
+            tuple(float(v) for v in n / np.linalg.norm(n)) + (float(d / np.linalg.norm(n)),)
+            for n, d in zip(normals, offsets)
+        )
+
+        corners = []
+        for dist in (near, far):
+            for sx in (-1, 1):
+                for sy in (-1, 1):
+                    q = p + dist * (f + sx * tx * right + sy * ty * u)
+                    corners.append(tuple(float(v) for v in q))
+        return cls(planes=planes, corners=tuple(corners))  # type: ignore[arg-type]
+
+    def _planes(self) -> "np.ndarray":
+        return np.asarray(self.planes, dtype=np.float64).reshape(-1, 4)
+
+    def aabb(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        if self.corners is None:
+            return np.full(3, -np.inf), np.full(3, np.inf)
+        c = np.asarray(self.corners, dtype=np.float64)
+        return c.min(axis=0), c.max(axis=0)
+
+    def contains(self, points: "np.ndarray") -> "np.ndarray":
+        pl = self._planes()
+        return np.all(np.asarray(points, dtype=np.float64) @ pl[:, :3].T + pl[:, 3] >= 0, axis=1)
+
+    def intersects_boxes(self, lo: "np.ndarray", hi: "np.ndarray") -> "np.ndarray":
+        pl = self._planes()
+        n = pl[:, :3]
+        # Per plane, the box corner furthest along the normal ("p-vertex").
+        pv = np.where(n[None, :, :] >= 0, hi[:, None, :], lo[:, None, :])
+        ok = np.all(np.einsum("mpk,pk->mp", pv, n) + pl[:, 3] >= 0, axis=1)
+        blo, bhi = self.aabb()
+        ok &= np.all((lo <= bhi) & (hi >= blo), axis=1)
+        return ok
+
+
+ShapeV08 = Union[SphereV08, OrientedBoxV08, FrustumV08]
+
+
+# ---------------------------------------------------------------------------
+# Tile selection
+# ---------------------------------------------------------------------------
+
+
+def tile_boxes_v08(tiling: TilingSpecV08) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Return (idx, lo, hi) arrays of shape (n_tiles, 3) in (tz, ty, tx) raster
+    order: tile indices (tx, ty, tz) and their voxel-space AABBs, clipped
+    to the volume.
+    """
+    nx, ny, nz = tiling.tiles_per_axis
+    tz, ty, tx = np.meshgrid(np.arange(nz), np.arange(ny), np.arange(nx), indexing="ij")
+    idx = np.stack([tx.ravel(), ty.ravel(), tz.ravel()], axis=1)
+    size = np.asarray(tiling.tile_size, dtype=np.float64)
+    lo = idx * size
+    hi = np.minimum(lo + size, np.asarray(tiling.volume_dims, dtype=np.float64))
+    return idx, lo, hi
+
+
+def query_tiles_for_shape_v08(tiling: TilingSpecV08, shape: ShapeV08) -> List[TileIndexV07]:
+    """
+    Return the tiles whose AABB intersects 'shape', in (tz, ty, tx) order.
+    """
+    idx, lo, hi = tile_boxes_v08(tiling)
+    hit = shape.intersects_boxes(lo, hi)
+    return [TileIndexV07(tx=int(a), ty=int(b), tz=int(c)) for a, b, c in idx[hit]]
+
+
+def shape_bounding_roi_v08(shape: ShapeV08, dims: Tuple[int, int, int]) -> RoiV06:
+    """
+    Smallest in-bounds RoiV06 containing every voxel centre inside 'shape'.
+    """
+    lo, hi = shape.aabb()
+    d = np.asarray(dims)
+    x0, y0, z0 = np.clip(np.floor(lo - 0.5) + 1, 0, d).astype(int)
+    x1, y1, z1 = np.clip(np.floor(hi - 0.5) + 1, 0, d).astype(int)
+    return RoiV06(
+        x=int(x0), y=int(y0), z=int(z0),
+        w=int(max(x1 - x0, 0)), h=int(max(y1 - y0, 0)), d=int(max(z1 - z0, 0)),
+    )
+
+
+def shape_mask_v08(shape: ShapeV08, roi: RoiV06) -> "np.ndarray":
+    """
+    Boolean (d, h, w) mask of the voxels of 'roi' whose centres lie inside 'shape'.
+    """
+    z, y, x = np.meshgrid(
+        np.arange(roi.z, roi.z + roi.d) + 0.5,
+        np.arange(roi.y, roi.y + roi.h) + 0.5,
+        np.arange(roi.x, roi.x + roi.w) + 0.5,
+        indexing="ij",
+    )
+    pts = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+    return shape.contains(pts).reshape(roi.d, roi.h, roi.w)
+
+
+# ---------------------------------------------------------------------------
+# Masked extraction
+# ---------------------------------------------------------------------------
+
+
+def extract_shape_from_tiles_v08(
+    tiling: TilingSpecV08,
+    volume_spec: VolumeSpecV06,
+    shape: ShapeV08,
+    load_tile: Callable[[TileIndexV07], bytes],
+    channels: Optional[List[int]] = None,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Gather the voxels inside 'shape', loading only the tiles it touches.
+
+    Returns (coords, values): coords is (N, 3) int64 voxel (x, y, z),
+    values is (N, C_sel) in the volume dtype. Voxels are ordered by tile
+    (tz, ty, tx raster order), then z, y, x within each tile.
+    """
+    if channels is not None:
+        for c in channels:
+            if c < 0 or c >= volume_spec.channels:
+                raise ValueError(
+                    f"Requested channel index {c} is out of range [0, {volume_spec.channels})"
+                )
+    ch = slice(None) if channels is None else list(channels)
+    n_ch = volume_spec.channels if channels is None else len(channels)
+
+    coords: List["np.ndarray"] = []
+    values: List["np.ndarray"] = []
+    sx, sy, sz = tiling.tile_size
+    for idx in query_tiles_for_shape_v08(tiling, shape):
+        ex, ey, ez = tile_extent_v08(tiling, idx)
+        roi = RoiV06(x=idx.tx * sx, y=idx.ty * sy, z=idx.tz * sz, w=ex, h=ey, d=ez)
+        mask = shape_mask_v08(shape, roi)
+        if not mask.any():
+            continue
+
+        tile = _tile_array(tiling, idx, volume_spec, load_tile(idx))
+        kz, ky, kx = np.nonzero(mask)
+        values.append(tile[:ez, :ey, :ex][kz, ky, kx][:, ch])
+        coords.append(np.stack([kx + roi.x, ky + roi.y, kz + roi.z], axis=1).astype(np.int64))
+
+    if not coords:
+        return np.empty((0, 3), dtype=np.int64), np.empty((0, n_ch), dtype=np.dtype(volume_spec.dtype))
+    return np.concatenate(coords), np.concatenate(values)
+
+
+def read_shape_from_tile_pack_v08(
+    out_dir: str,
+    shape: ShapeV08,
+    channels: Optional[List[int]] = None,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Extract the voxels inside 'shape' from a v0.8 tile pack folder.
+    See extract_shape_from_tiles_v08() for the return layout.
+    """
+    tiling, volume_spec, load_tile, close = open_tile_loader_v08(out_dir)
+    try:
+        return extract_shape_from_tiles_v08(tiling, volume_spec, shape, load_tile, channels=channels)
+    finally:
+        close()
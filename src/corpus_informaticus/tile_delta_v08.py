@@ -0,0 +1,280 @@
+"""
+tile_delta_v08.py — CIVD v0.8 temporal delta tile packs.
+
+A temporal pack is a folder of time steps. Each step is an ordinary v0.8
+tile pack that only contains the tiles whose content changed since the
+previous step, plus a delta manifest that maps *every* tile index to the
+step that last wrote it:
+
+    temporal_root/
+      ├── temporal_manifest.json      (steps + tiling + volume spec)
+      ├── step_000000/
+      │     ├── tiling_manifest.json  (v0.8, lists only the tiles stored here)
+      │     ├── delta_manifest.json   (tile -> [source step, content hash])
+      │     └── tile_tx*_ty*_tz*.bin
+      └── step_000001/
+            └── ...
+
+Change detection uses a content hash (BLAKE2b) of each tile payload, so
+write bandwidth and storage scale with the number of changed tiles rather
+than the volume size. Reading an ROI at any step opens only the tiles the
+ROI touches, wherever they were stored.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import functools
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, RoiV06
+from .tile_manifest_v07 import TileIndexV07
+from .tile_pack_v07 import tile_index_to_name
+from .tile_pack_v08 import (
+    TilingSpecV08,
+    assemble_roi_from_tiles_v08,
+    read_tile_file_payload_auto,
+    write_tile_pack_v08,
+)
+from .tile_store_v08 import tile_content_hash
+
+TEMPORAL_MANIFEST_FILENAME = "temporal_manifest.json"
+DELTA_MANIFEST_FILENAME = "delta_manifest.json"
+
+
+# ---------------------------------------------------------------------------
+# Data classes
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class DeltaStepInfoV08:
+    """
+    Summary of a written time step.
+
+    step:
+        Step number (0-based).
+    tiles_total:
+        Number of tiles referenced by this step.
+    tiles_written:
+        Number of tiles physically stored in this step's folder.
+    bytes_written:
+        Total payload bytes stored for this step (headers excluded).
+    """
+
+    step: int
+    tiles_total: int
+    tiles_written: int
+    bytes_written: int
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+
+def step_dir_name(step: int) -> str:
+    return f"step_{step:06d}"
+
+
+def _tiling_dict(tiling: TilingSpecV08, volume_spec: VolumeSpecV06) -> Dict:
+    return {
+        "volume_dims": list(tiling.volume_dims),
+        "tile_size": list(tiling.tile_size),
+        "tiles_per_axis": list(tiling.tiles_per_axis),
+        "volume_spec": {
+            "dims": list(volume_spec.dims),
+            "channels": volume_spec.channels,
+            "dtype": volume_spec.dtype,
+            "order": volume_spec.order,
+            "signature": volume_spec.signature,
+        },
+    }
+
+
+def _load_temporal_manifest(root: str) -> Optional[Dict]:
+    path = os.path.join(root, TEMPORAL_MANIFEST_FILENAME)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json_atomic(path: str, data: Dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_delta_step_v08(root: str, step: int) -> Dict[TileIndexV07, Tuple[int, str]]:
+    """
+    Return the full tile reference map for a step:
+
+        TileIndexV07 -> (source_step, content_hash)
+    """
+    path = os.path.join(root, step_dir_name(step), DELTA_MANIFEST_FILENAME)
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    refs: Dict[TileIndexV07, Tuple[int, str]] = {}
+    for tx, ty, tz, src_step, digest in data["tiles"]:
+        refs[TileIndexV07(tx=tx, ty=ty, tz=tz)] = (int(src_step), str(digest))
+    return refs
+
+
+def load_temporal_pack_v08(root: str) -> Tuple[TilingSpecV08, VolumeSpecV06, List[int]]:
+    """
+    Load (tiling, volume_spec, steps) from a temporal pack root.
+    """
+    data = _load_temporal_manifest(root)
+    if data is None:
+        raise FileNotFoundError(f"No {TEMPORAL_MANIFEST_FILENAME} in {root!r}")
+
+    vs = data["volume_spec"]
+    volume_spec = VolumeSpecV06(
+        dims=tuple(vs["dims"]),  # type: ignore[arg-type]
+        channels=int(vs["channels"]),
+        dtype=str(vs["dtype"]),
+        order=str(vs["order"]),
+        signature=str(vs["signature"]),
+    )
+    tiling = TilingSpecV08(
+        volume_dims=tuple(data["volume_dims"]),        # type: ignore[arg-type]
+        tile_size=tuple(data["tile_size"]),            # type: ignore[arg-type]
+        tiles_per_axis=tuple(data["tiles_per_axis"]),  # type: ignore[arg-type]
+    )
+    return tiling, volume_spec, [int(s) for s in data["steps"]]
+
+
+# ---------------------------------------------------------------------------
+# Writer
+# ---------------------------------------------------------------------------
+
+
+def write_delta_step_v08(
+    root: str,
+    tiling: TilingSpecV08,
+    tiles: Dict[TileIndexV07, bytes],
+    volume_spec: VolumeSpecV06,
+    add_tile_headers: bool = True,
+) -> DeltaStepInfoV08:
+    """
+    Append a new time step to a temporal pack.
+
+    'tiles' is the full tile set for this step (as returned by
+    tile_volume_buffer_v08). Only tiles whose content hash differs from
+    the previous step are written; unchanged tiles are referenced from
+    the step that last stored them.
+    """
+    os.makedirs(root, exist_ok=True)
+
+    layout = _tiling_dict(tiling, volume_spec)
+    temporal = _load_temporal_manifest(root)
+
+    prev_refs: Dict[TileIndexV07, Tuple[int, str]] = {}
+    if temporal is None:
+        temporal = {"schema": "civd.temporal.manifest.v1", "tiling_version": "0.8", "steps": []}
+        temporal.update(layout)
+    else:
+        for key, value in layout.items():
+            if temporal.get(key) != value:
+                raise ValueError(
+                    f"Temporal pack layout mismatch on {key!r}: "
+                    f"{temporal.get(key)!r} != {value!r}"
+                )
+        if temporal["steps"]:
+            prev_refs = load_delta_step_v08(root, temporal["steps"][-1])
+
+    step = temporal["steps"][-1] + 1 if temporal["steps"] else 0
+
+    refs: Dict[TileIndexV07, Tuple[int, str]] = {}
+    changed: Dict[TileIndexV07, bytes] = {}
+    for idx, payload in tiles.items():
+        digest = tile_content_hash(payload)
+        prev = prev_refs.get(idx)
+        if prev is not None and prev[1] == digest:
+            refs[idx] = prev
+        else:
+            refs[idx] = (step, digest)
+            changed[idx] = payload
+
+    step_dir = os.path.join(root, step_dir_name(step))
+    write_tile_pack_v08(step_dir, tiling, changed, volume_spec, add_tile_headers=add_tile_headers)
+
+    delta = {
+        "schema": "civd.tiling.delta.v1",
+        "step": step,
+        "base_step": temporal["steps"][-1] if temporal["steps"] else None,
+        "tiles": [
+            [idx.tx, idx.ty, idx.tz, src, digest]
+            for idx, (src, digest) in sorted(refs.items(), key=lambda kv: (kv[0].tz, kv[0].ty, kv[0].tx))
+        ],
+    }
+    _write_json_atomic(os.path.join(step_dir, DELTA_MANIFEST_FILENAME), delta)
+
+    # The root manifest is updated last, so a crash mid-step leaves the
+    # previous steps readable and the partial step unreferenced.
+    temporal["steps"].append(step)
+    _write_json_atomic(os.path.join(root, TEMPORAL_MANIFEST_FILENAME), temporal)
+
+    return DeltaStepInfoV08(
+        step=step,
+        tiles_total=len(refs),
+        tiles_written=len(changed),
+        bytes_written=sum(len(p) for p in changed.values()),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Reader
+# ---------------------------------------------------------------------------
+
+
+def _read_ref_tile(
+    root: str,
+    step: int,
+    refs: Dict[TileIndexV07, Tuple[int, str]],
+    idx: TileIndexV07,
+) -> bytes:
+    """
+    Payload of 'idx' from the step folder that 'refs' (the delta map of
+    'step') points it to.
+    """
+    if idx not in refs:
+        raise KeyError(f"Tile {idx} not present at step {step}")
+    src_step, _ = refs[idx]
+    _, payload = read_tile_file_payload_auto(
+        os.path.join(root, step_dir_name(src_step), tile_index_to_name(idx))
+    )
+    return payload
+
+
+def read_tile_at_step_v08(root: str, step: int, idx: TileIndexV07) -> bytes:
+    """
+    Return the payload of one tile as seen at 'step'.
+    """
+    return _read_ref_tile(root, step, load_delta_step_v08(root, step), idx)
+
+
+def read_roi_from_delta_pack_v08(
+    root: str,
+    step: int,
+    roi: RoiV06,
+    channels: Optional[List[int]] = None,
+    dtype: Optional[str] = None,
+) -> "np.ndarray":
+    """
+    Reconstruct an ROI as of 'step', reading only the tiles it intersects.
+    """
+    tiling, volume_spec, steps = load_temporal_pack_v08(root)
+    if step not in steps:
+        raise ValueError(f"Step {step} not found in temporal pack (steps={steps})")
+
+    refs = load_delta_step_v08(root, step)
+    load = functools.partial(_read_ref_tile, root, step, refs)
+    return assemble_roi_from_tiles_v08(tiling, volume_spec, roi, load, channels=channels, dtype=dtype)
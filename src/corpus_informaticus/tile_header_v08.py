@@ -12,15 +12,39 @@ import struct
 from typing import Optional, Tuple
 
 MAGIC_TILE_V08 = b"CIVDTILE"  # 8 bytes
-TILE_HEADER_STRUCT_V08 = struct.Struct("<8s H H I 3I 3I I H H B 7x Q")
+# magic, ver, header_len, flags, tx,ty,tz, sx,sy,sz, channels, dtype, sig, order,
+# extent (3u16, zeros = full tile_size), reserved(1), payload_nbytes
+TILE_HEADER_STRUCT_V08 = struct.Struct("<8s H H I 3I 3I I H H B 3H x Q")
 TILE_HEADER_LEN_V08 = TILE_HEADER_STRUCT_V08.size  # 64 bytes
 
+# header flags
+TILE_FLAG_RAGGED = 0x0001      # payload covers 'extent' voxels, not the full tile_size
+TILE_FLAG_SHUFFLE = 0x0002     # payload bytes are byte-shuffled (see tile_filters_v08)
+TILE_FLAG_BITSHUFFLE = 0x0004  # payload bits are bit-shuffled
+TILE_FLAG_DELTA_X = 0x0008     # values are delta-coded along x
+TILE_FLAG_PALETTE = 0x0010     # per-channel palette + bit-packed indices (see palette_v08)
 
-# dtype codes (minimal set; extend later)
+# bits 8..11 of the flags hold the compressor code
+TILE_COMPRESSOR_SHIFT = 8
+TILE_COMPRESSOR_MASK = 0x0F00
+COMPRESSOR_CODE = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+COMPRESSOR_NAME = {v: k for k, v in COMPRESSOR_CODE.items()}
+
+# flags that change how the stored payload must be decoded
+TILE_ENCODING_MASK = (
+    TILE_FLAG_SHUFFLE | TILE_FLAG_BITSHUFFLE | TILE_FLAG_DELTA_X | TILE_FLAG_PALETTE | TILE_COMPRESSOR_MASK
+)
+
+
+# dtype codes (shared by snapshot and tile-index headers); values are little-endian
 DTYPE_CODE = {
     "uint8": 1,
     "uint16": 2,
     "float32": 3,
+    "float16": 4,
+    "int16": 5,
+    "int32": 6,
+    "float64": 7,
 }
 DTYPE_NAME = {v: k for k, v in DTYPE_CODE.items()}
 
@@ -28,6 +52,8 @@ DTYPE_NAME = {v: k for k, v in DTYPE_CODE.items()}
 SIGNATURE_CODE = {
     "C_CONTIG": 1,
     "F_CONTIG": 2,
+    "MORTON": 3,
+    "PLANAR": 4,
 }
 SIGNATURE_NAME = {v: k for k, v in SIGNATURE_CODE.items()}
 
@@ -49,7 +75,14 @@ class TileHeaderV08:
     dtype: str
     signature: str
     order: str
-    payload_nbytes: int
+    payload_nbytes: int  # stored (possibly filtered/compressed) payload size
+    extent: Optional[Tuple[int, int, int]] = None  # (x,y,z) stored extent of a ragged edge tile
+
+    def stored_shape(self) -> Tuple[int, int, int]:
+        """
+        (x, y, z) voxel extent actually stored in the payload.
+        """
+        return self.extent if self.extent is not None else self.tile_size
 
     def to_bytes(self) -> bytes:
         if self.tile_format_ver != 8:
@@ -66,6 +99,9 @@ class TileHeaderV08:
         order_code = ORDER_CODE.get(self.order)
         if order_code is None:
             raise ValueError(f"Unsupported order: {self.order!r}")
+        ex, ey, ez = self.extent if self.extent is not None else (0, 0, 0)
+        if max(ex, ey, ez) > 0xFFFF:
+            raise ValueError(f"Tile extent {self.extent} does not fit the v0.8 header (max 65535)")
 
         return TILE_HEADER_STRUCT_V08.pack(
             MAGIC_TILE_V08,
@@ -82,6 +118,9 @@ class TileHeaderV08:
             dtype_code,
             sig_code,
             order_code,
+            ex,
+            ey,
+            ez,
             self.payload_nbytes,
         )
 
@@ -112,6 +151,9 @@ def try_parse_tile_header_v08(blob: bytes) -> Optional[TileHeaderV08]:
         dtype_code,
         sig_code,
         order_code,
+        ex,
+        ey,
+        ez,
         payload_nbytes,
     ) = TILE_HEADER_STRUCT_V08.unpack_from(blob, 0)
 
@@ -140,4 +182,5 @@ def try_parse_tile_header_v08(blob: bytes) -> Optional[TileHeaderV08]:
         signature=signature,
         order=order,
         payload_nbytes=payload_nbytes,
+        extent=(ex, ey, ez) if (ex or ey or ez) else None,
     )
@@ -0,0 +1,366 @@
+"""
+tile_index_v08.py — CIVD v0.8 binary tile-pack manifest (tile index).
+
+A compact, mmap-readable alternative to the JSON tiling manifest:
+
+    tiling_manifest.bin
+      [ header (72 bytes) ]
+          magic "CIVDTIDX", version(u16), flags(u16),
+          volume_dims(3u32), tile_size(3u32), tiles_per_axis(3u32),
+          channels(u32), dtype_code(u16), sig_code(u16), order_code(u8),
+          file_format(u8), pack_encoding(u16), reserved(4), n_entries(u64)
+      [ entries (n_entries * 24 bytes) ]
+          nbytes(u64), offset(u64), crc32(u32), entry_flags(u32)
+          (entry_flags bits 16..31 mirror the CIVDTILE header flags)
+
+There is one entry per grid cell in (tz, ty, tx) raster order, so the
+entry for a tile is found in O(1) without parsing anything else; absent
+tiles have entry_flags == 0. 'offset' is the payload offset inside the
+tile file (the CIVDTILE header length, or 0 for raw tiles) and 'nbytes'
+the stored payload size. 'crc32' is only meaningful when the header flag
+TILE_INDEX_HAS_CRC is set. Because the tile flags are mirrored in the
+entry, filtered/compressed tiles are decoded without parsing their header.
+'pack_encoding' holds the pack-wide filter/compressor flags (the
+CIVDTILE encoding bits) that newly created tiles get, and the header flag
+TILE_INDEX_RAGGED marks packs with cropped edge tiles, so a pack without
+a JSON manifest can still be extended consistently.
+
+The JSON manifest can still be written next to it as a sidecar.
+
+Rewrites (write_region_to_tile_pack_v08) replace tile files first and the
+index last, so for a moment the index on disk can describe the previous
+tile contents. TileIndexV08.read_tile() therefore treats a size/CRC/decode
+failure as possibly stale: it reopens the index if the file was replaced
+and retries for up to 'retry_timeout' seconds before raising.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .instrument_v08 import add_bytes_read, instrument_span
+from .roi_v06 import VolumeSpecV06
+from .tile_header_v08 import (
+    DTYPE_CODE,
+    DTYPE_NAME,
+    ORDER_CODE,
+    ORDER_NAME,
+    SIGNATURE_CODE,
+    SIGNATURE_NAME,
+    TILE_ENCODING_MASK,
+    TILE_FLAG_RAGGED,
+)
+from .tile_filters_v08 import decode_tile_payload_v08
+from .tile_manifest_v07 import TileIndexV07
+from .tile_pack_v07 import tile_index_to_name
+
+MAGIC_TILE_INDEX_V08 = b"CIVDTIDX"
+TILE_INDEX_FILENAME = "tiling_manifest.bin"
+
+# How long read_tile() keeps retrying a tile whose bytes do not match a
+# possibly stale index (see module docstring).
+STALE_INDEX_RETRY_TIMEOUT = 0.5
+
+_INDEX_HEADER = struct.Struct("<8s H H 3I 3I 3I I H H B B H 4x Q")  # 72 bytes
+
+TILE_INDEX_ENTRY_DTYPE = np.dtype(
+    [("nbytes", "<u8"), ("offset", "<u8"), ("crc32", "<u4"), ("flags", "<u4")]
+)
+
+# header flags
+TILE_INDEX_HAS_CRC = 0x1
+TILE_INDEX_RAGGED = 0x2
+
+# entry flags
+TILE_ENTRY_PRESENT = 0x1
+TILE_ENTRY_TILE_FLAGS_SHIFT = 16
+
+FILE_FORMAT_CODE = {"CIVDTILE_V08": 1, "RAW_V07": 2}
+FILE_FORMAT_NAME = {v: k for k, v in FILE_FORMAT_CODE.items()}
+
+
+def _raster_index(idx: TileIndexV07, tiles_per_axis: Tuple[int, int, int]) -> int:
+    nx, ny, _ = tiles_per_axis
+    return (idx.tz * ny + idx.ty) * nx + idx.tx
+
+
+def write_tile_index_v08(
+    path: str,
+    volume_dims: Tuple[int, int, int],
+    tile_size: Tuple[int, int, int],
+    tiles_per_axis: Tuple[int, int, int],
+    volume_spec: VolumeSpecV06,
+    tile_file_format: str,
+    tiles: Dict[TileIndexV07, Tuple[int, int, Optional[int]]],
+    tile_flags: Optional[Dict[TileIndexV07, int]] = None,
+    pack_encoding: int = 0,
+    ragged: bool = False,
+) -> str:
+    """
+    Write a binary tile index.
+
+    'tiles' maps each stored tile to (payload_nbytes, payload_offset, crc32_or_None).
+    CRCs are recorded only if every tile provides one. 'tile_flags'
+    optionally gives each tile's CIVDTILE header flags; 'pack_encoding' and
+    'ragged' record the pack-wide tile encoding and edge-tile mode.
+    """
+    tile_flags = tile_flags or {}
+    nx, ny, nz = tiles_per_axis
+    entries = np.zeros(nx * ny * nz, dtype=TILE_INDEX_ENTRY_DTYPE)
+
+    has_crc = bool(tiles) and all(crc is not None for _, _, crc in tiles.values())
+    for idx, (nbytes, offset, crc) in tiles.items():
+        if not (0 <= idx.tx < nx and 0 <= idx.ty < ny and 0 <= idx.tz < nz):
+            raise ValueError(f"Tile index {idx} out of range for tiles_per_axis={tiles_per_axis}")
+        e = entries[_raster_index(idx, tiles_per_axis)]
+        e["nbytes"] = nbytes
+        e["offset"] = offset
+        e["crc32"] = crc if has_crc else 0
+        e["flags"] = TILE_ENTRY_PRESENT | ((tile_flags.get(idx, 0) & 0xFFFF) << TILE_ENTRY_TILE_FLAGS_SHIFT)
+
+    header = _INDEX_HEADER.pack(
+        MAGIC_TILE_INDEX_V08,
+        8,
+        (TILE_INDEX_HAS_CRC if has_crc else 0) | (TILE_INDEX_RAGGED if ragged else 0),
+        *volume_dims,
+        *tile_size,
+        *tiles_per_axis,
+        volume_spec.channels,
+        DTYPE_CODE[volume_spec.dtype],
+        SIGNATURE_CODE[volume_spec.signature],
+        ORDER_CODE[volume_spec.order],
+        FILE_FORMAT_CODE[tile_file_format],
+        pack_encoding & TILE_ENCODING_MASK,
+        len(entries),
+    )
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(entries.tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+def tile_payload_crc32(payload: bytes) -> int:
+    return zlib.crc32(payload) & 0xFFFFFFFF
+
+
+class TileIndexV08:
+    """
+    Lazy, mmap-backed view of a binary tile index.
+
+    Opening costs one header parse; tile lookups are O(1) reads from the
+    memory-mapped entry table.
+    """
+
+    def __init__(self, out_dir: str, retry_timeout: float = STALE_INDEX_RETRY_TIMEOUT) -> None:
+        self.out_dir = out_dir
+        self.retry_timeout = retry_timeout
+        self._path = os.path.join(out_dir, TILE_INDEX_FILENAME)
+        self._open()
+
+    @classmethod
+    def from_bytes(cls, blob: bytes, out_dir: str = "") -> "TileIndexV08":
+        """
+        Parse an in-memory copy of a tiling_manifest.bin, e.g. one fetched
+        from a byte-range store. Lookups work as usual; read_tile() reads
+        the tile files under 'out_dir' and is only useful locally.
+        """
+        self = cls.__new__(cls)
+        self.out_dir = out_dir
+        self.retry_timeout = 0.0
+        self._path = None
+        self._f = self._mm = None
+        self._parse(blob)
+        return self
+
+    def _open(self) -> None:
+        self._f = open(self._path, "rb")
+        st = os.fstat(self._f.fileno())
+        self._identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+        self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._parse(self._mm)
+
+    def _parse(self, buf) -> None:
+        (
+            magic, ver, flags,
+            x, y, z,
+            sx, sy, sz,
+            nx, ny, nz,
+            channels, dtype_code, sig_code, order_code, fmt_code,
+            pack_encoding, n_entries,
+        ) = _INDEX_HEADER.unpack_from(buf, 0)
+
+        if magic != MAGIC_TILE_INDEX_V08 or ver != 8:
+            self.close()
+            raise ValueError(f"Not a CIVD v0.8 tile index: {self.out_dir!r}")
+        if n_entries != nx * ny * nz:
+            self.close()
+            raise ValueError("Tile index entry count does not match tiles_per_axis")
+
+        self.flags = flags
+        self.volume_dims = (x, y, z)
+        self.tile_size = (sx, sy, sz)
+        self.tiles_per_axis = (nx, ny, nz)
+        self.tile_file_format = FILE_FORMAT_NAME[fmt_code]
+        self.pack_encoding = pack_encoding
+        self.volume_spec = VolumeSpecV06(
+            dims=(x, y, z),
+            channels=channels,
+            dtype=DTYPE_NAME[dtype_code],
+            order=ORDER_NAME[order_code],
+            signature=SIGNATURE_NAME[sig_code],
+        )
+        self.entries = np.frombuffer(
+            buf, dtype=TILE_INDEX_ENTRY_DTYPE, count=n_entries, offset=_INDEX_HEADER.size
+        )
+
+    @property
+    def has_crc(self) -> bool:
+        return bool(self.flags & TILE_INDEX_HAS_CRC)
+
+    @property
+    def ragged(self) -> bool:
+        return bool(self.flags & TILE_INDEX_RAGGED)
+
+    def lookup(self, idx: TileIndexV07) -> Optional[Tuple[int, int, int]]:
+        """
+        Return (nbytes, offset, crc32) for a tile, or None if it is not stored.
+        """
+        nx, ny, nz = self.tiles_per_axis
+        if not (0 <= idx.tx < nx and 0 <= idx.ty < ny and 0 <= idx.tz < nz):
+            return None
+        e = self.entries[_raster_index(idx, self.tiles_per_axis)]
+        if not (int(e["flags"]) & TILE_ENTRY_PRESENT):
+            return None
+        return int(e["nbytes"]), int(e["offset"]), int(e["crc32"])
+
+    def tile_flags(self, idx: TileIndexV07) -> int:
+        """
+        CIVDTILE header flags recorded for a stored tile (0 if absent).
+        """
+        if self.lookup(idx) is None:
+            return 0
+        e = self.entries[_raster_index(idx, self.tiles_per_axis)]
+        return int(e["flags"]) >> TILE_ENTRY_TILE_FLAGS_SHIFT
+
+    def stored_shape(self, idx: TileIndexV07) -> Tuple[int, int, int]:
+        """
+        (x, y, z) extent of a tile's payload: the clipped edge extent if
+        its TILE_FLAG_RAGGED flag is set, tile_size otherwise.
+        """
+        if self.tile_flags(idx) & TILE_FLAG_RAGGED:
+            return tuple(
+                min(s, d - i * s) for s, d, i in zip(self.tile_size, self.volume_dims, (idx.tx, idx.ty, idx.tz))
+            )
+        return self.tile_size
+
+    def __contains__(self, idx: TileIndexV07) -> bool:
+        return self.lookup(idx) is not None
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.entries["flags"] & TILE_ENTRY_PRESENT))
+
+    def present_tiles(self) -> List[TileIndexV07]:
+        nx, ny, _ = self.tiles_per_axis
+        flat = np.nonzero(self.entries["flags"] & TILE_ENTRY_PRESENT)[0]
+        return [
+            TileIndexV07(tx=int(i % nx), ty=int((i // nx) % ny), tz=int(i // (nx * ny)))
+            for i in flat
+        ]
+
+    def reload(self) -> bool:
+        """
+        Reopen the index if the file on disk was replaced; returns True if
+        it was.
+        """
+        if self._path is None:
+            return False
+        try:
+            st = os.stat(self._path)
+        except FileNotFoundError:
+            return False
+        if (st.st_ino, st.st_mtime_ns, st.st_size) == self._identity:
+            return False
+        self.close()
+        self._open()
+        return True
+
+    def read_tile(self, idx: TileIndexV07, verify_crc: bool = True, lazy_palette: bool = False) -> bytes:
+        """
+        Read one tile payload using the recorded offset/size (no header parse).
+
+        Filtered/compressed tiles are decoded; the CRC covers the stored bytes.
+        With lazy_palette=True palette tiles come back as PaletteTileV08.
+
+        A tile that fails its size, CRC or decode check may have been
+        rewritten ahead of the index; the read is retried (reopening a
+        replaced index) until 'retry_timeout' expires, then ValueError is
+        raised.
+        """
+        deadline = time.monotonic() + self.retry_timeout
+        delay = 0.001
+        while True:
+            try:
+                return self._read_tile_once(idx, verify_crc, lazy_palette)
+            except ValueError:
+                if time.monotonic() >= deadline:
+                    raise
+            time.sleep(delay)
+            delay = min(2 * delay, 0.05)
+            self.reload()
+
+    def _read_tile_once(self, idx: TileIndexV07, verify_crc: bool, lazy_palette: bool):
+        entry = self.lookup(idx)
+        if entry is None:
+            raise KeyError(f"Tile {idx} is not stored in {self.out_dir!r}")
+        nbytes, offset, crc = entry
+
+        with open(os.path.join(self.out_dir, tile_index_to_name(idx)), "rb") as f:
+            f.seek(offset)
+            payload = f.read(nbytes)
+        add_bytes_read(len(payload))
+        if len(payload) != nbytes:
+            raise ValueError(f"Tile {idx} is truncated: {len(payload)} != {nbytes} bytes")
+        if verify_crc and self.has_crc:
+            with instrument_span("crc32", nbytes=nbytes):
+                crc_ok = tile_payload_crc32(payload) == crc
+            if not crc_ok:
+                raise ValueError(f"CRC mismatch for tile {idx}")
+
+        flags = self.tile_flags(idx)
+        if flags & TILE_ENCODING_MASK:
+            shape = self.stored_shape(idx)
+            with instrument_span("tile_v08.decode", nbytes=nbytes):
+                try:
+                    payload = decode_tile_payload_v08(
+                        payload, replace(self.volume_spec, dims=shape), flags, lazy_palette=lazy_palette
+                    )
+                except ValueError:
+                    raise
+                except Exception as exc:  # codec-specific errors (zlib.error, ...)
+                    raise ValueError(f"Tile {idx} failed to decode: {exc}") from exc
+        return payload
+
+    def close(self) -> None:
+        self.entries = None  # type: ignore[assignment]
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None  # type: ignore[assignment]
+        if self._f is not None:
+            self._f.close()
+
+    def __enter__(self) -> "TileIndexV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -140,7 +140,8 @@ class TileManifestV07:
         compressor:
             Optional text label for any compression scheme used inside
             tiles (e.g. "none", "lz4", "zstd"). No behavior is enforced
-            here; this is a hint for higher-level code.
+            here; this is a hint for higher-level code. v0.8 tile packs
+            apply it per tile, see tile_filters_v08.
     """
 
     version: str
@@ -0,0 +1,415 @@
+"""
+tile_octree_v08.py — CIVD v0.8 hierarchical sparse tile index (octree).
+
+For very large, mostly empty worlds even enumerating the tiles of an ROI
+is too slow: query_tiles_for_roi() walks every grid cell in range. A
+TileOctreeV08 sits on top of the TileIndexV07 grid of a tile pack:
+
+    level 0        occupied leaf tiles (Morton keys of (tx, ty, tz)); the
+                   leaf data are the pack's ordinary v0.8 tile payloads
+    level 1..L     internal nodes covering 2^l tiles per axis, each with an
+                   8-bit child occupancy mask (bit = child x | y<<1 | z<<2)
+
+Queries descend from the root and only expand set mask bits, so empty
+subtrees are skipped whole:
+
+    octree = open_tile_octree_v08("pack_dir")
+    roi = octree.read_roi(RoiV06(x=0, y=0, z=0, w=4096, h=4096, d=64))
+    vals = octree.lookup(points)
+    hit = octree.raycast(origin, direction)
+
+build_tile_octree_v08() scans an existing pack once (dropping tiles that
+hold only 'background') and stores the leaf set as tile_octree.bin next
+to the manifest; write_region_to_tile_pack_v08() keeps that file current.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import heapq
+import math
+import os
+import struct
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .morton_v08 import morton_decode_3d, morton_encode_3d
+from .roi_v06 import VolumeSpecV06, RoiV06, clamp_roi
+from .tile_manifest_v07 import TileIndexV07
+from .tile_pack_v08 import (
+    TilingSpecV08,
+    _replace_file_atomic,
+    _tile_array,
+    assemble_roi_from_tiles_v08,
+    list_pack_tiles_v08,
+    open_tile_loader_v08,
+)
+
+MAGIC_TILE_OCTREE_V08 = b"CIVDOCTR"
+TILE_OCTREE_FILENAME = "tile_octree.bin"
+
+# magic, version, reserved, tiles_per_axis (3u32), background (f64), n_leaves (u64)
+_OCTREE_HEADER = struct.Struct("<8s H 2x 3I d Q")
+
+_CHILD_OFFSETS = np.arange(8, dtype=np.uint64)
+
+
+@dataclass(frozen=True)
+class RayHitV08:
+    """
+    First occupied voxel along a ray: origin + t * direction lies in 'voxel'.
+    """
+
+    t: float
+    voxel: Tuple[int, int, int]   # (x, y, z)
+    tile: TileIndexV07
+    value: "np.ndarray"           # (C,)
+
+
+def _tile_keys(tiles: Iterable[TileIndexV07]) -> "np.ndarray":
+    t = np.array([idx.as_tuple() for idx in tiles], dtype=np.int64).reshape(-1, 3)
+    return np.unique(morton_encode_3d(t[:, 0], t[:, 1], t[:, 2]))
+
+
+def _key_to_tile(key) -> TileIndexV07:
+    tx, ty, tz = morton_decode_3d(np.uint64(key))
+    return TileIndexV07(tx=int(tx), ty=int(ty), tz=int(tz))
+
+
+class TileOctreeV08:
+    """
+    Octree over the occupied tiles of a tiling.
+
+    'leaves' are the occupied tiles; 'load_tile' (as returned by
+    open_tile_loader_v08) provides their payloads for voxel-level queries.
+    Voxels outside any leaf read as 'background'.
+    """
+
+    def __init__(
+        self,
+        tiling: TilingSpecV08,
+        volume_spec: VolumeSpecV06,
+        leaves: Iterable[TileIndexV07],
+        load_tile: Optional[Callable[[TileIndexV07], bytes]] = None,
+        background: float = 0,
+        close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.tiling = tiling
+        self.volume_spec = volume_spec
+        self.background = background
+        self._load = load_tile
+        self._close = close
+
+        self.depth = max(int(max(tiling.tiles_per_axis) - 1).bit_length(), 0)
+        self.leaf_keys = _tile_keys(leaves)
+
+        # self._nodes[l - 1] = (keys, masks) of level l, keys ascending.
+        self._nodes: List[Tuple["np.ndarray", "np.ndarray"]] = []
+        keys = self.leaf_keys
+        for _ in range(self.depth):
+            parents, start = np.unique(keys >> np.uint64(3), return_index=True)
+            bits = (np.uint8(1) << (keys & np.uint64(7)).astype(np.uint8)) if len(keys) else np.empty(0, np.uint8)
+            masks = np.bitwise_or.reduceat(bits, start) if len(keys) else np.empty(0, np.uint8)
+            self._nodes.append((parents, masks.astype(np.uint8)))
+            keys = parents
+
+    # -- structure ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.leaf_keys)
+
+    def __contains__(self, idx: TileIndexV07) -> bool:
+        key = morton_encode_3d(idx.tx, idx.ty, idx.tz)
+        pos = int(np.searchsorted(self.leaf_keys, key))
+        return pos < len(self.leaf_keys) and self.leaf_keys[pos] == key
+
+    def leaf_tiles(self) -> List[TileIndexV07]:
+        """
+        Occupied tiles in Morton order.
+        """
+        tx, ty, tz = morton_decode_3d(self.leaf_keys)
+        return [TileIndexV07(tx=int(a), ty=int(b), tz=int(c)) for a, b, c in zip(tx, ty, tz)]
+
+    def node_counts(self) -> List[int]:
+        """
+        Number of nodes per level, leaves first.
+        """
+        return [len(self.leaf_keys)] + [len(k) for k, _ in self._nodes]
+
+    def _children(self, level: int, keys: "np.ndarray") -> "np.ndarray":
+        """
+        Keys (at level - 1) of the occupied children of level-'level' nodes.
+        """
+        node_keys, node_masks = self._nodes[level - 1]
+        masks = node_masks[np.searchsorted(node_keys, keys)]
+        bits = np.unpackbits(masks[:, None], axis=1, bitorder="little").astype(bool)
+        return ((keys[:, None] << np.uint64(3)) | _CHILD_OFFSETS)[bits]
+
+    def _node_voxel_box(self, level: int, key) -> Tuple["np.ndarray", "np.ndarray"]:
+        t = np.array(morton_decode_3d(np.uint64(key)), dtype=np.int64)
+        size = np.asarray(self.tiling.tile_size, dtype=np.int64)
+        lo = (t << level) * size
+        hi = np.minimum(((t + 1) << level) * size, np.asarray(self.tiling.volume_dims, dtype=np.int64))
+        return lo, hi
+
+    # -- ROI ---------------------------------------------------------------
+
+    def query_tiles(self, roi: RoiV06) -> List[TileIndexV07]:
+        """
+        Occupied tiles intersecting 'roi' (clamped to the volume), in Morton
+        order. Cost scales with the occupied nodes near the ROI, not with
+        the number of grid cells it spans.
+        """
+        roi = clamp_roi(roi, self.tiling.volume_dims)
+        if not len(self.leaf_keys) or roi.w == 0 or roi.h == 0 or roi.d == 0:
+            return []
+        size = np.asarray(self.tiling.tile_size, dtype=np.int64)
+        lo = np.array([roi.x, roi.y, roi.z], dtype=np.int64) // size
+        hi = (np.array([roi.x + roi.w, roi.y + roi.h, roi.z + roi.d], dtype=np.int64) - 1) // size + 1
+
+        keys = np.zeros(1, dtype=np.uint64)
+        for level in range(self.depth, 0, -1):
+            keys = self._children(level, keys)
+            c = np.stack(morton_decode_3d(keys), axis=1) << (level - 1)
+            keep = np.all((c < hi) & (c + (1 << (level - 1)) > lo), axis=1)
+            keys = keys[keep]
+        if self.depth == 0:
+            keys = self.leaf_keys
+        return [_key_to_tile(k) for k in keys]
+
+    def read_roi(
+        self,
+        roi: RoiV06,
+        channels: Optional[List[int]] = None,
+        dtype: Optional[str] = None,
+    ) -> "np.ndarray":
+        """
+        Dense (d, h, w, C_sel) ROI; only occupied tiles are loaded.
+        """
+        return assemble_roi_from_tiles_v08(
+            self.tiling, self.volume_spec, roi, self._loader(),
+            channels=channels, dtype=dtype, tiles=self.query_tiles(roi), fill=self.background,
+        )
+
+    # -- points ------------------------------------------------------------
+
+    def lookup(self, points: "np.ndarray", channels: Optional[List[int]] = None) -> "np.ndarray":
+        """
+        Values at (M, 3) (x, y, z) voxel points as (M, C_sel). Points in
+        unoccupied tiles or outside the volume get 'background'; each
+        occupied tile is loaded once.
+        """
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 3)
+        ch = slice(None) if channels is None else list(channels)
+        n_ch = self.volume_spec.channels if channels is None else len(channels)
+        out = np.full((len(pts), n_ch), self.background, dtype=np.dtype(self.volume_spec.dtype))
+
+        size = np.asarray(self.tiling.tile_size, dtype=np.int64)
+        inside = np.all((pts >= 0) & (pts < np.asarray(self.tiling.volume_dims)), axis=1)
+        t = pts // size
+        keys = morton_encode_3d(t[:, 0], t[:, 1], t[:, 2])
+        pos = np.minimum(np.searchsorted(self.leaf_keys, keys), max(len(self.leaf_keys) - 1, 0))
+        hit = inside & (self.leaf_keys[pos] == keys) if len(self.leaf_keys) else np.zeros(len(pts), dtype=bool)
+
+        load = self._loader()
+        sel = np.nonzero(hit)[0]
+        uniq, inverse = np.unique(keys[sel], return_inverse=True)
+        for i, key in enumerate(uniq):
+            idx = _key_to_tile(key)
+            rows = sel[inverse.ravel() == i]
+            local = pts[rows] - t[rows] * size
+            tile = _tile_array(self.tiling, idx, self.volume_spec, load(idx))
+            out[rows] = tile[local[:, 2], local[:, 1], local[:, 0]][:, ch]
+        return out
+
+    # -- rays --------------------------------------------------------------
+
+    def raycast(
+        self,
+        origin: Tuple[float, float, float],
+        direction: Tuple[float, float, float],
+        max_t: float = math.inf,
+    ) -> Optional[RayHitV08]:
+        """
+        First voxel along origin + t * direction (t in [0, max_t]) whose value
+        differs from 'background' in any channel, or None.
+
+        Nodes are visited front to back by entry distance; subtrees without
+        occupied tiles are never entered, and inside a leaf the voxels are
+        stepped with a 3D DDA.
+        """
+        o = np.asarray(origin, dtype=np.float64)
+        d = np.asarray(direction, dtype=np.float64)
+        if not np.any(d):
+            raise ValueError("Ray direction must be non-zero")
+        if not len(self.leaf_keys):
+            return None
+
+        heap: List[Tuple[float, int, int]] = []
+        span = self._ray_box(o, d, *self._node_voxel_box(self.depth, 0))
+        if span is not None and span[0] <= max_t:
+            heap.append((span[0], self.depth, 0))
+
+        while heap:
+            t_enter, level, key = heapq.heappop(heap)
+            if level == 0:
+                hit = self._march_leaf(o, d, int(key), t_enter, max_t)
+                if hit is not None:
+                    return hit
+                continue
+            for child in self._children(level, np.array([key], dtype=np.uint64)):
+                span = self._ray_box(o, d, *self._node_voxel_box(level - 1, child))
+                if span is not None and span[0] <= max_t:
+                    heapq.heappush(heap, (span[0], level - 1, int(child)))
+        return None
+
+    @staticmethod
+    def _ray_box(o, d, lo, hi) -> Optional[Tuple[float, float]]:
+        """
+        Slab test: (t_enter, t_exit) of the ray inside [lo, hi), clipped to t >= 0.
+        """
+        t0, t1 = 0.0, math.inf
+        for a in range(3):
+            if d[a] == 0:
+                if not (lo[a] <= o[a] < hi[a]):
+                    return None
+                continue
+            ta, tb = (lo[a] - o[a]) / d[a], (hi[a] - o[a]) / d[a]
+            t0, t1 = max(t0, min(ta, tb)), min(t1, max(ta, tb))
+        return (t0, t1) if t0 < t1 else None
+
+    def _march_leaf(self, o, d, key: int, t_enter: float, max_t: float) -> Optional[RayHitV08]:
+        idx = _key_to_tile(key)
+        lo, hi = self._node_voxel_box(0, key)
+        span = self._ray_box(o, d, lo, hi)
+        if span is None:
+            return None
+        t, t_exit = span
+        tile = _tile_array(self.tiling, idx, self.volume_spec, self._loader()(idx))
+
+        v = np.clip(np.floor(o + d * t).astype(np.int64), lo, hi - 1)
+        step = np.sign(d).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_next = np.where(d != 0, (v + (step > 0) - o) / d, math.inf)
+            t_delta = np.where(d != 0, np.abs(1.0 / d), math.inf)
+
+        while t <= min(t_exit, max_t) and np.all((v >= lo) & (v < hi)):
+            lx, ly, lz = v - lo
+            value = tile[lz, ly, lx]
+            if np.any(value != self.background):
+                return RayHitV08(t=float(t), voxel=tuple(int(c) for c in v), tile=idx, value=value.copy())
+            a = int(np.argmin(t_next))
+            t = float(t_next[a])
+            v[a] += step[a]
+            t_next[a] += t_delta[a]
+        return None
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def _loader(self) -> Callable[[TileIndexV07], bytes]:
+        if self._load is None:
+            raise ValueError("This TileOctreeV08 has no tile loader (structure-only)")
+        return self._load
+
+    def close(self) -> None:
+        if self._close is not None:
+            self._close()
+            self._close = None
+
+    def __enter__(self) -> "TileOctreeV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------------------------------------------------------------------
+# Tile packs
+# ---------------------------------------------------------------------------
+
+
+def _write_octree_file(path: str, tiles_per_axis: Tuple[int, int, int], background: float, leaf_keys: "np.ndarray") -> str:
+    blob = _OCTREE_HEADER.pack(MAGIC_TILE_OCTREE_V08, 8, *tiles_per_axis, float(background), len(leaf_keys))
+    _replace_file_atomic(path, blob + leaf_keys.astype("<u8").tobytes())
+    return path
+
+
+def _read_octree_file(path: str) -> Tuple[Tuple[int, int, int], float, "np.ndarray"]:
+    with open(path, "rb") as f:
+        blob = f.read()
+    if len(blob) < _OCTREE_HEADER.size:
+        raise ValueError("Not a CIVD v0.8 tile octree")
+    magic, ver, nx, ny, nz, background, n = _OCTREE_HEADER.unpack_from(blob, 0)
+    if magic != MAGIC_TILE_OCTREE_V08 or ver != 8:
+        raise ValueError("Not a CIVD v0.8 tile octree")
+    if len(blob) != _OCTREE_HEADER.size + 8 * n:
+        raise ValueError("Tile octree size mismatch vs header")
+    keys = np.frombuffer(blob, dtype="<u8", count=n, offset=_OCTREE_HEADER.size).astype(np.uint64)
+    return (nx, ny, nz), background, keys
+
+
+def build_tile_octree_v08(
+    out_dir: str,
+    background: float = 0,
+    skip_empty: bool = True,
+    save: bool = True,
+) -> TileOctreeV08:
+    """
+    Build a TileOctreeV08 from an existing v0.8 tile pack.
+
+    Every tile present in the pack is a leaf; with skip_empty=True tiles
+    whose voxels all equal 'background' are dropped (one pass over the
+    pack). With save=True the leaf set is written to tile_octree.bin so
+    open_tile_octree_v08() does not have to rescan. Close the result when done.
+    """
+    tiling, volume_spec, load_tile, close = open_tile_loader_v08(out_dir)
+    try:
+        leaves = list_pack_tiles_v08(out_dir)
+        if skip_empty:
+            leaves = [
+                idx for idx in leaves
+                if np.any(_tile_array(tiling, idx, volume_spec, load_tile(idx)) != background)
+            ]
+        octree = TileOctreeV08(tiling, volume_spec, leaves, load_tile, background=background, close=close)
+    except Exception:
+        close()
+        raise
+    if save:
+        _write_octree_file(os.path.join(out_dir, TILE_OCTREE_FILENAME), tiling.tiles_per_axis, background, octree.leaf_keys)
+    return octree
+
+
+def open_tile_octree_v08(out_dir: str) -> TileOctreeV08:
+    """
+    Open the octree of a tile pack: tile_octree.bin if present, otherwise
+    every present tile becomes a leaf (nothing is scanned or saved).
+    """
+    path = os.path.join(out_dir, TILE_OCTREE_FILENAME)
+    if not os.path.isfile(path):
+        return build_tile_octree_v08(out_dir, skip_empty=False, save=False)
+
+    tiles_per_axis, background, keys = _read_octree_file(path)
+    tiling, volume_spec, load_tile, close = open_tile_loader_v08(out_dir)
+    if tuple(tiling.tiles_per_axis) != tiles_per_axis:
+        close()
+        raise ValueError(f"{TILE_OCTREE_FILENAME} does not match the pack's tile grid")
+    tx, ty, tz = morton_decode_3d(keys)
+    leaves = [TileIndexV07(tx=int(a), ty=int(b), tz=int(c)) for a, b, c in zip(tx, ty, tz)]
+    return TileOctreeV08(tiling, volume_spec, leaves, load_tile, background=background, close=close)
+
+
+def mark_tiles_occupied_v08(out_dir: str, tiles: Iterable[TileIndexV07]) -> None:
+    """
+    Add tiles to a pack's saved tile_octree.bin (no-op if there is none).
+
+    Called after writes so the saved leaf set stays a superset of the
+    non-empty tiles.
+    """
+    path = os.path.join(out_dir, TILE_OCTREE_FILENAME)
+    if not os.path.isfile(path):
+        return
+    tiles_per_axis, background, keys = _read_octree_file(path)
+    new = _tile_keys(tiles)
+    if len(new) and not np.all(np.isin(new, keys)):
+        _write_octree_file(path, tiles_per_axis, background, np.union1d(keys, new))
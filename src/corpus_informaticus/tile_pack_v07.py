@@ -19,7 +19,7 @@ from dataclasses import dataclass
 import json
 import math
 import os
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 
@@ -134,8 +134,13 @@ def _full_volume_view(
     Return a NumPy view over the full volume with shape (z, y, x, C).
 
     We re-implement the same logic as roi_v06._volume_view_from_bytes
-    so tile_pack_v07 stays decoupled from any private helpers.
+    so tile_pack_v07 stays decoupled from any private helpers. Any
+    C-contiguous buffer (bytes, bytearray, memoryview, mmap, ndarray) is
+    viewed in place.
     """
+    buf = memoryview(buf)
+    if buf.ndim != 1 or buf.format != "B":
+        buf = buf.cast("B")
     expected = spec.expected_nbytes()
     if len(buf) != expected:
         raise ValueError(
@@ -177,7 +182,8 @@ def tile_volume_buffer(
     Parameters
     ----------
     buf:
-        Raw bytes containing a dense volume in the layout described by 'spec'.
+        Dense volume in the layout described by 'spec': bytes or any
+        C-contiguous buffer (bytearray, memoryview, mmap, NumPy array).
     spec:
         VolumeSpecV06 describing dims, channels, dtype, order, signature.
         For v0.7 we assume a standard dense tensor with signature
@@ -243,6 +249,8 @@ def write_tile_pack(
     out_dir: str,
     tiling_spec: TilingSpecV07,
     tiles: Dict[TileIndexV07, bytes],
+    volume_spec: Optional[VolumeSpecV06] = None,
+    manifest_format: str = "json",
 ) -> None:
     """
     Write a "tile pack" directory:
@@ -254,8 +262,24 @@ def write_tile_pack(
           └── ...
 
     The manifest contains a machine-readable description of the tiling.
+
+    manifest_format "binary" writes the compact v0.8 index
+    tiling_manifest.bin (see tile_index_v08) instead of the JSON, "both"
+    writes both; the binary index needs 'volume_spec' for its header.
+    A manifest in the format not written is removed from 'out_dir'.
     """
+    if manifest_format not in ("json", "binary", "both"):
+        raise ValueError(f"Unsupported manifest_format: {manifest_format!r}")
+    if manifest_format != "json" and volume_spec is None:
+        raise ValueError("A binary tile index needs volume_spec")
+
+    # Imported here because tile_index_v08 builds on this module.
+    from .tile_index_v08 import TILE_INDEX_FILENAME, write_tile_index_v08
+
     os.makedirs(out_dir, exist_ok=True)
+    stale = {"json": TILE_INDEX_FILENAME, "binary": TILE_MANIFEST_FILENAME}.get(manifest_format)
+    if stale is not None and os.path.isfile(os.path.join(out_dir, stale)):
+        os.remove(os.path.join(out_dir, stale))
 
     manifest_tiles = []
 
@@ -275,6 +299,19 @@ def write_tile_pack(
             }
         )
 
+    if manifest_format != "json":
+        write_tile_index_v08(
+            os.path.join(out_dir, TILE_INDEX_FILENAME),
+            tiling_spec.volume_dims,
+            tiling_spec.tile_size,
+            tiling_spec.tiles_per_axis,
+            volume_spec,
+            "RAW_V07",
+            {TileIndexV07(t["tx"], t["ty"], t["tz"]): (t["nbytes"], 0, None) for t in manifest_tiles},
+        )
+        if manifest_format == "binary":
+            return
+
     manifest = {
         "version": TILE_MANIFEST_VERSION,
         "volume_dims": list(tiling_spec.volume_dims),
@@ -294,7 +331,20 @@ def load_tile_manifest(out_dir: str) -> TilingSpecV07:
 
     This reads only the global tiling parameters. Per-tile entries are
     available in the JSON if a consumer wants to inspect them.
+
+    If the pack has a v0.8 binary index (tiling_manifest.bin), the
+    parameters are taken from its fixed-size header instead, as the v0.8
+    readers do.
     """
+    from .tile_index_v08 import TILE_INDEX_FILENAME, TileIndexV08
+
+    if os.path.isfile(os.path.join(out_dir, TILE_INDEX_FILENAME)):
+        with TileIndexV08(out_dir) as index:
+            return TilingSpecV07(
+                volume_dims=index.volume_dims,
+                tile_size=index.tile_size,
+                tiles_per_axis=index.tiles_per_axis,
+            )
     manifest_path = os.path.join(out_dir, TILE_MANIFEST_FILENAME)
     with open(manifest_path, "r", encoding="utf-8") as f:
         data = json.load(f)
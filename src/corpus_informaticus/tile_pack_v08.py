@@ -7,14 +7,21 @@ tile_pack_v08.py — CIVD v0.8 tiling packer with optional per-tile header.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import json
 import os
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 
-from .roi_v06 import VolumeSpecV06
+from .roi_v06 import (
+    VolumeSpecV06,
+    RoiV06,
+    clamp_roi,
+    _prepare_region_data,
+    _volume_to_bytes,
+    _volume_view_from_bytes,
+)
 from .tile_manifest_v07 import TileIndexV07
 from .tile_pack_v07 import (
     TILE_MANIFEST_FILENAME,
@@ -22,7 +29,30 @@ from .tile_pack_v07 import (
     name_to_tile_index,
     query_tiles_for_roi,
 )
-from .tile_header_v08 import TileHeaderV08, try_parse_tile_header_v08, TILE_HEADER_LEN_V08
+from .tile_header_v08 import (
+    TileHeaderV08,
+    try_parse_tile_header_v08,
+    TILE_ENCODING_MASK,
+    TILE_FLAG_RAGGED,
+    TILE_HEADER_LEN_V08,
+)
+from .instrument_v08 import (
+    add_bytes_copied,
+    add_bytes_read,
+    add_bytes_written,
+    instrument_span,
+    instrumentation_enabled,
+    instrumented,
+)
+from .palette_v08 import PaletteTileV08
+from .tile_filters_v08 import (
+    decode_tile_payload_v08,
+    encode_tile_payload_v08,
+    encoding_flags_v08,
+    encoding_from_flags_v08,
+)
+from .tile_index_v08 import TILE_INDEX_FILENAME, TileIndexV08, tile_payload_crc32, write_tile_index_v08
+from .tile_store_v08 import TileStoreV08
 
 
 @dataclass(frozen=True)
@@ -44,18 +74,116 @@ def compute_tiling_spec_v08(volume_dims: Tuple[int, int, int], tile_size: Tuple[
     return TilingSpecV08(volume_dims=volume_dims, tile_size=tile_size, tiles_per_axis=(nx, ny, nz))
 
 
+def tile_extent_v08(tiling: TilingSpecV08, idx: TileIndexV07) -> Tuple[int, int, int]:
+    """
+    (x, y, z) extent of a tile clipped to the volume; smaller than tile_size on edges.
+    """
+    sx, sy, sz = tiling.tile_size
+    x, y, z = tiling.volume_dims
+    return (
+        min(sx, x - idx.tx * sx),
+        min(sy, y - idx.ty * sy),
+        min(sz, z - idx.tz * sz),
+    )
+
+
+def _tile_stored_shape(
+    tiling: TilingSpecV08,
+    idx: TileIndexV07,
+    volume_spec: VolumeSpecV06,
+    nbytes: int,
+) -> Tuple[int, int, int]:
+    """
+    Shape (x, y, z) of a headerless tile payload (v0.7 RAW tiles, CAS
+    blobs, tiles about to be written): full tile_size if padded, the
+    clipped extent if the edge tile is ragged, told apart by byte count.
+    v0.8 tiles on disk record their extent in the CIVDTILE header and the
+    binary index (TILE_FLAG_RAGGED); loaders use that instead.
+    """
+    voxel_nbytes = volume_spec.channels * np.dtype(volume_spec.dtype).itemsize
+    sx, sy, sz = tiling.tile_size
+    if nbytes == sx * sy * sz * voxel_nbytes:
+        return tiling.tile_size
+    ex, ey, ez = tile_extent_v08(tiling, idx)
+    if nbytes == ex * ey * ez * voxel_nbytes:
+        return ex, ey, ez
+    raise ValueError(f"Tile {idx} payload has {nbytes} bytes, matching neither padded nor ragged size")
+
+
+def _make_tile_header(
+    tiling: TilingSpecV08,
+    idx: TileIndexV07,
+    volume_spec: VolumeSpecV06,
+    payload: bytes,
+    encoding: int = 0,
+    stored_nbytes: Optional[int] = None,
+) -> TileHeaderV08:
+    """
+    Header for a raw tile 'payload'. 'encoding' are the filter/compressor
+    flags and 'stored_nbytes' the encoded size when they are non-zero.
+    """
+    shape = _tile_stored_shape(tiling, idx, volume_spec, len(payload))
+    ragged = shape != tuple(tiling.tile_size)
+    return TileHeaderV08(
+        tile_format_ver=8,
+        header_len=TILE_HEADER_LEN_V08,
+        flags=(TILE_FLAG_RAGGED if ragged else 0) | encoding,
+        tx=idx.tx,
+        ty=idx.ty,
+        tz=idx.tz,
+        tile_size=tiling.tile_size,
+        channels=volume_spec.channels,
+        dtype=volume_spec.dtype,
+        signature=volume_spec.signature,
+        order=volume_spec.order,
+        payload_nbytes=len(payload) if stored_nbytes is None else stored_nbytes,
+        extent=shape if ragged else None,
+    )
+
+
+def _encode_tile(
+    tiling: TilingSpecV08,
+    idx: TileIndexV07,
+    volume_spec: VolumeSpecV06,
+    payload: bytes,
+    encoding: int,
+    level: Optional[int] = None,
+) -> Tuple[TileHeaderV08, bytes]:
+    """
+    Filter/compress a raw tile payload; returns (header, stored_payload).
+    """
+    if encoding:
+        shape = _tile_stored_shape(tiling, idx, volume_spec, len(payload))
+        with instrument_span("tile_v08.encode", nbytes=len(payload)):
+            stored = encode_tile_payload_v08(payload, replace(volume_spec, dims=tuple(shape)), encoding, level)
+    else:
+        stored = payload
+    return _make_tile_header(tiling, idx, volume_spec, payload, encoding, len(stored)), stored
+
+
+@instrumented("tile_pack_v08.tile_volume")
 def tile_volume_buffer_v08(
     buf: bytes,
     spec: VolumeSpecV06,
     tile_size: Tuple[int, int, int],
+    pad_edges: bool = True,
 ) -> Tuple[TilingSpecV08, Dict[TileIndexV07, bytes]]:
     """
     Produce raw payload tiles (no headers yet). Payload layout matches v0.6 volume layout:
       view shape: (z,y,x,C)
+
+    'buf' may be bytes or any C-contiguous buffer (bytearray, memoryview,
+    mmap, NumPy array); tiles are cut from a view of it.
+
+    For 'MORTON' volumes each tile payload is itself in tile-local Morton order;
+    for 'PLANAR' volumes each tile payload is channel-planar.
+
+    With pad_edges=True (default) edge tiles are zero-padded to the full
+    tile_size. With pad_edges=False they are stored at their true extent
+    ("ragged"), which avoids the pad copy and the wasted bytes; the extent
+    is recorded in the tile header when the pack is written.
     """
-    vol = np.frombuffer(buf, dtype=np.dtype(spec.dtype)).reshape(
-        (spec.dims[2], spec.dims[1], spec.dims[0], spec.channels), order=spec.order
-    )
+    vol = _volume_view_from_bytes(buf, spec)
 
     tiling = compute_tiling_spec_v08(spec.dims, tile_size)
     sx, sy, sz = tiling.tile_size
@@ -79,60 +207,123 @@ def tile_volume_buffer_v08(
                 pad_z = sz - (z1 - z0)
                 pad_y = sy - (y1 - y0)
                 pad_x = sx - (x1 - x0)
-                if pad_z or pad_y or pad_x:
+                if pad_edges and (pad_z or pad_y or pad_x):
                     sub = np.pad(
                         sub,
                         pad_width=((0, pad_z), (0, pad_y), (0, pad_x), (0, 0)),
                         mode="constant",
                     )
 
-                tiles[TileIndexV07(tx=tx, ty=ty, tz=tz)] = sub.tobytes(order=spec.order)
+                tiles[TileIndexV07(tx=tx, ty=ty, tz=tz)] = _volume_to_bytes(sub, spec)
 
+    if instrumentation_enabled():
+        add_bytes_copied(sum(len(t) for t in tiles.values()))
     return tiling, tiles
 
 
+@instrumented("tile_pack_v08.write")
 def write_tile_pack_v08(
     out_dir: str,
     tiling: TilingSpecV08,
     tiles: Dict[TileIndexV07, bytes],
     volume_spec: VolumeSpecV06,
     add_tile_headers: bool = True,
+    tile_store: Optional[TileStoreV08] = None,
+    manifest_format: str = "json",
+    tile_crc: bool = False,
+    meta: Optional[Dict[str, Any]] = None,
+    filters: Sequence[str] = (),
+    compressor: Optional[str] = None,
+    compression_level: Optional[int] = None,
 ) -> str:
     """
     Write a tile pack folder with:
       - per tile .bin files
-      - tiling_manifest.json
+      - tiling_manifest.json and/or tiling_manifest.bin
 
     If add_tile_headers=True, each tile file is CIVDTILE(v0.8)+payload.
+
+    Writing over an existing pack removes its saved tile octree
+    (tile_octree_v08) and a leftover manifest in the format not written.
+
+    manifest_format selects "json" (default), "binary" (compact
+    tiling_manifest.bin only, see tile_index_v08) or "both" (binary index
+    plus JSON sidecar; readers take the tiling from the binary index when
+    it is present). With tile_crc=True the binary index also records a
+    CRC32 per tile payload. Returns the path of the JSON manifest, or of
+    the binary index when no JSON is written.
+
+    If tile_store is given, no per-tile files are written: payloads go into
+    the content-addressed store (deduplicated) and the manifest lists
+    "tile_refs" = [[tx, ty, tz, content_hash], ...] instead of "tile_files".
+
+    'meta' is an optional JSON-serializable dict stored as manifest["meta"]
+    (e.g. a quantization descriptor, see quantize_v08); it needs a JSON manifest.
+
+    'filters' (any of "delta_x", "shuffle"/"bitshuffle") and 'compressor'
+    ("zlib", "zstd", "lz4") encode each tile payload, see tile_filters_v08.
+    The pipeline is recorded in every tile header (so reads decode
+    automatically) and as "tile_filters"/"compressor" in the manifest (as
+    the pack encoding in the header of a binary index).
     """
+    encoding = encoding_flags_v08(filters, compressor)
+    if encoding and (tile_store is not None or not add_tile_headers):
+        raise ValueError("Tile filters/compression need per-tile files with CIVDTILE headers")
+    if manifest_format not in ("json", "binary", "both"):
+        raise ValueError(f"Unsupported manifest_format: {manifest_format!r}")
+    if meta and manifest_format == "binary":
+        raise ValueError("meta requires a JSON manifest (manifest_format 'json' or 'both')")
+    if tile_store is not None and manifest_format != "json":
+        raise ValueError("Binary tile index is not supported for tile_store packs")
+
     os.makedirs(out_dir, exist_ok=True)
 
-    # Write tiles
-    for idx, payload in tiles.items():
-        fname = tile_index_to_name(idx)
-        fpath = os.path.join(out_dir, fname)
-
-        if add_tile_headers:
-            hdr = TileHeaderV08(
-                tile_format_ver=8,
-                header_len=64,
-                flags=0,
-                tx=idx.tx,
-                ty=idx.ty,
-                tz=idx.tz,
-                tile_size=tiling.tile_size,
-                channels=volume_spec.channels,
-                dtype=volume_spec.dtype,
-                signature=volume_spec.signature,
-                order=volume_spec.order,
-                payload_nbytes=len(payload),
+    # Rewriting a pack invalidates files derived from the previous one: a
+    # saved tile octree would hide the new tiles and a manifest in the
+    # format not rewritten below would describe the old ones. (Imported
+    # here because tile_octree_v08 builds on this module.)
+    from .tile_octree_v08 import TILE_OCTREE_FILENAME
+
+    stale = [TILE_OCTREE_FILENAME]
+    if manifest_format == "json":
+        stale.append(TILE_INDEX_FILENAME)
+    elif manifest_format == "binary":
+        stale.append(TILE_MANIFEST_FILENAME)
+    for name in stale:
+        try:
+            os.remove(os.path.join(out_dir, name))
+        except FileNotFoundError:
+            pass
+
+    ordered = sorted(tiles.keys(), key=lambda t: (t.tz, t.ty, t.tx))
+
+    if tile_store is not None:
+        digests = tile_store.add_tiles(tiles[idx] for idx in ordered)
+    else:
+        # Write tiles
+        index_entries: Dict[TileIndexV07, Tuple[int, int, Optional[int]]] = {}
+        index_flags: Dict[TileIndexV07, int] = {}
+        for idx, payload in tiles.items():
+            fname = tile_index_to_name(idx)
+            fpath = os.path.join(out_dir, fname)
+
+            if add_tile_headers:
+                hdr, payload = _encode_tile(tiling, idx, volume_spec, payload, encoding, compression_level)
+                blob = hdr.to_bytes() + payload
+                add_bytes_copied(len(blob))
+                index_flags[idx] = hdr.flags
+            else:
+                blob = payload
+
+            with open(fpath, "wb") as f:
+                f.write(blob)
+            add_bytes_written(len(blob))
+
+            index_entries[idx] = (
+                len(payload),
+                TILE_HEADER_LEN_V08 if add_tile_headers else 0,
+                tile_payload_crc32(payload) if tile_crc else None,
             )
-            blob = hdr.to_bytes() + payload
-        else:
-            blob = payload
-
-        with open(fpath, "wb") as f:
-            f.write(blob)
 
     # Write manifest (keep v0.7 filename for continuity)
     manifest = {
@@ -141,7 +332,6 @@ def write_tile_pack_v08(
         "volume_dims": list(tiling.volume_dims),
         "tile_size": list(tiling.tile_size),
         "tiles_per_axis": list(tiling.tiles_per_axis),
-        "tile_files": [tile_index_to_name(idx) for idx in sorted(tiles.keys(), key=lambda t: (t.tz, t.ty, t.tx))],
         "volume_spec": {
             "dims": list(volume_spec.dims),
             "channels": volume_spec.channels,
@@ -149,8 +339,38 @@ def write_tile_pack_v08(
             "order": volume_spec.order,
             "signature": volume_spec.signature,
         },
-        "tile_file_format": "CIVDTILE_V08" if add_tile_headers else "RAW_V07",
+        "edge_tiles": "padded",
     }
+    if encoding:
+        manifest["tile_filters"], manifest["compressor"] = encoding_from_flags_v08(encoding)
+    if meta:
+        manifest["meta"] = meta
+    full_nbytes = int(np.prod(tiling.tile_size)) * volume_spec.channels * np.dtype(volume_spec.dtype).itemsize
+    if any(len(p) != full_nbytes for p in tiles.values()):
+        manifest["edge_tiles"] = "ragged"
+    if tile_store is not None:
+        manifest["tile_refs"] = [[idx.tx, idx.ty, idx.tz, d] for idx, d in zip(ordered, digests)]
+        manifest["tile_store"] = os.path.relpath(tile_store.root, os.path.abspath(out_dir))
+        manifest["tile_file_format"] = "CAS_V08"
+    else:
+        manifest["tile_files"] = [tile_index_to_name(idx) for idx in ordered]
+        manifest["tile_file_format"] = "CIVDTILE_V08" if add_tile_headers else "RAW_V07"
+
+    if manifest_format in ("binary", "both"):
+        bpath = write_tile_index_v08(
+            os.path.join(out_dir, TILE_INDEX_FILENAME),
+            tiling.volume_dims,
+            tiling.tile_size,
+            tiling.tiles_per_axis,
+            volume_spec,
+            manifest["tile_file_format"],
+            index_entries,
+            index_flags,
+            pack_encoding=encoding,
+            ragged=manifest["edge_tiles"] == "ragged",
+        )
+        if manifest_format == "binary":
+            return bpath
 
     mpath = os.path.join(out_dir, TILE_MANIFEST_FILENAME)
     with open(mpath, "w", encoding="utf-8") as f:
@@ -159,22 +379,44 @@ def write_tile_pack_v08(
     return mpath
 
 
-def read_tile_file_payload_auto(path: str) -> Tuple[Optional[TileHeaderV08], bytes]:
+def read_tile_file_payload_auto(path: str, lazy_palette: bool = False) -> Tuple[Optional[TileHeaderV08], bytes]:
     """
     Read a tile file and return (header_or_None, payload_bytes).
     - If header present: parse header, strip header_len, return payload
+      (decoded if the header flags record filters/compression)
     - Else: return raw bytes as payload (v0.7)
+
+    With lazy_palette=True palette-encoded tiles come back as PaletteTileV08.
     """
     with open(path, "rb") as f:
         blob = f.read()
+    add_bytes_read(len(blob))
+    return _parse_tile_file_blob(blob, lazy_palette=lazy_palette)
+
 
+def _parse_tile_file_blob(blob: bytes, lazy_palette: bool = False) -> Tuple[Optional[TileHeaderV08], bytes]:
+    """
+    Body of read_tile_file_payload_auto() for tile file contents that are
+    already in memory (e.g. fetched from a byte-range store).
+    """
     hdr = try_parse_tile_header_v08(blob)
     if hdr is None:
         return None, blob
 
     payload = blob[hdr.header_len:]
+    add_bytes_copied(len(payload))
     if len(payload) != hdr.payload_nbytes:
         raise ValueError("Tile payload size mismatch vs header")
+    if hdr.flags & TILE_ENCODING_MASK:
+        spec = VolumeSpecV06(
+            dims=hdr.stored_shape(),
+            channels=hdr.channels,
+            dtype=hdr.dtype,
+            order=hdr.order,
+            signature=hdr.signature,
+        )
+        with instrument_span("tile_v08.decode", nbytes=len(payload)):
+            payload = decode_tile_payload_v08(payload, spec, hdr.flags, lazy_palette=lazy_palette)
     return hdr, payload
 
 def read_tile_v08(out_dir: str, idx: "TileIndexV07"):
@@ -199,3 +441,433 @@ def read_tile_v08(out_dir: str, idx: "TileIndexV07"):
 
     payload = read_tile_file_payload_auto(path)
     return header, payload
+
+
+# ---------------------------------------------------------------------------
+# Manifest loading + ROI assembly
+# ---------------------------------------------------------------------------
+
+
+@instrumented("tile_pack_v08.load_manifest")
+def load_tile_pack_manifest_v08(out_dir: str) -> Tuple[TilingSpecV08, VolumeSpecV06, Dict]:
+    """
+    Load a v0.8 tiling manifest and return (tiling, volume_spec, raw_manifest_dict).
+
+    Like the pack readers, this prefers tiling_manifest.bin: when it is
+    present the tiling and volume spec come from its header, and the JSON
+    sidecar (if any) only supplies the returned dict. Packs written with
+    manifest_format="binary" have no JSON manifest; the returned dict is
+    then rebuilt from the index header ("tile_file_format", "edge_tiles"
+    and, for encoded packs, "tile_filters" / "compressor").
+    """
+    mpath = os.path.join(out_dir, TILE_MANIFEST_FILENAME)
+    if os.path.isfile(os.path.join(out_dir, TILE_INDEX_FILENAME)):
+        with TileIndexV08(out_dir) as index:
+            tiling = TilingSpecV08(index.volume_dims, index.tile_size, index.tiles_per_axis)
+            volume_spec = index.volume_spec
+            manifest = {
+                "tile_file_format": index.tile_file_format,
+                "edge_tiles": "ragged" if index.ragged else "padded",
+            }
+            if index.pack_encoding:
+                manifest["tile_filters"], manifest["compressor"] = encoding_from_flags_v08(index.pack_encoding)
+        if os.path.isfile(mpath):
+            with open(mpath, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        return tiling, volume_spec, manifest
+    with open(mpath, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    tiling, volume_spec = _specs_from_manifest(manifest)
+    return tiling, volume_spec, manifest
+
+
+def _specs_from_manifest(manifest: Dict) -> Tuple[TilingSpecV08, VolumeSpecV06]:
+    vs = manifest["volume_spec"]
+    volume_spec = VolumeSpecV06(
+        dims=tuple(vs["dims"]),  # type: ignore[arg-type]
+        channels=int(vs["channels"]),
+        dtype=str(vs["dtype"]),
+        order=str(vs.get("order", "C")),
+        signature=str(vs.get("signature", "C_CONTIG")),
+    )
+    tiling = TilingSpecV08(
+        volume_dims=tuple(manifest["volume_dims"]),        # type: ignore[arg-type]
+        tile_size=tuple(manifest["tile_size"]),            # type: ignore[arg-type]
+        tiles_per_axis=tuple(manifest["tiles_per_axis"]),  # type: ignore[arg-type]
+    )
+    return tiling, volume_spec
+
+
+def list_pack_tiles_v08(out_dir: str) -> List[TileIndexV07]:
+    """
+    Return the tiles present in a v0.8 tile pack (sparse packs may omit some),
+    in (tz, ty, tx) raster order.
+    """
+    if os.path.isfile(os.path.join(out_dir, TILE_INDEX_FILENAME)):
+        with TileIndexV08(out_dir) as index:
+            return index.present_tiles()
+    _, _, manifest = load_tile_pack_manifest_v08(out_dir)
+    if manifest.get("tile_file_format") == "CAS_V08":
+        tiles = [TileIndexV07(tx=r[0], ty=r[1], tz=r[2]) for r in manifest["tile_refs"]]
+    else:
+        tiles = [name_to_tile_index(n) for n in manifest.get("tile_files", [])]
+    return sorted(tiles, key=lambda t: (t.tz, t.ty, t.tx))
+
+
+def _tile_payload_view(
+    payload: bytes,
+    tile_shape: Tuple[int, int, int],
+    volume_spec: VolumeSpecV06,
+) -> "np.ndarray":
+    """
+    View a tile payload as (sz, sy, sx, C) for the given (x, y, z) tile shape.
+    """
+    return _volume_view_from_bytes(payload, replace(volume_spec, dims=tuple(tile_shape)))
+
+
+def _loaded_tile(hdr: Optional[TileHeaderV08], payload, volume_spec: VolumeSpecV06):
+    """
+    Loader result for a parsed tile file: a (sz, sy, sx, C) view shaped by
+    the header's extent, or 'payload' unchanged for headerless (v0.7)
+    tiles and PaletteTileV08.
+    """
+    if hdr is None or isinstance(payload, PaletteTileV08):
+        return payload
+    return _tile_payload_view(payload, hdr.stored_shape(), volume_spec)
+
+
+def _tile_array(
+    tiling: TilingSpecV08,
+    idx: TileIndexV07,
+    volume_spec: VolumeSpecV06,
+    payload,
+) -> "np.ndarray":
+    """
+    (sz, sy, sx, C) array for a loaded tile: the tile itself if the loader
+    already shaped it, the unpacked voxels of a PaletteTileV08, or a view
+    of a headerless raw payload.
+    """
+    if isinstance(payload, np.ndarray):
+        return payload
+    if isinstance(payload, PaletteTileV08):
+        return payload.to_array()
+    return _tile_payload_view(payload, _tile_stored_shape(tiling, idx, volume_spec, len(payload)), volume_spec)
+
+
+def iter_tile_overlaps_v08(
+    tiling: TilingSpecV08,
+    roi: RoiV06,
+    tiles: Optional[Iterable[TileIndexV07]] = None,
+) -> Iterator[Tuple[TileIndexV07, Tuple[slice, slice, slice], Tuple[slice, slice, slice]]]:
+    """
+    Yield (idx, tile_slices, roi_slices) for every tile intersecting 'roi'.
+
+    Both slice triples are in (z, y, x) order: tile_slices address the
+    overlap inside the (sz, sy, sx, C) tile, roi_slices the same voxels
+    inside a (d, h, w, C) ROI array. 'roi' must already be in bounds.
+
+    'tiles' restricts the walk to the given tiles (which must intersect
+    'roi') instead of enumerating the whole grid range.
+    """
+    sx, sy, sz = tiling.tile_size
+    rx0, rx1, ry0, ry1, rz0, rz1 = roi.as_bounds()
+
+    for idx in query_tiles_for_roi(tiling, roi) if tiles is None else tiles:
+        x0, y0, z0 = idx.tx * sx, idx.ty * sy, idx.tz * sz
+        ix0, ix1 = max(rx0, x0), min(rx1, x0 + sx)
+        iy0, iy1 = max(ry0, y0), min(ry1, y0 + sy)
+        iz0, iz1 = max(rz0, z0), min(rz1, z0 + sz)
+
+        yield (
+            idx,
+            (slice(iz0 - z0, iz1 - z0), slice(iy0 - y0, iy1 - y0), slice(ix0 - x0, ix1 - x0)),
+            (slice(iz0 - rz0, iz1 - rz0), slice(iy0 - ry0, iy1 - ry0), slice(ix0 - rx0, ix1 - rx0)),
+        )
+
+
+@instrumented("tile_pack_v08.assemble_roi")
+def assemble_roi_from_tiles_v08(
+    tiling: TilingSpecV08,
+    volume_spec: VolumeSpecV06,
+    roi: RoiV06,
+    load_tile: Callable[[TileIndexV07], bytes],
+    channels: Optional[List[int]] = None,
+    dtype: Optional[str] = None,
+    tiles: Optional[Iterable[TileIndexV07]] = None,
+    fill: Optional[float] = None,
+) -> "np.ndarray":
+    """
+    Build a (d, h, w, C_sel) ROI tensor by loading only the tiles it touches.
+
+    'load_tile(idx)' returns either a (sz, sy, sx, C) tile array (as the
+    loaders of v0.8 packs do, shaped from the tile header or index), or a
+    headerless raw payload as produced by tile_volume_buffer_v08(): padded
+    to the full tile_size or, for ragged edge tiles, at the tile's true
+    extent. It may also return a PaletteTileV08, in which case only the
+    overlapping sub-box is unpacked.
+    The ROI is clamped to the volume bounds first. If 'dtype' is given, tile
+    values are converted while they are copied into the output (no extra pass).
+
+    For sparse packs pass the intersecting tiles that exist as 'tiles'; the
+    voxels of all other tiles are set to 'fill'.
+    """
+    roi = clamp_roi(roi, tiling.volume_dims)
+    if channels is not None:
+        for c in channels:
+            if c < 0 or c >= volume_spec.channels:
+                raise ValueError(
+                    f"Requested channel index {c} is out of range [0, {volume_spec.channels})"
+                )
+    n_ch = volume_spec.channels if channels is None else len(channels)
+    out_dtype = np.dtype(volume_spec.dtype if dtype is None else dtype)
+    if fill is None:
+        out = np.empty((roi.d, roi.h, roi.w, n_ch), dtype=out_dtype)
+    else:
+        out = np.full((roi.d, roi.h, roi.w, n_ch), fill, dtype=out_dtype)
+    if roi.w == 0 or roi.h == 0 or roi.d == 0:
+        return out
+
+    ch = slice(None) if channels is None else list(channels)
+    for idx, tsl, rsl in iter_tile_overlaps_v08(tiling, roi, tiles):
+        payload = load_tile(idx)
+        if isinstance(payload, PaletteTileV08):
+            np.copyto(out[rsl], payload.read_box(tsl, ch), casting="unsafe")
+            continue
+        tile = _tile_array(tiling, idx, volume_spec, payload)
+        np.copyto(out[rsl], tile[tsl + (ch,)], casting="unsafe")
+
+    add_bytes_copied(out.nbytes)
+    return out
+
+
+def _stage_file(path: str, blob: bytes) -> str:
+    """
+    Write 'blob' next to 'path' under a temp name; returns the temp path
+    for a later os.replace().
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    add_bytes_written(len(blob))
+    return tmp
+
+
+def _replace_file_atomic(path: str, blob: bytes) -> None:
+    os.replace(_stage_file(path, blob), path)
+
+
+@instrumented("tile_pack_v08.write_region")
+def write_region_to_tile_pack_v08(
+    out_dir: str,
+    x: int,
+    y: int,
+    z: int,
+    data: "np.ndarray",
+    channels: Optional[List[int]] = None,
+    tile_store: Optional[TileStoreV08] = None,
+) -> List[TileIndexV07]:
+    """
+    Patch a (d, h, w, C_sel) region into an existing v0.8 tile pack.
+
+    Only tiles intersecting the region are read, patched and rewritten; a
+    tile missing from a sparse pack is created zero-filled. A saved tile
+    octree (tile_octree_v08) gets the written tiles added as leaves.
+
+    Bookkeeping order: all patched tiles are first staged as temp files,
+    then swapped in (os.replace) back to back, and only then are the binary
+    tile index and the JSON manifest replaced. Manifest readers therefore
+    never see a tile that does not exist yet. A binary-index reader that
+    opened the old index may briefly find a tile whose size/CRC no longer
+    matches; TileIndexV08.read_tile() retries until the new index is in
+    place.
+
+    For CAS packs pass the TileStoreV08 the pack was written with as
+    'tile_store' (a store opened on the manifest's "tile_store" path is
+    used otherwise).
+
+    Returns the list of rewritten tiles.
+    """
+    tiling, volume_spec, manifest = load_tile_pack_manifest_v08(out_dir)
+    data = _prepare_region_data(data, volume_spec, x, y, z, channels)
+    d, h, w, _ = data.shape
+    roi = RoiV06(x=x, y=y, z=z, w=w, h=h, d=d)
+
+    fmt = manifest.get("tile_file_format", "CIVDTILE_V08")
+    index_path = os.path.join(out_dir, TILE_INDEX_FILENAME)
+    json_path = os.path.join(out_dir, TILE_MANIFEST_FILENAME)
+
+    index_entries: Optional[Dict[TileIndexV07, Tuple[int, int, Optional[int]]]] = None
+    index_flags: Dict[TileIndexV07, int] = {}
+    has_crc = False
+    if os.path.isfile(index_path):
+        with TileIndexV08(out_dir) as index:
+            has_crc = index.has_crc
+            index_entries = {}
+            for idx in index.present_tiles():
+                nbytes, offset, crc = index.lookup(idx)  # type: ignore[misc]
+                index_entries[idx] = (nbytes, offset, crc if has_crc else None)
+                index_flags[idx] = index.tile_flags(idx)
+
+    # New tiles use the pack-wide pipeline; existing tiles keep their own.
+    pack_encoding = encoding_flags_v08(manifest.get("tile_filters", ()), manifest.get("compressor"))
+
+    store: Optional[TileStoreV08] = None
+    refs: Dict[TileIndexV07, str] = {}
+    if fmt == "CAS_V08":
+        store = tile_store or TileStoreV08(os.path.join(out_dir, manifest["tile_store"]))
+        refs = {TileIndexV07(tx=r[0], ty=r[1], tz=r[2]): r[3] for r in manifest["tile_refs"]}
+
+    voxel_nbytes = volume_spec.channels * np.dtype(volume_spec.dtype).itemsize
+    ragged = manifest.get("edge_tiles") == "ragged"
+    ch = slice(None) if channels is None else list(channels)
+
+    written: List[TileIndexV07] = []
+    new_refs: Dict[TileIndexV07, bytes] = {}
+    staged: List[Tuple[str, str]] = []
+    try:
+        for idx, tsl, rsl in iter_tile_overlaps_v08(tiling, roi):
+            path = os.path.join(out_dir, tile_index_to_name(idx))
+            empty_shape = tile_extent_v08(tiling, idx) if ragged else tiling.tile_size
+            empty_nbytes = int(np.prod(empty_shape)) * voxel_nbytes
+            encoding = pack_encoding
+            if store is not None:
+                payload = store.get(refs[idx]) if idx in refs else bytes(empty_nbytes)
+            elif os.path.isfile(path):
+                hdr, payload = read_tile_file_payload_auto(path)
+                if hdr is not None:
+                    encoding = hdr.flags & TILE_ENCODING_MASK
+                    payload = _loaded_tile(hdr, payload, volume_spec)
+            else:
+                payload = bytes(empty_nbytes)
+
+            tile = np.array(_tile_array(tiling, idx, volume_spec, payload))
+            tile[tsl + (ch,)] = data[rsl]
+            new_payload = _volume_to_bytes(tile, volume_spec)
+
+            if store is not None:
+                new_refs[idx] = new_payload
+            else:
+                if fmt == "CIVDTILE_V08":
+                    hdr, new_payload = _encode_tile(tiling, idx, volume_spec, new_payload, encoding)
+                    staged.append((path, _stage_file(path, hdr.to_bytes() + new_payload)))
+                    index_flags[idx] = hdr.flags
+                else:
+                    staged.append((path, _stage_file(path, new_payload)))
+
+                if index_entries is not None:
+                    index_entries[idx] = (
+                        len(new_payload),
+                        TILE_HEADER_LEN_V08 if fmt == "CIVDTILE_V08" else 0,
+                        tile_payload_crc32(new_payload) if has_crc else None,
+                    )
+            written.append(idx)
+    except BaseException:
+        for _, tmp in staged:
+            os.remove(tmp)
+        raise
+
+    # Swap the staged tiles in, then do the manifest bookkeeping.
+    for path, tmp in staged:
+        os.replace(tmp, path)
+    if store is not None:
+        ordered = list(new_refs)
+        digests = store.add_tiles(new_refs[idx] for idx in ordered)
+        released = [refs[idx] for idx in ordered if idx in refs]
+        refs.update(zip(ordered, digests))
+        manifest["tile_refs"] = [
+            [idx.tx, idx.ty, idx.tz, refs[idx]] for idx in sorted(refs, key=lambda t: (t.tz, t.ty, t.tx))
+        ]
+        _replace_file_atomic(json_path, json.dumps(manifest, indent=2).encode("utf-8"))
+        store.release(released)
+    else:
+        if index_entries is not None:
+            write_tile_index_v08(
+                index_path,
+                tiling.volume_dims,
+                tiling.tile_size,
+                tiling.tiles_per_axis,
+                volume_spec,
+                fmt,
+                index_entries,
+                index_flags,
+                pack_encoding=pack_encoding,
+                ragged=ragged,
+            )
+        if os.path.isfile(json_path):
+            names = set(manifest.get("tile_files", []))
+            if any(tile_index_to_name(idx) not in names for idx in written):
+                names.update(tile_index_to_name(idx) for idx in written)
+                ordered_idx = sorted(map(name_to_tile_index, names), key=lambda t: (t.tz, t.ty, t.tx))
+                manifest["tile_files"] = [tile_index_to_name(idx) for idx in ordered_idx]
+                _replace_file_atomic(json_path, json.dumps(manifest, indent=2).encode("utf-8"))
+
+    # Keep a saved tile octree a superset of the written tiles (imported
+    # here because tile_octree_v08 builds on this module).
+    from .tile_octree_v08 import mark_tiles_occupied_v08
+
+    mark_tiles_occupied_v08(out_dir, written)
+    return written
+
+
+def open_tile_loader_v08(
+    out_dir: str,
+) -> Tuple[TilingSpecV08, VolumeSpecV06, Callable[[TileIndexV07], bytes], Callable[[], None]]:
+    """
+    Open a v0.8 tile pack for random tile access.
+
+    Returns (tiling, volume_spec, load_tile, close). 'load_tile(idx)' works
+    for packs with per-tile files, a binary tile index, or a TileStoreV08
+    backing. v0.8 tiles come back as (sz, sy, sx, C) arrays shaped from
+    their header or index entry, headerless (v0.7 RAW, CAS) tiles as raw
+    payload bytes and palette-encoded tiles as PaletteTileV08 (see
+    assemble_roi_from_tiles_v08). Call 'close()' when done.
+    """
+    if os.path.isfile(os.path.join(out_dir, TILE_INDEX_FILENAME)):
+        index = TileIndexV08(out_dir)
+        tiling = TilingSpecV08(index.volume_dims, index.tile_size, index.tiles_per_axis)
+
+        shaped = index.tile_file_format == "CIVDTILE_V08"
+
+        def _load_indexed(idx: TileIndexV07):
+            payload = index.read_tile(idx, lazy_palette=True)
+            if not shaped or isinstance(payload, PaletteTileV08):
+                return payload
+            return _tile_payload_view(payload, index.stored_shape(idx), index.volume_spec)
+
+        return tiling, index.volume_spec, _load_indexed, index.close
+
+    tiling, volume_spec, manifest = load_tile_pack_manifest_v08(out_dir)
+
+    if manifest.get("tile_file_format") == "CAS_V08":
+        store = TileStoreV08(os.path.join(out_dir, manifest["tile_store"]))
+        refs = {TileIndexV07(tx=r[0], ty=r[1], tz=r[2]): r[3] for r in manifest["tile_refs"]}
+
+        def _load(idx: TileIndexV07) -> bytes:
+            return store.get(refs[idx])
+    else:
+        def _load(idx: TileIndexV07):
+            hdr, payload = read_tile_file_payload_auto(os.path.join(out_dir, tile_index_to_name(idx)), lazy_palette=True)
+            return _loaded_tile(hdr, payload, volume_spec)
+
+    return tiling, volume_spec, _load, lambda: None
+
+
+@instrumented("tile_pack_v08.read_roi")
+def read_roi_from_tile_pack_v08(
+    out_dir: str,
+    roi: RoiV06,
+    channels: Optional[List[int]] = None,
+    dtype: Optional[str] = None,
+) -> "np.ndarray":
+    """
+    Read an ROI from a v0.8 tile pack folder, opening only intersecting tiles.
+
+    Works for packs with per-tile files and for packs backed by a
+    TileStoreV08 (tile_file_format "CAS_V08"). If a binary tile index is
+    present it is used instead of the JSON manifest.
+    """
+    tiling, volume_spec, load_tile, close = open_tile_loader_v08(out_dir)
+    try:
+        return assemble_roi_from_tiles_v08(tiling, volume_spec, roi, load_tile, channels=channels, dtype=dtype)
+    finally:
+        close()
@@ -0,0 +1,401 @@
+"""
+tile_prefetch_v08.py — CIVD v0.8 motion-predictive tile prefetching.
+
+A robot streaming ROIs centred on its pose mostly re-reads the tiles of the
+previous ROI plus a leading edge. TilePrefetcherV08 keeps an LRU cache of
+tile payloads in front of any tile loader and, after each observed ROI,
+extrapolates the next few ROIs (constant velocity), selects their tiles
+with query_tiles_for_roi() and loads the missing ones on a background
+thread, so tile I/O happens off the control loop's critical path:
+
+    with open_tile_pack_prefetcher_v08("pack_dir", horizon=3) as pf:
+        for roi in rois:
+            block = pf.read_roi(roi)      # served from cache when predicted
+        print(pf.stats().prefetch_hit_rate)
+
+The I/O budget bounds how many tiles a single observation may schedule;
+plans made for an older observation are dropped once a newer one arrives.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .roi_v06 import VolumeSpecV06, RoiV06, clamp_roi
+from .tile_manifest_v07 import TileIndexV07
+from .tile_pack_v07 import query_tiles_for_roi
+from .tile_pack_v08 import TilingSpecV08, assemble_roi_from_tiles_v08, open_tile_loader_v08
+
+
+# ---------------------------------------------------------------------------
+# Stats
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class PrefetchStatsV08:
+    """
+    Counters of a TilePrefetcherV08 (or TileCacheV08).
+
+    hits / misses:
+        Demand tile reads served from cache / loaded on the caller's thread.
+    prefetched:
+        Tiles loaded ahead of time by the prefetcher.
+    prefetch_hits:
+        Demand reads whose tile was in cache *because* it was prefetched.
+    wasted:
+        Prefetched tiles evicted before any demand read used them.
+    """
+
+    hits: int
+    misses: int
+    prefetched: int
+    prefetch_hits: int
+    wasted: int
+
+    @property
+    def requests(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.requests if self.requests else 0.0
+
+    @property
+    def prefetch_hit_rate(self) -> float:
+        """Fraction of prefetched tiles that were later used."""
+        return self.prefetch_hits / self.prefetched if self.prefetched else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+
+class TileCacheV08:
+    """
+    Thread-safe LRU cache of tile payloads in front of 'load_tile(idx)'.
+
+    A demand read of a tile that is currently being prefetched waits for
+    that load instead of issuing a second one.
+    """
+
+    def __init__(self, load_tile: Callable[[TileIndexV07], bytes], capacity: int = 256) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._load = load_tile
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._tiles: "OrderedDict[TileIndexV07, bytes]" = OrderedDict()
+        self._unused_prefetch: Set[TileIndexV07] = set()
+        self._inflight: Dict[TileIndexV07, threading.Event] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._prefetched = 0
+        self._prefetch_hits = 0
+        self._wasted = 0
+
+    def __contains__(self, idx: TileIndexV07) -> bool:
+        with self._lock:
+            return idx in self._tiles
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tiles)
+
+    def _insert(self, idx: TileIndexV07, payload: bytes, prefetched: bool) -> None:
+        # caller holds the lock
+        self._tiles[idx] = payload
+        self._tiles.move_to_end(idx)
+        if prefetched:
+            self._unused_prefetch.add(idx)
+        while len(self._tiles) > self.capacity:
+            old, _ = self._tiles.popitem(last=False)
+            if old in self._unused_prefetch:
+                self._unused_prefetch.discard(old)
+                self._wasted += 1
+
+    def get(self, idx: TileIndexV07) -> bytes:
+        """
+        Return a tile payload, loading it on this thread on a miss.
+        """
+        while True:
+            with self._lock:
+                payload = self._tiles.get(idx)
+                if payload is not None:
+                    self._tiles.move_to_end(idx)
+                    self._hits += 1
+                    if idx in self._unused_prefetch:
+                        self._unused_prefetch.discard(idx)
+                        self._prefetch_hits += 1
+                    return payload
+                pending = self._inflight.get(idx)
+                if pending is None:
+                    break
+            pending.wait()
+            with self._lock:
+                if idx not in self._tiles:
+                    # the prefetch failed or was evicted already; load it ourselves
+                    break
+
+        payload = self._load(idx)
+        with self._lock:
+            self._misses += 1
+            self._insert(idx, payload, prefetched=False)
+        return payload
+
+    def prefetch(self, idx: TileIndexV07) -> bool:
+        """
+        Load a tile into the cache ahead of demand. Returns False if it was
+        already cached or being loaded.
+        """
+        with self._lock:
+            if idx in self._tiles or idx in self._inflight:
+                return False
+            done = threading.Event()
+            self._inflight[idx] = done
+        try:
+            payload = self._load(idx)
+            with self._lock:
+                self._prefetched += 1
+                self._insert(idx, payload, prefetched=True)
+            return True
+        finally:
+            with self._lock:
+                del self._inflight[idx]
+            done.set()
+
+    def stats(self) -> PrefetchStatsV08:
+        with self._lock:
+            return PrefetchStatsV08(
+                hits=self._hits,
+                misses=self._misses,
+                prefetched=self._prefetched,
+                prefetch_hits=self._prefetch_hits,
+                wasted=self._wasted,
+            )
+
+
+# ---------------------------------------------------------------------------
+# Motion prediction
+# ---------------------------------------------------------------------------
+
+
+def extrapolate_rois_v08(history: Sequence[RoiV06], horizon: int) -> List[RoiV06]:
+    """
+    Predict the next 'horizon' ROIs from the last two in 'history', assuming
+    constant velocity of the ROI origin. The size of the last ROI is kept.
+    Returns [] when fewer than two ROIs have been seen.
+    """
+    if len(history) < 2 or horizon <= 0:
+        return []
+    prev, last = history[-2], history[-1]
+    dx, dy, dz = last.x - prev.x, last.y - prev.y, last.z - prev.z
+    return [
+        RoiV06(x=last.x + k * dx, y=last.y + k * dy, z=last.z + k * dz, w=last.w, h=last.h, d=last.d)
+        for k in range(1, horizon + 1)
+    ]
+
+
+def rois_from_pose_v08(
+    center: Tuple[float, float, float],
+    velocity: Tuple[float, float, float],
+    size: Tuple[int, int, int],
+    horizon: int,
+    dt: float = 1.0,
+) -> List[RoiV06]:
+    """
+    Predict the next 'horizon' ROIs of shape 'size' (w, h, d) centred on a
+    pose moving at 'velocity' (voxels per unit time), sampled every 'dt'.
+    """
+    w, h, d = size
+    out: List[RoiV06] = []
+    for k in range(1, horizon + 1):
+        cx, cy, cz = (c + v * k * dt for c, v in zip(center, velocity))
+        out.append(
+            RoiV06(
+                x=int(np.floor(cx - w / 2)),
+                y=int(np.floor(cy - h / 2)),
+                z=int(np.floor(cz - d / 2)),
+                w=w,
+                h=h,
+                d=d,
+            )
+        )
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Prefetcher
+# ---------------------------------------------------------------------------
+
+
+class TilePrefetcherV08:
+    """
+    Tile cache plus a background worker that warms it for predicted ROIs.
+
+    horizon:
+        Number of future ROIs to extrapolate per observation.
+    cache_tiles:
+        LRU capacity in tiles; should exceed a few ROIs' worth of tiles.
+    io_budget_tiles:
+        Maximum number of tile loads scheduled per observation (nearest
+        predicted ROI first).
+    background:
+        If False, prefetching runs synchronously inside observe(); useful
+        for tests and deterministic replays.
+    """
+
+    def __init__(
+        self,
+        tiling: TilingSpecV08,
+        volume_spec: VolumeSpecV06,
+        load_tile: Callable[[TileIndexV07], bytes],
+        horizon: int = 3,
+        cache_tiles: int = 256,
+        io_budget_tiles: int = 32,
+        background: bool = True,
+        on_close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.tiling = tiling
+        self.volume_spec = volume_spec
+        self.horizon = horizon
+        self.io_budget_tiles = io_budget_tiles
+        self.cache = TileCacheV08(load_tile, capacity=cache_tiles)
+
+        self._history: List[RoiV06] = []
+        self._generation = 0
+        self._on_close = on_close
+        self._queue: "queue.Queue[Optional[Tuple[int, TileIndexV07]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        if background:
+            self._worker = threading.Thread(target=self._run, name="civd-tile-prefetch", daemon=True)
+            self._worker.start()
+
+    # -- planning -----------------------------------------------------------
+
+    def _plan(self, predicted: Sequence[RoiV06]) -> List[TileIndexV07]:
+        plan: List[TileIndexV07] = []
+        seen: Set[TileIndexV07] = set()
+        for roi in predicted:
+            roi = clamp_roi(roi, self.tiling.volume_dims)
+            if roi.w == 0 or roi.h == 0 or roi.d == 0:
+                continue
+            for idx in query_tiles_for_roi(self.tiling, roi):
+                if idx in seen or idx in self.cache:
+                    continue
+                seen.add(idx)
+                plan.append(idx)
+                if len(plan) >= self.io_budget_tiles:
+                    return plan
+        return plan
+
+    def _schedule(self, predicted: Sequence[RoiV06]) -> List[TileIndexV07]:
+        plan = self._plan(predicted)
+        self._generation += 1
+        if self._worker is None:
+            for idx in plan:
+                self.cache.prefetch(idx)
+        else:
+            for idx in plan:
+                self._queue.put((self._generation, idx))
+        return plan
+
+    def observe(self, roi: RoiV06) -> List[TileIndexV07]:
+        """
+        Record the ROI just read and schedule tiles for the extrapolated
+        next ROIs. Returns the scheduled tiles.
+        """
+        self._history = (self._history + [roi])[-2:]
+        return self._schedule(extrapolate_rois_v08(self._history, self.horizon))
+
+    def observe_pose(
+        self,
+        center: Tuple[float, float, float],
+        velocity: Tuple[float, float, float],
+        size: Tuple[int, int, int],
+        dt: float = 1.0,
+    ) -> List[TileIndexV07]:
+        """
+        Schedule tiles for ROIs predicted from a pose and velocity.
+        """
+        return self._schedule(rois_from_pose_v08(center, velocity, size, self.horizon, dt=dt))
+
+    # -- reading ------------------------------------------------------------
+
+    def read_roi(
+        self,
+        roi: RoiV06,
+        channels: Optional[List[int]] = None,
+        observe: bool = True,
+    ) -> "np.ndarray":
+        """
+        Read an ROI through the cache, then (by default) observe it so the
+        next ROIs are prefetched while the caller works on this one.
+        """
+        out = assemble_roi_from_tiles_v08(
+            self.tiling, self.volume_spec, roi, self.cache.get, channels=channels
+        )
+        if observe:
+            self.observe(roi)
+        return out
+
+    def stats(self) -> PrefetchStatsV08:
+        return self.cache.stats()
+
+    # -- worker -------------------------------------------------------------
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                generation, idx = item
+                if generation == self._generation:
+                    try:
+                        self.cache.prefetch(idx)
+                    except Exception:
+                        # A failed prefetch is retried as a demand read.
+                        pass
+            finally:
+                self._queue.task_done()
+
+    def wait(self) -> None:
+        """
+        Block until all scheduled prefetches have been processed.
+        """
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        if self._on_close is not None:
+            self._on_close()
+            self._on_close = None
+
+    def __enter__(self) -> "TilePrefetcherV08":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_tile_pack_prefetcher_v08(out_dir: str, **kwargs) -> TilePrefetcherV08:
+    """
+    Open a v0.8 tile pack folder behind a TilePrefetcherV08.
+
+    Keyword arguments are passed to TilePrefetcherV08.
+    """
+    tiling, volume_spec, load_tile, close = open_tile_loader_v08(out_dir)
+    return TilePrefetcherV08(tiling, volume_spec, load_tile, on_close=close, **kwargs)
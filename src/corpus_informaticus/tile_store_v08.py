@@ -0,0 +1,214 @@
+"""
+tile_store_v08.py — CIVD v0.8 content-addressed tile store.
+
+Tile payloads are stored once, under their content hash, and shared by
+every tile pack that references them:
+
+    store_root/
+      ├── refs.json                 (content hash -> reference count)
+      └── blobs/
+            └── ab/
+                  └── ab12...ef.bin (raw tile payload, no header)
+
+A tile pack written with write_tile_pack_v08(..., tile_store=store)
+contains only its manifest; the manifest's "tile_refs" entries point to
+blobs in the store. Blobs carry no CIVDTILE header because the header
+fields (tile index, dtype, ...) differ per pack while the payload bytes
+do not; readers rebuild that information from the manifest.
+
+Reference counts are incremented per tile reference on write and
+decremented by release_tile_pack_v08(). gc() removes blobs that are no
+longer referenced.
+
+Several TileStoreV08 instances (in one or more processes) may share a
+root: every put/release/gc takes an exclusive lock on refs.lock, re-reads
+refs.json and applies its change to the current counts, so no instance
+works from a stale copy.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+from .instrument_v08 import add_bytes_read, add_bytes_written
+from .tile_pack_v07 import TILE_MANIFEST_FILENAME
+
+TILE_STORE_REFS_FILENAME = "refs.json"
+TILE_STORE_LOCK_FILENAME = "refs.lock"
+
+
+def tile_content_hash(payload: bytes) -> str:
+    """
+    Content hash for tile payloads (BLAKE2b, 128-bit, hex).
+    """
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class TileStoreV08:
+    """
+    Content-addressed blob store for tile payloads with reference counts.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = os.path.abspath(root)
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+        self._refs_path = os.path.join(self.root, TILE_STORE_REFS_FILENAME)
+        self._lock_path = os.path.join(self.root, TILE_STORE_LOCK_FILENAME)
+        self._refs: Dict[str, int] = self._load_refs()
+
+    # -- paths ---------------------------------------------------------------
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest + ".bin")
+
+    def _load_refs(self) -> Dict[str, int]:
+        if not os.path.isfile(self._refs_path):
+            return {}
+        with open(self._refs_path, "r", encoding="utf-8") as f:
+            return {k: int(v) for k, v in json.load(f).items()}
+
+    def _save_refs(self) -> None:
+        tmp = f"{self._refs_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._refs, f, sort_keys=True)
+        os.replace(tmp, self._refs_path)
+
+    @contextmanager
+    def _locked(self, save: bool = True) -> Iterator[Dict[str, int]]:
+        """
+        Hold the store lock, refresh the refcounts from disk and (with
+        save=True) write them back when the block completes.
+        """
+        with open(self._lock_path, "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            else:  # pragma: no cover - Windows
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                self._refs = self._load_refs()
+                yield self._refs
+                if save:
+                    self._save_refs()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+                else:  # pragma: no cover - Windows
+                    lock.seek(0)
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    # -- write ---------------------------------------------------------------
+
+    def add_tiles(self, payloads: Iterable[bytes]) -> List[str]:
+        """
+        Store payloads (deduplicated) and take one reference per payload.
+
+        Returns the content hash for each payload, in input order.
+        """
+        digests: List[str] = []
+        # Blobs are written under the lock so a concurrent gc() cannot
+        # delete them before their references are recorded.
+        with self._locked() as refs:
+            for payload in payloads:
+                digest = tile_content_hash(payload)
+                path = self.blob_path(digest)
+                if not os.path.isfile(path):
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(payload)
+                    os.replace(tmp, path)
+                    add_bytes_written(len(payload))
+                refs[digest] = refs.get(digest, 0) + 1
+                digests.append(digest)
+        return digests
+
+    def release(self, digests: Iterable[str]) -> None:
+        """
+        Drop one reference per digest. Blobs are only deleted by gc().
+        """
+        with self._locked() as refs:
+            for digest in digests:
+                n = refs.get(digest, 0) - 1
+                if n > 0:
+                    refs[digest] = n
+                else:
+                    refs.pop(digest, None)
+
+    # -- read ----------------------------------------------------------------
+
+    def get(self, digest: str) -> bytes:
+        with open(self.blob_path(digest), "rb") as f:
+            blob = f.read()
+        add_bytes_read(len(blob))
+        return blob
+
+    def refcount(self, digest: str) -> int:
+        return self._load_refs().get(digest, 0)
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.isfile(self.blob_path(digest))
+
+    # -- maintenance ---------------------------------------------------------
+
+    def gc(self) -> Tuple[int, int]:
+        """
+        Delete every blob without a live reference.
+
+        Returns (blobs_removed, bytes_freed).
+        """
+        removed = 0
+        freed = 0
+        blobs_dir = os.path.join(self.root, "blobs")
+        with self._locked(save=False) as refs:
+            for shard in os.listdir(blobs_dir):
+                shard_dir = os.path.join(blobs_dir, shard)
+                for name in os.listdir(shard_dir):
+                    digest, ext = os.path.splitext(name)
+                    if ext != ".bin" or refs.get(digest, 0) > 0:
+                        continue
+                    path = os.path.join(shard_dir, name)
+                    freed += os.path.getsize(path)
+                    os.remove(path)
+                    removed += 1
+                if not os.listdir(shard_dir):
+                    os.rmdir(shard_dir)
+        return removed, freed
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return {"blobs": unique blobs referenced, "refs": total references}.
+        """
+        refs = self._load_refs()
+        return {"blobs": len(refs), "refs": sum(refs.values())}
+
+
+def release_tile_pack_v08(out_dir: str, store: TileStoreV08, remove_manifest: bool = True) -> int:
+    """
+    Release the store references held by a CAS tile pack.
+
+    Returns the number of references dropped. The blobs themselves stay on
+    disk until TileStoreV08.gc() is run.
+    """
+    mpath = os.path.join(out_dir, TILE_MANIFEST_FILENAME)
+    with open(mpath, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("tile_file_format") != "CAS_V08":
+        raise ValueError(f"Tile pack {out_dir!r} does not reference a tile store")
+
+    digests = [ref[3] for ref in manifest["tile_refs"]]
+    store.release(digests)
+    if remove_manifest:
+        os.remove(mpath)
+    return len(digests)
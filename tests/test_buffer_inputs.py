@@ -0,0 +1,85 @@
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, read_region_from_bytes, write_region_to_bytes
+from corpus_informaticus.snapshot_v07 import write_snapshot_v07, read_snapshot_v07
+from corpus_informaticus.snapshot_v08 import write_snapshot_v08, read_roi_from_snapshot_v08
+from corpus_informaticus.tile_pack_v07 import tile_volume_buffer
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08
+
+DIMS = (64, 64, 64)
+
+
+def _volume():
+    spec = VolumeSpecV06(dims=DIMS, channels=4, dtype="float32")
+    vol = np.arange(64 * 64 * 64 * 4, dtype=np.float32).reshape(64, 64, 64, 4)
+    return spec, vol
+
+
+def _peak_bytes(fn):
+    """
+    Peak traced allocation (Python + NumPy) while running fn().
+    """
+    tracemalloc.start()
+    try:
+        result = fn()
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def test_entry_points_accept_any_buffer():
+    spec, vol = _volume()
+    want = vol[3:9, 4:8, 5:15, 1:3]
+    for buf in (vol, memoryview(vol), bytearray(vol.tobytes()), vol.tobytes()):
+        roi = read_region_from_bytes(buf, spec, 5, 4, 3, 10, 4, 6, channels=[1, 2])
+        assert np.array_equal(roi, want)
+
+    view = read_region_from_bytes(vol, spec, 5, 4, 3, 10, 4, 6, copy=False)
+    assert np.shares_memory(view, vol)
+
+    target = np.zeros_like(vol)
+    write_region_to_bytes(target, spec, 5, 4, 3, want, channels=[1, 2])
+    assert np.array_equal(target[3:9, 4:8, 5:15, 1:3], want)
+
+    try:
+        read_region_from_bytes(vol[:, :, ::2], spec, 0, 0, 0, 1, 1, 1)
+        raise AssertionError("non-contiguous buffers must be rejected")
+    except ValueError:
+        pass
+
+
+def test_no_full_volume_copies():
+    spec, vol = _volume()
+    nbytes = vol.nbytes
+
+    with tempfile.TemporaryDirectory() as td:
+        peak, _ = _peak_bytes(lambda: write_snapshot_v08(f"{td}/a.civd", vol, spec))
+        assert peak < nbytes // 8
+
+        peak, roi = _peak_bytes(lambda: read_roi_from_snapshot_v08(f"{td}/a.civd", 10, 10, 10, 8, 8, 8))
+        assert peak < nbytes // 8
+        assert np.array_equal(roi, vol[10:18, 10:18, 10:18])
+
+        peak, _ = _peak_bytes(lambda: write_snapshot_v07(vol, spec, path=f"{td}/b.civd", return_blob=False))
+        assert peak < nbytes // 8
+
+        blob = bytearray(open(f"{td}/b.civd", "rb").read())
+        peak, (_, _, payload) = _peak_bytes(lambda: read_snapshot_v07(blob))
+        assert peak < nbytes // 8
+        assert np.shares_memory(np.frombuffer(payload, dtype=np.uint8), np.frombuffer(blob, dtype=np.uint8))
+
+    # The tiles themselves are one volume's worth of bytes; no extra copy on top.
+    peak, _ = _peak_bytes(lambda: tile_volume_buffer_v08(vol, spec, (16, 16, 16)))
+    assert peak < nbytes * 1.25
+    peak, _ = _peak_bytes(lambda: tile_volume_buffer(vol, spec, (16, 16, 16)))
+    assert peak < nbytes * 1.25
+
+
+if __name__ == "__main__":
+    test_entry_points_accept_any_buffer()
+    print("test_entry_points_accept_any_buffer: OK")
+    test_no_full_volume_copies()
+    print("test_no_full_volume_copies: OK")
@@ -0,0 +1,67 @@
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06, convert_volume_layout, read_region_from_bytes
+from corpus_informaticus.snapshot_v08 import write_snapshot_v08, read_snapshot_v08, read_roi_from_snapshot_v08
+from corpus_informaticus.tile_index_v08 import TileIndexV08
+from corpus_informaticus.tile_pack_v08 import (
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    read_roi_from_tile_pack_v08,
+)
+
+
+def test_extended_dtypes_roundtrip():
+    dims = (10, 6, 4)
+    roi = RoiV06(x=1, y=2, z=1, w=7, h=3, d=2)
+    for dtype in ("float16", "int16", "int32", "float64"):
+        spec = VolumeSpecV06(dims=dims, channels=2, dtype=dtype)
+        vol = (np.arange(4 * 6 * 10 * 2) - 100).astype(dtype).reshape(4, 6, 10, 2)
+        expect = vol[1:3, 2:5, 1:8]
+
+        with tempfile.TemporaryDirectory() as td:
+            for brick_size in (None, (4, 4, 4)):
+                path = f"{td}/snap.civd"
+                write_snapshot_v08(path, vol.tobytes(), spec, brick_size=brick_size)
+                _, spec2, payload = read_snapshot_v08(path)
+                assert spec2.dtype == dtype and payload == vol.tobytes()
+                out = read_roi_from_snapshot_v08(path, roi.x, roi.y, roi.z, roi.w, roi.h, roi.d)
+                assert out.dtype == np.dtype(dtype) and np.array_equal(out, expect)
+
+            tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (4, 4, 4))
+            write_tile_pack_v08(td, tiling, tiles, spec, manifest_format="both")
+            with TileIndexV08(td) as index:
+                assert index.volume_spec.dtype == dtype
+            assert np.array_equal(read_roi_from_tile_pack_v08(td, roi), expect)
+
+
+def test_dtype_conversion_on_read():
+    dims = (8, 4, 2)
+    spec = VolumeSpecV06(dims=dims, channels=1, dtype="float32")
+    vol = np.linspace(0.0, 4.0, 64, dtype=np.float32).reshape(2, 4, 8, 1)
+
+    half, hspec = convert_volume_layout(vol.tobytes(), spec, "C_CONTIG", dtype="float16")
+    assert hspec.dtype == "float16" and len(half) == len(vol.tobytes()) // 2
+
+    out = read_region_from_bytes(half, hspec, 0, 0, 0, 8, 4, 2, dtype="float32")
+    assert out.dtype == np.float32
+    assert np.allclose(out, vol, atol=1e-2)
+
+    with tempfile.TemporaryDirectory() as td:
+        write_snapshot_v08(f"{td}/s.civd", vol.tobytes(), spec, brick_size=(4, 4, 2))
+        as_f64 = read_roi_from_snapshot_v08(f"{td}/s.civd", 2, 1, 0, 4, 2, 2, dtype="float64")
+        assert as_f64.dtype == np.float64
+        assert np.array_equal(as_f64, vol[0:2, 1:3, 2:6].astype(np.float64))
+
+        tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (4, 4, 2))
+        write_tile_pack_v08(td, tiling, tiles, spec)
+        as_u8 = read_roi_from_tile_pack_v08(td, RoiV06(0, 0, 0, 8, 4, 2), dtype="uint8")
+        assert np.array_equal(as_u8, vol.astype(np.uint8))
+
+
+if __name__ == "__main__":
+    test_extended_dtypes_roundtrip()
+    print("test_extended_dtypes_roundtrip: OK")
+    test_dtype_conversion_on_read()
+    print("test_dtype_conversion_on_read: OK")
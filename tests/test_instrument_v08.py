@@ -0,0 +1,143 @@
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.codec_v03 import decode_civd_v03, encode_bytes_to_civd_v03
+from corpus_informaticus.instrument_v08 import (
+    StatsSinkV08,
+    JsonLinesSinkV08,
+    add_bytes_read,
+    instrument_span,
+    instrumentation_enabled,
+    instrumentation_v08,
+)
+from corpus_informaticus.range_store_v08 import LocalFileStoreV08, read_roi_from_snapshot_store_v08
+from corpus_informaticus.roi_v06 import RoiV06, VolumeSpecV06
+from corpus_informaticus.snapshot_v08 import read_roi_from_snapshot_v08, write_snapshot_v08
+from corpus_informaticus.tile_pack_v07 import tile_index_to_name
+from corpus_informaticus.tile_pack_v08 import read_roi_from_tile_pack_v08, tile_volume_buffer_v08, write_tile_pack_v08
+
+SPEC = VolumeSpecV06(dims=(32, 16, 8), channels=2, dtype="uint16")
+
+
+def _vol():
+    return np.arange(8 * 16 * 32 * 2, dtype=np.uint16).reshape(8, 16, 32, 2)
+
+
+def test_disabled_is_a_no_op():
+    assert not instrumentation_enabled()
+    with instrument_span("outside") as span:
+        add_bytes_read(10)
+        span.set(k=1)
+    stats = StatsSinkV08()
+    with instrumentation_v08(stats):
+        assert instrumentation_enabled()
+        add_bytes_read(10)  # no open span: ignored
+    assert not instrumentation_enabled() and stats.stats() == {}
+
+
+def test_snapshot_roi_spans_and_counters():
+    vol = _vol()
+    stats, events, lines = StatsSinkV08(), [], io.StringIO()
+    with tempfile.TemporaryDirectory() as td:
+        dense, bricked = os.path.join(td, "dense.civd"), os.path.join(td, "bricked.civd")
+        write_snapshot_v08(dense, vol, SPEC)
+        write_snapshot_v08(bricked, vol, SPEC, brick_size=(16, 8, 4))
+
+        with instrumentation_v08(stats, events.append, JsonLinesSinkV08(lines)):
+            out = read_roi_from_snapshot_v08(dense, 4, 2, 1, 10, 5, 3, channels=[1])
+            read_roi_from_snapshot_v08(bricked, 0, 0, 0, 16, 8, 4)
+        assert np.array_equal(out, vol[1:4, 2:7, 4:14, [1]])
+
+    s = stats.stats()
+    assert s["snapshot_v08.read_roi"]["count"] == 2
+    assert s["snapshot_v08.parse_header"]["count"] == 2
+    header = next(e for e in events if e["name"] == "snapshot_v08.parse_header")
+    assert header["parent"] == "snapshot_v08.read_roi" and header["depth"] == 1
+
+    dense_ev, bricked_ev = [e for e in events if e["name"] == "snapshot_v08.read_roi"]
+    assert dense_ev["depth"] == 0 and dense_ev["bytes_read"] == out.nbytes
+    assert dense_ev["bytes_copied"] == out.nbytes and dense_ev["duration_s"] > 0
+    # one whole brick touched; its bytes roll up from assemble_roi
+    assert bricked_ev["bytes_read"] == 16 * 8 * 4 * 2 * 2
+    assert s["tile_pack_v08.assemble_roi"]["bytes_copied"] == 16 * 8 * 4 * 2 * 2
+
+    logged = [json.loads(line) for line in lines.getvalue().splitlines()]
+    assert [e["name"] for e in logged] == [e["name"] for e in events]
+
+
+def test_tile_pack_decode_and_storage_bytes():
+    vol = _vol()
+    tiling, tiles = tile_volume_buffer_v08(vol, SPEC, (16, 8, 8))
+    roi = RoiV06(x=10, y=2, z=0, w=12, h=4, d=8)
+    stats, events = StatsSinkV08(), []
+    with tempfile.TemporaryDirectory() as td:
+        write_tile_pack_v08(td, tiling, tiles, SPEC, compressor="zlib", filters=("shuffle",))
+        # ROI spans tx 0-1, ty 0, tz 0
+        on_disk = sum(os.path.getsize(os.path.join(td, tile_index_to_name(idx))) for idx in tiles if idx.ty == 0)
+
+        with instrumentation_v08(stats, events.append):
+            got = read_roi_from_tile_pack_v08(td, roi)
+    assert np.array_equal(got, vol[0:8, 2:6, 10:22])
+
+    s = stats.stats()
+    assert s["tile_v08.decode"]["count"] == 2
+    assert s["tile_pack_v08.read_roi"]["bytes_read"] == on_disk
+    assemble = next(e for e in events if e["name"] == "tile_pack_v08.assemble_roi")
+    assert assemble["parent"] == "tile_pack_v08.read_roi" and assemble["bytes_copied"] >= got.nbytes
+
+
+def test_codec_crc_span_and_error_flag():
+    stats, events = StatsSinkV08(), []
+    blob = encode_bytes_to_civd_v03(b"x" * 1000, dims=(8, 8, 8), channels=4)
+    with instrumentation_v08(stats, events.append):
+        decode_civd_v03(blob)
+        with pytest.raises(ValueError):
+            decode_civd_v03(b"short")
+    crc = next(e for e in events if e["name"] == "crc32")
+    assert crc["parent"] == "civd_v03.decode" and crc["nbytes"] == 8 * 8 * 8 * 4
+    s = stats.stats()["civd_v03.decode"]
+    assert s["count"] == 2 and s["errors"] == 1 and s["bytes_copied"] == 2048 + 1000
+    assert events[-1]["error"] == "ValueError"
+
+
+def test_range_store_bytes_match_store_stats():
+    vol = _vol()
+    stats = StatsSinkV08()
+    with tempfile.TemporaryDirectory() as td:
+        write_snapshot_v08(os.path.join(td, "snap.civd"), vol, SPEC)
+        with LocalFileStoreV08(td) as store, instrumentation_v08(stats):
+            got = read_roi_from_snapshot_store_v08(store, "snap.civd", 0, 4, 2, 8, 4, 3)
+            assert stats.stats()["range_store_v08.read_roi_snapshot"]["bytes_read"] == store.stats()["bytes_read"]
+    assert np.array_equal(got, vol[2:5, 4:8, 0:8])
+
+
+def test_failing_sink_does_not_break_the_span():
+    stats = StatsSinkV08()
+
+    def broken(event):
+        raise RuntimeError("sink down")
+
+    with instrumentation_v08(broken, stats):
+        with pytest.warns(RuntimeWarning, match="sink down"):
+            with instrument_span("ok"):
+                pass
+        with pytest.warns(RuntimeWarning), pytest.raises(KeyError):
+            with instrument_span("failing"):
+                raise KeyError("original error")
+    s = stats.stats()
+    assert s["ok"]["count"] == 1 and s["failing"]["errors"] == 1
+
+
+if __name__ == "__main__":
+    test_disabled_is_a_no_op()
+    test_snapshot_roi_spans_and_counters()
+    test_tile_pack_decode_and_storage_bytes()
+    test_codec_crc_span_and_error_flag()
+    test_range_store_bytes_match_store_stats()
+    test_failing_sink_does_not_break_the_span()
+    print("All instrumentation tests passed.")
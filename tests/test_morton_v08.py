@@ -0,0 +1,159 @@
+import os
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus import morton_v08
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06, read_region_from_bytes, write_region_to_bytes
+from corpus_informaticus.morton_v08 import (
+    morton_encode_3d,
+    morton_decode_3d,
+    morton_order,
+    morton_rank,
+    morton_ranges_for_roi,
+    encode_morton_volume,
+    decode_morton_volume,
+)
+from corpus_informaticus.snapshot_v08 import write_snapshot_v08, read_snapshot_v08, read_roi_from_snapshot_v08
+from corpus_informaticus.tile_header_v08 import TileHeaderV08, try_parse_tile_header_v08
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08, write_tile_pack_v08, read_roi_from_tile_pack_v08
+
+
+def _volume(dims, channels=2):
+    x, y, z = dims
+    return np.arange(z * y * x * channels, dtype=np.uint32).reshape((z, y, x, channels)).astype(np.uint16)
+
+
+def test_morton_code_roundtrip():
+    rng = np.random.default_rng(1)
+    x, y, z = (rng.integers(0, 1 << 21, size=1000) for _ in range(3))
+    codes = morton_encode_3d(x, y, z)
+    dx, dy, dz = morton_decode_3d(codes)
+    assert np.array_equal(dx, x) and np.array_equal(dy, y) and np.array_equal(dz, z)
+    assert int(morton_encode_3d(1, 0, 0)) == 1
+    assert int(morton_encode_3d(0, 1, 0)) == 2
+    assert int(morton_encode_3d(0, 0, 1)) == 4
+
+
+def test_morton_rank_matches_sorted_order_for_non_pow2_dims():
+    dims = (13, 7, 10)
+    order = morton_order(dims)
+    rank_expected = np.empty_like(order)
+    rank_expected[order] = np.arange(order.size)
+
+    zz, yy, xx = np.meshgrid(*(np.arange(n) for n in dims[::-1]), indexing="ij")
+    rank = morton_rank(dims, xx.ravel(), yy.ravel(), zz.ravel())
+    assert np.array_equal(rank, rank_expected)
+
+
+def test_morton_volume_roundtrip_and_roi():
+    dims = (20, 12, 9)
+    vol = _volume(dims)
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16")
+
+    mbuf, mspec = encode_morton_volume(vol.tobytes(), spec)
+    assert mspec.signature == "MORTON"
+    assert len(mbuf) == spec.expected_nbytes()
+
+    cbuf, cspec = decode_morton_volume(mbuf, mspec)
+    assert cspec.signature == "C_CONTIG"
+    assert cbuf == vol.tobytes()
+
+    roi = read_region_from_bytes(mbuf, mspec, x=3, y=2, z=1, w=11, h=7, d=6, channels=[1])
+    assert np.array_equal(roi, vol[1:7, 2:9, 3:14, [1]])
+
+
+def test_morton_ranges_for_aligned_cube_is_single_range():
+    dims = (64, 64, 64)
+    assert morton_ranges_for_roi(dims, RoiV06(x=16, y=32, z=0, w=16, h=16, d=16)) == [
+        (int(morton_encode_3d(16, 32, 0)), int(morton_encode_3d(16, 32, 0)) + 16 ** 3)
+    ]
+    # Unaligned ROI: far fewer ranges than the 8*8 x-runs of a row-major read.
+    ranges = morton_ranges_for_roi(dims, RoiV06(x=4, y=4, z=4, w=8, h=8, d=8), max_gap=64)
+    assert len(ranges) < 64
+    assert sum(b - a for a, b in ranges) >= 8 ** 3
+
+
+def test_morton_roi_read_write_match_row_major_for_any_box():
+    dims = (37, 21, 18)
+    vol = _volume(dims)
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16")
+    mbuf, mspec = encode_morton_volume(vol.tobytes(), spec)
+    rng = np.random.default_rng(7)
+    for _ in range(25):
+        x, y, z = (int(rng.integers(0, n)) for n in dims)
+        w, h, d = (int(rng.integers(1, n - o + 1)) for n, o in zip(dims, (x, y, z)))
+        roi = read_region_from_bytes(mbuf, mspec, x=x, y=y, z=z, w=w, h=h, d=d)
+        assert np.array_equal(roi, vol[z:z + d, y:y + h, x:x + w])
+        ranges = morton_ranges_for_roi(dims, RoiV06(x, y, z, w, h, d))
+        assert sum(b - a for a, b in ranges) == w * h * d
+
+    buf = bytearray(mbuf)
+    patch = np.full((5, 9, 17, 1), 7, dtype=np.uint16)
+    write_region_to_bytes(buf, mspec, 3, 10, 8, patch, channels=[1])
+    vol[8:13, 10:19, 3:20, [1]] = patch
+    assert decode_morton_volume(bytes(buf), mspec)[0] == vol.tobytes()
+
+
+def test_morton_roi_large_nodes_copy_as_blocks():
+    dims = (70, 66, 40)
+    vol = _volume(dims, channels=3)
+    spec = VolumeSpecV06(dims=dims, channels=3, dtype="uint16")
+    mbuf, mspec = encode_morton_volume(vol.tobytes(), spec)
+    boxes = [(0, 0, 0, 64, 64, 32), (3, 13, 5, 61, 53, 35), (32, 0, 0, 38, 66, 40)]
+    saved = morton_v08._BLOCK_MAX_BITS
+    try:
+        for max_bits in (saved, 4):  # 4: 32-wide nodes are split into 16-wide blocks
+            morton_v08._BLOCK_MAX_BITS = max_bits
+            for x, y, z, w, h, d in boxes:
+                want = vol[z:z + d, y:y + h, x:x + w]
+                assert np.array_equal(read_region_from_bytes(mbuf, mspec, x=x, y=y, z=z, w=w, h=h, d=d), want)
+                got = read_region_from_bytes(mbuf, mspec, x=x, y=y, z=z, w=w, h=h, d=d, channels=[2, 0])
+                assert np.array_equal(got, want[..., [2, 0]])
+
+                buf = bytearray(mbuf)
+                patch = (want[..., [1]] + 5).astype(np.uint16)
+                write_region_to_bytes(buf, mspec, x, y, z, patch, channels=[1])
+                expected = vol.copy()
+                expected[z:z + d, y:y + h, x:x + w, [1]] = patch
+                assert decode_morton_volume(bytes(buf), mspec)[0] == expected.tobytes()
+                write_region_to_bytes(buf, mspec, x, y, z, want)
+                assert bytes(buf) == mbuf
+    finally:
+        morton_v08._BLOCK_MAX_BITS = saved
+
+
+def test_morton_snapshot_and_tile_pack():
+    dims = (24, 16, 8)
+    vol = _volume(dims)
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16")
+    mbuf, mspec = encode_morton_volume(vol.tobytes(), spec)
+
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "snap.civd")
+        write_snapshot_v08(path, mbuf, mspec)
+        header, spec2, _ = read_snapshot_v08(path)
+        assert header.signature == "MORTON" and spec2 == mspec
+
+        roi = read_roi_from_snapshot_v08(path, x=5, y=3, z=2, w=10, h=9, d=5)
+        assert np.array_equal(roi, vol[2:7, 3:12, 5:15])
+
+        tiling, tiles = tile_volume_buffer_v08(mbuf, mspec, (8, 8, 8))
+        pack = os.path.join(td, "pack")
+        write_tile_pack_v08(pack, tiling, tiles, mspec)
+        out = read_roi_from_tile_pack_v08(pack, RoiV06(x=5, y=3, z=2, w=10, h=9, d=5))
+        assert np.array_equal(out, vol[2:7, 3:12, 5:15])
+
+    hdr = TileHeaderV08(8, 64, 0, 0, 0, 0, (8, 8, 8), 2, "uint16", "MORTON", "C", 2048)
+    assert try_parse_tile_header_v08(hdr.to_bytes()).signature == "MORTON"
+
+
+if __name__ == "__main__":
+    test_morton_code_roundtrip()
+    test_morton_rank_matches_sorted_order_for_non_pow2_dims()
+    test_morton_volume_roundtrip_and_roi()
+    test_morton_ranges_for_aligned_cube_is_single_range()
+    test_morton_roi_read_write_match_row_major_for_any_box()
+    test_morton_roi_large_nodes_copy_as_blocks()
+    test_morton_snapshot_and_tile_pack()
+    print("All Morton v0.8 tests passed.")
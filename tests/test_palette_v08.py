@@ -0,0 +1,95 @@
+import os
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06, _volume_to_bytes
+from corpus_informaticus.palette_v08 import (
+    PaletteTileV08,
+    pack_indices,
+    unpack_indices,
+    encode_palette_tile_v08,
+    decode_palette_tile_v08,
+)
+from corpus_informaticus.tile_index_v08 import TILE_INDEX_FILENAME
+from corpus_informaticus.tile_pack_v08 import (
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    read_roi_from_tile_pack_v08,
+)
+
+
+def _semantic(dims=(40, 24, 16)):
+    # channel 0: a few class labels, channel 1: occupancy (0/1)
+    x, y, z = dims
+    zz, yy, xx = np.meshgrid(np.arange(z), np.arange(y), np.arange(x), indexing="ij")
+    labels = ((xx // 10 + yy // 8 + zz // 6) % 5).astype(np.uint8)
+    occ = ((xx + 2 * yy + zz) % 7 == 0).astype(np.uint8)
+    return np.stack([labels, occ], axis=-1)
+
+
+def test_pack_unpack_and_raw_fallback():
+    rng = np.random.default_rng(2)
+    for bits in (0, 1, 2, 4, 8):
+        idx = rng.integers(0, 1 << bits, size=1001, dtype=np.uint8)
+        packed = np.frombuffer(pack_indices(idx, bits), dtype=np.uint8)
+        assert len(packed) == -(-1001 * bits // 8)
+        pos = np.arange(1001)
+        assert np.array_equal(unpack_indices(packed, bits, pos), idx)
+
+    spec = VolumeSpecV06(dims=(7, 5, 3), channels=2, dtype="uint16", signature="MORTON")
+    vol = np.zeros((3, 5, 7, 2), dtype=np.uint16)
+    vol[..., 0] = rng.integers(0, 4, size=(3, 5, 7))
+    vol[..., 1] = np.arange(105).reshape(3, 5, 7) * 300  # > 256 distinct values
+    payload = _volume_to_bytes(vol, spec)
+    blob = encode_palette_tile_v08(payload, spec)
+    assert decode_palette_tile_v08(blob, spec) == payload
+    box = PaletteTileV08(blob, spec).read_box((slice(1, 3), slice(0, 4), slice(2, 6)), [1, 0])
+    assert np.array_equal(box, vol[1:3, 0:4, 2:6][..., [1, 0]])
+
+
+def test_palette_pack_is_small_and_reads_back():
+    vol = _semantic()
+    spec = VolumeSpecV06(dims=(40, 24, 16), channels=2, dtype="uint8")
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (16, 16, 16))
+
+    def _pack_size(d):
+        return sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d) if f.endswith(".bin"))
+
+    with tempfile.TemporaryDirectory() as td:
+        raw, pal = os.path.join(td, "raw"), os.path.join(td, "pal")
+        write_tile_pack_v08(raw, tiling, tiles, spec)
+        write_tile_pack_v08(pal, tiling, tiles, spec, filters=("palette",), manifest_format="both", tile_crc=True)
+        assert _pack_size(pal) * 3 < _pack_size(raw)
+
+        roi = RoiV06(x=5, y=3, z=2, w=30, h=17, d=11)
+        want = vol[2:13, 3:20, 5:35]
+        assert np.array_equal(read_roi_from_tile_pack_v08(pal, roi), want)
+        assert np.array_equal(read_roi_from_tile_pack_v08(pal, roi, channels=[1]), want[..., 1:])
+
+        os.remove(os.path.join(pal, TILE_INDEX_FILENAME))
+        assert np.array_equal(read_roi_from_tile_pack_v08(pal, roi), want)
+
+
+def test_float_palette_is_bit_exact():
+    spec = VolumeSpecV06(dims=(4, 3, 2), channels=1, dtype="float32")
+    quiet_nan = np.float32(np.nan)
+    payload_nan = np.array([0x7FC00001], dtype=np.uint32).view(np.float32)[0]
+    vol = np.zeros((2, 3, 4, 1), dtype=np.float32)
+    vol[0, 0, :4, 0] = [0.0, -0.0, quiet_nan, payload_nan]
+    vol[1, 2, 3, 0] = 1.5
+    payload = _volume_to_bytes(vol, spec)
+
+    blob = encode_palette_tile_v08(payload, spec)
+    assert decode_palette_tile_v08(blob, spec) == payload
+    box = PaletteTileV08(blob, spec).read_box((slice(0, 1), slice(0, 1), slice(0, 4)))
+    assert box.tobytes() == vol[0:1, 0:1, 0:4].tobytes()
+
+
+if __name__ == "__main__":
+    test_pack_unpack_and_raw_fallback()
+    print("test_pack_unpack_and_raw_fallback: OK")
+    test_palette_pack_is_small_and_reads_back()
+    print("test_palette_pack_is_small_and_reads_back: OK")
+    test_float_palette_is_bit_exact()
+    print("test_float_palette_is_bit_exact: OK")
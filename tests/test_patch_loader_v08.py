@@ -0,0 +1,131 @@
+import gc
+import os
+import tempfile
+import warnings
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.snapshot_v08 import write_snapshot_v08
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08, write_tile_pack_v08
+from corpus_informaticus.patch_loader_v08 import (
+    ClassBalancedPatchSamplerV08,
+    PatchLoaderV08,
+    RoiListPatchSamplerV08,
+    UniformPatchSamplerV08,
+    open_patch_reader_v08,
+)
+
+DIMS = (24, 20, 12)
+PATCH = (6, 5, 4)
+
+
+def _volume():
+    rng = np.random.default_rng(0)
+    vol = rng.integers(0, 1000, size=(12, 20, 24, 2), dtype=np.uint16)
+    vol[..., 1] = 0
+    vol[2:4, 3:5, 4:6, 1] = 7     # rare class: 8 voxels
+    vol[6:12, :, 12:, 1] = 3      # common class
+    return vol
+
+
+def _write_sources(td, vol):
+    spec = VolumeSpecV06(dims=DIMS, channels=2, dtype="uint16")
+    dense = os.path.join(td, "dense.civd")
+    bricked = os.path.join(td, "bricked.civd")
+    pack = os.path.join(td, "pack")
+    write_snapshot_v08(dense, vol, spec)
+    write_snapshot_v08(bricked, vol, spec, brick_size=(8, 8, 4))
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+    write_tile_pack_v08(pack, tiling, tiles, spec)
+    return dense, bricked, pack
+
+
+def _expected(vol, origins, channels=slice(None)):
+    w, h, d = PATCH
+    return np.stack([vol[z : z + d, y : y + h, x : x + w, channels] for x, y, z in origins])
+
+
+def test_loader_workers_match_direct_reads_for_all_sources():
+    vol = _volume()
+    with tempfile.TemporaryDirectory() as td:
+        for path in _write_sources(td, vol):
+            sampler = UniformPatchSamplerV08(DIMS, PATCH, seed=1)
+            with PatchLoaderV08(path, sampler, PATCH, batch_size=5, num_workers=2, num_batches=6) as loader:
+                batches = [(b.index, b.origins, b.patches.copy()) for b in loader]
+            assert [i for i, _, _ in batches] == list(range(6))
+            for _, origins, patches in batches:
+                assert patches.shape == (5, 4, 5, 6, 2)
+                assert np.array_equal(patches, _expected(vol, origins))
+
+
+def test_roi_list_sampler_partial_last_batch_in_process():
+    vol = _volume()
+    with tempfile.TemporaryDirectory() as td:
+        dense, _, _ = _write_sources(td, vol)
+        rois = [RoiV06(x, 2, 1, *PATCH) for x in range(7)]
+        sampler = RoiListPatchSamplerV08(rois, PATCH)
+        with PatchLoaderV08(dense, sampler, PATCH, batch_size=3, channels=[0], dtype="float32",
+                            num_workers=0, copy=True) as loader:
+            batches = list(loader)
+        assert [len(b.origins) for b in batches] == [3, 3, 1]
+        got = np.concatenate([b.patches for b in batches])
+        assert got.dtype == np.float32
+        assert np.array_equal(got, _expected(vol, [(x, 2, 1) for x in range(7)], [0]))
+
+        with pytest.raises(ValueError, match="out of bounds"):
+            bad = RoiListPatchSamplerV08([[20, 0, 0]], PATCH)
+            with PatchLoaderV08(dense, bad, PATCH, batch_size=2, num_workers=0) as loader:
+                next(loader)
+
+
+def test_class_balanced_sampler_covers_rare_class():
+    vol = _volume()
+    with tempfile.TemporaryDirectory() as td:
+        _, _, pack = _write_sources(td, vol)
+        sampler = ClassBalancedPatchSamplerV08(pack, PATCH, semantic_channel=1, seed=3)
+        assert sampler.classes.tolist() == [0, 3, 7]
+
+        origins = sampler.sample(300)
+        assert np.all(origins >= 0) and np.all(origins + PATCH <= DIMS)
+        with open_patch_reader_v08(pack) as reader:
+            labels = reader.read_regions(origins, PATCH, channels=[1])
+        has_rare = (labels == 7).reshape(300, -1).any(axis=1)
+        # 1/3 of draws target class 7 and always contain one of its voxels
+        assert 0.25 < has_rare.mean() < 0.45
+
+        only_rare = ClassBalancedPatchSamplerV08(pack, PATCH, semantic_channel=1, classes=[7], seed=3)
+        with open_patch_reader_v08(pack) as reader:
+            assert (reader.read_regions(only_rare.sample(20), PATCH, channels=[1]) == 7).reshape(20, -1).any(axis=1).all()
+
+        with pytest.raises(ValueError):
+            ClassBalancedPatchSamplerV08(pack, PATCH, semantic_channel=1, classes=[5])
+
+
+def test_reader_closes_file_on_bad_snapshot():
+    with tempfile.TemporaryDirectory() as td:
+        dense, _, _ = _write_sources(td, _volume())
+        truncated = os.path.join(td, "truncated.civd")
+        with open(dense, "rb") as f:
+            blob = f.read()
+        with open(truncated, "wb") as f:
+            f.write(blob[:-100])
+        empty = os.path.join(td, "empty.civd")
+        open(empty, "wb").close()
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            for path in (truncated, empty):
+                with pytest.raises(ValueError):
+                    open_patch_reader_v08(path)
+            gc.collect()
+        assert not [w for w in caught if issubclass(w.category, ResourceWarning)]
+
+
+if __name__ == "__main__":
+    test_loader_workers_match_direct_reads_for_all_sources()
+    test_roi_list_sampler_partial_last_batch_in_process()
+    test_class_balanced_sampler_covers_rare_class()
+    test_reader_closes_file_on_bad_snapshot()
+    print("All patch loader tests passed.")
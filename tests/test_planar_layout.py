@@ -0,0 +1,78 @@
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import (
+    VolumeSpecV06,
+    RoiV06,
+    convert_volume_layout,
+    full_volume_from_bytes,
+    read_region_from_bytes,
+)
+from corpus_informaticus.snapshot_v08 import (
+    write_snapshot_v08,
+    read_roi_from_snapshot_v08,
+    write_region_to_snapshot_v08,
+)
+from corpus_informaticus.tile_pack_v08 import (
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    read_roi_from_tile_pack_v08,
+)
+
+
+def _volume():
+    dims = (12, 10, 6)
+    vol = np.arange(6 * 10 * 12 * 3, dtype=np.uint16).reshape(6, 10, 12, 3)
+    spec = VolumeSpecV06(dims=dims, channels=3, dtype="uint16")
+    return vol, spec
+
+
+def test_planar_layout_is_channel_major():
+    vol, spec = _volume()
+    for order in ("C", "F"):
+        buf, pspec = convert_volume_layout(vol.tobytes(), spec, "PLANAR", order=order)
+        assert pspec.signature == "PLANAR"
+
+        # Each channel occupies one contiguous plane.
+        plane_nbytes = len(buf) // 3
+        plane1 = np.frombuffer(buf[plane_nbytes:2 * plane_nbytes], dtype=np.uint16)
+        assert np.array_equal(np.sort(plane1), np.sort(vol[..., 1].ravel()))
+
+        assert np.array_equal(full_volume_from_bytes(buf, pspec), vol)
+        roi = read_region_from_bytes(buf, pspec, 2, 1, 1, 5, 4, 3, channels=[2, 0])
+        assert np.array_equal(roi, vol[1:4, 1:5, 2:7][..., [2, 0]])
+
+        back, _ = convert_volume_layout(buf, pspec, "C_CONTIG")
+        assert back == vol.tobytes()
+
+
+def test_planar_snapshot_and_tiles():
+    vol, spec = _volume()
+    buf, pspec = convert_volume_layout(vol.tobytes(), spec, "PLANAR")
+    roi = RoiV06(x=3, y=2, z=1, w=7, h=6, d=4)
+    expect = vol[1:5, 2:8, 3:10][..., [1]]
+
+    with tempfile.TemporaryDirectory() as td:
+        for brick_size in (None, (4, 4, 4)):
+            path = f"{td}/planar_{brick_size is not None}.civd"
+            write_snapshot_v08(path, buf, pspec, brick_size=brick_size)
+            out = read_roi_from_snapshot_v08(path, roi.x, roi.y, roi.z, roi.w, roi.h, roi.d, channels=[1])
+            assert np.array_equal(out, expect)
+
+            write_region_to_snapshot_v08(path, 0, 0, 0, np.full((1, 1, 2, 1), 9, dtype=np.uint16), channels=[2])
+            patched = read_roi_from_snapshot_v08(path, 0, 0, 0, 3, 1, 1)
+            assert patched[0, 0, :, 2].tolist() == [9, 9, int(vol[0, 0, 2, 2])]
+            assert np.array_equal(patched[..., :2], vol[0:1, 0:1, 0:3, :2])
+
+        tiling, tiles = tile_volume_buffer_v08(buf, pspec, (8, 8, 8))
+        write_tile_pack_v08(f"{td}/pack", tiling, tiles, pspec)
+        out = read_roi_from_tile_pack_v08(f"{td}/pack", roi, channels=[1])
+        assert np.array_equal(out, expect)
+
+
+if __name__ == "__main__":
+    test_planar_layout_is_channel_major()
+    print("test_planar_layout_is_channel_major: OK")
+    test_planar_snapshot_and_tiles()
+    print("test_planar_snapshot_and_tiles: OK")
@@ -0,0 +1,70 @@
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.snapshot_v08 import read_snapshot_v08
+from corpus_informaticus.quantize_v08 import (
+    QuantSpecV08,
+    fit_quant_spec_v08,
+    quantize_volume_v08,
+    dequantize_volume_v08,
+    write_quantized_snapshot_v08,
+    read_roi_dequantized_from_snapshot_v08,
+    write_quantized_tile_pack_v08,
+    read_roi_dequantized_from_tile_pack_v08,
+)
+
+
+def _field():
+    dims = (16, 8, 4)
+    rng = np.random.default_rng(0)
+    vol = np.empty((4, 8, 16, 2), dtype=np.float32)
+    vol[..., 0] = rng.uniform(-0.1, 0.1, size=(4, 8, 16))    # TSDF
+    vol[..., 1] = rng.uniform(0.0, 1.0, size=(4, 8, 16))     # confidence
+    return vol, VolumeSpecV06(dims=dims, channels=2, dtype="float32")
+
+
+def test_quantize_roundtrip_error_bound():
+    vol, spec = _field()
+    for dtype in ("uint8", "uint16", "int16"):
+        quant = fit_quant_spec_v08(vol.tobytes(), spec, dtype=dtype)
+        codes, stored = quantize_volume_v08(vol.tobytes(), spec, quant)
+        assert stored.dtype == dtype
+        assert len(codes) == vol.size * np.dtype(dtype).itemsize
+
+        back, fspec = dequantize_volume_v08(codes, stored, quant)
+        assert fspec.dtype == "float32"
+        err = np.abs(np.frombuffer(back, dtype=np.float32).reshape(vol.shape) - vol)
+        assert (err.max(axis=(0, 1, 2)) <= np.asarray(quant.scale) / 2 + 1e-6).all()
+
+    assert QuantSpecV08.from_dict(quant.to_dict()) == quant
+
+
+def test_quantized_snapshot_and_pack_roi():
+    vol, spec = _field()
+    quant = fit_quant_spec_v08(vol.tobytes(), spec, dtype="uint8")
+    roi = RoiV06(x=3, y=1, z=1, w=9, h=5, d=2)
+    ref = vol[1:3, 1:6, 3:12]
+    tol = np.asarray(quant.scale) / 2 + 1e-6
+
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/q.civd"
+        write_quantized_snapshot_v08(path, vol.tobytes(), spec, quant, meta={"sensor": "tsdf"}, brick_size=(8, 8, 4))
+        header, stored, _ = read_snapshot_v08(path)
+        assert stored.dtype == "uint8" and header.meta["sensor"] == "tsdf"
+
+        out = read_roi_dequantized_from_snapshot_v08(path, roi.x, roi.y, roi.z, roi.w, roi.h, roi.d, channels=[1])
+        assert out.dtype == np.float32 and out.shape == (2, 5, 9, 1)
+        assert np.all(np.abs(out[..., 0] - ref[..., 1]) <= tol[1])
+
+        write_quantized_tile_pack_v08(f"{td}/pack", vol.tobytes(), spec, quant, (8, 8, 4))
+        out = read_roi_dequantized_from_tile_pack_v08(f"{td}/pack", roi)
+        assert np.all(np.abs(out - ref) <= tol)
+
+
+if __name__ == "__main__":
+    test_quantize_roundtrip_error_bound()
+    print("test_quantize_roundtrip_error_bound: OK")
+    test_quantized_snapshot_and_pack_roi()
+    print("test_quantized_snapshot_and_pack_roi: OK")
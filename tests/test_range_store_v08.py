@@ -0,0 +1,192 @@
+import functools
+import http.server
+import os
+import re
+import tempfile
+import threading
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06, _volume_to_bytes
+from corpus_informaticus.morton_v08 import encode_morton_volume
+from corpus_informaticus.snapshot_v08 import write_snapshot_v08
+from corpus_informaticus.tile_manifest_v07 import TileIndexV07
+from corpus_informaticus.tile_pack_v07 import tile_index_to_name
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08, write_tile_pack_v08
+from corpus_informaticus.tile_store_v08 import TileStoreV08
+from corpus_informaticus.range_store_v08 import (
+    HttpRangeStoreV08,
+    LocalFileStoreV08,
+    coalesce_ranges,
+    read_roi_from_snapshot_store_v08,
+    read_roi_from_tile_pack_store_v08,
+)
+
+DIMS = (40, 24, 16)
+
+
+class _RangeHandler(http.server.SimpleHTTPRequestHandler):
+    """Minimal Range support on top of the stdlib file server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        m = re.fullmatch(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        path = self.translate_path(self.path)
+        if m is None or not os.path.isfile(path):
+            return super().do_GET()
+        size = os.path.getsize(path)
+        start, stop = int(m.group(1)), min(int(m.group(2)), size - 1)
+        with open(path, "rb") as f:
+            f.seek(start)
+            body = f.read(stop - start + 1)
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{stop}/{size}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _NoRangeHandler(http.server.SimpleHTTPRequestHandler):
+    """Stdlib file server: ignores Range and always answers 200."""
+
+    protocol_version = "HTTP/1.1"
+    gets = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.gets.append(self.path)
+        return super().do_GET()
+
+
+def _serve(root, handler_cls=_RangeHandler):
+    handler = functools.partial(handler_cls, directory=root)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _volume():
+    return np.arange(16 * 24 * 40 * 3, dtype=np.uint16).reshape(16, 24, 40, 3)
+
+
+def test_coalesce_ranges():
+    assert coalesce_ranges([(100, 10), (0, 10), (12, 4), (50, 0)], max_gap=2) == [(0, 16), (100, 110)]
+    assert coalesce_ranges([(0, 10), (5, 2), (20, 5)]) == [(0, 10), (20, 25)]
+    assert coalesce_ranges([]) == []
+
+
+def test_snapshot_rois_over_http_all_layouts():
+    vol = _volume()
+    base = VolumeSpecV06(dims=DIMS, channels=3, dtype="uint16")
+    with tempfile.TemporaryDirectory() as td:
+        names = {}
+        for order, signature in (("C", "C_CONTIG"), ("F", "F_CONTIG"), ("C", "PLANAR")):
+            spec = replace(base, order=order, signature=signature)
+            names[signature] = f"{signature}.civd"
+            write_snapshot_v08(os.path.join(td, names[signature]), _volume_to_bytes(vol, spec), spec)
+        morton, mspec = encode_morton_volume(vol.tobytes(), base)
+        names["MORTON"] = "morton.civd"
+        write_snapshot_v08(os.path.join(td, "morton.civd"), morton, mspec)
+        names["BRICKED"] = "bricked.civd"
+        write_snapshot_v08(os.path.join(td, "bricked.civd"), vol, base, brick_size=(8, 8, 8))
+
+        server = _serve(td)
+        try:
+            with HttpRangeStoreV08(f"http://127.0.0.1:{server.server_address[1]}/", max_gap=256) as store:
+                for label, key in names.items():
+                    got = read_roi_from_snapshot_store_v08(store, key, 6, 3, 2, 9, 7, 5, channels=[2, 0])
+                    assert np.array_equal(got, vol[2:7, 3:10, 6:15][..., [2, 0]]), label
+
+                before = store.stats()
+                full = os.path.getsize(os.path.join(td, names["C_CONTIG"]))
+                read_roi_from_snapshot_store_v08(store, names["C_CONTIG"], 0, 0, 4, 40, 24, 2, dtype="float32")
+                used = {k: store.stats()[k] - before[k] for k in before}
+                # header probe + one coalesced payload range, far less than the file
+                assert used["requests"] <= 3 and used["bytes_read"] < full // 2
+
+                with pytest.raises(FileNotFoundError):
+                    store.read("missing.civd")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # max_gap=0 keeps every ROI row its own range
+        rng = np.random.default_rng(5)
+        with LocalFileStoreV08(td, max_gap=0) as store:
+            for label, key in names.items():
+                for _ in range(5):
+                    w, h, d = (int(rng.integers(1, n + 1)) for n in DIMS)
+                    x, y, z = (int(rng.integers(0, n - s + 1)) for n, s in zip(DIMS, (w, h, d)))
+                    got = read_roi_from_snapshot_store_v08(store, key, x, y, z, w, h, d, dtype="float32")
+                    assert got.dtype == np.float32 and got.flags.c_contiguous, label
+                    assert np.array_equal(got, vol[z : z + d, y : y + h, x : x + w]), label
+
+
+def test_server_without_range_support_downloads_once():
+    vol = _volume()
+    spec = VolumeSpecV06(dims=DIMS, channels=3, dtype="uint16")
+    with tempfile.TemporaryDirectory() as td:
+        write_snapshot_v08(os.path.join(td, "snap.civd"), vol, spec)
+        full = os.path.getsize(os.path.join(td, "snap.civd"))
+        server = _serve(td, _NoRangeHandler)
+        try:
+            with HttpRangeStoreV08(f"http://127.0.0.1:{server.server_address[1]}/", max_gap=0) as store:
+                for _ in range(2):
+                    got = read_roi_from_snapshot_store_v08(store, "snap.civd", 6, 3, 2, 9, 7, 5)
+                    assert np.array_equal(got, vol[2:7, 3:10, 6:15])
+                assert _NoRangeHandler.gets == ["/snap.civd"]
+                assert store.stats() == {"requests": 1, "bytes_read": full}
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_tile_pack_rois_from_local_and_http_stores():
+    vol = _volume()
+    spec = VolumeSpecV06(dims=DIMS, channels=3, dtype="uint16")
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (16, 16, 8))
+    roi = RoiV06(x=10, y=5, z=3, w=20, h=15, d=10)
+    expected = vol[3:13, 5:20, 10:30, [1]]
+
+    with tempfile.TemporaryDirectory() as td:
+        write_tile_pack_v08(os.path.join(td, "pack"), tiling, tiles, spec, compressor="zlib", filters=("shuffle",))
+        write_tile_pack_v08(os.path.join(td, "cas"), tiling, tiles, spec, tile_store=TileStoreV08(os.path.join(td, "store")))
+        write_tile_pack_v08(os.path.join(td, "binary"), tiling, tiles, spec, compressor="zlib",
+                            manifest_format="binary", tile_crc=True)
+
+        with LocalFileStoreV08(td) as store:
+            for prefix in ("pack", "cas", "binary"):
+                assert np.array_equal(read_roi_from_tile_pack_store_v08(store, prefix, roi, channels=[1]), expected)
+
+        server = _serve(td)
+        try:
+            with HttpRangeStoreV08(f"http://127.0.0.1:{server.server_address[1]}", max_connections=4) as store:
+                for prefix in ("pack", "cas", "binary"):
+                    got = read_roi_from_tile_pack_store_v08(store, prefix, roi, channels=[1])
+                    assert np.array_equal(got, expected), prefix
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # the binary index's CRCs are checked on remote reads too
+        with open(os.path.join(td, "binary", tile_index_to_name(TileIndexV07(1, 0, 0))), "r+b") as f:
+            f.seek(-4, os.SEEK_END)
+            f.write(b"\xff\xff\xff\xff")
+        with LocalFileStoreV08(td) as store, pytest.raises(ValueError, match="CRC"):
+            read_roi_from_tile_pack_store_v08(store, "binary", roi)
+
+
+if __name__ == "__main__":
+    test_coalesce_ranges()
+    test_snapshot_rois_over_http_all_layouts()
+    test_server_without_range_support_downloads_once()
+    test_tile_pack_rois_from_local_and_http_stores()
+    print("All range store tests passed.")
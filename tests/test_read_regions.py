@@ -0,0 +1,78 @@
+"""
+Batched multi-ROI reads (read_regions) across all volume layouts.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.roi_v06 import (
+    VolumeSpecV06,
+    _volume_to_bytes,
+    read_region_from_bytes,
+    read_regions,
+)
+from corpus_informaticus.morton_v08 import encode_morton_volume
+
+DIMS = (13, 9, 7)
+
+
+def _payloads():
+    spec = VolumeSpecV06(dims=DIMS, channels=3, dtype="uint16")
+    vol = np.arange(7 * 9 * 13 * 3, dtype=np.uint16).reshape((7, 9, 13, 3))
+    out = {}
+    for order, signature in (("C", "C_CONTIG"), ("F", "F_CONTIG"), ("C", "PLANAR"), ("F", "PLANAR")):
+        s = replace(spec, order=order, signature=signature)
+        out[(order, signature)] = (_volume_to_bytes(vol, s), s)
+    out[("C", "MORTON")] = encode_morton_volume(out[("C", "C_CONTIG")][0], spec)
+    return vol, out
+
+
+def test_read_regions_matches_per_roi_reads():
+    vol, payloads = _payloads()
+    rng = np.random.default_rng(7)
+    size = (4, 3, 2)
+    origins = np.stack(
+        [rng.integers(0, DIMS[i] - size[i] + 1, 25) for i in range(3)], axis=1
+    )
+    expected = np.stack([vol[z : z + 2, y : y + 3, x : x + 4] for x, y, z in origins])
+
+    for (order, signature), (buf, spec) in payloads.items():
+        for strategy in ("gather", "loop", "auto"):
+            got = read_regions(buf, spec, origins, size, strategy=strategy)
+            assert got.shape == (25, 2, 3, 4, 3)
+            assert np.array_equal(got, expected), (order, signature, strategy)
+
+            sub = read_regions(buf, spec, origins, size, channels=[2, 0], strategy=strategy)
+            assert np.array_equal(sub, expected[..., [2, 0]]), (order, signature, strategy)
+
+        x, y, z = origins[3]
+        single = read_region_from_bytes(buf, spec, x, y, z, *size, channels=[1])
+        assert np.array_equal(read_regions(buf, spec, origins, size, channels=[1])[3], single)
+
+
+def test_read_regions_out_dtype_and_bounds():
+    vol, payloads = _payloads()
+    buf, spec = payloads[("C", "C_CONTIG")]
+    origins = np.array([[0, 0, 0], [9, 6, 5]])
+
+    out = np.zeros((2, 2, 3, 4, 1), dtype=np.float32)
+    got = read_regions(buf, spec, origins, (4, 3, 2), channels=[1], dtype="float32", out=out)
+    assert got is out
+    assert np.array_equal(out[1, ..., 0], vol[5:7, 6:9, 9:13, 1].astype(np.float32))
+
+    assert read_regions(buf, spec, np.empty((0, 3), dtype=int), (2, 2, 2)).shape == (0, 2, 2, 2, 3)
+
+    with pytest.raises(ValueError, match="index 1"):
+        read_regions(buf, spec, [[0, 0, 0], [10, 0, 0], [-1, 0, 0]], (4, 3, 2))
+    with pytest.raises(ValueError, match="shape"):
+        read_regions(buf, spec, origins, (4, 3, 2), out=np.empty((2, 1, 1, 1, 3)))
+    with pytest.raises(ValueError):
+        read_regions(buf, spec, origins, (4, 3, 2), channels=[3])
+
+
+if __name__ == "__main__":
+    test_read_regions_matches_per_roi_reads()
+    test_read_regions_out_dtype_and_bounds()
+    print("All read_regions tests passed.")
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.snapshot_v08 import write_snapshot_v08
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08, write_tile_pack_v08
+from corpus_informaticus.roi_server_v08 import (
+    RoiServerError,
+    RoiServerV08,
+    open_roi_client_v08,
+)
+
+DIMS = (24, 20, 12)
+
+
+def _write_sources(td):
+    spec = VolumeSpecV06(dims=DIMS, channels=2, dtype="uint16")
+    vol = np.arange(12 * 20 * 24 * 2, dtype=np.uint16).reshape(12, 20, 24, 2)
+    paths = {
+        "dense": os.path.join(td, "dense.civd"),
+        "bricked": os.path.join(td, "bricked.civd"),
+        "pack": os.path.join(td, "pack"),
+    }
+    write_snapshot_v08(paths["dense"], vol, spec)
+    write_snapshot_v08(paths["bricked"], vol, spec, brick_size=(8, 8, 4))
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+    write_tile_pack_v08(paths["pack"], tiling, tiles, spec, compressor="zlib")
+    return vol, paths
+
+
+def test_roi_and_point_queries_over_unix_socket_and_tcp():
+    async def main(td):
+        vol, paths = _write_sources(td)
+        async with RoiServerV08(paths) as server:
+            for address in (os.path.join(td, "civd.sock"), ("127.0.0.1", 0)):
+                bound = await server.start(address)
+                async with await open_roi_client_v08(bound, pool_size=2) as client:
+                    info = await client.info("pack")
+                    assert info["dims"] == list(DIMS) and info["kind"] == "tile_pack"
+
+                    roi = RoiV06(x=5, y=3, z=2, w=12, h=9, d=6)
+                    pts = np.array([[0, 0, 0], [23, 19, 11], [9, 8, 4], [9, 8, 5]])
+                    for name in paths:
+                        block = await client.read_roi(name, roi, channels=[1])
+                        assert np.array_equal(block, vol[2:8, 3:12, 5:17, [1]]), name
+                        values = await client.read_points(name, pts)
+                        assert np.array_equal(values, vol[pts[:, 2], pts[:, 1], pts[:, 0]]), name
+
+                    with pytest.raises(RoiServerError, match="out of bounds"):
+                        await client.read_roi("dense", RoiV06(x=20, y=0, z=0, w=8, h=1, d=1))
+                    with pytest.raises(RoiServerError, match="Unknown source"):
+                        await client.info("nope")
+                    # the connection survives request errors
+                    assert (await client.info("dense"))["kind"] == "snapshot"
+                await server.stop()
+
+    with tempfile.TemporaryDirectory() as td:
+        asyncio.run(main(td))
+
+
+def test_pipelined_requests_coalesce_tile_loads():
+    async def main(td):
+        vol, paths = _write_sources(td)
+        async with RoiServerV08({"pack": paths["pack"]}) as server:
+            bound = await server.start(os.path.join(td, "civd.sock"))
+            async with await open_roi_client_v08(bound, pool_size=1) as client:
+                rois = [RoiV06(x=x, y=0, z=0, w=12, h=20, d=12) for x in (0, 4, 8, 12) * 4]
+                blocks = await asyncio.gather(*(client.read_roi("pack", r) for r in rois))
+                for r, block in zip(rois, blocks):
+                    assert np.array_equal(block, vol[:, :, r.x : r.x + 12])
+
+            stats = server.stats()["caches"]["pack"]
+            # 3 x 3 x 2 tiles in the volume, each loaded exactly once
+            assert stats["misses"] == 18 and stats["tiles"] == 18
+            assert stats["coalesced"] > 0
+            assert server.stats()["requests"] == 16
+
+    with tempfile.TemporaryDirectory() as td:
+        asyncio.run(main(td))
+
+
+if __name__ == "__main__":
+    test_roi_and_point_queries_over_unix_socket_and_tcp()
+    test_pipelined_requests_coalesce_tile_loads()
+    print("All ROI server tests passed.")
@@ -0,0 +1,123 @@
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06
+from corpus_informaticus.snapshot_v08 import write_snapshot_v08
+from corpus_informaticus.shm_volume_v08 import VolumeConsumerV08, VolumePublisherV08
+
+SPEC = VolumeSpecV06(dims=(16, 12, 8), channels=2, dtype="uint16")
+
+
+def _vol(k):
+    return (np.arange(8 * 12 * 16 * 2, dtype=np.uint16).reshape(8, 12, 16, 2) + k).astype(np.uint16)
+
+
+def _consumer_proc(name, results):
+    with VolumeConsumerV08(name) as con:
+        seen = 0
+        for _ in range(2):
+            seen = con.wait_for_version(seen, timeout=10)
+            version, spec, meta, vol = con.read()
+            results.put((version, meta["k"], bool(np.array_equal(vol, _vol(meta["k"])))))
+
+
+def test_publish_and_consume_across_processes():
+    with VolumePublisherV08(None, capacity=SPEC.expected_nbytes()) as pub:
+        ctx = multiprocessing.get_context()
+        results = ctx.Queue()
+        proc = ctx.Process(target=_consumer_proc, args=(pub.name, results))
+        proc.start()
+
+        assert pub.publish(_vol(1), SPEC, meta={"k": 1}) == 1
+        first = results.get(timeout=10)
+        assert pub.publish(_vol(2), SPEC, meta={"k": 2}) == 2
+        second = results.get(timeout=10)
+        proc.join(timeout=10)
+
+        assert first == (1, 1, True) and second == (2, 2, True)
+        # the consumer's exit must not have removed the publisher's segment
+        with VolumeConsumerV08(pub.name) as con:
+            assert con.version == 2
+
+
+def _publisher_proc(name, n, ready, done):
+    spec = VolumeSpecV06(dims=(4, 4, 2), channels=1, dtype="uint8")
+    with VolumePublisherV08(name, capacity=spec.expected_nbytes()) as pub:
+        ready.set()
+        for k in range(1, n + 1):
+            # spec JSON length and (non-ASCII) content change every publish
+            pub.publish(np.full(32, k % 256, np.uint8), spec, meta={"k": k, "pad": "\u00e9" * (k % 97)})
+        done.wait(timeout=30)
+
+
+def test_acquire_retries_torn_spec_from_publisher_process():
+    ctx = multiprocessing.get_context()
+    ready, done = ctx.Event(), ctx.Event()
+    name, n = f"civd_test_torn_{os.getpid()}", 10000
+    proc = ctx.Process(target=_publisher_proc, args=(name, n, ready, done))
+    proc.start()
+    try:
+        assert ready.wait(timeout=10)
+        with VolumeConsumerV08(name) as con:
+            con.wait_for_version(0, timeout=10)
+            reads = 0
+            while True:
+                version, spec, meta, vol = con.read(timeout=10)
+                assert version == meta["k"] and meta["pad"] == "\u00e9" * (meta["k"] % 97)
+                assert np.all(vol == meta["k"] % 256)
+                reads += 1
+                if version == n:
+                    break
+        assert reads > 1
+    finally:
+        done.set()
+        proc.join(timeout=10)
+    assert proc.exitcode == 0
+
+
+def test_zero_copy_view_and_seqlock_validity():
+    with VolumePublisherV08(None, capacity=2 * SPEC.expected_nbytes()) as pub:
+        con = VolumeConsumerV08(pub.name)
+        with pytest.raises(LookupError):
+            con.acquire()
+        assert con.wait_for_version(0, timeout=0.01) is None
+
+        pub.publish(memoryview(_vol(5)), SPEC, meta={"frame": 5})
+        shared = con.acquire()
+        assert shared.version == 1 and shared.meta == {"frame": 5} and shared.spec == SPEC
+        assert np.array_equal(shared.volume, _vol(5))
+        assert not shared.volume.flags.owndata and shared.valid
+
+        pub.publish(_vol(6), SPEC)
+        # the view follows the segment; the seqlock reports the change
+        assert np.array_equal(shared.volume, _vol(6)) and not shared.valid
+        shared.release()
+
+        with pytest.raises(ValueError, match="capacity"):
+            big = VolumeSpecV06(dims=(16, 12, 24), channels=2, dtype="uint16")
+            pub.publish(np.zeros(big.expected_nbytes(), np.uint8), big)
+        con.close()
+
+
+def test_publish_snapshot_dense_and_bricked():
+    with tempfile.TemporaryDirectory() as td, VolumePublisherV08(None, capacity=SPEC.expected_nbytes()) as pub:
+        for i, brick_size in enumerate((None, (8, 8, 4))):
+            path = f"{td}/snap_{i}.civd"
+            write_snapshot_v08(path, _vol(i), SPEC, meta={"i": i}, brick_size=brick_size)
+            pub.publish_snapshot(path)
+            with VolumeConsumerV08(pub.name) as con:
+                version, spec, meta, vol = con.read()
+            assert (version, meta) == (i + 1, {"i": i})
+            assert np.array_equal(vol, _vol(i))
+
+
+if __name__ == "__main__":
+    test_publish_and_consume_across_processes()
+    test_acquire_retries_torn_spec_from_publisher_process()
+    test_zero_copy_view_and_seqlock_validity()
+    test_publish_snapshot_dense_and_bricked()
+    print("All shared-memory volume tests passed.")
@@ -1,8 +1,15 @@
+import os
 import tempfile
 import numpy as np
 
-from corpus_informaticus.snapshot_v08 import write_snapshot_v08, read_snapshot_v08, read_roi_from_snapshot_v08
-from corpus_informaticus.roi_v06 import VolumeSpecV06
+from corpus_informaticus.snapshot_v08 import (
+    SnapshotWriterV08,
+    write_snapshot_v08,
+    read_snapshot_v08,
+    read_roi_from_snapshot_v08,
+    read_regions_from_snapshot_v08,
+)
+from corpus_informaticus.roi_v06 import VolumeSpecV06, _volume_to_bytes
 
 def test_snapshot_v08_roundtrip():
     dims = (16, 12, 8)  # (x,y,z)
@@ -28,6 +35,107 @@ def test_snapshot_v08_roundtrip():
         assert roi.shape == (2, 5, 4, channels)
         assert int(roi[..., 0].mean()) == 11
 
+
+def test_snapshot_v08_bricked_roundtrip():
+    dims = (20, 13, 9)  # not multiples of the brick size
+    channels = 2
+    spec = VolumeSpecV06(dims=dims, channels=channels, dtype="uint16", order="C", signature="C_CONTIG")
+    vol = np.arange(9 * 13 * 20 * channels, dtype=np.uint16).reshape((9, 13, 20, channels))
+    buf = vol.tobytes(order="C")
+
+    with tempfile.TemporaryDirectory() as td:
+        path = f"{td}/snap_v08_bricked.civd"
+        hdr = write_snapshot_v08(path, buf, spec, meta={"k": 1}, brick_size=(8, 8, 4))
+        assert hdr.layout == "BRICKED" and hdr.brick_size == (8, 8, 4)
+
+        header, spec2, payload = read_snapshot_v08(path)
+        assert header.layout == "BRICKED" and header.meta == {"k": 1}
+        assert spec2 == spec
+        assert payload == buf
+
+        roi = read_roi_from_snapshot_v08(path, x=5, y=3, z=2, w=12, h=9, d=6, channels=[1])
+        assert np.array_equal(roi, vol[2:8, 3:12, 5:17, [1]])
+
+
+def test_snapshot_writer_streams_slabs():
+    dims = (20, 13, 9)
+    vol = np.arange(9 * 13 * 20 * 2, dtype=np.uint16).reshape((9, 13, 20, 2))
+    cases = [
+        ("C_CONTIG", "C", None),
+        ("PLANAR", "C", None),
+        ("F_CONTIG", "F", (8, 8, 4)),
+        ("PLANAR", "C", (8, 8, 4)),
+    ]
+    with tempfile.TemporaryDirectory() as td:
+        for i, (signature, order, brick_size) in enumerate(cases):
+            spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16", order=order, signature=signature)
+            path = f"{td}/stream_{i}.civd"
+            with SnapshotWriterV08(path, spec, meta={"i": i}, brick_size=brick_size) as w:
+                w.write_slab(vol[:3])
+                w.write_slab(bytearray(vol[3:4].tobytes()))  # any buffer, C-order planes
+                w.write_slab(memoryview(vol[4:9]))
+            assert not os.path.exists(f"{path}.{os.getpid()}.tmp")
+
+            header, spec2, payload = read_snapshot_v08(path)
+            assert header.meta == {"i": i} and spec2 == spec
+            assert payload == _volume_to_bytes(vol, spec)
+
+        spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16")
+        w = SnapshotWriterV08(f"{td}/short.civd", spec)
+        w.write_slab(vol[:5])
+        try:
+            w.close()
+            raise AssertionError("incomplete snapshot must not close")
+        except ValueError:
+            pass
+        assert sorted(os.listdir(td)) == [f"stream_{i}.civd" for i in range(4)]
+
+
+def test_read_regions_from_snapshot_dense_and_bricked():
+    dims = (20, 13, 9)
+    vol = np.arange(9 * 13 * 20 * 2, dtype=np.uint16).reshape((9, 13, 20, 2))
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16")
+    origins = np.array([[0, 0, 0], [14, 5, 6], [7, 9, 3]])
+    expected = np.stack([vol[z : z + 3, y : y + 4, x : x + 6, [1]] for x, y, z in origins])
+
+    with tempfile.TemporaryDirectory() as td:
+        for brick_size in (None, (8, 8, 4)):
+            path = f"{td}/regions_{brick_size is None}.civd"
+            write_snapshot_v08(path, vol, spec, brick_size=brick_size)
+            got = read_regions_from_snapshot_v08(path, origins, (6, 4, 3), channels=[1], dtype="float32")
+            assert got.dtype == np.float32
+            assert np.array_equal(got, expected)
+
+
+def test_read_roi_from_snapshot_rejects_bad_requests():
+    dims = (8, 8, 8)
+    vol = np.arange(8 * 8 * 8 * 2, dtype=np.uint16).reshape((8, 8, 8, 2))
+
+    with tempfile.TemporaryDirectory() as td:
+        for signature in ("C_CONTIG", "PLANAR", "MORTON"):
+            for brick_size in (None, (4, 4, 4)) if signature != "MORTON" else (None,):
+                spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16", signature=signature)
+                path = f"{td}/bad_{signature}_{brick_size is None}.civd"
+                write_snapshot_v08(path, vol, spec, brick_size=brick_size)
+                for kwargs, message in (
+                    (dict(x=6, w=4, channels=None), "out of bounds"),
+                    (dict(x=0, w=4, channels=[5]), "out of range"),
+                ):
+                    try:
+                        read_roi_from_snapshot_v08(path, y=0, z=0, h=4, d=4, **kwargs)
+                        raise AssertionError(f"{signature}: bad request must be rejected")
+                    except ValueError as e:
+                        assert message in str(e)
+
+
 if __name__ == "__main__":
     test_snapshot_v08_roundtrip()
     print("test_snapshot_v08_roundtrip: OK")
+    test_snapshot_v08_bricked_roundtrip()
+    print("test_snapshot_v08_bricked_roundtrip: OK")
+    test_snapshot_writer_streams_slabs()
+    print("test_snapshot_writer_streams_slabs: OK")
+    test_read_regions_from_snapshot_dense_and_bricked()
+    print("test_read_regions_from_snapshot_dense_and_bricked: OK")
+    test_read_roi_from_snapshot_rejects_bad_requests()
+    print("test_read_roi_from_snapshot_rejects_bad_requests: OK")
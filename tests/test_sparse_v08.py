@@ -0,0 +1,116 @@
+import os
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06, _volume_to_bytes
+from corpus_informaticus.sparse_v08 import (
+    SparseVolumeV08,
+    morton_key_ranges_for_roi,
+    write_sparse_snapshot_v08,
+    read_sparse_snapshot_v08,
+    read_roi_from_sparse_snapshot_v08,
+)
+from corpus_informaticus.morton_v08 import morton_encode_3d
+
+
+def _occupancy(dims=(50, 40, 30), frac=0.02, seed=3):
+    x, y, z = dims
+    rng = np.random.default_rng(seed)
+    vol = np.zeros((z, y, x, 2), dtype=np.uint16)
+    mask = rng.random((z, y, x)) < frac
+    vol[mask, 0] = 1
+    vol[mask, 1] = rng.integers(1, 1000, size=int(mask.sum()))
+    return vol
+
+
+def test_key_ranges_cover_roi_exactly():
+    roi = RoiV06(x=3, y=5, z=2, w=11, h=6, d=9)
+    ranges = morton_key_ranges_for_roi(roi, max_ranges=10_000)
+    zz, yy, xx = np.meshgrid(np.arange(2, 11), np.arange(5, 11), np.arange(3, 14), indexing="ij")
+    want = np.sort(morton_encode_3d(xx.ravel(), yy.ravel(), zz.ravel()))
+    got = np.concatenate([np.arange(a, b, dtype=np.uint64) for a, b in ranges])
+    assert np.array_equal(got, want)
+    assert len(morton_key_ranges_for_roi(roi, max_ranges=16)) <= 16
+
+
+def test_sparse_dense_roundtrip_and_roi():
+    vol = _occupancy()
+    for signature in ("C_CONTIG", "MORTON", "PLANAR"):
+        spec = VolumeSpecV06(dims=(50, 40, 30), channels=2, dtype="uint16", signature=signature)
+        sv = SparseVolumeV08.from_dense(_volume_to_bytes(vol, spec), spec)
+        assert len(sv) == int(vol[..., 0].astype(bool).sum())
+        assert sv.to_dense(signature=signature) == (_volume_to_bytes(vol, spec), spec)
+
+    roi = RoiV06(x=7, y=4, z=10, w=30, h=21, d=13)
+    assert np.array_equal(sv.read_roi(roi, channels=[1]), vol[10:23, 4:25, 7:37, 1:])
+    coords, values = sv.query_roi(roi)
+    x, y, z = coords.T
+    assert np.array_equal(values, vol[z, y, x])
+    assert len(coords) == int(vol[10:23, 4:25, 7:37, 0].astype(bool).sum())
+
+    pts = np.array([[x[0], y[0], z[0]], [0, 0, 0], [49, 39, 29]])
+    expect = vol[pts[:, 2], pts[:, 1], pts[:, 0]]
+    assert np.array_equal(sv.lookup(pts), expect)
+
+    dup = SparseVolumeV08.from_coords((4, 4, 4), [[1, 2, 3], [0, 0, 0], [1, 2, 3]], [5, 6, 7])
+    assert np.array_equal(dup.lookup([[1, 2, 3]]), [[7]])
+
+
+def test_sparse_snapshot_file():
+    vol = _occupancy()
+    spec = VolumeSpecV06(dims=(50, 40, 30), channels=2, dtype="uint16")
+    sv = SparseVolumeV08.from_dense(vol.tobytes(), spec, meta={"sensor": "lidar"})
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "occ.civds")
+        size = write_sparse_snapshot_v08(path, sv)
+        assert size == os.path.getsize(path) < spec.expected_nbytes() // 5
+
+        back = read_sparse_snapshot_v08(path)
+        assert back.meta == {"sensor": "lidar"}
+        assert np.array_equal(back.keys, sv.keys) and np.array_equal(back.values, sv.values)
+
+        roi = RoiV06(x=40, y=30, z=20, w=20, h=20, d=20)  # clamped
+        assert np.array_equal(read_roi_from_sparse_snapshot_v08(path, roi), vol[20:, 30:, 40:])
+        coords, values = read_roi_from_sparse_snapshot_v08(path, roi, channels=[0], dense=False)
+        assert len(coords) == len(values) == int(vol[20:, 30:, 40:, 0].sum())
+
+        empty = os.path.join(d, "empty.civds")
+        write_sparse_snapshot_v08(empty, SparseVolumeV08.from_dense(bytes(spec.expected_nbytes()), spec))
+        assert not read_roi_from_sparse_snapshot_v08(empty, roi).any()
+
+
+def test_sparse_rejects_bad_channels():
+    vol = _occupancy(dims=(8, 8, 8), frac=0.3)[..., :1]
+    spec = VolumeSpecV06(dims=(8, 8, 8), channels=1, dtype="uint16")
+    sv = SparseVolumeV08.from_dense(vol.tobytes(), spec)
+    roi = RoiV06(x=0, y=0, z=0, w=4, h=4, d=4)
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "one.civds")
+        write_sparse_snapshot_v08(path, sv)
+        calls = [
+            lambda: sv.read_roi(roi, channels=[3]),
+            lambda: sv.query_roi(roi, channels=[3]),
+            lambda: sv.lookup([[0, 0, 0]], channels=[-1]),
+            lambda: read_roi_from_sparse_snapshot_v08(path, roi, channels=[3]),
+            lambda: read_roi_from_sparse_snapshot_v08(path, roi, channels=[3], dense=False),
+        ]
+        for call in calls:
+            try:
+                call()
+                raise AssertionError("bad channel must be rejected")
+            except ValueError as e:
+                assert "out of range [0, 1)" in str(e)
+
+
+if __name__ == "__main__":
+    test_key_ranges_cover_roi_exactly()
+    print("test_key_ranges_cover_roi_exactly: OK")
+    test_sparse_dense_roundtrip_and_roi()
+    print("test_sparse_dense_roundtrip_and_roi: OK")
+    test_sparse_snapshot_file()
+    print("test_sparse_snapshot_file: OK")
+    test_sparse_rejects_bad_channels()
+    print("test_sparse_rejects_bad_channels: OK")
@@ -0,0 +1,83 @@
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06
+from corpus_informaticus.tile_pack_v07 import query_tiles_for_roi
+from corpus_informaticus.tile_pack_v08 import (
+    compute_tiling_spec_v08,
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+)
+from corpus_informaticus.spatial_query_v08 import (
+    FrustumV08,
+    OrientedBoxV08,
+    SphereV08,
+    query_tiles_for_shape_v08,
+    read_shape_from_tile_pack_v08,
+    shape_bounding_roi_v08,
+    shape_mask_v08,
+)
+
+
+def _voxel_centres(dims):
+    x, y, z = dims
+    zz, yy, xx = np.meshgrid(np.arange(z), np.arange(y), np.arange(x), indexing="ij")
+    return np.stack([xx.ravel(), yy.ravel(), zz.ravel()], axis=1) + 0.5
+
+
+def _shapes():
+    c = np.sqrt(0.5)
+    return [
+        SphereV08(center=(20.0, 16.0, 12.0), radius=9.0),
+        OrientedBoxV08(
+            center=(24.0, 16.0, 10.0),
+            half_extents=(14.0, 3.0, 4.0),
+            rotation=((c, -c, 0.0), (c, c, 0.0), (0.0, 0.0, 1.0)),
+        ),
+        FrustumV08.from_camera(
+            position=(1.0, 16.0, 12.0), forward=(1.0, 0.2, 0.0), up=(0.0, 0.0, 1.0),
+            fov_y_deg=40.0, aspect=1.0, near=2.0, far=40.0,
+        ),
+    ]
+
+
+def test_shape_tiles_cover_inside_voxels():
+    dims = (48, 32, 24)
+    tiling = compute_tiling_spec_v08(dims, (8, 8, 8))
+    pts = _voxel_centres(dims)
+    for shape in _shapes():
+        inside = pts[shape.contains(pts)]
+        assert len(inside) > 0
+        needed = {tuple(t) for t in (inside // 8).astype(int)}
+        got = {(t.tx, t.ty, t.tz) for t in query_tiles_for_shape_v08(tiling, shape)}
+        assert needed <= got
+
+        box = shape_bounding_roi_v08(shape, dims)
+        assert len(got) < len(query_tiles_for_roi(tiling, box))
+        assert shape_mask_v08(shape, box).sum() == len(inside)
+
+
+def test_read_shape_from_tile_pack():
+    dims = (48, 32, 24)
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint16")
+    vol = np.arange(24 * 32 * 48 * 2, dtype=np.uint16).reshape(24, 32, 48, 2)
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+
+    with tempfile.TemporaryDirectory() as d:
+        write_tile_pack_v08(d, tiling, tiles, spec)
+        shape = _shapes()[0]
+        coords, values = read_shape_from_tile_pack_v08(d, shape, channels=[1])
+
+    pts = _voxel_centres(dims)
+    assert len(coords) == int(shape.contains(pts).sum())
+    assert shape.contains(coords + 0.5).all()
+    x, y, z = coords.T
+    assert np.array_equal(values[:, 0], vol[z, y, x, 1])
+
+
+if __name__ == "__main__":
+    test_shape_tiles_cover_inside_voxels()
+    print("test_shape_tiles_cover_inside_voxels: OK")
+    test_read_shape_from_tile_pack()
+    print("test_read_shape_from_tile_pack: OK")
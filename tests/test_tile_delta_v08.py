@@ -0,0 +1,69 @@
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08, write_tile_pack_v08, read_roi_from_tile_pack_v08
+from corpus_informaticus.tile_delta_v08 import (
+    write_delta_step_v08,
+    load_temporal_pack_v08,
+    read_roi_from_delta_pack_v08,
+)
+
+
+def _volume(dims, channels=2, seed=0):
+    x, y, z = dims
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, size=(z, y, x, channels), dtype=np.uint8)
+
+
+def test_tile_pack_v08_roi_read():
+    dims = (20, 18, 10)
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint8")
+    vol = _volume(dims)
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 4))
+
+    with tempfile.TemporaryDirectory() as td:
+        write_tile_pack_v08(td, tiling, tiles, spec)
+        roi = RoiV06(x=3, y=5, z=2, w=15, h=12, d=8)
+        out = read_roi_from_tile_pack_v08(td, roi, channels=[1])
+        assert np.array_equal(out, vol[2:10, 5:17, 3:18, [1]])
+
+
+def test_delta_steps_store_only_changed_tiles():
+    dims = (32, 32, 16)
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint8")
+    v0 = _volume(dims)
+    v1 = v0.copy()
+    v1[0:4, 0:4, 0:4, :] = 7          # touches tile (0,0,0) only
+    v2 = v1.copy()
+    v2[12:16, 28:32, 28:32, 0] = 9    # touches tile (3,3,1) only
+
+    with tempfile.TemporaryDirectory() as td:
+        infos = []
+        for v in (v0, v1, v2):
+            tiling, tiles = tile_volume_buffer_v08(v.tobytes(), spec, (8, 8, 8))
+            infos.append(write_delta_step_v08(td, tiling, tiles, spec))
+
+        assert [i.step for i in infos] == [0, 1, 2]
+        assert infos[0].tiles_written == 32
+        assert infos[1].tiles_written == 1
+        assert infos[2].tiles_written == 1
+
+        _, _, steps = load_temporal_pack_v08(td)
+        assert steps == [0, 1, 2]
+
+        full = RoiV06(x=0, y=0, z=0, w=32, h=32, d=16)
+        for step, v in enumerate((v0, v1, v2)):
+            assert np.array_equal(read_roi_from_delta_pack_v08(td, step, full), v)
+
+        roi = RoiV06(x=2, y=2, z=2, w=4, h=4, d=4)
+        assert np.array_equal(read_roi_from_delta_pack_v08(td, 0, roi), v0[2:6, 2:6, 2:6])
+        assert np.array_equal(read_roi_from_delta_pack_v08(td, 2, roi), v1[2:6, 2:6, 2:6])
+
+
+if __name__ == "__main__":
+    test_tile_pack_v08_roi_read()
+    print("test_tile_pack_v08_roi_read: OK")
+    test_delta_steps_store_only_changed_tiles()
+    print("test_delta_steps_store_only_changed_tiles: OK")
@@ -0,0 +1,75 @@
+import os
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.tile_header_v08 import try_parse_tile_header_v08, TILE_FLAG_SHUFFLE, TILE_FLAG_DELTA_X
+from corpus_informaticus.tile_filters_v08 import (
+    encoding_flags_v08,
+    encode_tile_payload_v08,
+    decode_tile_payload_v08,
+)
+from corpus_informaticus.tile_manifest_v07 import TileIndexV07
+from corpus_informaticus.tile_pack_v07 import tile_index_to_name
+from corpus_informaticus.tile_pack_v08 import (
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    read_roi_from_tile_pack_v08,
+    write_region_to_tile_pack_v08,
+)
+
+
+def _depth(dims=(32, 16, 8)):
+    x, y, z = dims
+    zz, yy, xx = np.meshgrid(np.arange(z), np.arange(y), np.arange(x), indexing="ij")
+    return (1000 + 7 * xx + 3 * yy + zz).astype(np.uint16)[..., None]
+
+
+def test_filter_pipelines_roundtrip():
+    rng = np.random.default_rng(1)
+    for dtype, signature in (("uint16", "C_CONTIG"), ("float32", "PLANAR"), ("int16", "MORTON"), ("uint8", "F_CONTIG")):
+        spec = VolumeSpecV06(dims=(5, 4, 3), channels=2, dtype=dtype, signature=signature, order="F" if signature == "F_CONTIG" else "C")
+        payload = rng.integers(0, 100, size=spec.expected_nbytes(), dtype=np.uint8).tobytes()
+        for filters in ((), ("shuffle",), ("bitshuffle",), ("delta_x",), ("delta_x", "shuffle"), ("delta_x", "bitshuffle")):
+            for compressor in (None, "zlib"):
+                flags = encoding_flags_v08(filters, compressor)
+                stored = encode_tile_payload_v08(payload, spec, flags)
+                assert decode_tile_payload_v08(stored, spec, flags) == payload
+
+
+def test_filtered_pack_compresses_and_reads_back():
+    vol = _depth()
+    spec = VolumeSpecV06(dims=(32, 16, 8), channels=1, dtype="uint16")
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (16, 16, 8))
+
+    def _pack_size(d):
+        return sum(os.path.getsize(os.path.join(d, f)) for f in os.listdir(d) if f.endswith(".bin"))
+
+    with tempfile.TemporaryDirectory() as td:
+        plain, filt = os.path.join(td, "plain"), os.path.join(td, "filt")
+        write_tile_pack_v08(plain, tiling, tiles, spec, compressor="zlib")
+        write_tile_pack_v08(filt, tiling, tiles, spec, filters=("delta_x", "shuffle"), compressor="zlib",
+                            manifest_format="both", tile_crc=True)
+        assert _pack_size(filt) < _pack_size(plain) < len(vol.tobytes())
+
+        with open(os.path.join(filt, tile_index_to_name(TileIndexV07(1, 0, 0))), "rb") as f:
+            hdr = try_parse_tile_header_v08(f.read())
+        assert hdr.flags & TILE_FLAG_SHUFFLE and hdr.flags & TILE_FLAG_DELTA_X
+
+        roi = RoiV06(x=10, y=2, z=1, w=14, h=9, d=5)
+        assert np.array_equal(read_roi_from_tile_pack_v08(filt, roi), vol[1:6, 2:11, 10:24])
+
+        write_region_to_tile_pack_v08(filt, 15, 0, 0, np.full((1, 1, 2, 1), 5, dtype=np.uint16))
+        vol[0, 0, 15:17] = 5
+        with open(os.path.join(filt, tile_index_to_name(TileIndexV07(1, 0, 0))), "rb") as f:
+            assert try_parse_tile_header_v08(f.read()).flags == hdr.flags
+        full = read_roi_from_tile_pack_v08(filt, RoiV06(0, 0, 0, 32, 16, 8))
+        assert np.array_equal(full, vol)
+
+
+if __name__ == "__main__":
+    test_filter_pipelines_roundtrip()
+    print("test_filter_pipelines_roundtrip: OK")
+    test_filtered_pack_compresses_and_reads_back()
+    print("test_filtered_pack_compresses_and_reads_back: OK")
@@ -1,5 +1,5 @@
 from corpus_informaticus.tile_header_v08 import (
-    TileHeaderV08, try_parse_tile_header_v08, TILE_HEADER_LEN_V08
+    TileHeaderV08, try_parse_tile_header_v08, TILE_HEADER_LEN_V08, TILE_FLAG_RAGGED
 )
 
 def test_tile_header_roundtrip():
@@ -20,7 +20,29 @@ def test_tile_header_roundtrip():
     assert parsed is not None
     assert parsed.tx == 1 and parsed.ty == 2 and parsed.tz == 3
     assert parsed.payload_nbytes == 1234
+    assert parsed.extent is None and parsed.stored_shape() == (16, 16, 16)
+
+def test_ragged_tile_header_extent():
+    hdr = TileHeaderV08(
+        tile_format_ver=8,
+        header_len=TILE_HEADER_LEN_V08,
+        flags=TILE_FLAG_RAGGED,
+        tx=2, ty=1, tz=1,
+        tile_size=(8,8,8),
+        channels=2,
+        dtype="uint8",
+        signature="C_CONTIG",
+        order="C",
+        payload_nbytes=4 * 4 * 2 * 2,
+        extent=(4, 4, 2),
+    )
+    parsed = try_parse_tile_header_v08(hdr.to_bytes())
+    assert parsed.flags & TILE_FLAG_RAGGED
+    assert parsed.extent == (4, 4, 2)
+    assert parsed.stored_shape() == (4, 4, 2)
 
 if __name__ == "__main__":
     test_tile_header_roundtrip()
     print("test_tile_header_roundtrip: OK")
+    test_ragged_tile_header_extent()
+    print("test_ragged_tile_header_extent: OK")
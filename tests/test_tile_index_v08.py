@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.tile_manifest_v07 import TileIndexV07
+from corpus_informaticus.tile_pack_v07 import TILE_MANIFEST_FILENAME, load_tile_manifest, tile_index_to_name
+from corpus_informaticus.tile_pack_v08 import (
+    load_tile_pack_manifest_v08,
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    read_roi_from_tile_pack_v08,
+)
+from corpus_informaticus.tile_index_v08 import TileIndexV08
+
+
+def _pack(td, manifest_format, tile_crc=False):
+    dims = (20, 16, 12)
+    spec = VolumeSpecV06(dims=dims, channels=2, dtype="uint8")
+    vol = np.random.default_rng(3).integers(0, 255, size=(12, 16, 20, 2), dtype=np.uint8)
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+    del tiles[TileIndexV07(tx=2, ty=1, tz=1)]  # sparse pack
+    write_tile_pack_v08(td, tiling, tiles, spec, manifest_format=manifest_format, tile_crc=tile_crc)
+    return vol, tiles
+
+
+def test_binary_index_lookup_and_read():
+    with tempfile.TemporaryDirectory() as td:
+        vol, tiles = _pack(td, "binary", tile_crc=True)
+        assert not os.path.exists(os.path.join(td, TILE_MANIFEST_FILENAME))
+
+        with TileIndexV08(td) as index:
+            assert index.tiles_per_axis == (3, 2, 2)
+            assert index.has_crc
+            assert len(index) == 11
+            assert TileIndexV07(tx=2, ty=1, tz=1) not in index
+            nbytes, offset, _ = index.lookup(TileIndexV07(tx=1, ty=0, tz=1))
+            assert (nbytes, offset) == (8 * 8 * 8 * 2, 64)
+            idx = TileIndexV07(tx=0, ty=1, tz=0)
+            assert index.read_tile(idx) == tiles[idx]
+            assert set(index.present_tiles()) == set(tiles)
+
+        assert load_tile_manifest(td).tiles_per_axis == (3, 2, 2)
+
+        roi = read_roi_from_tile_pack_v08(td, RoiV06(x=1, y=2, z=0, w=14, h=12, d=8))
+        assert np.array_equal(roi, vol[0:8, 2:14, 1:15])
+
+
+def test_binary_index_crc_mismatch_detected():
+    with tempfile.TemporaryDirectory() as td:
+        _pack(td, "both", tile_crc=True)
+        assert os.path.exists(os.path.join(td, TILE_MANIFEST_FILENAME))
+        idx = TileIndexV07(tx=0, ty=0, tz=0)
+        path = os.path.join(td, tile_index_to_name(idx))
+        with open(path, "r+b") as f:
+            f.seek(100)
+            f.write(b"\xff\xfe")
+        with TileIndexV08(td) as index:
+            with pytest.raises(ValueError):
+                index.read_tile(idx)
+            index.read_tile(idx, verify_crc=False)
+
+
+def test_binary_index_takes_precedence_and_rewrites_drop_other_format():
+    with tempfile.TemporaryDirectory() as td:
+        vol, _ = _pack(td, "both")
+        # a stale JSON sidecar must not override the binary index
+        stale = {"volume_dims": [1, 1, 1], "tile_size": [1, 1, 1], "tiles_per_axis": [1, 1, 1],
+                 "volume_spec": {"dims": [1, 1, 1], "channels": 1, "dtype": "uint8"}}
+        with open(os.path.join(td, TILE_MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+            json.dump(stale, f)
+        tiling, spec, _ = load_tile_pack_manifest_v08(td)
+        assert tiling.tiles_per_axis == (3, 2, 2) and spec.channels == 2
+        assert load_tile_manifest(td).tiles_per_axis == (3, 2, 2)
+
+        _pack(td, "binary")
+        assert not os.path.exists(os.path.join(td, TILE_MANIFEST_FILENAME))
+        _pack(td, "json")
+        with pytest.raises(FileNotFoundError):
+            TileIndexV08(td)
+        roi = read_roi_from_tile_pack_v08(td, RoiV06(x=0, y=0, z=0, w=20, h=16, d=8))
+        assert np.array_equal(roi, vol[0:8])
+
+
+if __name__ == "__main__":
+    test_binary_index_lookup_and_read()
+    test_binary_index_crc_mismatch_detected()
+    test_binary_index_takes_precedence_and_rewrites_drop_other_format()
+    print("All tile index v0.8 tests passed.")
@@ -0,0 +1,112 @@
+import os
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.tile_index_v08 import TILE_INDEX_FILENAME
+from corpus_informaticus.tile_manifest_v07 import TileIndexV07
+from corpus_informaticus.tile_pack_v07 import query_tiles_for_roi
+from corpus_informaticus.tile_pack_v08 import (
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    write_region_to_tile_pack_v08,
+)
+from corpus_informaticus.tile_octree_v08 import (
+    TILE_OCTREE_FILENAME,
+    build_tile_octree_v08,
+    open_tile_octree_v08,
+)
+
+
+def _world(dims=(100, 72, 40)):
+    # Two small occupied blobs in an otherwise empty volume.
+    x, y, z = dims
+    vol = np.zeros((z, y, x, 2), dtype=np.uint8)
+    vol[3:9, 5:14, 6:20] = (1, 7)
+    vol[30:38, 60:70, 80:97] = (1, 9)
+    vol[31, 61, 85] = (1, 200)
+    return vol
+
+
+def _pack(d, vol, sparse=True, **kwargs):
+    z, y, x, c = vol.shape
+    spec = VolumeSpecV06(dims=(x, y, z), channels=c, dtype="uint8")
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+    if sparse:
+        tiles = {idx: p for idx, p in tiles.items() if any(p)}
+    write_tile_pack_v08(d, tiling, tiles, spec, **kwargs)
+    return tiling
+
+
+def test_octree_roi_and_points():
+    vol = _world()
+    with tempfile.TemporaryDirectory() as d:
+        tiling = _pack(d, vol, sparse=False, manifest_format="both")
+        with build_tile_octree_v08(d) as octree:
+            assert len(octree) < len(query_tiles_for_roi(tiling, RoiV06(0, 0, 0, 100, 72, 40))) // 10
+            assert os.path.isfile(os.path.join(d, TILE_OCTREE_FILENAME))
+
+            full = RoiV06(0, 0, 0, 100, 72, 40)
+            assert np.array_equal(octree.read_roi(full), vol)
+            roi = RoiV06(x=10, y=3, z=2, w=80, h=65, d=33)
+            assert np.array_equal(octree.read_roi(roi, channels=[1]), vol[2:35, 3:68, 10:90, 1:])
+            assert octree.query_tiles(RoiV06(40, 30, 10, 30, 20, 15)) == []
+
+            pts = np.array([[6, 5, 3], [85, 61, 31], [50, 40, 20], [99, 71, 39], [-1, 0, 0]])
+            want = np.array([[1, 7], [1, 200], [0, 0], [0, 0], [0, 0]], dtype=np.uint8)
+            assert np.array_equal(octree.lookup(pts), want)
+
+
+def test_octree_raycast():
+    vol = _world()
+    with tempfile.TemporaryDirectory() as d:
+        _pack(d, vol)
+        with open_tile_octree_v08(d) as octree:
+            hit = octree.raycast((0.5, 9.5, 5.5), (1.0, 0.0, 0.0))
+            assert hit is not None and hit.voxel == (6, 9, 5) and abs(hit.t - 5.5) < 1e-9
+            assert list(hit.value) == [1, 7]
+
+            hit = octree.raycast((99.5, 71.5, 39.5), (-19.0, -10.5, -8.5))
+            assert hit is not None and hit.voxel[0] >= 80 and hit.tile in octree
+
+            assert octree.raycast((0.5, 40.5, 20.5), (1.0, 0.0, 0.0)) is None
+            assert octree.raycast((0.5, 9.5, 5.5), (1.0, 0.0, 0.0), max_t=4.0) is None
+
+
+def test_octree_tracks_region_writes():
+    vol = _world()
+    with tempfile.TemporaryDirectory() as d:
+        _pack(d, vol, sparse=False)
+        build_tile_octree_v08(d).close()
+        write_region_to_tile_pack_v08(d, 50, 40, 20, np.full((1, 1, 1, 2), 3, dtype=np.uint8))
+        vol[20, 40, 50] = 3
+        with open_tile_octree_v08(d) as octree:
+            assert TileIndexV07(6, 5, 2) in octree
+            assert np.array_equal(octree.read_roi(RoiV06(0, 0, 0, 100, 72, 40)), vol)
+
+
+def test_rewriting_pack_drops_saved_octree_and_stale_index():
+    vol = _world()
+    with tempfile.TemporaryDirectory() as d:
+        _pack(d, vol, manifest_format="both")
+        build_tile_octree_v08(d).close()
+
+        vol[20, 40, 50] = (1, 5)
+        _pack(d, vol)
+        assert not os.path.exists(os.path.join(d, TILE_OCTREE_FILENAME))
+        assert not os.path.exists(os.path.join(d, TILE_INDEX_FILENAME))
+        with open_tile_octree_v08(d) as octree:
+            assert TileIndexV07(6, 5, 2) in octree
+            assert np.array_equal(octree.read_roi(RoiV06(0, 0, 0, 100, 72, 40)), vol)
+
+
+if __name__ == "__main__":
+    test_octree_roi_and_points()
+    print("test_octree_roi_and_points: OK")
+    test_octree_raycast()
+    print("test_octree_raycast: OK")
+    test_octree_tracks_region_writes()
+    print("test_octree_tracks_region_writes: OK")
+    test_rewriting_pack_drops_saved_octree_and_stale_index()
+    print("test_rewriting_pack_drops_saved_octree_and_stale_index: OK")
@@ -21,6 +21,7 @@ from typing import Tuple
 import numpy as np
 
 from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.tile_index_v08 import TILE_INDEX_FILENAME, TileIndexV08
 from corpus_informaticus.tile_manifest_v07 import TileIndexV07
 from corpus_informaticus.tile_pack_v07 import (
     TILE_MANIFEST_FILENAME,
@@ -32,6 +33,7 @@ from corpus_informaticus.tile_pack_v07 import (
     tile_volume_buffer,
     write_tile_pack,
 )
+from corpus_informaticus.tile_pack_v08 import read_roi_from_tile_pack_v08
 
 
 # ---------------------------------------------------------------------------
@@ -146,6 +148,41 @@ def test_write_pack_and_manifest() -> None:
     print("test_write_pack_and_manifest: OK")
 
 
+def test_write_pack_binary_manifest() -> None:
+    buf, spec = _make_test_volume(dims=(20, 16, 12), channels=2)
+    tiling_spec, tiles = tile_volume_buffer(buf, spec, tile_size=(8, 8, 8))
+
+    out_dir = "tmp_test_tile_pack_v07_binary"
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+
+    write_tile_pack(out_dir, tiling_spec, tiles)
+    write_tile_pack(out_dir, tiling_spec, tiles, volume_spec=spec, manifest_format="binary")
+
+    # The binary index replaces the JSON manifest
+    assert not os.path.exists(os.path.join(out_dir, TILE_MANIFEST_FILENAME))
+    assert os.path.isfile(os.path.join(out_dir, TILE_INDEX_FILENAME))
+    assert load_tile_manifest(out_dir) == tiling_spec
+
+    # v0.8 readers use the index for the ragged v0.7 tiles
+    with TileIndexV08(out_dir) as index:
+        assert index.tile_file_format == "RAW_V07" and len(index) == len(tiles)
+    vol = np.frombuffer(buf, dtype=np.uint8).reshape(12, 16, 20, 2)
+    roi = read_roi_from_tile_pack_v08(out_dir, RoiV06(x=3, y=1, z=2, w=17, h=15, d=10))
+    assert np.array_equal(roi, vol[2:12, 1:16, 3:20])
+
+    try:
+        write_tile_pack(out_dir, tiling_spec, tiles, manifest_format="binary")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("binary manifest without volume_spec should fail")
+
+    shutil.rmtree(out_dir)
+
+    print("test_write_pack_binary_manifest: OK")
+
+
 def test_query_tiles_for_full_volume_roi() -> None:
     buf, spec = _make_test_volume(dims=(16, 16, 16), channels=2)
     tile_size = (8, 8, 8)
@@ -185,6 +222,7 @@ def main() -> None:
     test_tile_name_roundtrip()
     test_tiling_basic()
     test_write_pack_and_manifest()
+    test_write_pack_binary_manifest()
     test_query_tiles_for_full_volume_roi()
     print("All v0.7 tiling tests passed.")
 
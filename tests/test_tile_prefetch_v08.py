@@ -0,0 +1,49 @@
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.tile_pack_v08 import tile_volume_buffer_v08, write_tile_pack_v08
+from corpus_informaticus.tile_prefetch_v08 import (
+    extrapolate_rois_v08,
+    open_tile_pack_prefetcher_v08,
+)
+
+
+def test_extrapolate_rois_constant_velocity():
+    hist = [RoiV06(x=0, y=0, z=0, w=8, h=8, d=8), RoiV06(x=4, y=2, z=0, w=8, h=8, d=8)]
+    pred = extrapolate_rois_v08(hist, 2)
+    assert pred == [RoiV06(x=8, y=4, z=0, w=8, h=8, d=8), RoiV06(x=12, y=6, z=0, w=8, h=8, d=8)]
+    assert extrapolate_rois_v08(hist[:1], 3) == []
+
+
+def test_prefetcher_moving_roi():
+    dims = (64, 16, 8)
+    spec = VolumeSpecV06(dims=dims, channels=1, dtype="uint8")
+    vol = (np.arange(8 * 16 * 64) % 251).astype(np.uint8).reshape(8, 16, 64, 1)
+    tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+
+    with tempfile.TemporaryDirectory() as d:
+        write_tile_pack_v08(d, tiling, tiles, spec)
+
+        with open_tile_pack_prefetcher_v08(d, horizon=2, background=True) as pf:
+            for step in range(7):
+                roi = RoiV06(x=step * 6, y=0, z=0, w=12, h=16, d=8)
+                out = pf.read_roi(roi)
+                assert np.array_equal(out, vol[:, :, roi.x:roi.x + 12, :])
+                pf.wait()
+            stats = pf.stats()
+
+    # After the first two reads establish the motion, leading-edge tiles
+    # are already cached when the ROI reaches them.
+    assert stats.prefetched > 0
+    assert stats.prefetch_hits > 0
+    assert stats.hit_rate > 0.5
+    assert stats.misses < stats.requests
+
+
+if __name__ == "__main__":
+    test_extrapolate_rois_constant_velocity()
+    print("test_extrapolate_rois_constant_velocity: OK")
+    test_prefetcher_moving_roi()
+    print("test_prefetcher_moving_roi: OK")
@@ -0,0 +1,86 @@
+import os
+import tempfile
+
+import numpy as np
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06
+from corpus_informaticus.tile_pack_v08 import (
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    read_roi_from_tile_pack_v08,
+)
+from corpus_informaticus.tile_store_v08 import TileStoreV08, release_tile_pack_v08
+
+
+def test_tile_store_dedup_and_gc():
+    dims = (32, 32, 16)
+    spec = VolumeSpecV06(dims=dims, channels=1, dtype="uint8")
+
+    vol_a = np.zeros((16, 32, 32, 1), dtype=np.uint8)
+    vol_a[0:8, 0:8, 0:8, 0] = np.arange(512, dtype=np.uint16).reshape(8, 8, 8) % 256
+    vol_b = vol_a.copy()
+    vol_b[8:16, 24:32, 24:32, 0] = 5
+
+    with tempfile.TemporaryDirectory() as td:
+        store = TileStoreV08(os.path.join(td, "store"))
+
+        tiling, tiles_a = tile_volume_buffer_v08(vol_a.tobytes(), spec, (8, 8, 8))
+        _, tiles_b = tile_volume_buffer_v08(vol_b.tobytes(), spec, (8, 8, 8))
+        pack_a = os.path.join(td, "pack_a")
+        pack_b = os.path.join(td, "pack_b")
+        write_tile_pack_v08(pack_a, tiling, tiles_a, spec, tile_store=store)
+        write_tile_pack_v08(pack_b, tiling, tiles_b, spec, tile_store=store)
+
+        # No per-tile files in the packs, only the manifest.
+        assert os.listdir(pack_a) == ["tiling_manifest.json"]
+
+        # Unique payloads: the ramp tile, the zero tile and the constant-5 tile.
+        assert store.stats() == {"blobs": 3, "refs": 64}
+
+        full = RoiV06(x=0, y=0, z=0, w=32, h=32, d=16)
+        assert np.array_equal(read_roi_from_tile_pack_v08(pack_a, full), vol_a)
+        assert np.array_equal(read_roi_from_tile_pack_v08(pack_b, full), vol_b)
+
+        assert release_tile_pack_v08(pack_b, store) == 32
+        removed, freed = store.gc()
+        assert removed == 1 and freed == 8 * 8 * 8
+
+        # Reopening the store sees the persisted refcounts.
+        reopened = TileStoreV08(os.path.join(td, "store"))
+        assert reopened.stats() == {"blobs": 2, "refs": 32}
+        assert np.array_equal(read_roi_from_tile_pack_v08(pack_a, full), vol_a)
+
+
+def test_two_store_instances_share_refcounts():
+    spec = VolumeSpecV06(dims=(16, 8, 8), channels=1, dtype="uint8")
+    vol_a = np.zeros((8, 8, 16, 1), dtype=np.uint8)
+    vol_b = np.full((8, 8, 16, 1), 7, dtype=np.uint8)
+    full = RoiV06(x=0, y=0, z=0, w=16, h=8, d=8)
+
+    with tempfile.TemporaryDirectory() as td:
+        root = os.path.join(td, "store")
+        first = TileStoreV08(root)
+        second = TileStoreV08(root)
+
+        tiling, tiles_a = tile_volume_buffer_v08(vol_a, spec, (8, 8, 8))
+        _, tiles_b = tile_volume_buffer_v08(vol_b, spec, (8, 8, 8))
+        pack_a, pack_b = os.path.join(td, "a"), os.path.join(td, "b")
+        write_tile_pack_v08(pack_a, tiling, tiles_a, spec, tile_store=first)
+        # 'second' was opened before 'first' wrote anything
+        write_tile_pack_v08(pack_b, tiling, tiles_b, spec, tile_store=second)
+
+        assert first.stats() == second.stats() == {"blobs": 2, "refs": 4}
+        # gc on the instance that never saw pack_b must keep its blob
+        assert first.gc() == (0, 0)
+        assert np.array_equal(read_roi_from_tile_pack_v08(pack_b, full), vol_b)
+
+        release_tile_pack_v08(pack_a, second)
+        assert first.gc() == (1, 8 * 8 * 8)
+        assert TileStoreV08(root).stats() == {"blobs": 1, "refs": 2}
+        assert np.array_equal(read_roi_from_tile_pack_v08(pack_b, full), vol_b)
+
+
+if __name__ == "__main__":
+    test_tile_store_dedup_and_gc()
+    test_two_store_instances_share_refcounts()
+    print("test_tile_store_dedup_and_gc: OK")
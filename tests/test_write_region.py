@@ -0,0 +1,174 @@
+"""
+In-place region writes for dense buffers, v0.7/v0.8 snapshots and v0.8 tile packs.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from corpus_informaticus.roi_v06 import VolumeSpecV06, RoiV06, write_region_to_bytes
+from corpus_informaticus.morton_v08 import encode_morton_volume, decode_morton_volume
+from corpus_informaticus.snapshot_v07 import write_snapshot_v07, read_snapshot_v07, write_region_to_snapshot_v07
+from corpus_informaticus.snapshot_v08 import (
+    write_snapshot_v08,
+    read_snapshot_v08,
+    write_region_to_snapshot_v08,
+)
+from corpus_informaticus.tile_filters_v08 import encoding_flags_v08
+from corpus_informaticus.tile_header_v08 import TILE_ENCODING_MASK
+from corpus_informaticus.tile_index_v08 import TILE_INDEX_FILENAME, TileIndexV08
+from corpus_informaticus.tile_manifest_v07 import TileIndexV07
+from corpus_informaticus.tile_pack_v07 import tile_index_to_name
+from corpus_informaticus.tile_pack_v08 import (
+    tile_volume_buffer_v08,
+    write_tile_pack_v08,
+    read_roi_from_tile_pack_v08,
+    read_tile_file_payload_auto,
+    write_region_to_tile_pack_v08,
+)
+from corpus_informaticus.tile_store_v08 import TileStoreV08
+
+DIMS = (20, 14, 10)
+
+
+def _setup():
+    spec = VolumeSpecV06(dims=DIMS, channels=3, dtype="uint16")
+    vol = np.arange(10 * 14 * 20 * 3, dtype=np.uint16).reshape((10, 14, 20, 3))
+    patch = np.full((4, 5, 6, 1), 999, dtype=np.uint16)
+    expected = vol.copy()
+    expected[3:7, 2:7, 9:15, [2]] = patch
+    return spec, vol, patch, expected
+
+
+def test_write_region_to_bytes_c_f_and_morton():
+    spec, vol, patch, expected = _setup()
+
+    buf = bytearray(vol.tobytes())
+    write_region_to_bytes(buf, spec, 9, 2, 3, patch, channels=[2])
+    assert bytes(buf) == expected.tobytes()
+
+    fspec = VolumeSpecV06(dims=DIMS, channels=3, dtype="uint16", order="F")
+    fbuf = bytearray(vol.tobytes(order="F"))
+    write_region_to_bytes(fbuf, fspec, 9, 2, 3, patch, channels=[2])
+    assert bytes(fbuf) == expected.tobytes(order="F")
+
+    mbuf, mspec = encode_morton_volume(vol.tobytes(), spec)
+    mbuf = bytearray(mbuf)
+    write_region_to_bytes(mbuf, mspec, 9, 2, 3, patch, channels=[2])
+    assert decode_morton_volume(bytes(mbuf), mspec)[0] == expected.tobytes()
+
+    with pytest.raises(TypeError):
+        write_region_to_bytes(vol.tobytes(), spec, 0, 0, 0, patch, channels=[0])
+    with pytest.raises(ValueError):
+        write_region_to_bytes(buf, spec, 16, 0, 0, patch, channels=[0])
+
+
+def test_write_region_to_snapshots():
+    spec, vol, patch, expected = _setup()
+    with tempfile.TemporaryDirectory() as td:
+        p7 = os.path.join(td, "snap.v07")
+        write_snapshot_v07(vol.tobytes(), spec, path=p7)
+        write_region_to_snapshot_v07(p7, 9, 2, 3, patch, channels=[2])
+        assert read_snapshot_v07(p7)[2] == expected.tobytes()
+
+        for brick_size in (None, (8, 8, 4)):
+            p8 = os.path.join(td, f"snap_{brick_size}.v08")
+            write_snapshot_v08(p8, vol.tobytes(), spec, brick_size=brick_size)
+            hdr = write_region_to_snapshot_v08(p8, 9, 2, 3, patch, channels=[2])
+            assert hdr.generation == 1
+            header, _, payload = read_snapshot_v08(p8)
+            assert header.generation == 1
+            assert payload == expected.tobytes()
+
+
+def test_write_region_to_tile_pack_rewrites_only_intersecting_tiles():
+    spec, vol, patch, expected = _setup()
+    full = RoiV06(0, 0, 0, *DIMS)
+    with tempfile.TemporaryDirectory() as td:
+        tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+
+        pack = os.path.join(td, "pack")
+        write_tile_pack_v08(pack, tiling, tiles, spec, manifest_format="both", tile_crc=True)
+        written = write_region_to_tile_pack_v08(pack, 9, 2, 3, patch, channels=[2])
+        assert written == [TileIndexV07(1, 0, 0)]
+        assert np.array_equal(read_roi_from_tile_pack_v08(pack, full), expected)
+
+        store = TileStoreV08(os.path.join(td, "store"))
+        cas = os.path.join(td, "cas")
+        write_tile_pack_v08(cas, tiling, tiles, spec, tile_store=store)
+        refs_before = store.stats()["refs"]
+        write_region_to_tile_pack_v08(cas, 9, 2, 3, patch, channels=[2], tile_store=store)
+        assert TileStoreV08(store.root).stats()["refs"] == refs_before
+        store.gc()
+        assert np.array_equal(read_roi_from_tile_pack_v08(cas, full), expected)
+
+        # without tile_store= the writer opens the pack's store itself
+        write_region_to_tile_pack_v08(cas, 0, 0, 0, patch, channels=[0])
+        expected[0:4, 0:5, 0:6, [0]] = patch
+        assert TileStoreV08(store.root).stats()["refs"] == refs_before
+        store.gc()
+        assert np.array_equal(read_roi_from_tile_pack_v08(cas, full), expected)
+
+
+def test_new_tiles_in_binary_pack_get_the_pack_encoding():
+    spec, vol, _, _ = _setup()
+    with tempfile.TemporaryDirectory() as td:
+        tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8), pad_edges=False)
+        missing = TileIndexV07(2, 1, 1)  # ragged corner tile, x 16..20, y 8..14, z 8..10
+        del tiles[missing]
+        pack = os.path.join(td, "pack")
+        write_tile_pack_v08(pack, tiling, tiles, spec, manifest_format="binary", filters=["shuffle"], compressor="zlib")
+
+        patch = np.full((2, 6, 4, 1), 7, dtype=np.uint16)
+        assert write_region_to_tile_pack_v08(pack, 16, 8, 8, patch, channels=[2]) == [missing]
+
+        hdr, _ = read_tile_file_payload_auto(os.path.join(pack, tile_index_to_name(missing)))
+        assert hdr.flags & TILE_ENCODING_MASK == encoding_flags_v08(["shuffle"], "zlib")
+        assert tuple(hdr.stored_shape()) == (4, 6, 2)
+        with TileIndexV08(pack) as index:
+            assert index.pack_encoding == encoding_flags_v08(["shuffle"], "zlib") and index.ragged
+
+        expected = vol.copy()
+        expected[8:10, 8:14, 16:20] = 0
+        expected[8:10, 8:14, 16:20, [2]] = patch
+        assert np.array_equal(read_roi_from_tile_pack_v08(pack, RoiV06(0, 0, 0, *DIMS)), expected)
+
+
+def test_index_reader_retries_until_new_index_is_swapped_in():
+    spec, vol, patch, expected = _setup()
+    idx = TileIndexV07(1, 0, 0)
+    with tempfile.TemporaryDirectory() as td:
+        tiling, tiles = tile_volume_buffer_v08(vol.tobytes(), spec, (8, 8, 8))
+        old, new = os.path.join(td, "old"), os.path.join(td, "new")
+        for pack in (old, new):
+            write_tile_pack_v08(pack, tiling, tiles, spec, manifest_format="binary", tile_crc=True, compressor="zlib")
+        write_region_to_tile_pack_v08(new, 9, 2, 3, patch, channels=[2])
+        new_payload = TileIndexV08(new).read_tile(idx)
+
+        # a writer has replaced the tile file but not yet the index
+        reader = TileIndexV08(old, retry_timeout=0.05)
+        shutil.copyfile(os.path.join(new, tile_index_to_name(idx)), os.path.join(old, tile_index_to_name(idx)))
+        with pytest.raises(ValueError):
+            reader.read_tile(idx)
+
+        reader.retry_timeout = 5.0
+        swap = threading.Timer(0.05, os.replace, (os.path.join(new, TILE_INDEX_FILENAME), os.path.join(old, TILE_INDEX_FILENAME)))
+        swap.start()
+        try:
+            assert reader.read_tile(idx) == new_payload
+        finally:
+            swap.join()
+        reader.close()
+
+
+if __name__ == "__main__":
+    test_write_region_to_bytes_c_f_and_morton()
+    test_write_region_to_snapshots()
+    test_write_region_to_tile_pack_rewrites_only_intersecting_tiles()
+    test_new_tiles_in_binary_pack_get_the_pack_encoding()
+    test_index_reader_retries_until_new_index_is_swapped_in()
+    print("All write-region tests passed.")